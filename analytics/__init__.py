@@ -1 +1 @@
-__all__ = ['integration_guide', 'analytics_controller', 'interactive_charts', 'anomaly_detection', 'user_behavior', 'access_trends', 'security_patterns', 'unique_patterns_analyzer']
+__all__ = ['integration_guide', 'analytics_controller', 'interactive_charts', 'anomaly_detection', 'user_behavior', 'access_trends', 'security_patterns', 'unique_patterns_analyzer', 'incremental_aggregates', 'sketches', 'prepared_frame', 'tailgating', 'streaming_anomalies', 'model_registry', 'user_profiles', 'behavior_clustering', 'sequence_mining', 'rollup_cube', 'door_forecasting', 'security_rules', 'interaction_matrix', 'access_graph', 'copresence_index', 'impossible_travel', 'kpi_sketches']
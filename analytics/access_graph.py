@@ -0,0 +1,260 @@
+"""
+Access Graph Module
+Door-transition network with centrality, communities and chokepoints
+"""
+
+import pandas as pd
+import numpy as np
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+import logging
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from core.caching import dataframe_fingerprint
+
+from .sequence_mining import DEFAULT_SESSION_GAP
+
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-10
+MAX_ITERATIONS = 100
+DEFAULT_MAX_GRAPHS = 8
+
+class AccessGraph:
+    """Weighted directed graph of consecutive door visits
+
+    ``adjacency[i, j]`` counts badges moving from door ``i`` to door ``j``
+    as consecutive events within one session (no gap over
+    ``session_gap``); repeats at the same door are not edges. Edges are
+    extracted from the sorted event arrays in one vectorised pass and kept
+    as a CSR matrix, so memory follows the distinct door pairs. Centrality
+    and communities are computed on first use and kept with the graph.
+    """
+
+    def __init__(self, doors: np.ndarray, adjacency: sparse.csr_matrix):
+        self.logger = logging.getLogger(__name__)
+        self.doors = doors
+        self.adjacency = adjacency
+        self._pagerank: Optional[np.ndarray] = None
+        self._communities: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame,
+                    session_gap: timedelta = DEFAULT_SESSION_GAP) -> 'AccessGraph':
+        """Build the graph from ``person_id``, ``door_id`` and ``timestamp``"""
+        valid = (df['person_id'].notna() & df['door_id'].notna() & df['timestamp'].notna()).to_numpy()
+        if not valid.all():
+            df = df.loc[valid]
+        person_codes = pd.factorize(df['person_id'])[0]
+        door_codes, doors = pd.factorize(df['door_id'])
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+
+        order = np.lexsort((timestamps, person_codes))
+        person_codes, door_codes, timestamps = person_codes[order], door_codes[order], timestamps[order]
+
+        # An edge joins each event to the next one of the same session
+        moves = ((person_codes[1:] == person_codes[:-1])
+                 & (np.diff(timestamps) <= np.timedelta64(session_gap))
+                 & (door_codes[1:] != door_codes[:-1]))
+        sources, targets = door_codes[:-1][moves], door_codes[1:][moves]
+
+        n = len(doors)
+        adjacency = sparse.coo_matrix((np.ones(len(sources), dtype=np.int64), (sources, targets)),
+                                      shape=(n, n)).tocsr()
+        return cls(np.asarray(doors, dtype=object), adjacency)
+
+    @property
+    def n_doors(self) -> int:
+        return len(self.doors)
+
+    @property
+    def n_edges(self) -> int:
+        return self.adjacency.nnz
+
+    @property
+    def total_transitions(self) -> int:
+        return int(self.adjacency.sum())
+
+    def out_strength(self) -> np.ndarray:
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def in_strength(self) -> np.ndarray:
+        return np.asarray(self.adjacency.sum(axis=0)).ravel()
+
+    def pagerank(self) -> np.ndarray:
+        """Weighted PageRank by sparse power iteration"""
+        if self._pagerank is None:
+            n = self.n_doors
+            if n == 0:
+                self._pagerank = np.empty(0)
+                return self._pagerank
+            out = self.out_strength().astype(float)
+            dangling = out == 0
+            # Row-stochastic transitions, transposed for r <- P^T r
+            transitions = (sparse.diags(1.0 / np.where(dangling, 1, out)) @ self.adjacency).T.tocsr()
+            rank = np.full(n, 1.0 / n)
+            for _ in range(MAX_ITERATIONS):
+                updated = (PAGERANK_DAMPING * (transitions @ rank + rank[dangling].sum() / n)
+                           + (1 - PAGERANK_DAMPING) / n)
+                converged = np.abs(updated - rank).sum() < PAGERANK_TOLERANCE
+                rank = updated
+                if converged:
+                    break
+            self._pagerank = rank
+        return self._pagerank
+
+    def communities(self) -> np.ndarray:
+        """Community label per door by weighted label propagation
+
+        Runs on the undirected graph; each round moves half the doors
+        (alternating) to the label with the most edge weight among their
+        neighbours, which avoids the oscillation of fully synchronous
+        updates. Labels are renumbered by community size, largest first.
+        """
+        if self._communities is None:
+            n = self.n_doors
+            weights = (self.adjacency + self.adjacency.T).tocsr().astype(float)
+            labels = np.arange(n)
+            unchanged_rounds = 0
+            for iteration in range(MAX_ITERATIONS):
+                one_hot = sparse.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, n))
+                # A small bonus for the current label keeps ties and isolated doors stable
+                scores = (weights @ one_hot + one_hot * 0.5).tocsr()
+                best = np.asarray(scores.argmax(axis=1)).ravel()
+                movable = np.zeros(n, dtype=bool)
+                movable[iteration % 2::2] = True
+                changed = movable & (best != labels)
+                labels = np.where(changed, best, labels)
+                # Both halves must be stable
+                unchanged_rounds = 0 if changed.any() else unchanged_rounds + 1
+                if unchanged_rounds == 2:
+                    break
+            # Renumber: largest community first
+            _, labels, sizes = np.unique(labels, return_inverse=True, return_counts=True)
+            rank = np.empty_like(sizes)
+            rank[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+            self._communities = rank[labels]
+        return self._communities
+
+    def components(self) -> int:
+        """Number of weakly connected groups of doors"""
+        return int(csgraph.connected_components(self.adjacency, directed=True, connection='weak')[0])
+
+    def chokepoints(self, k: int = 10) -> List[Dict[str, Any]]:
+        """Doors ranked by the transition weight they carry between communities
+
+        A door whose edges link its own community to others is where
+        movement between areas of the site funnels through. Ties fall back
+        to through-traffic (the smaller of in- and out-flow).
+        """
+        if self.n_edges == 0:
+            return []
+        communities = self.communities()
+        coo = self.adjacency.tocoo()
+        crossing = communities[coo.row] != communities[coo.col]
+        ends = np.r_[coo.row[crossing], coo.col[crossing]]
+        others = np.r_[communities[coo.col[crossing]], communities[coo.row[crossing]]]
+        bridging = np.bincount(ends, weights=np.tile(coo.data[crossing], 2), minlength=self.n_doors)
+
+        n_communities = max(communities.max() + 1, 1)
+        linked = np.bincount(pd.unique(ends.astype(np.int64) * n_communities + others) // n_communities,
+                             minlength=self.n_doors)
+        through = np.minimum(self.in_strength(), self.out_strength())
+        order = np.lexsort((-through, -bridging))[:k]
+        total = max(self.total_transitions, 1)
+        pagerank = self.pagerank()
+        return [
+            {
+                'door_id': self.doors[i],
+                'bridging_share': float(bridging[i] / total),
+                'through_traffic': int(through[i]),
+                'communities_linked': int(linked[i]),
+                'pagerank': float(pagerank[i]),
+            }
+            for i in order if bridging[i] > 0 or through[i] > 0
+        ]
+
+    def top_edges(self, k: int = 10) -> List[Dict[str, Any]]:
+        coo = self.adjacency.tocoo()
+        order = np.argsort(-coo.data, kind='stable')[:k]
+        return [{'from': self.doors[coo.row[i]], 'to': self.doors[coo.col[i]],
+                 'transitions': int(coo.data[i])} for i in order]
+
+    def community_summary(self, k: int = 10) -> List[Dict[str, Any]]:
+        communities = self.communities()
+        pagerank = self.pagerank()
+        summary = []
+        n_communities = int(communities.max()) + 1 if self.n_doors else 0
+        for label in range(min(n_communities, k)):
+            members = np.flatnonzero(communities == label)
+            hubs = members[np.argsort(-pagerank[members], kind='stable')[:5]]
+            summary.append({'community': label, 'size': len(members),
+                            'hub_doors': self.doors[hubs].tolist()})
+        return summary
+
+    def summary(self, k: int = 10) -> Dict[str, Any]:
+        """Network statistics for reports"""
+        if self.n_edges == 0:
+            return {'status': 'no_transitions', 'total_doors': self.n_doors}
+        pagerank = self.pagerank()
+        top = np.argsort(-pagerank, kind='stable')[:k]
+        return {
+            'total_doors': self.n_doors,
+            'total_edges': self.n_edges,
+            'total_transitions': self.total_transitions,
+            'density': self.n_edges / max(self.n_doors * (self.n_doors - 1), 1),
+            'connected_components': self.components(),
+            'central_doors': [{'door_id': self.doors[i], 'pagerank': float(pagerank[i])} for i in top],
+            'top_transitions': self.top_edges(k),
+            'communities': self.community_summary(k),
+            'chokepoints': self.chokepoints(k),
+        }
+
+class AccessGraphEngine:
+    """Build access graphs once per dataset version
+
+    Graphs are kept in a small LRU keyed by ``dataset_version`` (such as
+    the shared event store generation) or, without one, by a content
+    fingerprint of the events, so repeated UI queries on the same data
+    reuse the graph and its computed centrality and communities.
+    """
+
+    def __init__(self, session_gap: timedelta = DEFAULT_SESSION_GAP,
+                 max_graphs: int = DEFAULT_MAX_GRAPHS):
+        self.session_gap = session_gap
+        self.max_graphs = max_graphs
+        self._graphs: 'OrderedDict[str, AccessGraph]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def graph(self, df: pd.DataFrame, dataset_version: Optional[str] = None) -> AccessGraph:
+        key = str(dataset_version) if dataset_version is not None else dataframe_fingerprint(
+            df[['person_id', 'door_id', 'timestamp']])
+        with self._lock:
+            if key in self._graphs:
+                self._graphs.move_to_end(key)
+                return self._graphs[key]
+        graph = AccessGraph.from_events(df, self.session_gap)
+        with self._lock:
+            self._graphs[key] = graph
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def invalidate(self, dataset_version: Optional[str] = None) -> None:
+        """Drop one cached graph, or all of them"""
+        with self._lock:
+            if dataset_version is None:
+                self._graphs.clear()
+            else:
+                self._graphs.pop(str(dataset_version), None)
+
+# Factory function
+def create_access_graph_engine(session_gap: timedelta = DEFAULT_SESSION_GAP) -> AccessGraphEngine:
+    """Factory function to create access graph engine"""
+    return AccessGraphEngine(session_gap)
+
+# Export for compatibility
+__all__ = ['AccessGraph', 'AccessGraphEngine', 'create_access_graph_engine']
@@ -6,12 +6,17 @@ Analyzes temporal and usage trends in access control data
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
 from scipy import stats
 from sklearn.linear_model import LinearRegression
 
+from .door_forecasting import DoorForecaster
+from .model_registry import ModelRegistry
+from .prepared_frame import DAY_NAMES, PreparedFrame, prepare_frame
+from .rollup_cube import RollupCube
+
 @dataclass
 class TrendMetrics:
     """Trend metrics data structure"""
@@ -23,29 +28,43 @@ class TrendMetrics:
     period_comparison: Dict[str, float]
 
 class AccessTrendsAnalyzer:
-    """Advanced access trends analysis"""
+    """Advanced access trends analysis
+
+    Time-series metrics read the frame's :class:`RollupCube` rather than
+    grouping raw events; only per-user and per-door patterns scan rows.
+    Per-door and per-site forecasts come from a :class:`DoorForecaster`
+    whose fitted model is cached in ``model_registry``.
+    """
     
-    def __init__(self):
+    def __init__(self, model_registry: Optional[ModelRegistry] = None):
         self.logger = logging.getLogger(__name__)
+        self.forecaster = DoorForecaster(model_registry)
         
-    def analyze_trends(self, df: pd.DataFrame, 
-                       comparison_period_days: int = 30) -> Dict[str, Any]:
-        """Main analysis function for access trends"""
+    def analyze_trends(self, df: Union[pd.DataFrame, PreparedFrame], 
+                       comparison_period_days: int = 30,
+                       cube: Optional[RollupCube] = None) -> Dict[str, Any]:
+        """Main analysis function for access trends
+
+        ``cube`` may be a rollup of the same events maintained elsewhere,
+        e.g. incrementally across uploads; otherwise the frame's is used.
+        """
         try:
             if df.empty:
                 return self._empty_result()
             
-            df = self._prepare_data(df)
+            frame = prepare_frame(df)
+            cube = cube if cube is not None else frame.rollup()
+            df = frame.view()
             
             trends = {
-                'temporal_trends': self._analyze_temporal_trends(df),
-                'volume_trends': self._analyze_volume_trends(df),
+                'temporal_trends': self._analyze_temporal_trends(cube),
+                'volume_trends': self._analyze_volume_trends(cube),
                 'usage_patterns': self._analyze_usage_patterns(df),
-                'peak_analysis': self._analyze_peak_periods(df),
-                'growth_metrics': self._calculate_growth_metrics(df),
-                'seasonal_patterns': self._analyze_seasonal_patterns(df),
-                'forecasting': self._generate_forecasts(df),
-                'trend_summary': self._generate_trend_summary(df)
+                'peak_analysis': self._analyze_peak_periods(df, cube),
+                'growth_metrics': self._calculate_growth_metrics(cube),
+                'seasonal_patterns': self._analyze_seasonal_patterns(cube),
+                'forecasting': self._generate_forecasts(cube, self._door_sites(df)),
+                'trend_summary': self._generate_trend_summary(cube)
             }
             
             return trends
@@ -54,40 +73,73 @@ class AccessTrendsAnalyzer:
             self.logger.error(f"Access trends analysis failed: {e}")
             return self._empty_result()
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _prepare_data(self, df: Union[pd.DataFrame, PreparedFrame]) -> pd.DataFrame:
         """Prepare and validate data for trend analysis"""
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.day_name()
-        df['week'] = df['timestamp'].dt.isocalendar().week
-        df['month'] = df['timestamp'].dt.month
-        df['is_weekend'] = df['timestamp'].dt.weekday >= 5
-        df['quarter_hour'] = (df['timestamp'].dt.minute // 15) * 15
-        return df
-    
-    def _analyze_temporal_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
+        return prepare_frame(df).view()
+    
+    # Cube views, shaped like the raw ``groupby`` results they replace
+    def _daily_counts(self, cube: RollupCube) -> pd.DataFrame:
+        """Per-day counts for days with events, indexed by ``date``"""
+        events = cube.events('daily')
+        active = events > 0
+        daily = pd.DataFrame({
+            'events': events[active],
+            'granted': cube.granted('daily')[active],
+            'unique_users': cube.daily_unique_users()[active],
+            'unique_doors': cube.daily_unique_doors()[active],
+            'weekday': cube.weekdays[active],
+        }, index=pd.Index(cube.days[active].astype(object), name='date'))
+        daily['success_rate'] = daily['granted'] / daily['events'] * 100
+        return daily
+    
+    def _hourly_counts(self, cube: RollupCube) -> pd.DataFrame:
+        """Events and grants per hour of day, for hours with events"""
+        events = cube.events('minute_of_day').reshape(24, 60).sum(axis=1)
+        granted = cube.granted('minute_of_day').reshape(24, 60).sum(axis=1)
+        hours = np.flatnonzero(events)
+        return pd.DataFrame({'events': events[hours], 'granted': granted[hours]},
+                            index=pd.Index(hours, name='hour'))
+    
+    def _weekday_counts(self, cube: RollupCube) -> pd.DataFrame:
+        """Events and grants per day of week, for days of week with events"""
+        weekdays = cube.weekdays
+        events = np.bincount(weekdays, weights=cube.events('daily'), minlength=7).astype(np.int64)
+        granted = np.bincount(weekdays, weights=cube.granted('daily'), minlength=7).astype(np.int64)
+        days = np.flatnonzero(events)
+        return pd.DataFrame({'events': events[days], 'granted': granted[days]},
+                            index=pd.Index(np.array(DAY_NAMES)[days], name='day_of_week'))
+    
+    def _hourly_counts_by_day_type(self, cube: RollupCube, weekend: bool) -> pd.Series:
+        """Events per hour of day over weekend or weekday dates only"""
+        days = (cube.weekdays >= 5) == weekend
+        counts = cube.day_hour_events()[days].sum(axis=0)
+        hours = np.flatnonzero(counts)
+        return pd.Series(counts[hours], index=pd.Index(hours, name='hour'))
+    
+    def _analyze_temporal_trends(self, cube: RollupCube) -> Dict[str, Any]:
         """Analyze temporal trends (hourly, daily, weekly)"""
         
         # Hourly trends
-        hourly_data = df.groupby('hour').agg({
-            'event_id': 'count',
-            'access_result': lambda x: (x == 'Granted').mean() * 100
-        }).rename(columns={'event_id': 'event_count', 'access_result': 'success_rate'})
+        hourly = self._hourly_counts(cube)
+        hourly_data = pd.DataFrame({
+            'event_count': hourly['events'],
+            'success_rate': hourly['granted'] / hourly['events'] * 100
+        })
         
         # Daily trends
-        daily_data = df.groupby('date').agg({
-            'event_id': 'count',
-            'person_id': 'nunique',
-            'door_id': 'nunique',
-            'access_result': lambda x: (x == 'Granted').mean() * 100
+        daily = self._daily_counts(cube)
+        daily_data = pd.DataFrame({
+            'event_id': daily['events'],
+            'person_id': daily['unique_users'],
+            'door_id': daily['unique_doors'],
+            'access_result': daily['success_rate']
         })
         
         # Weekly trends
-        weekly_data = df.groupby('day_of_week').agg({
-            'event_id': 'count',
-            'access_result': lambda x: (x == 'Granted').mean() * 100
+        weekly = self._weekday_counts(cube)
+        weekly_data = pd.DataFrame({
+            'event_id': weekly['events'],
+            'access_result': weekly['granted'] / weekly['events'] * 100
         })
         
         # Calculate trend directions
@@ -101,19 +153,16 @@ class AccessTrendsAnalyzer:
             'hourly_trend': hourly_trend,
             'daily_trend': daily_trend,
             'peak_hours': self._identify_peak_hours(hourly_data),
-            'trend_metrics': self._calculate_temporal_metrics(df)
+            'trend_metrics': self._calculate_temporal_metrics(cube)
         }
     
-    def _analyze_volume_trends(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_volume_trends(self, cube: RollupCube) -> Dict[str, Any]:
         """Analyze access volume trends over time"""
         
         # Daily volume analysis
-        daily_volumes = df.groupby('date').agg({
-            'event_id': 'count',
-            'person_id': 'nunique',
-            'door_id': 'nunique'
-        }).rename(columns={'event_id': 'total_events', 'person_id': 'unique_users', 'door_id': 'unique_doors'})
-        
+        daily_volumes = self._daily_counts(cube)[['events', 'unique_users', 'unique_doors']].rename(
+            columns={'events': 'total_events'}
+        )
         # Rolling averages
         daily_volumes['7day_avg'] = daily_volumes['total_events'].rolling(window=7).mean()
         daily_volumes['30day_avg'] = daily_volumes['total_events'].rolling(window=30).mean()
@@ -143,7 +192,7 @@ class AccessTrendsAnalyzer:
         """Analyze usage patterns by users and doors"""
         
         # User usage patterns
-        user_patterns = df.groupby('person_id').agg({
+        user_patterns = df.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'door_id': 'nunique',
             'timestamp': ['min', 'max'],
@@ -152,7 +201,7 @@ class AccessTrendsAnalyzer:
         user_patterns.columns = ['total_events', 'doors_accessed', 'first_access', 'last_access', 'success_rate']
         
         # Door usage patterns
-        door_patterns = df.groupby('door_id').agg({
+        door_patterns = df.groupby('door_id', observed=True).agg({
             'event_id': 'count',
             'person_id': 'nunique',
             'timestamp': lambda x: x.dt.hour.mode().iloc[0] if len(x) > 0 else 0,
@@ -176,27 +225,31 @@ class AccessTrendsAnalyzer:
             'user_loyalty': self._analyze_user_loyalty(user_patterns)
         }
     
-    def _analyze_peak_periods(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_peak_periods(self, df: pd.DataFrame, cube: RollupCube) -> Dict[str, Any]:
         """Analyze peak access periods"""
         
         # Hourly peak analysis
-        hourly_counts = df.groupby('hour')['event_id'].count()
+        hourly_counts = self._hourly_counts(cube)['events']
         peak_hours = hourly_counts.nlargest(3).index.tolist()
         
         # Daily peak analysis
-        daily_counts = df.groupby('day_of_week')['event_id'].count()
+        daily_counts = self._weekday_counts(cube)['events']
         peak_days = daily_counts.nlargest(2).index.tolist()
         
         # Quarter-hour granularity for precise peak identification
-        df['hour_quarter'] = df['hour'].astype(str) + ':' + df['quarter_hour'].astype(str).str.zfill(2)
-        quarter_hour_counts = df.groupby('hour_quarter')['event_id'].count()
+        quarter_counts = cube.events('minute_of_day').reshape(24, 4, 15).sum(axis=2)
+        hours, quarters = np.nonzero(quarter_counts)
+        quarter_hour_counts = pd.Series(
+            quarter_counts[hours, quarters],
+            index=[f"{hour}:{quarter * 15:02d}" for hour, quarter in zip(hours, quarters)]
+        ).sort_index()
         precise_peaks = quarter_hour_counts.nlargest(5)
         
         # Peak intensity analysis
-        peak_intensity = self._calculate_peak_intensity(df)
+        peak_intensity = self._calculate_peak_intensity(cube)
         
         # Peak consistency (how consistent are the peaks day-to-day)
-        peak_consistency = self._analyze_peak_consistency(df)
+        peak_consistency = self._analyze_peak_consistency(cube)
         
         return {
             'peak_hours': peak_hours,
@@ -204,13 +257,13 @@ class AccessTrendsAnalyzer:
             'precise_peak_times': precise_peaks.to_dict(),
             'peak_intensity_score': peak_intensity,
             'peak_consistency': peak_consistency,
-            'off_peak_analysis': self._analyze_off_peak_periods(df)
+            'off_peak_analysis': self._analyze_off_peak_periods(df, cube)
         }
     
-    def _calculate_growth_metrics(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_growth_metrics(self, cube: RollupCube) -> Dict[str, Any]:
         """Calculate various growth metrics"""
         
-        daily_data = df.groupby('date')['event_id'].count()
+        daily_data = self._daily_counts(cube)['events']
         
         # Period-over-period growth
         if len(daily_data) >= 14:
@@ -244,22 +297,25 @@ class AccessTrendsAnalyzer:
             'growth_acceleration': self._calculate_growth_acceleration(daily_data)
         }
     
-    def _analyze_seasonal_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_seasonal_patterns(self, cube: RollupCube) -> Dict[str, Any]:
         """Analyze seasonal and cyclical patterns"""
         
         # Day of week patterns
-        dow_patterns = df.groupby('day_of_week')['event_id'].count()
+        dow_patterns = self._weekday_counts(cube)['events']
+        daily = self._daily_counts(cube)
+        is_weekend = daily['weekday'] >= 5
         weekend_vs_weekday = {
-            'weekday_avg': df[~df['is_weekend']].groupby('date')['event_id'].count().mean(),
-            'weekend_avg': df[df['is_weekend']].groupby('date')['event_id'].count().mean()
+            'weekday_avg': daily.loc[~is_weekend, 'events'].mean(),
+            'weekend_avg': daily.loc[is_weekend, 'events'].mean()
         }
         
         # Monthly patterns (if enough data spans multiple months)
-        monthly_patterns = df.groupby('month')['event_id'].count() if df['month'].nunique() > 1 else {}
+        months = pd.Index([day.month for day in daily.index], name='month')
+        monthly_patterns = daily['events'].groupby(months).sum() if months.nunique() > 1 else {}
         
         # Hour-of-day patterns by day type
-        weekday_hourly = df[~df['is_weekend']].groupby('hour')['event_id'].count()
-        weekend_hourly = df[df['is_weekend']].groupby('hour')['event_id'].count()
+        weekday_hourly = self._hourly_counts_by_day_type(cube, weekend=False)
+        weekend_hourly = self._hourly_counts_by_day_type(cube, weekend=True)
         
         return {
             'day_of_week_patterns': dow_patterns.to_dict(),
@@ -267,13 +323,14 @@ class AccessTrendsAnalyzer:
             'monthly_patterns': monthly_patterns.to_dict() if hasattr(monthly_patterns, 'to_dict') else {},
             'weekday_hourly_pattern': weekday_hourly.to_dict(),
             'weekend_hourly_pattern': weekend_hourly.to_dict(),
-            'seasonal_strength': self._calculate_seasonal_strength(df)
+            'seasonal_strength': self._calculate_seasonal_strength(cube)
         }
     
-    def _generate_forecasts(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate simple trend-based forecasts"""
+    def _generate_forecasts(self, cube: RollupCube,
+                            door_sites: Optional[pd.Series] = None) -> Dict[str, Any]:
+        """Generate simple trend-based forecasts, overall and per door and site"""
         
-        daily_data = df.groupby('date')['event_id'].count()
+        daily_data = self._daily_counts(cube)['events']
         
         if len(daily_data) < 7:
             return {'forecast_available': False, 'reason': 'insufficient_data'}
@@ -299,27 +356,44 @@ class AccessTrendsAnalyzer:
             'trend_slope': model.coef_[0],
             'confidence_level': confidence,
             'r_squared': r_squared,
-            'forecast_summary': self._summarize_forecast(forecast, daily_data.mean())
+            'forecast_summary': self._summarize_forecast(forecast, daily_data.mean()),
+            'door_forecasts': self._seasonal_forecasts(self.forecaster.forecast_doors(cube)),
+            'site_forecasts': (self._seasonal_forecasts(self.forecaster.forecast_sites(cube, door_sites))
+                               if door_sites is not None else {})
         }
     
-    def _generate_trend_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _door_sites(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        """Facility of each door, when events carry one"""
+        if 'facility_id' not in df.columns:
+            return None
+        sites = df[['door_id', 'facility_id']].dropna().drop_duplicates('door_id')
+        return sites.set_index('door_id')['facility_id']
+    
+    def _seasonal_forecasts(self, forecasts: pd.DataFrame) -> Dict[Any, List[float]]:
+        """Next days' expected events per door or site"""
+        return {
+            key: group.tolist()
+            for key, group in forecasts['forecast'].groupby(level=0, sort=False)
+        }
+    
+    def _generate_trend_summary(self, cube: RollupCube) -> Dict[str, Any]:
         """Generate comprehensive trend summary"""
         
-        total_events = len(df)
-        date_range = (df['timestamp'].max() - df['timestamp'].min()).days
+        total_events = cube.total_events
+        date_range = (cube.last_timestamp - cube.first_timestamp).days
         daily_average = total_events / max(date_range, 1)
         
         # Key trend indicators
-        daily_data = df.groupby('date')['event_id'].count()
+        daily_data = self._daily_counts(cube)['events']
         trend_direction = self._calculate_trend_direction(daily_data.values)
         
         # Usage intensity
-        unique_users = df['person_id'].nunique()
+        unique_users = cube.unique_users()
         events_per_user = total_events / unique_users if unique_users > 0 else 0
         
         # Access success trends
-        success_rate = (df['access_result'] == 'Granted').mean() * 100
-        success_trend = self._analyze_success_rate_trend(df)
+        success_rate = cube.granted('daily').sum() / total_events * 100
+        success_trend = self._analyze_success_rate_trend(cube)
         
         return {
             'overall_trend': trend_direction,
@@ -328,8 +402,8 @@ class AccessTrendsAnalyzer:
             'overall_success_rate': success_rate,
             'success_rate_trend': success_trend,
             'data_period_days': date_range,
-            'trend_strength': self._calculate_overall_trend_strength(df),
-            'key_insights': self._generate_key_insights(df)
+            'trend_strength': self._calculate_overall_trend_strength(cube),
+            'key_insights': self._generate_key_insights(cube)
         }
     
     # Helper methods
@@ -365,15 +439,21 @@ class AccessTrendsAnalyzer:
         """Identify peak hours based on event count"""
         return hourly_data['event_count'].nlargest(3).index.tolist()
     
-    def _calculate_temporal_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
+    def _calculate_temporal_metrics(self, cube: RollupCube) -> Dict[str, float]:
         """Calculate various temporal metrics"""
         # Time span utilization
-        total_hours = (df['timestamp'].max() - df['timestamp'].min()).total_seconds() / 3600
-        active_hours = df['hour'].nunique()
-        
-        # Distribution metrics
-        hour_std = df['hour'].std()
-        hour_range = df['hour'].max() - df['hour'].min()
+        total_hours = (cube.last_timestamp - cube.first_timestamp).total_seconds() / 3600
+        hour_counts = self._hourly_counts(cube)['events']
+        active_hours = len(hour_counts)
+        
+        # Distribution metrics, weighting each hour by its events
+        hours = hour_counts.index.to_numpy(dtype=float)
+        weights = hour_counts.to_numpy(dtype=float)
+        mean_hour = np.average(hours, weights=weights)
+        n_events = weights.sum()
+        hour_std = (np.sqrt((weights * (hours - mean_hour) ** 2).sum() / (n_events - 1))
+                    if n_events > 1 else np.nan)
+        hour_range = hours.max() - hours.min()
         
         return {
             'time_span_hours': total_hours,
@@ -421,11 +501,11 @@ class AccessTrendsAnalyzer:
         """Analyze concentration of access across users and doors"""
         
         # User concentration (Gini coefficient approximation)
-        user_counts = df['person_id'].value_counts()
+        user_counts = df['person_id'].value_counts().loc[lambda counts: counts > 0]
         user_gini = self._calculate_gini_coefficient(user_counts.values)
         
         # Door concentration
-        door_counts = df['door_id'].value_counts()
+        door_counts = df['door_id'].value_counts().loc[lambda counts: counts > 0]
         door_gini = self._calculate_gini_coefficient(door_counts.values)
         
         return {
@@ -454,19 +534,22 @@ class AccessTrendsAnalyzer:
             'user_retention_rate': (len(user_patterns) - one_time_users) / len(user_patterns) * 100
         }
     
-    def _calculate_peak_intensity(self, df: pd.DataFrame) -> float:
+    def _calculate_peak_intensity(self, cube: RollupCube) -> float:
         """Calculate how intense the peak periods are"""
-        hourly_counts = df.groupby('hour')['event_id'].count()
+        hourly_counts = self._hourly_counts(cube)['events']
         peak_value = hourly_counts.max()
         average_value = hourly_counts.mean()
         
         return peak_value / average_value if average_value > 0 else 1.0
     
-    def _analyze_peak_consistency(self, df: pd.DataFrame) -> Dict[str, float]:
+    def _analyze_peak_consistency(self, cube: RollupCube) -> Dict[str, float]:
         """Analyze how consistent peak times are across days"""
         
-        # Group by date and hour to see daily hourly patterns
-        daily_hourly = df.groupby(['date', 'hour'])['event_id'].count().unstack(fill_value=0)
+        # Daily hourly patterns for days and hours with any events
+        matrix = cube.day_hour_events()
+        days = matrix.sum(axis=1) > 0
+        hours = np.flatnonzero(matrix.sum(axis=0))
+        daily_hourly = pd.DataFrame(matrix[days][:, hours], columns=hours)
         
         if daily_hourly.empty:
             return {'consistency_score': 0, 'peak_hour_stability': 0}
@@ -488,21 +571,25 @@ class AccessTrendsAnalyzer:
             'peak_hour_stability': peak_stability
         }
     
-    def _analyze_off_peak_periods(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_off_peak_periods(self, df: pd.DataFrame, cube: RollupCube) -> Dict[str, Any]:
         """Analyze off-peak period characteristics"""
-        hourly_counts = df.groupby('hour')['event_id'].count()
+        hourly = self._hourly_counts(cube)
+        hourly_counts = hourly['events']
         
         # Define off-peak as bottom 25% of hours
         off_peak_threshold = hourly_counts.quantile(0.25)
-        off_peak_hours = hourly_counts[hourly_counts <= off_peak_threshold].index.tolist()
+        off_peak = hourly[hourly_counts <= off_peak_threshold]
+        off_peak_hours = off_peak.index.tolist()
+        off_peak_events = int(off_peak['events'].sum())
         
-        off_peak_data = df[df['hour'].isin(off_peak_hours)]
+        # Distinct users are not in the cube, so only they come from raw rows
+        off_peak_users = df.loc[df['hour'].isin(off_peak_hours), 'person_id'].nunique()
         
         return {
             'off_peak_hours': off_peak_hours,
-            'off_peak_event_count': len(off_peak_data),
-            'off_peak_success_rate': (off_peak_data['access_result'] == 'Granted').mean() * 100 if len(off_peak_data) > 0 else 0,
-            'off_peak_unique_users': off_peak_data['person_id'].nunique() if len(off_peak_data) > 0 else 0
+            'off_peak_event_count': off_peak_events,
+            'off_peak_success_rate': off_peak['granted'].sum() / off_peak_events * 100 if off_peak_events > 0 else 0,
+            'off_peak_unique_users': off_peak_users
         }
     
     def _calculate_growth_acceleration(self, daily_data: pd.Series) -> float:
@@ -518,15 +605,15 @@ class AccessTrendsAnalyzer:
         
         return acceleration.mean()
     
-    def _calculate_seasonal_strength(self, df: pd.DataFrame) -> float:
+    def _calculate_seasonal_strength(self, cube: RollupCube) -> float:
         """Calculate strength of seasonal patterns"""
         
         # Day of week variation
-        dow_counts = df.groupby('day_of_week')['event_id'].count()
+        dow_counts = self._weekday_counts(cube)['events']
         dow_cv = dow_counts.std() / dow_counts.mean() if dow_counts.mean() > 0 else 0
         
         # Hour of day variation
-        hour_counts = df.groupby('hour')['event_id'].count()
+        hour_counts = self._hourly_counts(cube)['events']
         hour_cv = hour_counts.std() / hour_counts.mean() if hour_counts.mean() > 0 else 0
         
         # Combined seasonal strength (higher CV = more seasonal)
@@ -543,11 +630,9 @@ class AccessTrendsAnalyzer:
         else:
             return 'stable_trend'
     
-    def _analyze_success_rate_trend(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_success_rate_trend(self, cube: RollupCube) -> Dict[str, Any]:
         """Analyze trends in access success rates"""
-        daily_success = df.groupby('date').agg({
-            'access_result': lambda x: (x == 'Granted').mean() * 100
-        })['access_result']
+        daily_success = self._daily_counts(cube)['success_rate']
         
         trend = self._calculate_trend_direction(daily_success.values)
         
@@ -557,14 +642,10 @@ class AccessTrendsAnalyzer:
             'success_rate_volatility': daily_success.std()
         }
     
-    def _calculate_overall_trend_strength(self, df: pd.DataFrame) -> float:
+    def _calculate_overall_trend_strength(self, cube: RollupCube) -> float:
         """Calculate overall trend strength across multiple metrics"""
         
-        daily_data = df.groupby('date').agg({
-            'event_id': 'count',
-            'person_id': 'nunique',
-            'access_result': lambda x: (x == 'Granted').mean() * 100
-        })
+        daily_data = self._daily_counts(cube)[['events', 'unique_users', 'success_rate']]
         
         # Calculate trend strength for each metric
         strengths = []
@@ -574,26 +655,27 @@ class AccessTrendsAnalyzer:
         
         return np.mean(strengths)
     
-    def _generate_key_insights(self, df: pd.DataFrame) -> List[str]:
+    def _generate_key_insights(self, cube: RollupCube) -> List[str]:
         """Generate key insights from trend analysis"""
         insights = []
+        total_events = cube.total_events
         
         # Volume insights
-        daily_avg = len(df) / max((df['timestamp'].max() - df['timestamp'].min()).days, 1)
+        daily_avg = total_events / max((cube.last_timestamp - cube.first_timestamp).days, 1)
         if daily_avg > 100:
             insights.append(f"High activity system with {daily_avg:.0f} events per day on average")
         
         # Peak time insights
-        peak_hour = df.groupby('hour')['event_id'].count().idxmax()
+        peak_hour = self._hourly_counts(cube)['events'].idxmax()
         insights.append(f"Peak activity occurs at {peak_hour}:00")
         
         # Weekend activity
-        weekend_pct = len(df[df['is_weekend']]) / len(df) * 100
+        weekend_pct = cube.events('daily')[cube.weekdays >= 5].sum() / total_events * 100
         if weekend_pct > 20:
             insights.append(f"Significant weekend activity ({weekend_pct:.1f}% of total events)")
         
         # Success rate insight
-        success_rate = (df['access_result'] == 'Granted').mean() * 100
+        success_rate = cube.granted('daily').sum() / total_events * 100
         if success_rate < 85:
             insights.append(f"Lower than expected success rate ({success_rate:.1f}%)")
         
@@ -625,9 +707,9 @@ class AccessTrendsAnalyzer:
         }
 
 # Factory function
-def create_trends_analyzer() -> AccessTrendsAnalyzer:
+def create_trends_analyzer(model_registry: Optional[ModelRegistry] = None) -> AccessTrendsAnalyzer:
     """Create access trends analyzer instance"""
-    return AccessTrendsAnalyzer()
+    return AccessTrendsAnalyzer(model_registry)
 
 # Export
 __all__ = ['AccessTrendsAnalyzer', 'TrendMetrics', 'create_trends_analyzer']
@@ -8,17 +8,34 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+
+from core.caching import LRUByteCache, dataframe_fingerprint
+from services.shared_event_store import read_frame, write_frame
+
+try:  # Performance monitoring needs psutil
+    from core.performance import cache_monitor
+except ImportError:  # pragma: no cover - optional dependency
+    cache_monitor = None
 
 # Import all analytics modules
 from .security_patterns import SecurityPatternsAnalyzer, create_security_analyzer
 from .access_trends import AccessTrendsAnalyzer, create_trends_analyzer
 from .user_behavior import UserBehaviorAnalyzer, create_behavior_analyzer
 from .anomaly_detection import AnomalyDetector, create_anomaly_detector
+from .model_registry import ModelRegistry, create_model_registry
 from .interactive_charts import SecurityChartsGenerator, create_charts_generator
+from .kpi_sketches import KPISketch
+from .prepared_frame import PreparedFrame
 
 @dataclass
 class AnalyticsConfig:
@@ -32,6 +49,11 @@ class AnalyticsConfig:
     parallel_processing: bool = True
     cache_results: bool = True
     cache_duration_minutes: int = 30
+    cache_max_mb: int = 256
+    parallel_backend: str = 'thread'  # 'thread', or opt in to 'process' or 'auto'
+    process_pool_min_rows: int = 250_000
+    model_dir: Optional[str] = None  # persist fitted ML models here, e.g. 'data/models'
+    model_refit_minutes: Optional[int] = None  # refit on a schedule, not per dataset
 
 @dataclass
 class AnalyticsResult:
@@ -47,6 +69,50 @@ class AnalyticsResult:
     status: str
     errors: List[str]
 
+# Analyses runnable in worker processes; analyzers are rebuilt per process
+_PROCESS_ANALYSES = {
+    'security_patterns': lambda df, config: create_security_analyzer().analyze_patterns(df),
+    'access_trends': lambda df, config: create_trends_analyzer(
+        model_registry=_worker_model_registry(config)
+    ).analyze_trends(df),
+    'user_behavior': lambda df, config: create_behavior_analyzer(
+        model_registry=_worker_model_registry(config)
+    ).analyze_behavior(df),
+    'anomaly_detection': lambda df, config: create_anomaly_detector(
+        model_registry=_worker_model_registry(config)
+    ).detect_anomalies(df, config.anomaly_sensitivity),
+    'interactive_charts': lambda df, config: create_charts_generator().generate_all_charts(df),
+}
+
+# Frame mapped by this worker process, keyed by its shared directory
+_worker_frames: Dict[str, pd.DataFrame] = {}
+# Model registries of this worker process, by storage directory and schedule
+_worker_registries: Dict[tuple, ModelRegistry] = {}
+
+def _create_model_registry(config: 'AnalyticsConfig') -> ModelRegistry:
+    refit_interval = (timedelta(minutes=config.model_refit_minutes)
+                      if config.model_refit_minutes else None)
+    return create_model_registry(config.model_dir, refit_interval)
+
+def _worker_model_registry(config: 'AnalyticsConfig') -> ModelRegistry:
+    key = (config.model_dir, config.model_refit_minutes)
+    if key not in _worker_registries:
+        _worker_registries[key] = _create_model_registry(config)
+    return _worker_registries[key]
+
+# tmpfs keeps the shared frame in memory on Linux
+_SHARED_FRAME_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+def _run_analysis_in_process(analysis_type: str, frame_dir: str,
+                             config: 'AnalyticsConfig') -> Dict[str, Any]:
+    """Run one analysis in a worker process against the shared frame"""
+    df = _worker_frames.get(frame_dir)
+    if df is None:
+        _worker_frames.clear()
+        df = read_frame(frame_dir)
+        _worker_frames[frame_dir] = df
+    return _PROCESS_ANALYSES[analysis_type](df, config)
+
 class AnalyticsController:
     """Unified controller for all analytics operations"""
     
@@ -56,14 +122,23 @@ class AnalyticsController:
         
         # Initialize analyzers
         self.security_analyzer = create_security_analyzer() if self.config.enable_security_patterns else None
-        self.trends_analyzer = create_trends_analyzer() if self.config.enable_access_trends else None
-        self.behavior_analyzer = create_behavior_analyzer() if self.config.enable_user_behavior else None
-        self.anomaly_detector = create_anomaly_detector() if self.config.enable_anomaly_detection else None
+        self.model_registry = _create_model_registry(self.config)
+        self.trends_analyzer = (create_trends_analyzer(model_registry=self.model_registry)
+                                if self.config.enable_access_trends else None)
+        self.behavior_analyzer = (create_behavior_analyzer(model_registry=self.model_registry)
+                                  if self.config.enable_user_behavior else None)
+        self.anomaly_detector = (create_anomaly_detector(model_registry=self.model_registry)
+                                 if self.config.enable_anomaly_detection else None)
         self.charts_generator = create_charts_generator() if self.config.enable_interactive_charts else None
         
-        # Cache for results
-        self._cache = {}
-        self._cache_timestamps = {}
+        # Content-addressed result cache, bounded by size
+        self._cache = LRUByteCache(
+            max_bytes=self.config.cache_max_mb * 1024 * 1024,
+            ttl=self.config.cache_duration_minutes * 60
+        )
+        self._config_hash = hashlib.blake2b(
+            json.dumps(asdict(self.config), sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
         
         # Callback registry
         self._callbacks = {
@@ -76,6 +151,8 @@ class AnalyticsController:
         
         # Thread pool for parallel processing
         self._executor = ThreadPoolExecutor(max_workers=5) if self.config.parallel_processing else None
+        # Process pool for large frames, created on first use
+        self._process_pool: Optional[ProcessPoolExecutor] = None
     
     def register_callback(self, event: str, callback: Callable):
         """Register callback for specific events"""
@@ -98,8 +175,16 @@ class AnalyticsController:
                 self.logger.error(f"Callback error for {event}: {e}")
     
     def analyze_all(self, df: pd.DataFrame, 
-                    analysis_id: Optional[str] = None) -> AnalyticsResult:
-        """Run complete analytics analysis"""
+                    analysis_id: Optional[str] = None,
+                    dataset_version: Optional[str] = None,
+                    kpi_sketch: Optional[KPISketch] = None) -> AnalyticsResult:
+        """Run complete analytics analysis
+
+        ``dataset_version`` (e.g. the upload store generation) identifies the
+        data for caching and skips hashing the frame's content. A merged
+        ``kpi_sketch`` of the same data, such as the one built per file at
+        upload, supplies the headline figures of the data summary.
+        """
         
         start_time = datetime.now()
         analysis_id = analysis_id or f"analysis_{int(start_time.timestamp())}"
@@ -110,15 +195,17 @@ class AnalyticsController:
             self._trigger_callbacks('on_analysis_start', analysis_id, df)
             
             # Check cache first
+            cache_key = None
             if self.config.cache_results:
-                cached_result = self._get_cached_result(df)
+                cache_key = self._get_cache_key(df, dataset_version)
+                cached_result = self._get_cached_result(cache_key)
                 if cached_result:
                     self.logger.info("Returning cached analytics result")
                     return cached_result
             
             # Validate and prepare data
             df_processed = self._prepare_data(df)
-            data_summary = self._generate_data_summary(df_processed)
+            data_summary = self._generate_data_summary(df_processed.data, kpi_sketch)
             
             self._trigger_callbacks('on_data_processed', analysis_id, data_summary)
             
@@ -145,8 +232,8 @@ class AnalyticsController:
             )
             
             # Cache result
-            if self.config.cache_results:
-                self._cache_result(df, analytics_result)
+            if cache_key is not None:
+                self._cache_result(cache_key, analytics_result)
             
             # Trigger completion callbacks
             self._trigger_callbacks('on_analysis_complete', analysis_id, analytics_result)
@@ -168,7 +255,7 @@ class AnalyticsController:
                 anomaly_detection={},
                 interactive_charts={},
                 processing_time=(datetime.now() - start_time).total_seconds(),
-                data_summary=self._generate_data_summary(df),
+                data_summary=self._generate_data_summary(df, kpi_sketch),
                 generated_at=start_time,
                 status='error',
                 errors=errors
@@ -222,9 +309,82 @@ class AnalyticsController:
             self._trigger_callbacks('on_analysis_error', analysis_id, e)
             return {}
     
-    def _run_parallel_analysis(self, df: pd.DataFrame, 
+    def _use_process_pool(self, df: pd.DataFrame) -> bool:
+        """Decide whether the frame is large enough to pay for processes"""
+        backend = self.config.parallel_backend
+        if backend == 'process':
+            return True
+        return (backend == 'auto'
+                and len(df) >= self.config.process_pool_min_rows
+                and (os.cpu_count() or 1) > 1)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            # Spawned, not forked: the Dash server runs callbacks in threads,
+            # and a forked child can inherit locks held by those threads
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=min(5, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._process_pool
+    
+    def _enabled_analyses(self) -> List[str]:
+        analyzers = {
+            'security_patterns': self.security_analyzer,
+            'access_trends': self.trends_analyzer,
+            'user_behavior': self.behavior_analyzer,
+            'anomaly_detection': self.anomaly_detector,
+            'interactive_charts': self.charts_generator,
+        }
+        return [name for name, analyzer in analyzers.items() if analyzer]
+    
+    def _run_process_analysis(self, df: PreparedFrame,
+                              analysis_id: str) -> Dict[str, Any]:
+        """Run analytics in worker processes sharing one memory-mapped frame"""
+        
+        # Write the frame once; workers map it instead of unpickling a copy.
+        # Only input columns are shared, each worker derives the rest once.
+        frame_dir = tempfile.mkdtemp(prefix='yosai_analytics_', dir=_SHARED_FRAME_DIR)
+        try:
+            write_frame(frame_dir, df.source)
+            pool = self._get_process_pool()
+            futures = {
+                analysis_type: pool.submit(
+                    _run_analysis_in_process, analysis_type, frame_dir, self.config
+                )
+                for analysis_type in self._enabled_analyses()
+            }
+            
+            results = {}
+            total_tasks = len(futures)
+            completed_tasks = 0
+            for analysis_type, future in futures.items():
+                try:
+                    results[analysis_type] = future.result(timeout=300)  # 5 minute timeout
+                    completed_tasks += 1
+                    progress = (completed_tasks / total_tasks) * 100
+                    self._trigger_callbacks('on_analysis_progress', analysis_id, analysis_type, progress)
+                    
+                except BrokenProcessPool:
+                    self._process_pool = None
+                    raise
+                except Exception as e:
+                    self.logger.error(f"Process analysis {analysis_type} failed: {e}")
+                    results[analysis_type] = {}
+            
+            return results
+        finally:
+            shutil.rmtree(frame_dir, ignore_errors=True)
+    
+    def _run_parallel_analysis(self, df: PreparedFrame, 
                                analysis_id: str) -> Dict[str, Any]:
-        """Run analytics in parallel using thread pool"""
+        """Run analytics in parallel, in processes for large frames or threads"""
+        
+        if self._use_process_pool(df):
+            try:
+                return self._run_process_analysis(df, analysis_id)
+            except Exception as e:
+                self.logger.warning(f"Process pool unavailable, using threads: {e}")
         
         futures = {}
         results = {}
@@ -272,7 +432,7 @@ class AnalyticsController:
         
         return results
     
-    def _run_sequential_analysis(self, df: pd.DataFrame, 
+    def _run_sequential_analysis(self, df: PreparedFrame, 
                                 analysis_id: str) -> Dict[str, Any]:
         """Run analytics sequentially"""
         
@@ -310,8 +470,8 @@ class AnalyticsController:
         
         return results
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare and validate data for analytics"""
+    def _prepare_data(self, df: pd.DataFrame) -> PreparedFrame:
+        """Validate data and derive the shared features for all analyzers"""
         
         if df.empty:
             raise ValueError("DataFrame is empty")
@@ -324,8 +484,9 @@ class AnalyticsController:
             raise ValueError(f"Missing required columns: {missing_columns}")
         
         # Data type conversions
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df = df.copy(deep=False)
+        if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
         
         # Sort by timestamp
         df = df.sort_values('timestamp').reset_index(drop=True)
@@ -333,11 +494,15 @@ class AnalyticsController:
         # Remove duplicates
         df = df.drop_duplicates(subset=['event_id'], keep='first')
         
-        return df
+        return PreparedFrame(df)
     
-    def _generate_data_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _generate_data_summary(self, df: pd.DataFrame,
+                               kpi_sketch: Optional[KPISketch] = None) -> Dict[str, Any]:
         """Generate summary of data for analytics"""
         
+        if kpi_sketch is not None and kpi_sketch.total_events:
+            return self._summary_from_sketch(kpi_sketch, df)
+        
         if df.empty:
             return {
                 'total_events': 0,
@@ -359,6 +524,24 @@ class AnalyticsController:
             'data_quality': self._assess_data_quality(df)
         }
     
+    def _summary_from_sketch(self, kpi_sketch: KPISketch, df: pd.DataFrame) -> Dict[str, Any]:
+        """Data summary from merged KPI sketches; unique counts are estimates"""
+        
+        summary = kpi_sketch.summary()
+        date_range = summary['date_range']
+        return {
+            'total_events': summary['total_events'],
+            'date_range': {
+                'start': date_range['start'].isoformat() if date_range['start'] is not None else None,
+                'end': date_range['end'].isoformat() if date_range['end'] is not None else None
+            },
+            'unique_users': summary['unique_users'],
+            'unique_doors': summary['unique_doors'],
+            'unique_count_error': summary['distinct_error'],
+            'access_success_rate': summary['success_rate'],
+            'data_quality': self._assess_data_quality(df)
+        }
+    
     def _assess_data_quality(self, df: pd.DataFrame) -> str:
         """Assess quality of data"""
         
@@ -388,61 +571,35 @@ class AnalyticsController:
         else:
             return 'poor'
     
-    def _get_cache_key(self, df: pd.DataFrame) -> str:
-        """Generate cache key for DataFrame"""
-        
-        # Create hash based on data shape and content sample
-        data_hash = hash((
-            len(df),
-            df.shape[1],
-            df['timestamp'].min() if 'timestamp' in df.columns else 0,
-            df['timestamp'].max() if 'timestamp' in df.columns else 0,
-            df['person_id'].nunique() if 'person_id' in df.columns else 0
-        ))
-        
-        return str(data_hash)
+    def _get_cache_key(self, df: pd.DataFrame,
+                       dataset_version: Optional[str] = None) -> str:
+        """Generate cache key from dataset content and analytics config"""
+        
+        data_key = dataset_version or dataframe_fingerprint(df)
+        return f"{data_key}:{self._config_hash}"
     
-    def _get_cached_result(self, df: pd.DataFrame) -> Optional[AnalyticsResult]:
+    def _get_cached_result(self, cache_key: str) -> Optional[AnalyticsResult]:
         """Get cached result if available and valid"""
         
-        cache_key = self._get_cache_key(df)
-        
-        if cache_key in self._cache:
-            cached_time = self._cache_timestamps.get(cache_key)
-            if cached_time:
-                age_minutes = (datetime.now() - cached_time).total_seconds() / 60
-                if age_minutes < self.config.cache_duration_minutes:
-                    return self._cache[cache_key]
-                else:
-                    # Cache expired, remove it
-                    del self._cache[cache_key]
-                    del self._cache_timestamps[cache_key]
-        
-        return None
+        result = self._cache.get(cache_key)
+        if cache_monitor is not None:
+            if result is None:
+                cache_monitor.record_cache_miss('analytics_results')
+            else:
+                cache_monitor.record_cache_hit('analytics_results')
+        return result
     
-    def _cache_result(self, df: pd.DataFrame, result: AnalyticsResult):
-        """Cache analytics result"""
-        
-        cache_key = self._get_cache_key(df)
-        self._cache[cache_key] = result
-        self._cache_timestamps[cache_key] = datetime.now()
-        
-        # Limit cache size
-        if len(self._cache) > 100:
-            # Remove oldest entries
-            oldest_keys = sorted(
-                self._cache_timestamps.keys(),
-                key=lambda k: self._cache_timestamps[k]
-            )[:50]
-            
-            for key in oldest_keys:
-                del self._cache[key]
-                del self._cache_timestamps[key]
+    def _cache_result(self, cache_key: str, result: AnalyticsResult):
+        """Cache analytics result, evicting least recently used results"""
+        
+        if not self._cache.set(cache_key, result):
+            self.logger.info("Analytics result exceeds cache size limit, not cached")
+        if cache_monitor is not None:
+            cache_monitor.cache_sizes['analytics_results'] = self._cache.total_bytes
     
     def clear_cache(self):
         """Clear analytics cache"""
         self._cache.clear()
-        self._cache_timestamps.clear()
     
     def get_analytics_status(self) -> Dict[str, Any]:
         """Get status of analytics modules"""
@@ -464,13 +621,16 @@ class AnalyticsController:
             },
             'configuration': {
                 'parallel_processing': self.config.parallel_processing,
+                'parallel_backend': self.config.parallel_backend,
                 'cache_enabled': self.config.cache_results,
                 'cache_duration_minutes': self.config.cache_duration_minutes,
+                'cache_max_mb': self.config.cache_max_mb,
                 'anomaly_sensitivity': self.config.anomaly_sensitivity
             },
             'cache_stats': {
                 'cached_results': len(self._cache),
-                'cache_memory_usage': sum(len(str(result)) for result in self._cache.values())
+                'cache_memory_usage': self._cache.total_bytes,
+                **self._cache.get_stats()
             },
             'callback_counts': {event: len(callbacks) for event, callbacks in self._callbacks.items()}
         }
@@ -557,6 +717,8 @@ class AnalyticsController:
         """Cleanup resources"""
         if self._executor:
             self._executor.shutdown(wait=True)
+        if getattr(self, '_process_pool', None):
+            self._process_pool.shutdown(wait=True)
 
 # Convenience factory functions
 def create_analytics_controller(config: Optional[AnalyticsConfig] = None) -> AnalyticsController:
@@ -6,16 +6,33 @@ Advanced anomaly detection using multiple algorithms and techniques
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Callable, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
+import time
 from scipy import stats
 from sklearn.ensemble import IsolationForest
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDOneClassSVM
+from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.svm import OneClassSVM
 import warnings
+
+from core.caching import dataframe_fingerprint
+
+from .impossible_travel import ImpossibleTravelDetector
+from .model_registry import ModelRegistry
+from .prepared_frame import PreparedFrame, prepare_frame
+from .tailgating import TailgatingDetector
+
 warnings.filterwarnings('ignore')
 
+# Above this many hourly windows the exact RBF One-Class SVM, whose fit
+# grows quadratically, gives way to a Nystroem + SGD approximation
+SVM_EXACT_MAX_SAMPLES = 10_000
+SVM_APPROX_COMPONENTS = 300
+
 @dataclass
 class Anomaly:
     """Anomaly data structure"""
@@ -32,11 +49,18 @@ class Anomaly:
 class AnomalyDetector:
     """Advanced anomaly detection with multiple algorithms"""
     
-    def __init__(self):
+    def __init__(self, tailgating_detector: Optional[TailgatingDetector] = None,
+                 model_registry: Optional[ModelRegistry] = None,
+                 svm_exact_max_samples: int = SVM_EXACT_MAX_SAMPLES,
+                 travel_detector: Optional[ImpossibleTravelDetector] = None):
         self.logger = logging.getLogger(__name__)
-        self.scaler = StandardScaler()
+        self.tailgating_detector = tailgating_detector or TailgatingDetector()
+        self.travel_detector = travel_detector or ImpossibleTravelDetector()
+        # Fitted scaler/model pairs, reused while the hourly features are unchanged
+        self.model_registry = model_registry or ModelRegistry()
+        self.svm_exact_max_samples = svm_exact_max_samples
         
-    def detect_anomalies(self, df: pd.DataFrame, 
+    def detect_anomalies(self, df: Union[pd.DataFrame, PreparedFrame], 
                          sensitivity: float = 0.95) -> Dict[str, Any]:
         """Main anomaly detection function using multiple approaches"""
         try:
@@ -67,21 +91,31 @@ class AnomalyDetector:
             self.logger.error(f"Anomaly detection failed: {e}")
             return self._empty_result()
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _prepare_data(self, df: Union[pd.DataFrame, PreparedFrame]) -> pd.DataFrame:
         """Prepare and validate data for anomaly detection"""
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        df['minute'] = df['timestamp'].dt.minute
-        df['day_of_week'] = df['timestamp'].dt.day_name()
-        df['is_weekend'] = df['timestamp'].dt.weekday >= 5
-        df['is_business_hours'] = (df['hour'] >= 8) & (df['hour'] <= 18)
-        df['time_of_day'] = df['hour'] + df['minute'] / 60.0
+        df = prepare_frame(df).view()
         
         # Sort by timestamp for sequential analysis
         df = df.sort_values('timestamp').reset_index(drop=True)
         
+        # Per-user sequence features shared by all per-user detectors
+        df = self._add_user_sequence_features(df)
+        
+        return df
+    
+    def _add_user_sequence_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute per-user event order, time gaps and door changes in one pass
+        
+        The frame is already sorted by timestamp, so grouping by ``person_id``
+        without re-sorting keeps every user's events in chronological order.
+        Detectors aggregate over these columns with ``groupby`` instead of
+        filtering the whole frame once per user.
+        """
+        user_groups = df.groupby('person_id', sort=False, observed=True)
+        df['user_event_seq'] = user_groups.cumcount()
+        df['user_event_count'] = user_groups['timestamp'].transform('size')
+        df['user_time_diff'] = user_groups['timestamp'].diff()
+        df['user_door_change'] = df['door_id'] != user_groups['door_id'].shift()
         return df
     
     def _detect_statistical_anomalies(self, df: pd.DataFrame, 
@@ -130,9 +164,9 @@ class AnomalyDetector:
                     })
         
         # User activity anomalies
-        user_activity = df.groupby('person_id')['event_id'].count()
+        user_activity = df.groupby('person_id', observed=True)['event_id'].count()
         if len(user_activity) > 2:
-            user_z_scores = np.abs(stats.zscore(user_activity))
+            user_z_scores = pd.Series(np.abs(stats.zscore(user_activity)), index=user_activity.index)
             user_threshold = stats.norm.ppf(sensitivity)
             
             # Focus on unusually high activity (potential security risk)
@@ -205,24 +239,20 @@ class AnomalyDetector:
         anomalies = []
         
         # Rapid repeated attempts
-        df_sorted = df.sort_values(['person_id', 'timestamp'])
-        df_sorted['time_diff'] = df_sorted.groupby('person_id')['timestamp'].diff()
-        
-        rapid_attempts = df_sorted[df_sorted['time_diff'] < pd.Timedelta(seconds=30)]
-        if len(rapid_attempts) > 0:
-            for user_id in rapid_attempts['person_id'].unique():
-                user_rapid = rapid_attempts[rapid_attempts['person_id'] == user_id]
-                anomalies.append({
-                    'type': 'rapid_attempts',
-                    'severity': 'high',
-                    'confidence': 0.9,
-                    'user_id': user_id,
-                    'attempt_count': len(user_rapid),
-                    'description': f'User {user_id} made {len(user_rapid)} rapid access attempts'
-                })
+        rapid_mask = df['user_time_diff'] < pd.Timedelta(seconds=30)
+        rapid_counts = df.loc[rapid_mask, 'person_id'].value_counts().loc[lambda counts: counts > 0].sort_index()
+        for user_id, attempt_count in rapid_counts.items():
+            anomalies.append({
+                'type': 'rapid_attempts',
+                'severity': 'high',
+                'confidence': 0.9,
+                'user_id': user_id,
+                'attempt_count': int(attempt_count),
+                'description': f'User {user_id} made {attempt_count} rapid access attempts'
+            })
         
         # Door hopping (multiple doors in short time)
-        door_hopping_anomalies = self._detect_door_hopping(df_sorted)
+        door_hopping_anomalies = self._detect_door_hopping(df)
         anomalies.extend(door_hopping_anomalies)
         
         # Unusual location patterns
@@ -245,7 +275,7 @@ class AnomalyDetector:
         if len(failed_attempts) > 0:
             
             # Multiple failures by same user
-            user_failures = failed_attempts.groupby('person_id')['event_id'].count()
+            user_failures = failed_attempts.groupby('person_id', observed=True)['event_id'].count()
             high_failure_users = user_failures[user_failures >= 5]
             
             for user_id, failure_count in high_failure_users.items():
@@ -263,7 +293,7 @@ class AnomalyDetector:
                 })
             
             # Door-specific failure spikes
-            door_failures = failed_attempts.groupby('door_id')['event_id'].count()
+            door_failures = failed_attempts.groupby('door_id', observed=True)['event_id'].count()
             for door_id, failure_count in door_failures.items():
                 total_door_attempts = len(df[df['door_id'] == door_id])
                 failure_rate = failure_count / total_door_attempts
@@ -304,6 +334,10 @@ class AnomalyDetector:
         sequence_anomalies = self._detect_sequence_anomalies(df)
         anomalies.extend(sequence_anomalies)
         
+        # Moves between doors faster than their transit time
+        travel_anomalies = self._detect_impossible_travel(df)
+        anomalies.extend(travel_anomalies)
+        
         # Break in routine patterns
         routine_break_anomalies = self._detect_routine_breaks(df)
         anomalies.extend(routine_break_anomalies)
@@ -327,12 +361,14 @@ class AnomalyDetector:
             if len(features) < 10:  # Not enough data for ML
                 return anomalies
             
+            version = self._features_fingerprint(features)
+            
             # Isolation Forest
-            isolation_anomalies = self._isolation_forest_detection(features, sensitivity)
+            isolation_anomalies = self._isolation_forest_detection(features, sensitivity, version)
             anomalies.extend(isolation_anomalies)
             
             # One-Class SVM
-            svm_anomalies = self._oneclass_svm_detection(features, sensitivity)
+            svm_anomalies = self._oneclass_svm_detection(features, sensitivity, version)
             anomalies.extend(svm_anomalies)
             
         except Exception as e:
@@ -346,11 +382,15 @@ class AnomalyDetector:
         # Aggregate features by time windows (hourly)
         df['hour_window'] = df['timestamp'].dt.floor('H')
         
-        features = df.groupby('hour_window').agg({
+        # Success rate as a boolean mean, not a Python lambda per window
+        columns = ['hour_window', 'event_id', 'person_id', 'door_id',
+                   'hour', 'is_weekend', 'is_business_hours']
+        hourly = df[columns].assign(access_result=df['access_result'] == 'Granted')
+        features = hourly.groupby('hour_window').agg({
             'event_id': 'count',
             'person_id': 'nunique',
             'door_id': 'nunique',
-            'access_result': lambda x: (x == 'Granted').mean(),
+            'access_result': 'mean',
             'hour': 'mean',
             'is_weekend': 'mean',
             'is_business_hours': 'mean'
@@ -369,8 +409,30 @@ class AnomalyDetector:
         
         return features
     
+    def _features_fingerprint(self, features: pd.DataFrame) -> str:
+        """Content hash of the hourly features, used as the model version"""
+        return dataframe_fingerprint(features.reset_index())
+    
+    def _fitted_model(self, name: str, features: pd.DataFrame, version: str,
+                      make_model: Callable[[np.ndarray], Any]) -> Tuple[StandardScaler, Any]:
+        """Scaler and model for ``name`` from the registry, fitting if needed
+        
+        Each model gets its own scaler, so concurrent requests never refit a
+        scaler that another request is using. ``make_model`` receives the
+        scaled training features and returns an unfitted model.
+        """
+        def fit():
+            scaler = StandardScaler()
+            features_scaled = scaler.fit_transform(features)
+            model = make_model(features_scaled).fit(features_scaled)
+            return scaler, model, len(features)
+        
+        entry = self.model_registry.get_or_fit(name, version, fit)
+        return entry.scaler, entry.model
+    
     def _isolation_forest_detection(self, features: pd.DataFrame, 
-                                    sensitivity: float) -> List[Dict[str, Any]]:
+                                    sensitivity: float,
+                                    version: Optional[str] = None) -> List[Dict[str, Any]]:
         """Detect anomalies using Isolation Forest"""
         
         anomalies = []
@@ -378,18 +440,21 @@ class AnomalyDetector:
         # Configure contamination based on sensitivity
         contamination = 1 - sensitivity
         
-        # Fit Isolation Forest
-        iso_forest = IsolationForest(
-            contamination=contamination,
-            random_state=42,
-            n_estimators=100
+        scaler, iso_forest = self._fitted_model(
+            f'isolation_forest_{sensitivity:.4f}', features,
+            version or self._features_fingerprint(features),
+            lambda features_scaled: IsolationForest(
+                contamination=contamination,
+                random_state=42,
+                n_estimators=100
+            )
         )
         
         # Scale features
-        features_scaled = self.scaler.fit_transform(features)
+        features_scaled = scaler.transform(features)
         
         # Predict anomalies
-        predictions = iso_forest.fit_predict(features_scaled)
+        predictions = iso_forest.predict(features_scaled)
         anomaly_scores = iso_forest.decision_function(features_scaled)
         
         # Extract anomalies
@@ -412,7 +477,8 @@ class AnomalyDetector:
         return anomalies
     
     def _oneclass_svm_detection(self, features: pd.DataFrame, 
-                                sensitivity: float) -> List[Dict[str, Any]]:
+                                sensitivity: float,
+                                version: Optional[str] = None) -> List[Dict[str, Any]]:
         """Detect anomalies using One-Class SVM"""
         
         anomalies = []
@@ -421,14 +487,18 @@ class AnomalyDetector:
             # Configure nu parameter based on sensitivity
             nu = 1 - sensitivity
             
-            # Fit One-Class SVM
-            svm = OneClassSVM(nu=nu, kernel='rbf', gamma='scale')
+            backend = self._svm_backend(len(features))
+            scaler, svm = self._fitted_model(
+                f'oneclass_svm_{backend}_{sensitivity:.4f}', features,
+                version or self._features_fingerprint(features),
+                lambda features_scaled: self._make_oneclass_svm(nu, backend, features_scaled)
+            )
             
             # Scale features
-            features_scaled = self.scaler.fit_transform(features)
+            features_scaled = scaler.transform(features)
             
             # Predict anomalies
-            predictions = svm.fit_predict(features_scaled)
+            predictions = svm.predict(features_scaled)
             
             # Extract anomalies
             anomaly_indices = np.where(predictions == -1)[0]
@@ -441,6 +511,7 @@ class AnomalyDetector:
                     'severity': 'medium',
                     'confidence': 0.8,
                     'timestamp': timestamp,
+                    'backend': backend,
                     'description': f'One-Class SVM detected anomaly at {timestamp}'
                 })
         
@@ -449,6 +520,57 @@ class AnomalyDetector:
         
         return anomalies
     
+    def _svm_backend(self, n_samples: int) -> str:
+        """'exact' RBF One-Class SVM, or 'approximate' for large feature sets"""
+        return 'exact' if n_samples <= self.svm_exact_max_samples else 'approximate'
+    
+    def _make_oneclass_svm(self, nu: float, backend: str, features_scaled: np.ndarray) -> Any:
+        """Unfitted One-Class SVM for ``backend``
+        
+        The approximation maps features through a Nystroem RBF kernel with the
+        same gamma as ``gamma='scale'`` and fits a linear one-class SVM by SGD,
+        so fitting grows linearly with the number of hourly windows.
+        """
+        if backend == 'exact':
+            return OneClassSVM(nu=nu, kernel='rbf', gamma='scale')
+        
+        variance = features_scaled.var()
+        gamma = 1.0 / (features_scaled.shape[1] * variance) if variance > 0 else 1.0
+        return make_pipeline(
+            Nystroem(gamma=gamma, n_components=min(SVM_APPROX_COMPONENTS, len(features_scaled)),
+                     random_state=42),
+            SGDOneClassSVM(nu=nu, random_state=42)
+        )
+    
+    def compare_svm_backends(self, features: pd.DataFrame,
+                             sensitivity: float = 0.95) -> Dict[str, Any]:
+        """Fit both One-Class SVM backends on ``features`` and compare them
+        
+        Reports how many windows each flags, the share of windows on which
+        they agree, the recall of the exact model's anomalies and fit times.
+        """
+        nu = 1 - sensitivity
+        features_scaled = StandardScaler().fit_transform(features)
+        
+        predictions = {}
+        seconds = {}
+        for backend in ('exact', 'approximate'):
+            start = time.perf_counter()
+            model = self._make_oneclass_svm(nu, backend, features_scaled).fit(features_scaled)
+            predictions[backend] = model.predict(features_scaled) == -1
+            seconds[backend] = time.perf_counter() - start
+        
+        exact, approximate = predictions['exact'], predictions['approximate']
+        return {
+            'samples': len(features),
+            'exact_anomalies': int(exact.sum()),
+            'approximate_anomalies': int(approximate.sum()),
+            'agreement': float((exact == approximate).mean()),
+            'anomaly_recall': float((exact & approximate).sum() / exact.sum()) if exact.any() else 1.0,
+            'exact_seconds': seconds['exact'],
+            'approximate_seconds': seconds['approximate'],
+        }
+    
     # Helper methods for specific anomaly types
     
     def _detect_time_clustering_anomalies(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
@@ -500,32 +622,24 @@ class AnomalyDetector:
         
         return anomalies
     
-    def _detect_door_hopping(self, df_sorted: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _detect_door_hopping(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect door hopping behavior"""
         
         anomalies = []
         
-        # Look for rapid movement between different doors
-        for user_id in df_sorted['person_id'].unique():
-            user_data = df_sorted[df_sorted['person_id'] == user_id].copy()
-            user_data['door_change'] = user_data['door_id'] != user_data['door_id'].shift()
-            user_data['time_diff'] = user_data['timestamp'].diff()
-            
-            # Rapid door changes (< 5 minutes)
-            rapid_changes = user_data[
-                (user_data['door_change']) & 
-                (user_data['time_diff'] < pd.Timedelta(minutes=5))
-            ]
-            
-            if len(rapid_changes) > 3:  # More than 3 rapid door changes
-                anomalies.append({
-                    'type': 'door_hopping',
-                    'severity': 'medium',
-                    'confidence': 0.8,
-                    'user_id': user_id,
-                    'rapid_changes': len(rapid_changes),
-                    'description': f'User {user_id} showed door hopping behavior with {len(rapid_changes)} rapid door changes'
-                })
+        # Rapid door changes (< 5 minutes) counted per user in a single pass
+        rapid_changes = df['user_door_change'] & (df['user_time_diff'] < pd.Timedelta(minutes=5))
+        change_counts = rapid_changes.groupby(df['person_id'], observed=True).sum()
+        
+        for user_id, change_count in change_counts[change_counts > 3].items():
+            anomalies.append({
+                'type': 'door_hopping',
+                'severity': 'medium',
+                'confidence': 0.8,
+                'user_id': user_id,
+                'rapid_changes': int(change_count),
+                'description': f'User {user_id} showed door hopping behavior with {change_count} rapid door changes'
+            })
         
         return anomalies
     
@@ -535,7 +649,7 @@ class AnomalyDetector:
         anomalies = []
         
         # Users accessing unusual number of doors
-        user_door_counts = df.groupby('person_id')['door_id'].nunique()
+        user_door_counts = df.groupby('person_id', observed=True)['door_id'].nunique()
         
         # Statistical threshold for high door diversity
         if len(user_door_counts) > 1:
@@ -559,35 +673,39 @@ class AnomalyDetector:
         
         anomalies = []
         
-        # For each user, compare recent behavior to historical
-        for user_id in df['person_id'].unique():
-            user_data = df[df['person_id'] == user_id].sort_values('timestamp')
-            
-            if len(user_data) < 10:  # Need sufficient data
-                continue
-            
-            # Split into historical and recent
-            split_point = int(len(user_data) * 0.7)
-            historical = user_data.iloc[:split_point]
-            recent = user_data.iloc[split_point:]
-            
-            if len(recent) < 3:
-                continue
-            
-            # Compare hour patterns
-            hist_hours = historical['hour'].value_counts(normalize=True)
-            recent_hours = recent['hour'].value_counts(normalize=True)
-            
-            # Calculate pattern similarity (using Hellinger distance)
-            similarity = self._calculate_pattern_similarity(hist_hours, recent_hours)
-            
-            if similarity < 0.5:  # Significant pattern change
+        # Need sufficient data per user
+        eligible = df[df['user_event_count'] >= 10]
+        if eligible.empty:
+            return anomalies
+        
+        # Split each user's history into the first 70% (historical) and the
+        # remainder (recent) using the shared per-user event order
+        split_point = (eligible['user_event_count'] * 0.7).astype(int)
+        is_recent = eligible['user_event_seq'] >= split_point
+        
+        hour_counts = eligible.groupby(
+            [eligible['person_id'], is_recent.rename('is_recent'), eligible['hour']],
+            observed=True
+        ).size()
+        hour_dist = hour_counts / hour_counts.groupby(level=[0, 1], observed=True).transform('sum')
+        hour_dist = hour_dist.unstack('hour', fill_value=0.0)
+        
+        historical = hour_dist.xs(False, level='is_recent')
+        recent = hour_dist.xs(True, level='is_recent').reindex(historical.index, fill_value=0.0)
+        
+        # Calculate pattern similarity (using Hellinger distance) for all users at once
+        hellinger = np.sqrt(0.5 * ((np.sqrt(historical) - np.sqrt(recent)) ** 2).sum(axis=1))
+        similarities = (1 - hellinger).clip(lower=0)
+        
+        for user_id in pd.unique(eligible['person_id']):
+            similarity = similarities.get(user_id)
+            if similarity is not None and similarity < 0.5:  # Significant pattern change
                 anomalies.append({
                     'type': 'pattern_deviation',
                     'severity': 'medium',
                     'confidence': 0.75,
                     'user_id': user_id,
-                    'similarity_score': similarity,
+                    'similarity_score': float(similarity),
                     'description': f'User {user_id} showed significant deviation from historical patterns'
                 })
         
@@ -615,7 +733,7 @@ class AnomalyDetector:
                 })
             
             # Users with frequent invalid badge usage
-            user_invalid_counts = invalid_badge_events.groupby('person_id')['event_id'].count()
+            user_invalid_counts = invalid_badge_events.groupby('person_id', observed=True)['event_id'].count()
             frequent_invalid_users = user_invalid_counts[user_invalid_counts >= 3]
             
             for user_id, count in frequent_invalid_users.items():
@@ -639,7 +757,7 @@ class AnomalyDetector:
         
         if len(device_issues) > 0:
             # Group by door to find problematic devices
-            door_device_issues = device_issues.groupby('door_id').agg({
+            door_device_issues = device_issues.groupby('door_id', observed=True).agg({
                 'event_id': 'count',
                 'device_status': lambda x: list(x.unique())
             })
@@ -660,107 +778,82 @@ class AnomalyDetector:
     
     def _detect_tailgating(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect potential tailgating events"""
-        
-        anomalies = []
-        
-        # Look for multiple successful accesses at same door within short time
-        df_sorted = df.sort_values(['door_id', 'timestamp'])
-        
-        for door_id in df['door_id'].unique():
-            door_data = df_sorted[df_sorted['door_id'] == door_id]
-            granted_access = door_data[door_data['access_result'] == 'Granted']
-            
-            if len(granted_access) < 2:
-                continue
-            
-            granted_access = granted_access.copy()
-            granted_access['time_diff'] = granted_access['timestamp'].diff()
-            
-            # Multiple accesses within 30 seconds
-            rapid_accesses = granted_access[granted_access['time_diff'] < pd.Timedelta(seconds=30)]
-            
-            if len(rapid_accesses) > 0:
-                for _, row in rapid_accesses.iterrows():
-                    anomalies.append({
-                        'type': 'potential_tailgating',
-                        'severity': 'medium',
-                        'confidence': 0.6,
-                        'door_id': door_id,
-                        'timestamp': row['timestamp'],
-                        'time_gap': row['time_diff'],
-                        'description': f'Potential tailgating at door {door_id}: access {row["time_diff"]} after previous'
-                    })
-        
-        return anomalies
+        return self.tailgating_detector.detect(df)
     
     def _detect_sequence_anomalies(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect unusual access sequences"""
         
         anomalies = []
         
-        # Analyze door access sequences for each user
-        for user_id in df['person_id'].unique():
-            user_data = df[df['person_id'] == user_id].sort_values('timestamp')
-            
-            if len(user_data) < 3:
-                continue
-            
-            # Look for impossible sequences (e.g., being at two distant doors too quickly)
-            # This would require door location data, so we'll use a simple heuristic
-            user_data = user_data.copy()
-            user_data['door_change'] = user_data['door_id'] != user_data['door_id'].shift()
-            user_data['time_diff'] = user_data['timestamp'].diff()
-            
-            # Very rapid door changes (< 1 minute) might be suspicious
-            rapid_sequences = user_data[
-                (user_data['door_change']) & 
-                (user_data['time_diff'] < pd.Timedelta(minutes=1))
-            ]
-            
-            if len(rapid_sequences) > 2:
-                anomalies.append({
-                    'type': 'rapid_sequence',
-                    'severity': 'low',
-                    'confidence': 0.5,
-                    'user_id': user_id,
-                    'sequence_count': len(rapid_sequences),
-                    'description': f'User {user_id} has rapid door sequence changes'
-                })
+        # Very rapid door changes (< 1 minute) might be suspicious; moves that
+        # are physically impossible are flagged by _detect_impossible_travel
+        eligible = df['user_event_count'] >= 3
+        rapid_sequences = (
+            eligible
+            & df['user_door_change']
+            & (df['user_time_diff'] < pd.Timedelta(minutes=1))
+        )
+        sequence_counts = rapid_sequences.groupby(df['person_id'], sort=False, observed=True).sum()
+        
+        for user_id, sequence_count in sequence_counts[sequence_counts > 2].items():
+            anomalies.append({
+                'type': 'rapid_sequence',
+                'severity': 'low',
+                'confidence': 0.5,
+                'user_id': user_id,
+                'sequence_count': int(sequence_count),
+                'description': f'User {user_id} has rapid door sequence changes'
+            })
         
         return anomalies
     
+    def _detect_impossible_travel(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """Detect badges at two doors faster than the transit between them"""
+        return self.travel_detector.detect(df)
+    
     def _detect_routine_breaks(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Detect breaks in routine patterns"""
         
         anomalies = []
         
         # This is a simplified version - in practice, you'd need more sophisticated pattern analysis
-        for user_id in df['person_id'].unique():
-            user_data = df[df['person_id'] == user_id]
-            
-            if len(user_data) < 7:  # Need at least a week of data
+        eligible = df[df['user_event_count'] >= 7]  # Need at least a week of data
+        if eligible.empty:
+            return anomalies
+        
+        # Check for sudden changes in daily activity level
+        daily_activity = eligible.groupby(['person_id', 'date'], observed=True).size()
+        user_days = daily_activity.groupby(level='person_id', observed=True)
+        daily_activity = daily_activity[user_days.transform('size') > 3]
+        if daily_activity.empty:
+            return anomalies
+        
+        # The last three active days of each user are "recent", the rest historical
+        is_recent = daily_activity.groupby(level='person_id', observed=True).cumcount(ascending=False) < 3
+        averages = daily_activity.groupby(
+            [daily_activity.index.get_level_values('person_id'), is_recent.values],
+            observed=True
+        ).mean().unstack()
+        
+        for user_id in pd.unique(eligible['person_id']):
+            if user_id not in averages.index:
                 continue
+            recent = averages.at[user_id, True]
+            historical = averages.at[user_id, False]
             
-            # Check for sudden changes in daily activity level
-            daily_activity = user_data.groupby('date')['event_id'].count()
-            
-            if len(daily_activity) > 3:
-                recent_avg = daily_activity.tail(3).mean()
-                historical_avg = daily_activity.head(-3).mean()
-                
-                # Significant change in activity level
-                if abs(recent_avg - historical_avg) > historical_avg:
-                    change_type = 'increase' if recent_avg > historical_avg else 'decrease'
-                    anomalies.append({
-                        'type': 'routine_break',
-                        'severity': 'low',
-                        'confidence': 0.6,
-                        'user_id': user_id,
-                        'change_type': change_type,
-                        'historical_avg': historical_avg,
-                        'recent_avg': recent_avg,
-                        'description': f'User {user_id} shows {change_type} in activity level'
-                    })
+            # Significant change in activity level
+            if abs(recent - historical) > historical:
+                change_type = 'increase' if recent > historical else 'decrease'
+                anomalies.append({
+                    'type': 'routine_break',
+                    'severity': 'low',
+                    'confidence': 0.6,
+                    'user_id': user_id,
+                    'change_type': change_type,
+                    'historical_avg': historical,
+                    'recent_avg': recent,
+                    'description': f'User {user_id} shows {change_type} in activity level'
+                })
         
         return anomalies
     
@@ -771,7 +864,7 @@ class AnomalyDetector:
         
         # Sudden burst of activity
         df['hour_window'] = df['timestamp'].dt.floor('H')
-        hourly_counts = df.groupby(['person_id', 'hour_window'])['event_id'].count()
+        hourly_counts = df.groupby(['person_id', 'hour_window'], observed=True)['event_id'].count()
         
         # Find users with unusually high activity in single hours
         for (user_id, hour_window), count in hourly_counts.items():
@@ -951,6 +1044,9 @@ class AnomalyDetector:
         if 'after_hours_spike' in anomaly_types:
             recommendations.append("Implement additional monitoring for after-hours access activities")
         
+        if 'impossible_travel' in anomaly_types:
+            recommendations.append("Check badges seen at distant doors too quickly for cloning or sharing")
+        
         if 'door_failure_spike' in anomaly_types:
             recommendations.append("Check door hardware and access control systems for malfunctions")
         
@@ -1006,7 +1102,8 @@ class AnomalyDetector:
             'door_failure_spike',
             'high_invalid_badge_rate',
             'rapid_attempts',
-            'potential_tailgating'
+            'potential_tailgating',
+            'impossible_travel'
         ]
         
         security_anomalies = [a for a in all_anomalies if a.get('type') in security_types]
@@ -1043,9 +1140,12 @@ class AnomalyDetector:
         }
 
 # Factory function
-def create_anomaly_detector() -> AnomalyDetector:
+def create_anomaly_detector(tailgating_detector: Optional[TailgatingDetector] = None,
+                            model_registry: Optional[ModelRegistry] = None,
+                            svm_exact_max_samples: int = SVM_EXACT_MAX_SAMPLES,
+                            travel_detector: Optional[ImpossibleTravelDetector] = None) -> AnomalyDetector:
     """Create anomaly detector instance"""
-    return AnomalyDetector()
+    return AnomalyDetector(tailgating_detector, model_registry, svm_exact_max_samples, travel_detector)
 
 # Export
 __all__ = ['AnomalyDetector', 'Anomaly', 'create_anomaly_detector']
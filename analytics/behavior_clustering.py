@@ -0,0 +1,101 @@
+"""
+Behavior Clustering Module
+Incremental user segmentation with centroids kept between runs
+"""
+
+import pandas as pd
+import numpy as np
+import copy
+from typing import Mapping, Optional, Union
+import logging
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from core.caching import dataframe_fingerprint
+
+from .model_registry import FittedModel, ModelRegistry
+
+DEFAULT_MODEL_NAME = 'behavior_clusters'
+DEFAULT_BATCH_SIZE = 1024
+MAX_CLUSTERS = 5
+
+class IncrementalBehaviorClustering:
+    """Segment users with MiniBatchKMeans updated by ``partial_fit``
+
+    The first call fits the feature scaler and seeds the centroids. Later
+    calls with new user features only run mini-batch updates from the
+    stored centroids, so segments stay stable and no full refit happens.
+    Features seen before (same content fingerprint) are just assigned.
+    The scaler and model live in a ``ModelRegistry`` and can be persisted
+    with it. ``assign`` places a single user in O(k) without sklearn.
+    """
+
+    def __init__(self, model_registry: Optional[ModelRegistry] = None,
+                 n_clusters: Optional[int] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 model_name: str = DEFAULT_MODEL_NAME):
+        self.model_registry = model_registry or ModelRegistry()
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.model_name = model_name
+        self.logger = logging.getLogger(__name__)
+
+    def fit_predict(self, features: pd.DataFrame) -> np.ndarray:
+        """Update the segmentation with ``features`` and label every row"""
+        features = features.astype(float)
+        version = dataframe_fingerprint(features.reset_index())
+        entry = self.model_registry.get(self.model_name)
+        if entry is not None and list(entry.scaler.feature_names_in_) != list(features.columns):
+            entry = None
+
+        if entry is None:
+            scaler = StandardScaler().fit(features)
+            n_clusters = self.n_clusters or min(MAX_CLUSTERS, max(2, len(features) // 3))
+            model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size,
+                                    random_state=42, n_init=3)
+            entry = FittedModel(scaler, model, version='')
+
+        features_scaled = entry.scaler.transform(features)
+        if entry.version != version:
+            # Update a copy so concurrent callers keep predicting with the stored model
+            model = copy.deepcopy(entry.model)
+            self._partial_fit(model, features_scaled)
+            entry = FittedModel(entry.scaler, model, version,
+                                n_samples=entry.n_samples + len(features))
+            self.model_registry.put(self.model_name, entry)
+
+        return entry.model.predict(features_scaled)
+
+    def assign(self, user_features: Union[Mapping[str, float], pd.Series]) -> int:
+        """Nearest stored centroid for one user's features"""
+        entry = self.model_registry.get(self.model_name)
+        if entry is None:
+            raise ValueError("Behavior clusters have not been fitted yet")
+        scaler, model = entry.scaler, entry.model
+        values = np.array([user_features[name] for name in scaler.feature_names_in_], dtype=float)
+        scaled = (values - scaler.mean_) / scaler.scale_
+        return int(np.argmin(((model.cluster_centers_ - scaled) ** 2).sum(axis=1)))
+
+    @property
+    def centroids(self) -> Optional[np.ndarray]:
+        entry = self.model_registry.get(self.model_name)
+        return entry.model.cluster_centers_ if entry is not None else None
+
+    def _partial_fit(self, model: MiniBatchKMeans, features_scaled: np.ndarray) -> None:
+        """Feed shuffled mini-batches; the first needs at least k rows"""
+        order = np.random.default_rng(42).permutation(len(features_scaled))
+        batch_size = max(self.batch_size, model.n_clusters)
+        for start in range(0, len(order), batch_size):
+            batch = features_scaled[order[start:start + batch_size]]
+            if not hasattr(model, 'cluster_centers_') and len(batch) < model.n_clusters:
+                break
+            model.partial_fit(batch)
+
+# Factory function
+def create_incremental_clustering(model_registry: Optional[ModelRegistry] = None,
+                                  n_clusters: Optional[int] = None) -> IncrementalBehaviorClustering:
+    """Factory function to create incremental behavior clustering"""
+    return IncrementalBehaviorClustering(model_registry, n_clusters)
+
+# Export for compatibility
+__all__ = ['IncrementalBehaviorClustering', 'create_incremental_clustering']
@@ -0,0 +1,191 @@
+"""
+Co-presence Index Module
+Per-door event timelines for "who was at the same reader" queries
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional, Union
+import logging
+
+DEFAULT_WINDOW = timedelta(minutes=5)
+# Keys are door code << 42 | milliseconds since the index origin:
+# 2**42 ms is about 139 years, leaving 21 bits (2M doors) for the door
+TIME_BITS = 42
+TIME_MASK = (1 << TIME_BITS) - 1
+MAX_DOORS = 1 << (63 - TIME_BITS)
+
+TimeBound = Optional[Union[str, datetime, pd.Timestamp]]
+
+class CoPresenceIndex:
+    """Sorted per-door timelines of badge events
+
+    Every event is one int64 key ``door << 42 | ms``, and the keys are kept
+    sorted, so each door's events form a contiguous time-ordered run. The
+    badges seen at a door within ``window`` of a time are then found with
+    two binary searches, with no scan and no per-user filter. A second
+    ordering by (badge, time) finds a badge's own events. A query costs
+    O(k log n) for a badge with k events, whatever the history length.
+    Badge IDs are kept as strings, so ``1001`` and ``'1001'`` are the same
+    badge whichever dtype a file was parsed with.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.origin = np.datetime64(0, 'ms')
+        self.doors = np.empty(0, dtype=object)
+        self.persons = np.empty(0, dtype=object)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.key_persons = np.empty(0, dtype=np.int64)
+        # Positions in ``keys`` of each person's events, by person then time
+        self.person_order = np.empty(0, dtype=np.int64)
+        self.person_indptr = np.zeros(1, dtype=np.int64)
+        self._person_lookup = pd.Index([])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame) -> 'CoPresenceIndex':
+        """Index the ``timestamp``, ``person_id`` and ``door_id`` of one batch"""
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce')
+        valid = (timestamps.notna() & df['person_id'].notna() & df['door_id'].notna()).to_numpy()
+        if not valid.all():
+            df, timestamps = df.loc[valid], timestamps[valid]
+        times = timestamps.to_numpy(dtype='datetime64[ms]')
+        door_codes, doors = pd.factorize(df['door_id'])
+        person_codes, persons = pd.factorize(df['person_id'])
+        # Merge IDs that only differ in type once they are strings
+        string_codes, persons = pd.factorize(np.asarray(persons).astype(str))
+        person_codes = string_codes[person_codes]
+        origin = times.min() if len(times) else np.datetime64(0, 'ms')
+        return cls._build(origin, np.asarray(doors, dtype=object), np.asarray(persons, dtype=object),
+                          door_codes, person_codes, times)
+
+    @classmethod
+    def concat(cls, indexes: Iterable['CoPresenceIndex']) -> 'CoPresenceIndex':
+        """One index over several batches, e.g. per-file partial indexes"""
+        indexes = [index for index in indexes if len(index)]
+        if not indexes:
+            return cls()
+        if len(indexes) == 1:
+            return indexes[0]
+        doors = pd.Index(np.concatenate([index.doors for index in indexes])).unique()
+        persons = pd.Index(np.concatenate([index.persons for index in indexes])).unique()
+        door_codes, person_codes, times = [], [], []
+        for index in indexes:
+            door_codes.append(doors.get_indexer(index.doors)[index.keys >> TIME_BITS])
+            person_codes.append(persons.get_indexer(index.persons)[index.key_persons])
+            times.append(index.origin + (index.keys & TIME_MASK).astype('timedelta64[ms]'))
+        times = np.concatenate(times)
+        return cls._build(times.min(), np.asarray(doors, dtype=object), np.asarray(persons, dtype=object),
+                          np.concatenate(door_codes), np.concatenate(person_codes), times)
+
+    @classmethod
+    def _build(cls, origin: np.datetime64, doors: np.ndarray, persons: np.ndarray,
+               door_codes: np.ndarray, person_codes: np.ndarray, times: np.ndarray) -> 'CoPresenceIndex':
+        if len(doors) >= MAX_DOORS:
+            raise ValueError(f"Co-presence index supports at most {MAX_DOORS} doors")
+        index = cls()
+        offsets = (times - origin).astype(np.int64)
+        keys = (door_codes.astype(np.int64) << TIME_BITS) | offsets
+        order = np.argsort(keys, kind='stable')
+        index.origin = origin
+        index.doors = doors
+        index.persons = persons
+        index.keys = keys[order]
+        index.key_persons = person_codes.astype(np.int64)[order]
+        index.person_order = np.lexsort((offsets[order], index.key_persons))
+        index.person_indptr = np.r_[0, np.cumsum(np.bincount(index.key_persons, minlength=len(persons)))]
+        index._person_lookup = pd.Index(persons)
+        return index
+
+    def events(self, person_id: Any, start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        """The badge's own events, by time"""
+        positions = self._person_positions(person_id, start, end)
+        return pd.DataFrame({
+            'timestamp': self._times(positions),
+            'door_id': self.doors[self.keys[positions] >> TIME_BITS],
+        })
+
+    def event_count(self, person_id: Any, start: TimeBound = None, end: TimeBound = None) -> int:
+        """Number of the badge's own events, without materialising them"""
+        return len(self._person_positions(person_id, start, end))
+
+    def co_present(self, person_id: Any, window: timedelta = DEFAULT_WINDOW,
+                   start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        """Every event of another badge at the same door within ``window``
+
+        One row per (badge event, other event) pair, with the gap in
+        seconds (negative when the other badge came first).
+        """
+        positions = self._person_positions(person_id, start, end)
+        keys = self.keys[positions]
+        door_base = keys & ~TIME_MASK
+        span = int(window / timedelta(milliseconds=1))
+        lo = np.searchsorted(self.keys, np.maximum(keys - span, door_base), side='left')
+        hi = np.searchsorted(self.keys, np.minimum(keys + span, door_base | TIME_MASK), side='right')
+
+        # Expand the [lo, hi) runs into matched positions
+        lengths = hi - lo
+        source = np.repeat(np.arange(len(positions)), lengths)
+        matched = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + lo[source]
+        other = self.key_persons[matched] != self.key_persons[positions[source]]
+        source, matched = source[other], matched[other]
+
+        return pd.DataFrame({
+            'door_id': self.doors[self.keys[matched] >> TIME_BITS],
+            'timestamp': self._times(positions[source]),
+            'person_id': self.persons[self.key_persons[matched]],
+            'other_timestamp': self._times(matched),
+            'gap_seconds': ((self.keys[matched] & TIME_MASK) - (keys[source] & TIME_MASK)) / 1000.0,
+        })
+
+    def contacts(self, person_id: Any, window: timedelta = DEFAULT_WINDOW,
+                 start: TimeBound = None, end: TimeBound = None) -> pd.DataFrame:
+        """Badges co-present with ``person_id``, most encounters first"""
+        return self.summarize_contacts(self.co_present(person_id, window, start, end))
+
+    @staticmethod
+    def summarize_contacts(pairs: pd.DataFrame) -> pd.DataFrame:
+        """Per-badge contacts from :meth:`co_present` pairs, most encounters first"""
+        columns = ['encounters', 'doors', 'first_contact', 'last_contact', 'closest_gap_seconds']
+        if pairs.empty:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='person_id'))
+        pairs = pairs.assign(abs_gap=pairs['gap_seconds'].abs())
+        contacts = pairs.groupby('person_id', sort=False).agg(
+            encounters=('timestamp', 'nunique'),
+            doors=('door_id', lambda doors: sorted(doors.unique().tolist())),
+            first_contact=('other_timestamp', 'min'),
+            last_contact=('other_timestamp', 'max'),
+            closest_gap_seconds=('abs_gap', 'min'),
+        )
+        return contacts.sort_values(['encounters', 'closest_gap_seconds'], ascending=[False, True])
+
+    def _person_positions(self, person_id: Any, start: TimeBound, end: TimeBound) -> np.ndarray:
+        code = self._person_lookup.get_indexer([str(person_id)])[0]
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        positions = self.person_order[self.person_indptr[code]:self.person_indptr[code + 1]]
+        if start is not None or end is not None:
+            # The badge's positions are time ordered, so bound them by search
+            offsets = self.keys[positions] & TIME_MASK
+            first = 0 if start is None else np.searchsorted(offsets, self._offset(start), side='left')
+            last = len(offsets) if end is None else np.searchsorted(offsets, self._offset(end), side='right')
+            positions = positions[first:last]
+        return positions
+
+    def _offset(self, bound: Union[str, datetime, pd.Timestamp]) -> int:
+        return int((pd.Timestamp(bound).to_datetime64() - self.origin) // np.timedelta64(1, 'ms'))
+
+    def _times(self, positions: np.ndarray) -> np.ndarray:
+        return (self.origin + (self.keys[positions] & TIME_MASK).astype('timedelta64[ms]')).astype('datetime64[ns]')
+
+# Factory function
+def create_copresence_index(dfs: Iterable[pd.DataFrame] = ()) -> CoPresenceIndex:
+    """Factory function to index one or more event batches"""
+    return CoPresenceIndex.concat(CoPresenceIndex.from_events(df) for df in dfs)
+
+# Export for compatibility
+__all__ = ['CoPresenceIndex', 'create_copresence_index']
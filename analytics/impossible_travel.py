@@ -0,0 +1,242 @@
+"""
+Impossible Travel Module
+Door transit-time matrix and detection of badge moves faster than possible
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+import logging
+
+# Minimum seconds between two different doors, when nothing is learned
+SAME_FLOOR_SECONDS = 5.0
+PER_FLOOR_SECONDS = 8.0
+# Extra walk to a lift or stairs when neither door is one
+CONNECTOR_SECONDS = 10.0
+# A learned pair's bound is this share of its median transit time
+LEARNED_FRACTION = 0.25
+MIN_OBSERVATIONS = 5
+# Longer gaps between two doors are stops on the way, not transits
+DEFAULT_MAX_TRANSIT = timedelta(minutes=10)
+CONNECTOR_FLAGS = ('is_elevator', 'is_stairwell', 'is_fire_escape')
+
+class DoorTopology:
+    """Minimum transit seconds between every pair of doors
+
+    There are no door coordinates, so the bound is modelled from the
+    device mapping attributes: ``same_floor_seconds`` between two doors of
+    a floor, ``per_floor_seconds`` for each floor of difference, and
+    ``connector_seconds`` more to change floor when neither door is an
+    elevator or stairwell. Pairs involving a door of unknown floor get no
+    bound. ``transit[i, j]`` is precomputed as a dense float32 matrix, so
+    checking a move is a single lookup. ``learn`` tightens the modelled
+    bound of frequently used pairs to a share of their median transit.
+    """
+
+    def __init__(self, doors: Any, floors: Any, connectors: Any,
+                 same_floor_seconds: float = SAME_FLOOR_SECONDS,
+                 per_floor_seconds: float = PER_FLOOR_SECONDS,
+                 connector_seconds: float = CONNECTOR_SECONDS):
+        self.logger = logging.getLogger(__name__)
+        self.doors = pd.Index(doors, name='door_id')
+        self.floors = np.asarray(floors, dtype=np.float32)
+        self.connectors = np.asarray(connectors, dtype=bool)
+        self.same_floor_seconds = same_floor_seconds
+        self.per_floor_seconds = per_floor_seconds
+        self.connector_seconds = connector_seconds
+        self.learned_pairs = 0
+        self.transit = self._model_transit()
+
+    @classmethod
+    def from_device_mappings(cls, mappings: Mapping[Any, Mapping[str, Any]],
+                             **params: float) -> 'DoorTopology':
+        """Topology from door -> attributes, as saved by the door mapping service"""
+        attributes = pd.DataFrame.from_dict(dict(mappings), orient='index')
+        return cls._from_attributes(attributes, **params)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, **params: float) -> 'DoorTopology':
+        """Topology from events enriched with the device mapping columns"""
+        columns = [column for column in ('floor_number',) + CONNECTOR_FLAGS if column in df.columns]
+        if not columns:
+            return cls._from_attributes(pd.DataFrame(index=pd.unique(df['door_id'].dropna())), **params)
+        attributes = df.groupby('door_id', sort=False, observed=True)[columns].first()
+        return cls._from_attributes(attributes, **params)
+
+    @classmethod
+    def _from_attributes(cls, attributes: pd.DataFrame, **params: float) -> 'DoorTopology':
+        floors = (pd.to_numeric(attributes['floor_number'], errors='coerce')
+                  if 'floor_number' in attributes.columns else pd.Series(np.nan, index=attributes.index))
+        connectors = np.zeros(len(attributes), dtype=bool)
+        for flag in CONNECTOR_FLAGS:
+            if flag in attributes.columns:
+                connectors |= attributes[flag].astype(object).eq(True).to_numpy(dtype=bool)
+        return cls(attributes.index, floors.to_numpy(dtype=np.float32), connectors, **params)
+
+    def __len__(self) -> int:
+        return len(self.doors)
+
+    def _model_transit(self) -> np.ndarray:
+        floors, connectors = self.floors, self.connectors
+        floor_gap = np.abs(floors[:, None] - floors[None, :])
+        transit = np.float32(self.same_floor_seconds) + floor_gap * np.float32(self.per_floor_seconds)
+        walk_to_connector = (floor_gap > 0) & ~(connectors[:, None] | connectors[None, :])
+        transit[walk_to_connector] += np.float32(self.connector_seconds)
+        transit[np.isnan(transit)] = 0
+        np.fill_diagonal(transit, 0)
+        return transit
+
+    def codes(self, door_ids: Any) -> np.ndarray:
+        """Matrix positions of ``door_ids``, -1 for doors not in the topology"""
+        return self.doors.get_indexer(door_ids)
+
+    def min_transit(self, from_door: Any, to_door: Any) -> float:
+        i, j = self.codes([from_door, to_door])
+        return float(self.transit[i, j]) if i >= 0 and j >= 0 else 0.0
+
+    def learn(self, sources: np.ndarray, targets: np.ndarray, seconds: np.ndarray,
+              min_observations: int = MIN_OBSERVATIONS,
+              fraction: float = LEARNED_FRACTION) -> 'DoorTopology':
+        """Copy with bounds from the median observed transit of each pair
+
+        Transits are matrix positions and durations. Each pair with a
+        modelled bound and at least ``min_observations`` transits is
+        bounded by ``fraction`` of its median when that is lower, so
+        learning never flags more than the model. Medians come from one
+        sort by (pair, duration), read at the middle of each pair's run.
+        """
+        n = len(self.doors)
+        keys = sources.astype(np.int64) * n + targets
+        order = np.lexsort((seconds, keys))
+        keys, seconds = keys[order], seconds[order]
+        pairs, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        # Pairs of unknown floor stay unbounded whatever was observed
+        usable = (counts >= min_observations) & (self.transit[pairs // n, pairs % n] > 0)
+        pairs, starts, counts = pairs[usable], starts[usable], counts[usable]
+        medians = (seconds[starts + (counts - 1) // 2] + seconds[starts + counts // 2]) / 2
+
+        learned = DoorTopology.__new__(DoorTopology)
+        learned.__dict__.update(self.__dict__)
+        learned.transit = self.transit.copy()
+        sources, targets = pairs // n, pairs % n
+        learned.transit[sources, targets] = np.minimum(learned.transit[sources, targets], medians * fraction)
+        learned.learned_pairs = len(pairs)
+        return learned
+
+class ImpossibleTravelDetector:
+    """Flag consecutive badge events at two doors closer in time than possible
+
+    Events are sorted once by (badge, time) and every move to a different
+    door is checked against the topology's transit matrix in one
+    vectorised pass. Without a fixed ``topology`` one is built from the
+    device mapping columns of each frame; a frame without floor data gets
+    no bounds, so nothing is checked. With ``learn`` the moves of the frame
+    itself (up to ``max_transit`` long) tighten the bounds first; the
+    median keeps the few impossible moves from shifting them.
+    """
+
+    def __init__(self, topology: Optional[DoorTopology] = None, learn: bool = True,
+                 min_observations: int = MIN_OBSERVATIONS,
+                 learned_fraction: float = LEARNED_FRACTION,
+                 max_transit: timedelta = DEFAULT_MAX_TRANSIT):
+        self.topology = topology
+        self.learn = learn
+        self.min_observations = min_observations
+        self.learned_fraction = learned_fraction
+        self.max_transit = max_transit
+        self.logger = logging.getLogger(__name__)
+
+    def topology_for(self, df: pd.DataFrame) -> DoorTopology:
+        """The topology used for ``df``, including anything learned from it"""
+        return self._moves(df)[0]
+
+    def find_impossible_transitions(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Moves made faster than the minimum transit between their doors
+
+        Returns ``person_id``, ``from_door``, ``door_id``, ``from_timestamp``,
+        ``timestamp``, ``gap_seconds`` and ``min_transit_seconds``, ordered
+        by badge (in order of first appearance) and time.
+        """
+        columns = ['person_id', 'from_door', 'door_id', 'from_timestamp',
+                   'timestamp', 'gap_seconds', 'min_transit_seconds']
+        topology, moves = self._moves(df)
+        if moves is None:
+            return pd.DataFrame(columns=columns)
+        rows, sources, targets, seconds, frame = moves
+
+        bounds = topology.transit[sources, targets]
+        flagged = seconds < bounds
+        rows = rows[flagged]
+        return pd.DataFrame({
+            'person_id': frame['person_id'].to_numpy()[rows],
+            'from_door': topology.doors[sources[flagged]],
+            'door_id': topology.doors[targets[flagged]],
+            'from_timestamp': frame['timestamp'].to_numpy(dtype='datetime64[ns]')[rows - 1],
+            'timestamp': frame['timestamp'].to_numpy(dtype='datetime64[ns]')[rows],
+            'gap_seconds': seconds[flagged],
+            'min_transit_seconds': bounds[flagged].astype(float),
+        }, columns=columns)
+
+    def iter_anomalies(self, df: pd.DataFrame) -> Iterator[Dict[str, Any]]:
+        """Yield one impossible travel anomaly dict per flagged move"""
+        transitions = self.find_impossible_transitions(df)
+        for row in transitions.itertuples(index=False):
+            yield {
+                'type': 'impossible_travel',
+                'severity': 'high',
+                'confidence': 0.8,
+                'user_id': row.person_id,
+                'door_id': row.door_id,
+                'from_door': row.from_door,
+                'timestamp': row.timestamp,
+                'time_gap': row.gap_seconds,
+                'min_transit_seconds': row.min_transit_seconds,
+                'description': (f'User {row.person_id} badged at {row.door_id} {row.gap_seconds:.0f}s after '
+                                f'{row.from_door}; the doors are at least {row.min_transit_seconds:.0f}s apart')
+            }
+
+    def detect(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """All impossible travel anomalies as a list"""
+        return list(self.iter_anomalies(df))
+
+    def _moves(self, df: pd.DataFrame) -> Tuple[DoorTopology, Optional[tuple]]:
+        """Topology plus the door changes of consecutive per-badge events
+
+        Moves are ``(rows, sources, targets, seconds, frame)``
+        where ``rows`` index the arriving event in ``frame``, sorted by
+        badge and time, or None when there is no move to check.
+        """
+        valid = (df['person_id'].notna() & df['door_id'].notna() & df['timestamp'].notna()).to_numpy()
+        frame = df.loc[valid] if not valid.all() else df
+        topology = self.topology or DoorTopology.from_frame(frame)
+        if len(frame) < 2 or not topology.transit.any():
+            return topology, None
+
+        persons = pd.factorize(frame['person_id'])[0]
+        doors = topology.codes(frame['door_id'])
+        timestamps = frame['timestamp'].to_numpy(dtype='datetime64[ns]')
+        order = np.lexsort((timestamps, persons))
+        frame = frame.iloc[order]
+        persons, doors, timestamps = persons[order], doors[order], timestamps[order]
+
+        seconds = np.diff(timestamps) / np.timedelta64(1, 's')
+        moved = ((persons[1:] == persons[:-1]) & (doors[1:] != doors[:-1])
+                 & (doors[1:] >= 0) & (doors[:-1] >= 0))
+        rows = np.flatnonzero(moved) + 1
+        sources, targets, seconds = doors[rows - 1], doors[rows], seconds[rows - 1]
+
+        if self.learn and len(rows):
+            transits = seconds <= self.max_transit.total_seconds()
+            topology = topology.learn(sources[transits], targets[transits], seconds[transits],
+                                      self.min_observations, self.learned_fraction)
+        return topology, (rows, sources, targets, seconds, frame)
+
+# Factory function
+def create_impossible_travel_detector(topology: Optional[DoorTopology] = None,
+                                      learn: bool = True) -> ImpossibleTravelDetector:
+    """Factory function to create impossible travel detector"""
+    return ImpossibleTravelDetector(topology, learn)
+
+# Export for compatibility
+__all__ = ['DoorTopology', 'ImpossibleTravelDetector', 'create_impossible_travel_detector']
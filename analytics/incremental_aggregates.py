@@ -0,0 +1,253 @@
+"""
+Incremental Aggregates Module
+Mergeable per-day/hour/user/door partial aggregates so new uploads update
+dashboard statistics without rescanning the full history
+"""
+
+import pandas as pd
+import numpy as np
+import pickle
+from pathlib import Path
+from typing import Dict, Any, Optional
+import logging
+
+from .sketches import HyperLogLog, hash_values
+
+REQUIRED_COLUMNS = ['timestamp', 'person_id', 'door_id', 'access_result']
+
+class IncrementalAggregator:
+    """Append-only aggregates of access events
+
+    Every table holds additive partials (event and granted counts, per-user
+    sums and sums of squares of daily counts) and distinct users are tracked
+    with HyperLogLog sketches, so two aggregators merge exactly except for
+    the sketch estimates.
+    """
+
+    def __init__(self, hll_precision: int = 14, door_hll_precision: int = 10):
+        self.logger = logging.getLogger(__name__)
+        self.hll_precision = hll_precision
+        self.door_hll_precision = door_hll_precision
+        self.daily_hll_precision = max(4, hll_precision - 2)
+
+        self.daily = pd.DataFrame(columns=['events', 'granted'], dtype='int64')
+        self.hourly = pd.DataFrame(columns=['events', 'granted'], dtype='int64')
+        self.users = pd.DataFrame(
+            columns=['events', 'granted', 'active_days', 'daily_sumsq', 'first_seen', 'last_seen']
+        )
+        self.doors = pd.DataFrame(columns=['events', 'granted'], dtype='int64')
+        # (person_id, date) -> events, needed to keep daily_sumsq exact on merge
+        self.user_days = pd.Series(dtype='int64')
+
+        self.unique_users = HyperLogLog(hll_precision)
+        self.daily_users: Dict[Any, HyperLogLog] = {}
+        self.door_users: Dict[Any, HyperLogLog] = {}
+
+    @property
+    def total_events(self) -> int:
+        return int(self.daily['events'].sum()) if len(self.daily) else 0
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame, **kwargs) -> 'IncrementalAggregator':
+        """Build partial aggregates for one batch of events"""
+        aggregator = cls(**kwargs)
+
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce')
+        valid = timestamps.notna().to_numpy()
+        if not valid.all():
+            df = df.loc[valid]
+            timestamps = timestamps[valid]
+        if df.empty:
+            return aggregator
+
+        batch = pd.DataFrame({
+            'date': timestamps.dt.normalize().to_numpy(),
+            'hour': timestamps.dt.floor('h').to_numpy(),
+            'person_id': df['person_id'].to_numpy(),
+            'door_id': df['door_id'].to_numpy(),
+            'timestamp': timestamps.to_numpy(),
+            'events': 1,
+            'granted': (df['access_result'] == 'Granted').to_numpy().astype('int64'),
+        })
+
+        counts = ['events', 'granted']
+        aggregator.daily = batch.groupby('date')[counts].sum()
+        aggregator.hourly = batch.groupby('hour')[counts].sum()
+        aggregator.doors = batch.groupby('door_id', observed=True)[counts].sum()
+        aggregator.user_days = batch.groupby(['person_id', 'date'], observed=True)['events'].sum()
+
+        users = batch.groupby('person_id', observed=True).agg(
+            events=('events', 'sum'),
+            granted=('granted', 'sum'),
+            first_seen=('timestamp', 'min'),
+            last_seen=('timestamp', 'max'),
+        )
+        day_groups = aggregator.user_days.groupby(level='person_id', observed=True)
+        users['active_days'] = day_groups.size()
+        users['daily_sumsq'] = (aggregator.user_days.astype('float64') ** 2).groupby(level='person_id', observed=True).sum()
+        aggregator.users = users
+
+        # Distinct user sketches, hashing each user id once
+        user_hashes = hash_values(batch['person_id'])
+        aggregator.unique_users.add_hashes(user_hashes)
+        for key_column, sketches, precision in (
+            ('date', aggregator.daily_users, aggregator.daily_hll_precision),
+            ('door_id', aggregator.door_users, aggregator.door_hll_precision),
+        ):
+            codes, keys = pd.factorize(batch[key_column])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(keys) + 1))
+            for i, key in enumerate(keys):
+                rows = order[bounds[i]:bounds[i + 1]]
+                sketches[key] = HyperLogLog(precision).add_hashes(user_hashes[rows])
+
+        return aggregator
+
+    def add_events(self, df: pd.DataFrame) -> 'IncrementalAggregator':
+        """Fold a new batch of events into the aggregates"""
+        return self.merge(IncrementalAggregator.from_events(
+            df, hll_precision=self.hll_precision, door_hll_precision=self.door_hll_precision
+        ))
+
+    def merge(self, other: 'IncrementalAggregator') -> 'IncrementalAggregator':
+        """Merge another aggregator's partials into this one"""
+        if other.total_events == 0:
+            return self
+        if self.total_events == 0:
+            state = pickle.loads(pickle.dumps(other.__getstate__()))
+            self.__setstate__(state)
+            return self
+
+        self.daily = _add_tables(self.daily, other.daily)
+        self.hourly = _add_tables(self.hourly, other.hourly)
+        self.doors = _add_tables(self.doors, other.doors)
+
+        # Daily sums of squares: (old + new)^2 - old^2 = new * (2 * old + new)
+        old = self.user_days.reindex(other.user_days.index, fill_value=0)
+        new = other.user_days
+        sumsq_delta = (new.astype('float64') * (2 * old + new)).groupby(level='person_id', observed=True).sum()
+        new_days = (old == 0).groupby(level='person_id', observed=True).sum()
+        self.user_days = self.user_days.add(new, fill_value=0).astype('int64')
+
+        users = other.users.copy()
+        users['daily_sumsq'] = sumsq_delta
+        users['active_days'] = new_days
+        if len(self.users):
+            known = users.index.intersection(self.users.index)
+            existing = self.users.loc[known]
+            for column in ['events', 'granted', 'active_days', 'daily_sumsq']:
+                users.loc[known, column] += existing[column]
+            users.loc[known, 'first_seen'] = np.minimum(users.loc[known, 'first_seen'], existing['first_seen'])
+            users.loc[known, 'last_seen'] = np.maximum(users.loc[known, 'last_seen'], existing['last_seen'])
+            users = pd.concat([self.users.drop(known), users])
+        self.users = users
+
+        self.unique_users.merge(other.unique_users)
+        for sketches, other_sketches in ((self.daily_users, other.daily_users),
+                                         (self.door_users, other.door_users)):
+            for key, sketch in other_sketches.items():
+                if key in sketches:
+                    sketches[key].merge(sketch)
+                else:
+                    sketches[key] = sketch.copy()
+
+        return self
+
+    # Queries
+    def get_summary(self) -> Dict[str, Any]:
+        """Headline statistics equivalent to a full scan"""
+        total = self.total_events
+        if total == 0:
+            return {'total_events': 0, 'unique_users': 0, 'unique_doors': 0,
+                    'success_rate': 0.0, 'date_range': {'start': None, 'end': None}}
+
+        return {
+            'total_events': total,
+            'unique_users': self.unique_users.count(),
+            'unique_users_error': self.unique_users.relative_error,
+            'unique_doors': len(self.doors),
+            'success_rate': float(self.daily['granted'].sum() / total * 100),
+            'date_range': {
+                'start': self.users['first_seen'].min(),
+                'end': self.users['last_seen'].max(),
+            },
+            'days_covered': len(self.daily),
+        }
+
+    def get_daily_volume(self) -> pd.DataFrame:
+        """Events, success rate and approximate distinct users per day"""
+        daily = self.daily.sort_index().copy()
+        daily['success_rate'] = daily['granted'] / daily['events'] * 100
+        daily['unique_users'] = [self.daily_users[day].count() for day in daily.index]
+        return daily
+
+    def get_hourly_distribution(self) -> pd.Series:
+        """Total events per hour of day"""
+        if self.hourly.empty:
+            return pd.Series(0, index=range(24), dtype='int64')
+        by_hour = self.hourly['events'].groupby(pd.DatetimeIndex(self.hourly.index).hour).sum()
+        return by_hour.reindex(range(24), fill_value=0)
+
+    def get_door_stats(self) -> pd.DataFrame:
+        """Events, success rate and approximate distinct users per door"""
+        doors = self.doors.copy()
+        doors['success_rate'] = doors['granted'] / doors['events'] * 100
+        doors['unique_users'] = [self.door_users[door].count() for door in doors.index]
+        return doors.sort_values('events', ascending=False)
+
+    def get_user_activity_stats(self) -> pd.DataFrame:
+        """Per-user daily mean/std and z-score of total activity across users"""
+        users = self.users.copy()
+        days = users['active_days'].astype('float64')
+        users['daily_mean'] = users['events'] / days
+        users['daily_std'] = np.sqrt(np.maximum(users['daily_sumsq'] / days - users['daily_mean'] ** 2, 0))
+
+        events = users['events'].astype('float64')
+        std = events.std(ddof=0)
+        users['activity_zscore'] = (events - events.mean()) / std if std > 0 else 0.0
+        return users
+
+    # Persistence
+    def save(self, path: str) -> None:
+        """Persist aggregates to disk"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self.__getstate__(), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalAggregator':
+        """Load aggregates saved with :meth:`save`"""
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        aggregator = cls.__new__(cls)
+        aggregator.__setstate__(state)
+        return aggregator
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('logger', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(__name__)
+
+def _add_tables(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    """Add two count tables, aligning on their index"""
+    if left.empty:
+        return right.copy()
+    return left.add(right, fill_value=0).astype('int64')
+
+# Factory function
+def create_incremental_aggregator(path: Optional[str] = None) -> IncrementalAggregator:
+    """Create an aggregator, restoring it from ``path`` if it exists"""
+    if path and Path(path).exists():
+        return IncrementalAggregator.load(path)
+    return IncrementalAggregator()
+
+# Export for compatibility
+__all__ = ['IncrementalAggregator', 'create_incremental_aggregator']
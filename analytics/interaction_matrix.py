@@ -0,0 +1,186 @@
+"""
+Interaction Matrix Module
+Sparse user x door event counts for interaction analytics
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, Optional
+import logging
+from scipy import sparse
+from sklearn.cluster import MiniBatchKMeans
+
+MAX_CLUSTERS = 5
+TOP_EXCLUSIVE_PAIRS = 20
+# Normalised entropy below which a user counts as concentrated on few doors
+LOW_DIVERSITY_THRESHOLD = 0.2
+
+def _row_entropy(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Shannon entropy (nats) of each row's count distribution"""
+    sizes = np.diff(matrix.indptr)
+    totals = np.asarray(matrix.sum(axis=1)).ravel()
+    p = matrix.data / np.repeat(np.where(totals > 0, totals, 1), sizes)
+    terms = -p * np.log(p)
+    entropy = np.zeros(matrix.shape[0])
+    filled = sizes > 0
+    entropy[filled] = np.add.reduceat(terms, matrix.indptr[:-1][filled])
+    return entropy
+
+def _normalised(entropy: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """Entropy over its maximum ``log(size)``, 0 where a row has one column"""
+    bound = np.log(np.maximum(sizes, 1))
+    return np.divide(entropy, bound, out=np.zeros_like(entropy), where=bound > 0)
+
+class InteractionMatrix:
+    """Event counts per (person, door) pair as scipy sparse matrices
+
+    Persons and doors are factorized once; ``counts`` (CSR, persons x
+    doors) holds the events of every observed pair and ``granted`` the
+    granted events on the same sparsity pattern. Pair timestamps are kept
+    as arrays aligned with ``counts.data``. Memory follows the number of
+    distinct pairs rather than persons x doors, which a dense crosstab
+    of 40k badges over 3k readers would need.
+    """
+
+    def __init__(self, users: pd.Index, doors: pd.Index, counts: sparse.csr_matrix,
+                 granted: np.ndarray, first_seen: np.ndarray, last_seen: np.ndarray):
+        self.logger = logging.getLogger(__name__)
+        self.users = users
+        self.doors = doors
+        self.counts = counts
+        self.granted = granted
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        self._csc: Optional[sparse.csc_matrix] = None
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame) -> 'InteractionMatrix':
+        """Build the matrix from rows with both ``person_id`` and ``door_id``"""
+        valid = (df['person_id'].notna() & df['door_id'].notna()).to_numpy()
+        if not valid.all():
+            df = df.loc[valid]
+        user_codes, users = pd.factorize(df['person_id'])
+        door_codes, doors = pd.factorize(df['door_id'])
+
+        # Row-major pair keys: sorting them gives CSR order directly
+        keys = user_codes.astype(np.int64) * max(len(doors), 1) + door_codes
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(pairs))
+
+        if 'access_granted' in df.columns:
+            outcomes = df['access_granted'].to_numpy(dtype=bool)
+        elif 'access_result' in df.columns:
+            outcomes = (df['access_result'] == 'Granted').to_numpy()
+        else:
+            outcomes = np.ones(len(keys), dtype=bool)
+        granted = np.bincount(inverse, weights=outcomes, minlength=len(pairs))
+
+        first_seen = last_seen = np.full(len(pairs), np.datetime64('NaT'), dtype='datetime64[ns]')
+        if 'timestamp' in df.columns and len(pairs):
+            timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+            order = np.lexsort((timestamps, inverse))
+            starts = np.searchsorted(inverse[order], np.arange(len(pairs)))
+            ends = np.r_[starts[1:], len(order)] - 1
+            first_seen, last_seen = timestamps[order[starts]], timestamps[order[ends]]
+
+        n_doors = max(len(doors), 1)
+        indptr = np.r_[0, np.cumsum(np.bincount(pairs // n_doors, minlength=len(users)))]
+        matrix = sparse.csr_matrix((counts, pairs % n_doors, indptr),
+                                   shape=(len(users), len(doors)))
+        return cls(pd.Index(users, name='person_id'), pd.Index(doors, name='door_id'),
+                   matrix, granted, first_seen, last_seen)
+
+    @property
+    def nnz(self) -> int:
+        return self.counts.nnz
+
+    @property
+    def csc(self) -> sparse.csc_matrix:
+        """Door-major copy of ``counts`` for per-door queries"""
+        if self._csc is None:
+            self._csc = self.counts.tocsc()
+        return self._csc
+
+    def users_per_door(self) -> np.ndarray:
+        return np.diff(self.csc.indptr)
+
+    def doors_per_user(self) -> np.ndarray:
+        return np.diff(self.counts.indptr)
+
+    def pair_frame(self) -> pd.DataFrame:
+        """One row per observed pair, never the full persons x doors grid"""
+        rows = np.repeat(np.arange(len(self.users)), self.doors_per_user())
+        counts = self.counts.data
+        return pd.DataFrame({
+            'interaction_count': counts,
+            'success_rate': self.granted / np.maximum(counts, 1),
+            'first_interaction': self.first_seen,
+            'last_interaction': self.last_seen,
+        }, index=pd.MultiIndex.from_arrays([self.users[rows], self.doors[self.counts.indices]]))
+
+    def exclusive_pairs(self, limit: int = TOP_EXCLUSIVE_PAIRS) -> Dict[str, Any]:
+        """Doors used by a single person, and persons using a single door"""
+        exclusive_doors = np.flatnonzero(self.users_per_door() == 1)
+        starts = self.csc.indptr[exclusive_doors]
+        owners, counts = self.csc.indices[starts], self.csc.data[starts]
+        top = np.argsort(-counts, kind='stable')[:limit]
+        return {
+            'exclusive_device_count': len(exclusive_doors),
+            'single_door_user_count': int((self.doors_per_user() == 1).sum()),
+            'exclusive_pairs': [
+                {'user': self.users[owners[i]], 'device': self.doors[exclusive_doors[i]],
+                 'interaction_count': int(counts[i])}
+                for i in top
+            ]
+        }
+
+    def diversity(self) -> Dict[str, Any]:
+        """Entropy of each person's door mix and each door's user mix"""
+        if self.nnz == 0:
+            return {'status': 'no_interactions'}
+        doors_per_user, users_per_door = self.doors_per_user(), self.users_per_door()
+        user_entropy = _normalised(_row_entropy(self.counts), doors_per_user)
+        door_entropy = _normalised(_row_entropy(self.csc.T.tocsr()), users_per_door)
+        return {
+            'mean_doors_per_user': float(doors_per_user.mean()),
+            'mean_users_per_door': float(users_per_door.mean()),
+            'user_entropy': {'mean': float(user_entropy.mean()), 'median': float(np.median(user_entropy))},
+            'device_entropy': {'mean': float(door_entropy.mean()), 'median': float(np.median(door_entropy))},
+            'low_diversity_users': int((user_entropy < LOW_DIVERSITY_THRESHOLD).sum()),
+        }
+
+    def cluster_users(self, n_clusters: int = MAX_CLUSTERS, random_state: int = 42) -> Dict[str, Any]:
+        """Group persons by the share of their events at each door
+
+        Rows are normalised to door shares and clustered as a sparse matrix
+        with MiniBatchKMeans; only the k x doors centroids are dense.
+        """
+        n_clusters = min(n_clusters, len(self.users))
+        if n_clusters < 2:
+            return {'status': 'insufficient_data'}
+
+        totals = np.asarray(self.counts.sum(axis=1)).ravel()
+        shares = sparse.diags(1.0 / np.maximum(totals, 1)) @ self.counts.astype(float)
+        model = MiniBatchKMeans(n_clusters=n_clusters, random_state=random_state, n_init=3)
+        labels = model.fit_predict(shares.tocsr())
+
+        sizes = np.bincount(labels, minlength=n_clusters)
+        return {
+            'n_clusters': n_clusters,
+            'clusters': [
+                {
+                    'cluster': cluster,
+                    'size': int(sizes[cluster]),
+                    'top_devices': self.doors[np.argsort(-model.cluster_centers_[cluster])[:3]].tolist(),
+                }
+                for cluster in range(n_clusters) if sizes[cluster]
+            ]
+        }
+
+# Factory function
+def create_interaction_matrix(df: pd.DataFrame) -> InteractionMatrix:
+    """Factory function to build a sparse user x door interaction matrix"""
+    return InteractionMatrix.from_events(df)
+
+# Export for compatibility
+__all__ = ['InteractionMatrix', 'create_interaction_matrix']
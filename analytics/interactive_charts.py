@@ -9,10 +9,13 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Union
 import logging
 import json
 
+from .prepared_frame import PreparedFrame, prepare_frame
+from .rollup_cube import RollupCube
+
 class SecurityChartsGenerator:
     """Generate interactive security charts for dashboard"""
     
@@ -27,18 +30,19 @@ class SecurityChartsGenerator:
             'secondary': '#6c757d'
         }
         
-    def generate_all_charts(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def generate_all_charts(self, df: Union[pd.DataFrame, PreparedFrame]) -> Dict[str, Any]:
         """Generate all interactive charts for security dashboard"""
         try:
             if df.empty:
                 return self._empty_charts()
             
-            df = self._prepare_data(df)
+            frame = prepare_frame(df)
+            df = frame.view()
             
             charts = {
                 'onion_model': self._create_onion_model(df),
                 'security_overview': self._create_security_overview_charts(df),
-                'temporal_analysis': self._create_temporal_charts(df),
+                'temporal_analysis': self._create_temporal_charts(frame.rollup()),
                 'user_activity': self._create_user_activity_charts(df),
                 'door_analysis': self._create_door_analysis_charts(df),
                 'risk_dashboard': self._create_risk_dashboard(df),
@@ -52,18 +56,9 @@ class SecurityChartsGenerator:
             self.logger.error(f"Chart generation failed: {e}")
             return self._empty_charts()
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _prepare_data(self, df: Union[pd.DataFrame, PreparedFrame]) -> pd.DataFrame:
         """Prepare data for chart generation"""
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.day_name()
-        df['is_weekend'] = df['timestamp'].dt.weekday >= 5
-        df['is_business_hours'] = (df['hour'] >= 8) & (df['hour'] <= 18)
-        df['month'] = df['timestamp'].dt.month
-        df['week'] = df['timestamp'].dt.isocalendar().week
-        return df
+        return prepare_frame(df).view()
     
     def _create_onion_model(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Create security onion model visualization"""
@@ -257,7 +252,7 @@ class SecurityChartsGenerator:
         charts = {}
         
         # Access result pie chart
-        result_counts = df['access_result'].value_counts()
+        result_counts = df['access_result'].value_counts().loc[lambda counts: counts > 0]
         charts['access_results'] = go.Figure(data=[
             go.Pie(
                 labels=result_counts.index,
@@ -294,7 +289,7 @@ class SecurityChartsGenerator:
         )
         
         # Hourly activity heatmap
-        hourly_activity = df.groupby(['day_of_week', 'hour']).size().unstack(fill_value=0)
+        hourly_activity = df.groupby(['day_of_week', 'hour'], observed=True).size().unstack(fill_value=0)
         day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         hourly_activity = hourly_activity.reindex(day_order)
         
@@ -313,19 +308,20 @@ class SecurityChartsGenerator:
         
         return charts
     
-    def _create_temporal_charts(self, df: pd.DataFrame) -> Dict[str, go.Figure]:
-        """Create temporal analysis charts"""
+    def _create_temporal_charts(self, cube: RollupCube) -> Dict[str, go.Figure]:
+        """Create temporal analysis charts from the rollup cube"""
         
         charts = {}
         
-        # Multi-metric time series
-        daily_metrics = df.groupby('date').agg({
-            'event_id': 'count',
-            'person_id': 'nunique',
-            'door_id': 'nunique',
-            'access_result': lambda x: (x == 'Granted').mean() * 100
-        })
-        daily_metrics.columns = ['Total Events', 'Unique Users', 'Unique Doors', 'Success Rate']
+        # Multi-metric time series over days with events
+        events = cube.events('daily')
+        active = events > 0
+        daily_metrics = pd.DataFrame({
+            'Total Events': events[active],
+            'Unique Users': cube.daily_unique_users()[active],
+            'Unique Doors': cube.daily_unique_doors()[active],
+            'Success Rate': cube.granted('daily')[active] / events[active] * 100
+        }, index=pd.Index(cube.days[active].astype(object), name='date'))
         
         charts['time_series'] = make_subplots(
             rows=2, cols=2,
@@ -357,7 +353,9 @@ class SecurityChartsGenerator:
         )
         
         # Peak hours analysis
-        hourly_counts = df.groupby('hour')['event_id'].count()
+        hour_events = cube.events('minute_of_day').reshape(24, 60).sum(axis=1)
+        active_hours = np.flatnonzero(hour_events)
+        hourly_counts = pd.Series(hour_events[active_hours], index=active_hours)
         charts['peak_hours'] = go.Figure()
         
         # Color bars based on business hours
@@ -377,8 +375,12 @@ class SecurityChartsGenerator:
         )
         
         # Weekend vs Weekday comparison
-        weekend_comparison = df.groupby(['is_weekend', 'hour'])['event_id'].count().unstack(level=0, fill_value=0)
-        weekend_comparison.columns = ['Weekday', 'Weekend']
+        day_hour = cube.day_hour_events()
+        is_weekend = cube.weekdays >= 5
+        weekend_comparison = pd.DataFrame({
+            'Weekday': day_hour[~is_weekend].sum(axis=0),
+            'Weekend': day_hour[is_weekend].sum(axis=0)
+        }).loc[active_hours]
         
         charts['weekend_comparison'] = go.Figure()
         for col, color in zip(weekend_comparison.columns, ['#1f77b4', '#ff7f0e']):
@@ -404,7 +406,7 @@ class SecurityChartsGenerator:
         charts = {}
         
         # User activity distribution
-        user_activity = df.groupby('person_id').agg({
+        user_activity = df.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'door_id': 'nunique',
             'access_result': lambda x: (x == 'Granted').mean() * 100
@@ -483,7 +485,7 @@ class SecurityChartsGenerator:
         charts = {}
         
         # Door utilization
-        door_stats = df.groupby('door_id').agg({
+        door_stats = df.groupby('door_id', observed=True).agg({
             'event_id': 'count',
             'person_id': 'nunique',
             'access_result': lambda x: (x == 'Granted').mean() * 100
@@ -533,7 +535,7 @@ class SecurityChartsGenerator:
         )
         
         # Failed attempts by door
-        failed_by_door = df[df['access_result'] == 'Denied'].groupby('door_id').size()
+        failed_by_door = df[df['access_result'] == 'Denied'].groupby('door_id', observed=True).size()
         if len(failed_by_door) > 0:
             charts['door_failures'] = go.Figure()
             charts['door_failures'].add_trace(go.Bar(
@@ -713,7 +715,7 @@ class SecurityChartsGenerator:
             )
         
         # User behavior anomalies
-        user_activity = df.groupby('person_id')['event_id'].count()
+        user_activity = df.groupby('person_id', observed=True)['event_id'].count()
         if len(user_activity) > 3:
             mean_activity = user_activity.mean()
             std_activity = user_activity.std()
@@ -0,0 +1,180 @@
+"""
+KPI Sketches Module
+Fixed-size, mergeable per-partition summaries behind headline dashboard KPIs
+"""
+
+import pandas as pd
+import numpy as np
+import calendar
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import logging
+
+from .sketches import DistinctSample, HyperLogLog, TDigest, TopK, hash_values
+
+GRANTED_RESULTS = ['granted', 'success']
+
+class EntityActivity:
+    """Distinct count, heavy hitters and activity quantiles of one entity column
+
+    ``distinct`` (HyperLogLog) counts the entities, ``counts`` (count-min
+    with top-k candidates) finds the heaviest ones, and ``sample`` is a
+    uniform sample of distinct entities with their exact event counts.
+    Quantiles of events per entity are read from the sample; unlike digests
+    of per-partition counts, that stays correct when one entity's events
+    span partitions, and unlike count-min estimates it does not inflate
+    the counts of light entities.
+    """
+
+    def __init__(self, hll_precision: int = 14, top_k: int = 100, sample_size: int = 1024):
+        self.distinct = HyperLogLog(hll_precision)
+        self.counts = TopK(top_k)
+        self.sample = DistinctSample(sample_size)
+
+    def add(self, values: pd.Series) -> 'EntityActivity':
+        """Add one batch of entity values, hashing each distinct value once"""
+        counts = values.value_counts()
+        counts = counts[counts > 0]
+        if len(counts):
+            hashes = hash_values(counts.index)
+            self.distinct.add_hashes(hashes)
+            self.counts.add_counts(counts.index, counts.to_numpy(), hashes)
+            self.sample.add(counts.index, hashes, counts.to_numpy())
+        return self
+
+    def merge(self, other: 'EntityActivity') -> 'EntityActivity':
+        self.distinct.merge(other.distinct)
+        self.counts.merge(other.counts)
+        self.sample.merge(other.sample)
+        return self
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+        """Estimated events per entity at quantiles ``q``"""
+        if not len(self.sample):
+            return np.zeros(len(q))
+        return np.quantile(self.sample.counts, q)
+
+    def top(self, n: int = 10, above: float = 0) -> List[Any]:
+        """Heaviest entities with estimated counts over ``above``"""
+        top = self.counts.top()
+        return top[top > above].index[:n].tolist()
+
+    def sampled(self, low: float, high: float, n: int = 10) -> List[Any]:
+        """Sampled entities with event counts in [low, high]"""
+        counts = self.sample.counts
+        return self.sample.values[(counts >= low) & (counts <= high)][:n].tolist()
+
+class KPISketch:
+    """Headline statistics of access events in constant size
+
+    Built once per partition (an uploaded file) and merged at query time,
+    so KPIs cost the same whatever the history length. Event, granted and
+    hour/weekday counts and the time range are exact;
+    distinct users, doors and user-door pairs are HyperLogLog estimates
+    (``distinct_error`` relative standard error); per-entity counts are
+    count-min estimates that overcount by at most ``count_error`` of all
+    events and only rank the heaviest entities; per-entity quantiles come
+    from a uniform sample of ``sample_size`` entities; and events per
+    active badge-day are held in a t-digest.
+    """
+
+    def __init__(self, hll_precision: int = 14, top_k: int = 100, sample_size: int = 1024):
+        self.logger = logging.getLogger(__name__)
+        self.total_events = 0
+        self.granted = 0
+        self.first_seen: Optional[pd.Timestamp] = None
+        self.last_seen: Optional[pd.Timestamp] = None
+        self.hours = np.zeros(24, dtype=np.int64)
+        self.weekdays = np.zeros(7, dtype=np.int64)
+        self.users = EntityActivity(hll_precision, top_k, sample_size)
+        self.doors = EntityActivity(hll_precision, top_k, sample_size)
+        self.pairs = HyperLogLog(hll_precision)
+        self.user_day_activity = TDigest()
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame, **kwargs) -> 'KPISketch':
+        """Sketch one batch of events in a single pass per column"""
+        sketch = cls(**kwargs)
+        sketch.total_events = len(df)
+        if df.empty:
+            return sketch
+
+        if 'access_result' in df.columns:
+            sketch.granted = int(df['access_result'].astype(str).str.lower().isin(GRANTED_RESULTS).sum())
+        if 'person_id' in df.columns:
+            sketch.users.add(df['person_id'])
+        if 'door_id' in df.columns:
+            sketch.doors.add(df['door_id'])
+        if {'person_id', 'door_id'} <= set(df.columns):
+            pairs = df[['person_id', 'door_id']].dropna()
+            sketch.pairs.add_hashes(pd.util.hash_pandas_object(pairs, index=False).to_numpy())
+
+        if 'timestamp' in df.columns:
+            timestamps = pd.to_datetime(df['timestamp'], errors='coerce')
+            valid = timestamps.notna().to_numpy()
+            times = timestamps[valid]
+            if len(times):
+                sketch.first_seen, sketch.last_seen = times.min(), times.max()
+                sketch.hours = np.bincount(times.dt.hour, minlength=24).astype(np.int64)
+                sketch.weekdays = np.bincount(times.dt.dayofweek, minlength=7).astype(np.int64)
+                if 'person_id' in df.columns:
+                    user_days = pd.DataFrame({'person_id': df['person_id'].to_numpy()[valid],
+                                              'date': times.dt.normalize().to_numpy()})
+                    per_day = user_days.groupby(['person_id', 'date'], observed=True).size()
+                    sketch.user_day_activity.add(per_day.to_numpy())
+        return sketch
+
+    def merge(self, other: 'KPISketch') -> 'KPISketch':
+        """Merge another partition's sketch into this one"""
+        self.total_events += other.total_events
+        self.granted += other.granted
+        if other.first_seen is not None:
+            self.first_seen = other.first_seen if self.first_seen is None else min(self.first_seen, other.first_seen)
+            self.last_seen = other.last_seen if self.last_seen is None else max(self.last_seen, other.last_seen)
+        self.hours += other.hours
+        self.weekdays += other.weekdays
+        self.users.merge(other.users)
+        self.doors.merge(other.doors)
+        self.pairs.merge(other.pairs)
+        self.user_day_activity.merge(other.user_day_activity)
+        return self
+
+    @property
+    def success_rate(self) -> float:
+        return self.granted / self.total_events if self.total_events else 0.0
+
+    def peak_hours(self, n: int = 3) -> List[int]:
+        return sorted(np.argsort(-self.hours, kind='stable')[:n].tolist()) if self.hours.any() else []
+
+    def peak_days(self, n: int = 2) -> List[str]:
+        if not self.weekdays.any():
+            return []
+        return [calendar.day_name[day] for day in np.argsort(-self.weekdays, kind='stable')[:n]]
+
+    def summary(self) -> Dict[str, Any]:
+        """Headline KPIs with the error bounds of the approximate ones"""
+        p50, p90, p99 = (self.user_day_activity.quantile([0.5, 0.9, 0.99])
+                         if self.user_day_activity.count else (0.0, 0.0, 0.0))
+        return {
+            'total_events': self.total_events,
+            'date_range': {'start': self.first_seen, 'end': self.last_seen},
+            'unique_users': self.users.distinct.count(),
+            'unique_doors': self.doors.distinct.count(),
+            'unique_interactions': self.pairs.count(),
+            'distinct_error': self.pairs.relative_error,
+            'success_rate': self.success_rate * 100,
+            'events_per_user_day': {'p50': float(p50), 'p90': float(p90), 'p99': float(p99)},
+            'count_error': self.users.counts.counts.error_bound,
+            'peak_hours': self.peak_hours(),
+            'peak_days': self.peak_days(),
+        }
+
+# Factory function
+def create_kpi_sketch(dfs: Iterable[pd.DataFrame] = ()) -> KPISketch:
+    """Factory function to sketch and merge one or more event batches"""
+    sketch = KPISketch()
+    for df in dfs:
+        sketch.merge(KPISketch.from_events(df))
+    return sketch
+
+# Export for compatibility
+__all__ = ['KPISketch', 'EntityActivity', 'create_kpi_sketch']
@@ -0,0 +1,140 @@
+"""
+Model Registry Module
+Fitted scaler and model pairs reused across analytics requests
+"""
+
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+import joblib
+
+@dataclass
+class FittedModel:
+    """A fitted scaler and model with the data version they were fitted on"""
+    scaler: Any
+    model: Any
+    version: str
+    fitted_at: datetime = field(default_factory=datetime.now)
+    n_samples: int = 0
+
+class ModelRegistry:
+    """Keep fitted models in memory and optionally on disk with joblib
+
+    A model is fitted once per ``version`` (for example a fingerprint of
+    the training features) and reused while later requests ask for the same
+    version. With ``refit_interval`` the version is ignored and models are
+    refitted on that schedule instead, so new feature rows are scored with
+    the stored model. ``storage_dir`` persists models across restarts and
+    worker processes; without it the registry is in-memory only.
+    """
+
+    def __init__(self, storage_dir: Optional[str] = None,
+                 refit_interval: Optional[timedelta] = None):
+        self.storage_dir = Path(storage_dir) if storage_dir else None
+        self.refit_interval = refit_interval
+        self.logger = logging.getLogger(__name__)
+        self._models: Dict[str, FittedModel] = {}
+        self._lock = threading.Lock()
+        self._fit_locks: Dict[str, threading.Lock] = {}
+
+    def get_or_fit(self, name: str, version: str,
+                   fit: Callable[[], Tuple[Any, Any, int]]) -> FittedModel:
+        """Return the stored model ``name`` or fit and store a new one
+
+        ``fit`` returns ``(scaler, model, n_samples)`` and is only called
+        when no usable model is held in memory or on disk. Concurrent
+        callers for the same name wait for a single fit.
+        """
+        with self._lock:
+            fit_lock = self._fit_locks.setdefault(name, threading.Lock())
+
+        with fit_lock:
+            entry = self._models.get(name)
+            if entry is None:
+                entry = self._load(name)
+            if entry is not None and self._is_current(entry, version):
+                self._models[name] = entry
+                return entry
+
+            scaler, model, n_samples = fit()
+            entry = FittedModel(scaler, model, version, n_samples=n_samples)
+            self._models[name] = entry
+            self._save(name, entry)
+            return entry
+
+    def put(self, name: str, entry: FittedModel) -> None:
+        """Store a model updated outside ``get_or_fit``, e.g. incrementally"""
+        with self._lock:
+            self._models[name] = entry
+        self._save(name, entry)
+
+    def get(self, name: str) -> Optional[FittedModel]:
+        """Stored model ``name`` regardless of version or age"""
+        return self._models.get(name) or self._load(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one stored model, or all of them, from memory and disk"""
+        with self._lock:
+            names = [name] if name else list(self._models)
+            if name is None and self.storage_dir is not None and self.storage_dir.exists():
+                names.extend(path.stem for path in self.storage_dir.glob('*.joblib'))
+            for model_name in set(names):
+                self._models.pop(model_name, None)
+                path = self._path(model_name)
+                if path is not None and path.exists():
+                    path.unlink()
+
+    def _is_current(self, entry: FittedModel, version: str) -> bool:
+        if self.refit_interval is not None:
+            return datetime.now() - entry.fitted_at < self.refit_interval
+        return entry.version == version
+
+    def _path(self, name: str) -> Optional[Path]:
+        if self.storage_dir is None:
+            return None
+        return self.storage_dir / f"{name}.joblib"
+
+    def _load(self, name: str) -> Optional[FittedModel]:
+        path = self._path(name)
+        if path is None or not path.exists():
+            return None
+        try:
+            entry = joblib.load(path)
+            if isinstance(entry, FittedModel):
+                return entry
+        except Exception as e:
+            self.logger.warning(f"Could not load model {name}: {e}")
+        return None
+
+    def _save(self, name: str, entry: FittedModel) -> None:
+        path = self._path(name)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write beside the target and swap so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            os.close(fd)
+            try:
+                joblib.dump(entry, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+        except Exception as e:
+            self.logger.warning(f"Could not save model {name}: {e}")
+
+# Factory function
+def create_model_registry(storage_dir: Optional[str] = None,
+                          refit_interval: Optional[timedelta] = None) -> ModelRegistry:
+    """Factory function to create model registry"""
+    return ModelRegistry(storage_dir, refit_interval)
+
+# Export for compatibility
+__all__ = ['ModelRegistry', 'FittedModel', 'create_model_registry']
@@ -0,0 +1,94 @@
+"""
+Prepared Frame Module
+Derived time features computed once and shared by every analyzer
+"""
+
+import pandas as pd
+import threading
+from typing import Optional, Union
+
+from .rollup_cube import RollupCube
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+DAY_OF_WEEK_DTYPE = pd.CategoricalDtype(DAY_NAMES)
+
+DERIVED_COLUMNS = [
+    'date', 'hour', 'minute', 'day_of_week', 'is_weekend', 'is_business_hours',
+    'is_after_hours', 'month', 'week', 'quarter_hour', 'time_of_day'
+]
+
+class PreparedFrame:
+    """Access events plus the derived columns every analyzer uses
+
+    ``timestamp`` is parsed once and the calendar features are stored
+    compactly: int8 hour/minute/month/week/quarter-hour, one-byte boolean
+    flags and a categorical ``day_of_week``. Analyzers take :meth:`view`,
+    a shallow copy they may add columns to without copying the data;
+    ``source`` holds just the input columns. :meth:`rollup` builds the
+    time-series cube on first use and shares it the same way.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        df = df.copy(deep=False)
+        if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        # Input columns only, sharing data with ``data``
+        self.source = df.copy(deep=False)
+
+        timestamps = df['timestamp'].dt
+        hour = _small_int(timestamps.hour)
+        minute = _small_int(timestamps.minute)
+        weekday = timestamps.weekday
+
+        df['date'] = timestamps.date
+        df['hour'] = hour
+        df['minute'] = minute
+        df['day_of_week'] = pd.Categorical.from_codes(
+            weekday.fillna(-1).astype('int8'), dtype=DAY_OF_WEEK_DTYPE
+        )
+        df['is_weekend'] = weekday >= 5
+        df['is_business_hours'] = ((hour >= 8) & (hour <= 18)).fillna(False).astype(bool)
+        df['is_after_hours'] = ((hour < 6) | (hour > 22)).fillna(False).astype(bool)
+        df['month'] = _small_int(timestamps.month)
+        df['week'] = _small_int(timestamps.isocalendar().week)
+        df['quarter_hour'] = (minute // 15) * 15
+        df['time_of_day'] = hour + minute / 60.0
+
+        self.data = df
+        self._rollup: Optional[RollupCube] = None
+        self._rollup_lock = threading.Lock()
+
+    def view(self) -> pd.DataFrame:
+        """Shallow copy for one analyzer; shares column data with the frame"""
+        return self.data.copy(deep=False)
+
+    def rollup(self) -> RollupCube:
+        """Day/hour/minute x door x result counts, built once per frame"""
+        with self._rollup_lock:
+            if self._rollup is None:
+                self._rollup = RollupCube.from_events(self.source)
+            return self._rollup
+
+    @property
+    def empty(self) -> bool:
+        return self.data.empty
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.data.columns
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+def _small_int(values: pd.Series) -> pd.Series:
+    """Downcast calendar fields to int8, nullable if timestamps are missing"""
+    return values.astype('Int8' if values.isna().any() else 'int8')
+
+def prepare_frame(df: Union[pd.DataFrame, PreparedFrame]) -> PreparedFrame:
+    """Wrap ``df`` in a :class:`PreparedFrame` unless it already is one"""
+    if isinstance(df, PreparedFrame):
+        return df
+    return PreparedFrame(df)
+
+# Export for compatibility
+__all__ = ['PreparedFrame', 'prepare_frame', 'DERIVED_COLUMNS', 'DAY_NAMES']
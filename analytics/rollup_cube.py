@@ -0,0 +1,206 @@
+"""
+Rollup Cube Module
+Dense event counts by day, hour and minute x door x access result
+"""
+
+import pandas as pd
+import numpy as np
+import copy
+from typing import Any, Dict, Optional
+import logging
+
+REQUIRED_COLUMNS = ['timestamp', 'person_id', 'door_id', 'access_result']
+
+MINUTES_PER_DAY = 1440
+ONE_DAY = np.timedelta64(1, 'D')
+GRANTED = 'Granted'
+
+class RollupCube:
+    """Pre-aggregated access counts for time-series analytics
+
+    Three dense int32 arrays share the door and result axes:
+
+    * ``daily``: one row per calendar day from ``start``
+    * ``hourly``: one row per hour of the same span (``24 * n_days``)
+    * ``minute_of_day``: 1440 rows folding every day onto one profile, since
+      a per-minute timeline over months of history would not stay small
+
+    Distinct (day, user) pairs are kept beside the arrays so daily unique
+    user counts stay exact. Cubes merge exactly, so a new upload only needs
+    a cube for its own rows.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.start: Optional[np.datetime64] = None
+        self.doors = np.empty(0, dtype=object)
+        self.results = np.empty(0, dtype=object)
+        self.daily = np.zeros((0, 0, 0), dtype=np.int32)
+        self.hourly = np.zeros((0, 0, 0), dtype=np.int32)
+        self.minute_of_day = np.zeros((MINUTES_PER_DAY, 0, 0), dtype=np.int32)
+        # Distinct (day number since epoch, person_id) pairs
+        self.user_days = pd.DataFrame({'day': pd.Series(dtype='int64'),
+                                       'person_id': pd.Series(dtype=object)})
+        self.first_timestamp: Optional[pd.Timestamp] = None
+        self.last_timestamp: Optional[pd.Timestamp] = None
+
+    @property
+    def total_events(self) -> int:
+        return int(self.daily.sum(dtype=np.int64))
+
+    @property
+    def n_days(self) -> int:
+        return self.daily.shape[0]
+
+    @property
+    def days(self) -> np.ndarray:
+        """Calendar day of each ``daily`` row as ``datetime64[D]``"""
+        if self.start is None:
+            return np.empty(0, dtype='datetime64[D]')
+        return self.start + np.arange(self.n_days)
+
+    @property
+    def weekdays(self) -> np.ndarray:
+        """Weekday of each ``daily`` row, Monday = 0"""
+        # 1970-01-01 was a Thursday
+        return (self.days.astype(np.int64) + 3) % 7
+
+    @classmethod
+    def from_events(cls, df: pd.DataFrame) -> 'RollupCube':
+        """Build the cube for one batch of events"""
+        cube = cls()
+
+        missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValueError(f"Missing required columns: {missing}")
+
+        timestamps = pd.to_datetime(df['timestamp'], errors='coerce')
+        valid = timestamps.notna().to_numpy()
+        if not valid.all():
+            df = df.loc[valid]
+            timestamps = timestamps[valid]
+        if df.empty:
+            return cube
+
+        values = timestamps.to_numpy(dtype='datetime64[ns]')
+        day_numbers = values.astype('datetime64[D]').astype(np.int64)
+        first_day = day_numbers.min()
+        minutes = (values - np.datetime64(int(first_day), 'D')) // np.timedelta64(1, 'm')
+        n_days = int(day_numbers.max() - first_day) + 1
+
+        door_codes, doors = pd.factorize(df['door_id'], use_na_sentinel=False)
+        result_codes, results = pd.factorize(df['access_result'], use_na_sentinel=False)
+        n_doors, n_results = len(doors), len(results)
+        cell = door_codes.astype(np.int64) * n_results + result_codes
+        n_cells = n_doors * n_results
+
+        hourly = np.bincount((minutes // 60) * n_cells + cell, minlength=n_days * 24 * n_cells)
+        minute_of_day = np.bincount((minutes % MINUTES_PER_DAY) * n_cells + cell,
+                                    minlength=MINUTES_PER_DAY * n_cells)
+
+        cube.start = np.datetime64(int(first_day), 'D')
+        cube.doors = np.asarray(doors, dtype=object)
+        cube.results = np.asarray(results, dtype=object)
+        cube.hourly = hourly.reshape(n_days * 24, n_doors, n_results).astype(np.int32)
+        cube.daily = cube.hourly.reshape(n_days, 24, n_doors, n_results).sum(axis=1, dtype=np.int32)
+        cube.minute_of_day = minute_of_day.reshape(MINUTES_PER_DAY, n_doors, n_results).astype(np.int32)
+        # Distinct (day, user) pairs, deduplicated as integer keys
+        person_codes, persons = pd.factorize(df['person_id'])
+        n_persons = max(len(persons), 1)
+        known = person_codes >= 0
+        pairs = pd.unique((day_numbers[known] - first_day) * n_persons + person_codes[known])
+        cube.user_days = pd.DataFrame({
+            'day': first_day + pairs // n_persons,
+            'person_id': np.asarray(persons, dtype=object)[pairs % n_persons],
+        })
+        cube.first_timestamp = timestamps.min()
+        cube.last_timestamp = timestamps.max()
+        return cube
+
+    def add_events(self, df: pd.DataFrame) -> 'RollupCube':
+        """Fold a new batch of events into the cube"""
+        return self.merge(RollupCube.from_events(df))
+
+    def merge(self, other: 'RollupCube') -> 'RollupCube':
+        """Add another cube's counts, widening the time, door and result axes"""
+        if other.total_events == 0:
+            return self
+        if self.total_events == 0:
+            self.__setstate__(copy.deepcopy(other.__getstate__()))
+            return self
+
+        doors = pd.Index(self.doors).append(pd.Index(other.doors)).unique()
+        results = pd.Index(self.results).append(pd.Index(other.results)).unique()
+        start = min(self.start, other.start)
+        end = max(self.start + self.n_days, other.start + other.n_days)
+        n_days = int((end - start) // ONE_DAY)
+
+        merged = {
+            'daily': np.zeros((n_days, len(doors), len(results)), dtype=np.int32),
+            'hourly': np.zeros((n_days * 24, len(doors), len(results)), dtype=np.int32),
+            'minute_of_day': np.zeros((MINUTES_PER_DAY, len(doors), len(results)), dtype=np.int32),
+        }
+        for cube in (self, other):
+            offset = int((cube.start - start) // ONE_DAY)
+            door_index = doors.get_indexer(cube.doors)
+            result_index = results.get_indexer(cube.results)
+            rows = {
+                'daily': np.arange(offset, offset + cube.n_days),
+                'hourly': np.arange(offset * 24, (offset + cube.n_days) * 24),
+                'minute_of_day': np.arange(MINUTES_PER_DAY),
+            }
+            for name, counts in merged.items():
+                counts[np.ix_(rows[name], door_index, result_index)] += getattr(cube, name)
+
+        self.start = start
+        self.doors = np.asarray(doors, dtype=object)
+        self.results = np.asarray(results, dtype=object)
+        self.daily = merged['daily']
+        self.hourly = merged['hourly']
+        self.minute_of_day = merged['minute_of_day']
+        self.user_days = pd.concat([self.user_days, other.user_days]).drop_duplicates(ignore_index=True)
+        self.first_timestamp = min(self.first_timestamp, other.first_timestamp)
+        self.last_timestamp = max(self.last_timestamp, other.last_timestamp)
+        return self
+
+    # Queries
+    def events(self, level: str = 'daily') -> np.ndarray:
+        """Event count per row of ``level`` summed over doors and results"""
+        return getattr(self, level).sum(axis=(1, 2), dtype=np.int64)
+
+    def granted(self, level: str = 'daily') -> np.ndarray:
+        """Granted event count per row of ``level``"""
+        counts = getattr(self, level)[:, :, self.results == GRANTED]
+        return counts.sum(axis=(1, 2), dtype=np.int64)
+
+    def day_hour_events(self) -> np.ndarray:
+        """Events as a days x 24 matrix"""
+        return self.events('hourly').reshape(self.n_days, 24)
+
+    def daily_unique_users(self) -> np.ndarray:
+        offsets = self.user_days['day'].to_numpy() - (self.days.astype(np.int64)[0] if self.n_days else 0)
+        return np.bincount(offsets, minlength=self.n_days)
+
+    def daily_unique_doors(self) -> np.ndarray:
+        doors_used = self.daily.sum(axis=2)[:, pd.notna(self.doors)]
+        return (doors_used > 0).sum(axis=1)
+
+    def unique_users(self) -> int:
+        return int(self.user_days['person_id'].nunique())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state.pop('logger', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(__name__)
+
+# Factory function
+def create_rollup_cube(df: Optional[pd.DataFrame] = None) -> RollupCube:
+    """Create a rollup cube, built from ``df`` when given"""
+    return RollupCube.from_events(df) if df is not None else RollupCube()
+
+# Export for compatibility
+__all__ = ['RollupCube', 'create_rollup_cube']
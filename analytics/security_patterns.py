@@ -6,10 +6,13 @@ Analyzes security-related patterns in access control data
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Iterable, Tuple, Union
 from dataclasses import dataclass
 import logging
 
+from .prepared_frame import PreparedFrame, prepare_frame
+from .security_rules import RuleScan, SecurityRule, create_rule_engine
+
 @dataclass
 class SecurityPattern:
     """Security pattern data structure"""
@@ -22,28 +25,45 @@ class SecurityPattern:
     recommendation: str
 
 class SecurityPatternsAnalyzer:
-    """Advanced security patterns analysis"""
+    """Advanced security patterns analysis
+
+    Every check is a :class:`SecurityRule`; all rules are evaluated in one
+    shared scan and the sections below only read its masks and group
+    counts. Site rules passed as ``rules`` (or via :meth:`add_rule`) join
+    the same scan and are reported under ``custom_rules``.
+    """
     
-    def __init__(self):
+    def __init__(self, rules: Iterable[SecurityRule] = ()):
         self.logger = logging.getLogger(__name__)
+        self.rule_engine = create_rule_engine()
+        self.custom_rules: List[str] = []
+        for rule in rules:
+            self.add_rule(rule)
+    
+    def add_rule(self, rule: SecurityRule) -> None:
+        """Register a site rule evaluated in the shared scan"""
+        self.rule_engine.add_rule(rule)
+        self.custom_rules.append(rule.name)
         
-    def analyze_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def analyze_patterns(self, df: Union[pd.DataFrame, PreparedFrame]) -> Dict[str, Any]:
         """Main analysis function for security patterns"""
         try:
             if df.empty:
                 return self._empty_result()
             
             df = self._prepare_data(df)
+            scan = self.rule_engine.scan(df)
             
             patterns = {
-                'failed_access_patterns': self._analyze_failed_access(df),
-                'unauthorized_attempts': self._analyze_unauthorized_attempts(df),
-                'suspicious_timing': self._analyze_suspicious_timing(df),
-                'badge_anomalies': self._analyze_badge_anomalies(df),
-                'device_security_issues': self._analyze_device_issues(df),
-                'access_violations': self._analyze_access_violations(df),
-                'security_score': self._calculate_security_score(df),
-                'threat_summary': self._generate_threat_summary(df)
+                'failed_access_patterns': self._analyze_failed_access(scan),
+                'unauthorized_attempts': self._analyze_unauthorized_attempts(scan),
+                'suspicious_timing': self._analyze_suspicious_timing(scan),
+                'badge_anomalies': self._analyze_badge_anomalies(scan),
+                'device_security_issues': self._analyze_device_issues(scan),
+                'access_violations': self._analyze_access_violations(scan),
+                'security_score': self._calculate_security_score(scan),
+                'threat_summary': self._generate_threat_summary(scan),
+                'custom_rules': self._summarize_custom_rules(scan)
             }
             
             return patterns
@@ -52,224 +72,189 @@ class SecurityPatternsAnalyzer:
             self.logger.error(f"Security patterns analysis failed: {e}")
             return self._empty_result()
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _prepare_data(self, df: Union[pd.DataFrame, PreparedFrame]) -> pd.DataFrame:
         """Prepare and validate data for analysis"""
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.day_name()
-        df['is_weekend'] = df['timestamp'].dt.weekday >= 5
-        df['is_after_hours'] = (df['hour'] < 6) | (df['hour'] > 22)
-        return df
+        return prepare_frame(df).view()
     
-    def _analyze_failed_access(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_failed_access(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze failed access attempts patterns"""
-        failed_attempts = df[df['access_result'] == 'Denied']
+        total = scan.total('failed_access')
         
-        if failed_attempts.empty:
+        if total == 0:
             return {'total': 0, 'patterns': [], 'risk_level': 'low'}
         
-        # Group by person and analyze repeated failures
-        failure_by_person = failed_attempts.groupby('person_id').agg({
-            'event_id': 'count',
-            'door_id': 'nunique',
-            'timestamp': ['min', 'max']
-        }).flatten()
-        
-        # Identify high-risk patterns
-        high_failure_users = failure_by_person[
-            failure_by_person['event_id'] >= 5
-        ].index.tolist()
+        # Identify high-risk patterns from repeated failures per person
+        failure_by_person = scan.counts('failed_access', 'person_id')
+        high_failure_users = failure_by_person[failure_by_person >= 5].index.tolist()
         
         # Analyze failure timing patterns
-        failure_timing = failed_attempts.groupby(['hour', 'day_of_week']).size()
+        failure_timing = scan.counts('failed_access', ('hour', 'day_of_week'))
         peak_failure_times = failure_timing.nlargest(5)
         
         # Door-specific failure analysis
-        door_failures = failed_attempts.groupby('door_id').agg({
-            'event_id': 'count',
-            'person_id': 'nunique'
+        door_failures = pd.DataFrame({
+            'event_id': scan.counts('failed_access', 'door_id'),
+            'person_id': scan.nunique('failed_access', 'door_id', 'person_id')
         }).sort_values('event_id', ascending=False)
         
         return {
-            'total': len(failed_attempts),
-            'failure_rate': len(failed_attempts) / len(df) * 100,
+            'total': total,
+            'failure_rate': total / len(scan) * 100,
             'high_risk_users': high_failure_users,
             'peak_failure_times': peak_failure_times.to_dict(),
             'top_failure_doors': door_failures.head(10).to_dict(),
-            'patterns': self._extract_failure_patterns(failed_attempts),
-            'risk_level': self._assess_failure_risk(len(failed_attempts), len(df))
+            'patterns': self._extract_failure_patterns(failure_by_person),
+            'risk_level': self._assess_failure_risk(total, len(scan))
         }
     
-    def _analyze_unauthorized_attempts(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_unauthorized_attempts(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze unauthorized access attempts"""
-        # Multiple criteria for unauthorized attempts
-        unauthorized = df[
-            (df['access_result'] == 'Denied') |
-            (df['badge_status'] == 'Invalid') |
-            (df['entry_without_badge'] == True)
-        ]
-        
-        if unauthorized.empty:
+        # Denied, invalid badge or entry without badge
+        total = scan.total('unauthorized')
+        
+        if total == 0:
             return {'total': 0, 'severity': 'low', 'locations': []}
         
         # Analyze by location and time
-        location_analysis = unauthorized.groupby('door_id').agg({
-            'event_id': 'count',
-            'person_id': 'nunique',
-            'timestamp': lambda x: x.dt.hour.mode().iloc[0] if len(x) > 0 else 0
+        location_analysis = pd.DataFrame({
+            'event_id': scan.counts('unauthorized', 'door_id'),
+            'person_id': scan.nunique('unauthorized', 'door_id', 'person_id'),
+            'timestamp': scan.mode('unauthorized', 'door_id', 'hour', default=0)
         })
         
         # Time-based analysis
-        after_hours_unauthorized = unauthorized[unauthorized['is_after_hours']]
-        weekend_unauthorized = unauthorized[unauthorized['is_weekend']]
+        unauthorized = scan.mask('unauthorized')
         
         return {
-            'total': len(unauthorized),
-            'after_hours_count': len(after_hours_unauthorized),
-            'weekend_count': len(weekend_unauthorized),
+            'total': total,
+            'after_hours_count': int((unauthorized & scan.mask('after_hours')).sum()),
+            'weekend_count': int((unauthorized & scan.mask('weekend')).sum()),
             'affected_doors': location_analysis.to_dict(),
-            'severity': self._assess_unauthorized_severity(unauthorized),
-            'repeat_offenders': self._identify_repeat_offenders(unauthorized)
+            'severity': self._assess_unauthorized_severity(total),
+            'repeat_offenders': self._identify_repeat_offenders(scan.counts('unauthorized', 'person_id'))
         }
     
-    def _analyze_suspicious_timing(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_suspicious_timing(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze suspicious timing patterns"""
-        # Define suspicious times (very early/late hours)
-        very_early = df[(df['hour'] >= 0) & (df['hour'] <= 4)]
-        very_late = df[(df['hour'] >= 23) | (df['hour'] <= 1)]
-        
-        # Weekend access analysis
-        weekend_access = df[df['is_weekend']]
-        
-        # Rapid sequential access (potential tailgating)
-        df_sorted = df.sort_values(['person_id', 'timestamp'])
-        df_sorted['time_diff'] = df_sorted.groupby('person_id')['timestamp'].diff()
-        rapid_access = df_sorted[df_sorted['time_diff'] < pd.Timedelta(minutes=2)]
-        
         return {
-            'after_hours_events': len(df[df['is_after_hours']]),
-            'weekend_events': len(weekend_access),
-            'very_early_access': len(very_early),
-            'very_late_access': len(very_late),
-            'rapid_sequential_access': len(rapid_access),
-            'suspicious_patterns': self._identify_timing_patterns(df)
+            'after_hours_events': scan.total('after_hours'),
+            'weekend_events': scan.total('weekend'),
+            'very_early_access': scan.total('very_early'),
+            'very_late_access': scan.total('very_late'),
+            # Rapid sequential access (potential tailgating)
+            'rapid_sequential_access': scan.total('rapid_sequential'),
+            'suspicious_patterns': self._identify_timing_patterns(scan)
         }
     
-    def _analyze_badge_anomalies(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_badge_anomalies(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze badge-related security anomalies"""
-        badge_issues = df[df['badge_status'] != 'Valid']
+        total = scan.total('badge_issue')
         
-        if badge_issues.empty:
+        if total == 0:
             return {'total': 0, 'issues': {}, 'affected_users': []}
         
         # Group by badge status
-        status_breakdown = badge_issues['badge_status'].value_counts().to_dict()
+        status_breakdown = scan.value_counts('badge_issue', 'badge_status').to_dict()
         
         # Users with frequent badge issues
-        problematic_users = badge_issues.groupby('person_id').size()
+        problematic_users = scan.counts('badge_issue', 'person_id')
         frequent_issues = problematic_users[problematic_users >= 3].to_dict()
         
         # Badge issues by door
-        door_badge_issues = badge_issues.groupby('door_id').agg({
-            'event_id': 'count',
-            'badge_status': lambda x: x.mode().iloc[0] if len(x) > 0 else 'Unknown'
+        door_badge_issues = pd.DataFrame({
+            'event_id': scan.counts('badge_issue', 'door_id'),
+            'badge_status': scan.mode('badge_issue', 'door_id', 'badge_status', default='Unknown')
         })
         
         return {
-            'total': len(badge_issues),
-            'issue_rate': len(badge_issues) / len(df) * 100,
+            'total': total,
+            'issue_rate': total / len(scan) * 100,
             'status_breakdown': status_breakdown,
             'frequent_issue_users': frequent_issues,
             'door_issues': door_badge_issues.to_dict(),
-            'severity': self._assess_badge_severity(badge_issues, df)
+            'severity': self._assess_badge_severity(total, len(scan))
         }
     
-    def _analyze_device_issues(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_device_issues(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze device status security issues"""
-        if 'device_status' not in df.columns:
+        if not scan.has_columns('device_status'):
             return {'total': 0, 'issues': {}}
         
-        device_issues = df[df['device_status'] != 'normal']
+        total = scan.total('device_issue')
         
-        if device_issues.empty:
+        if total == 0:
             return {'total': 0, 'issues': {}, 'affected_doors': []}
         
         # Group by device status
-        status_types = device_issues['device_status'].value_counts().to_dict()
+        status_types = scan.value_counts('device_issue', 'device_status').to_dict()
         
         # Doors with device issues
-        door_device_issues = device_issues.groupby('door_id').agg({
-            'event_id': 'count',
-            'device_status': lambda x: list(x.unique())
+        door_device_issues = pd.DataFrame({
+            'event_id': scan.counts('device_issue', 'door_id'),
+            'device_status': scan.unique_values('device_issue', 'door_id', 'device_status')
         })
         
         return {
-            'total': len(device_issues),
+            'total': total,
             'status_types': status_types,
             'affected_doors': door_device_issues.to_dict(),
-            'issue_rate': len(device_issues) / len(df) * 100
+            'issue_rate': total / len(scan) * 100
         }
     
-    def _analyze_access_violations(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_access_violations(self, scan: RuleScan) -> Dict[str, Any]:
         """Analyze access policy violations"""
-        # Define violations based on multiple criteria
-        violations = df[
-            (df['access_result'] == 'Denied') |
-            (df['entry_without_badge'] == True) |
-            ((df['door_held_open_time'] > 30) & (df['door_held_open_time'] < 9999))
-        ]
-        
-        if violations.empty:
+        # Denied, entry without badge, or door held open too long
+        total = scan.total('access_violation')
+        
+        if total == 0:
             return {'total': 0, 'violation_types': {}}
         
         violation_types = {
-            'access_denied': len(df[df['access_result'] == 'Denied']),
-            'no_badge_entry': len(df[df['entry_without_badge'] == True]),
-            'door_held_too_long': len(df[df['door_held_open_time'] > 30])
+            'access_denied': scan.total('failed_access'),
+            'no_badge_entry': scan.total('no_badge_entry'),
+            'door_held_too_long': scan.total('door_held_too_long')
         }
         
         # Critical area violations
-        critical_doors = ['DOOR002', 'DOOR003', 'DOOR005']  # Based on schema
-        critical_violations = violations[violations['door_id'].isin(critical_doors)]
+        critical_violations = scan.total('critical_area_violation')
         
         return {
-            'total': len(violations),
+            'total': total,
             'violation_types': violation_types,
-            'critical_area_violations': len(critical_violations),
-            'violation_rate': len(violations) / len(df) * 100,
-            'severity': 'high' if len(critical_violations) > 0 else 'medium'
+            'critical_area_violations': critical_violations,
+            'violation_rate': total / len(scan) * 100,
+            'severity': 'high' if critical_violations > 0 else 'medium'
         }
     
-    def _calculate_security_score(self, df: pd.DataFrame) -> int:
+    def _calculate_security_score(self, scan: RuleScan) -> int:
         """Calculate overall security score (0-100)"""
-        if df.empty:
+        if len(scan) == 0:
             return 0
         
         # Base score
         score = 100
         
         # Deduct points for security issues
-        failed_rate = len(df[df['access_result'] == 'Denied']) / len(df)
+        failed_rate = scan.total('failed_access') / len(scan)
         score -= failed_rate * 30
         
-        badge_issue_rate = len(df[df['badge_status'] != 'Valid']) / len(df)
+        badge_issue_rate = scan.total('badge_issue') / len(scan)
         score -= badge_issue_rate * 25
         
-        after_hours_rate = len(df[df['is_after_hours']]) / len(df)
+        after_hours_rate = scan.total('after_hours') / len(scan)
         score -= after_hours_rate * 15
         
-        weekend_rate = len(df[df['is_weekend']]) / len(df)
+        weekend_rate = scan.total('weekend') / len(scan)
         score -= weekend_rate * 10
         
         return max(0, min(100, int(score)))
     
-    def _generate_threat_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _generate_threat_summary(self, scan: RuleScan) -> Dict[str, Any]:
         """Generate comprehensive threat summary"""
         threats = []
         
         # High failure rate threat
-        failure_rate = len(df[df['access_result'] == 'Denied']) / len(df) * 100
+        failure_rate = scan.total('failed_access') / len(scan) * 100
         if failure_rate > 15:
             threats.append({
                 'type': 'high_failure_rate',
@@ -278,8 +263,8 @@ class SecurityPatternsAnalyzer:
             })
         
         # After-hours access threat
-        after_hours_count = len(df[df['is_after_hours']])
-        if after_hours_count > len(df) * 0.1:
+        after_hours_count = scan.total('after_hours')
+        if after_hours_count > len(scan) * 0.1:
             threats.append({
                 'type': 'excessive_after_hours',
                 'severity': 'medium',
@@ -287,7 +272,7 @@ class SecurityPatternsAnalyzer:
             })
         
         # Badge security threat
-        invalid_badge_rate = len(df[df['badge_status'] != 'Valid']) / len(df) * 100
+        invalid_badge_rate = scan.total('badge_issue') / len(scan) * 100
         if invalid_badge_rate > 5:
             threats.append({
                 'type': 'badge_security',
@@ -301,13 +286,29 @@ class SecurityPatternsAnalyzer:
             'overall_risk': self._assess_overall_risk(threats)
         }
     
+    def _summarize_custom_rules(self, scan: RuleScan) -> Dict[str, Any]:
+        """Match totals and per-key counts of the site rules"""
+        summary = {}
+        for name in self.custom_rules:
+            rule = self.rule_engine.rules[name]
+            total = scan.total(name)
+            summary[name] = {
+                'total': total,
+                'rate': total / len(scan) * 100,
+                'description': rule.description,
+                'groups': {
+                    key if isinstance(key, str) else ','.join(key): scan.counts(name, key).to_dict()
+                    for key in rule.group_by
+                }
+            }
+        return summary
+    
     # Helper methods
-    def _extract_failure_patterns(self, failed_attempts: pd.DataFrame) -> List[Dict]:
+    def _extract_failure_patterns(self, user_failures: pd.Series) -> List[Dict]:
         """Extract specific failure patterns"""
         patterns = []
         
         # Repeated failures by same user
-        user_failures = failed_attempts.groupby('person_id').size()
         repeat_users = user_failures[user_failures >= 3]
         
         for user, count in repeat_users.items():
@@ -330,26 +331,25 @@ class SecurityPatternsAnalyzer:
         else:
             return 'low'
     
-    def _assess_unauthorized_severity(self, unauthorized: pd.DataFrame) -> str:
+    def _assess_unauthorized_severity(self, unauthorized: int) -> str:
         """Assess severity of unauthorized attempts"""
-        if len(unauthorized) > 20:
+        if unauthorized > 20:
             return 'high'
-        elif len(unauthorized) > 5:
+        elif unauthorized > 5:
             return 'medium'
         else:
             return 'low'
     
-    def _identify_repeat_offenders(self, unauthorized: pd.DataFrame) -> List[str]:
+    def _identify_repeat_offenders(self, offenders: pd.Series) -> List[str]:
         """Identify users with multiple unauthorized attempts"""
-        offenders = unauthorized.groupby('person_id').size()
         return offenders[offenders >= 3].index.tolist()
     
-    def _identify_timing_patterns(self, df: pd.DataFrame) -> List[Dict]:
+    def _identify_timing_patterns(self, scan: RuleScan) -> List[Dict]:
         """Identify suspicious timing patterns"""
         patterns = []
         
         # Users accessing at unusual times
-        after_hours_users = df[df['is_after_hours']].groupby('person_id').size()
+        after_hours_users = scan.counts('after_hours', 'person_id')
         frequent_after_hours = after_hours_users[after_hours_users >= 5]
         
         for user, count in frequent_after_hours.items():
@@ -361,9 +361,9 @@ class SecurityPatternsAnalyzer:
         
         return patterns
     
-    def _assess_badge_severity(self, badge_issues: pd.DataFrame, df: pd.DataFrame) -> str:
+    def _assess_badge_severity(self, badge_issues: int, total: int) -> str:
         """Assess severity of badge issues"""
-        rate = len(badge_issues) / len(df) * 100
+        rate = badge_issues / total * 100
         if rate > 15:
             return 'high'
         elif rate > 5:
@@ -395,13 +395,14 @@ class SecurityPatternsAnalyzer:
             'device_security_issues': {'total': 0, 'issues': {}},
             'access_violations': {'total': 0, 'violation_types': {}},
             'security_score': 0,
-            'threat_summary': {'threat_count': 0, 'threats': []}
+            'threat_summary': {'threat_count': 0, 'threats': []},
+            'custom_rules': {}
         }
 
 # Factory function
-def create_security_analyzer() -> SecurityPatternsAnalyzer:
+def create_security_analyzer(rules: Iterable[SecurityRule] = ()) -> SecurityPatternsAnalyzer:
     """Create security patterns analyzer instance"""
-    return SecurityPatternsAnalyzer()
+    return SecurityPatternsAnalyzer(rules)
 
 # Export
 __all__ = ['SecurityPatternsAnalyzer', 'SecurityPattern', 'create_security_analyzer']
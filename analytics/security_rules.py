@@ -0,0 +1,264 @@
+"""
+Security Rules Module
+Declarative event rules evaluated together in one shared scan
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import logging
+
+GroupKey = Union[str, Tuple[str, ...]]
+MaskFunction = Callable[['RuleScan'], Union[pd.Series, np.ndarray]]
+
+# Critical areas from the access control schema
+CRITICAL_DOORS = ['DOOR002', 'DOOR003', 'DOOR005']
+RAPID_ACCESS_GAP = pd.Timedelta(minutes=2)
+
+@dataclass(frozen=True)
+class SecurityRule:
+    """A named event mask and the keys its matches are grouped by
+
+    ``mask`` receives the :class:`RuleScan` and returns one boolean per
+    event; it can combine other rules' masks with ``scan.mask(name)``,
+    which are computed once and shared. If any ``requires`` column is
+    missing from the frame the rule matches nothing.
+    """
+    name: str
+    mask: MaskFunction
+    group_by: Tuple[GroupKey, ...] = ()
+    requires: Tuple[str, ...] = ()
+    description: str = ''
+
+def _key(key: GroupKey) -> Tuple[str, ...]:
+    return (key,) if isinstance(key, str) else tuple(key)
+
+class RuleScan:
+    """Masks and group aggregates of every rule over one frame
+
+    Each rule's mask is evaluated once and each group key is factorized
+    once; per-rule counts, distinct counts and modes are then integer
+    ``bincount`` passes over the shared group codes, so a rule added to
+    the engine costs one mask rather than another filter-and-groupby.
+    """
+
+    def __init__(self, df: pd.DataFrame, rules: Dict[str, SecurityRule]):
+        self.df = df
+        self.rules = rules
+        self._masks: Dict[str, np.ndarray] = {}
+        self._groups: Dict[Tuple[str, ...], Tuple[np.ndarray, pd.Index]] = {}
+        self._values: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = {}
+        self._counts: Dict[Tuple[str, Tuple[str, ...]], pd.Series] = {}
+        self._person_gaps: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def has_columns(self, *columns: str) -> bool:
+        return all(column in self.df.columns for column in columns)
+
+    def mask(self, name: str) -> np.ndarray:
+        """Boolean match of rule ``name`` per event"""
+        if name not in self._masks:
+            rule = self.rules[name]
+            if not self.has_columns(*rule.requires):
+                self._masks[name] = np.zeros(len(self.df), dtype=bool)
+            else:
+                mask = rule.mask(self)
+                if isinstance(mask, pd.Series):
+                    mask = mask.fillna(False).to_numpy(dtype=bool)
+                self._masks[name] = np.asarray(mask, dtype=bool)
+        return self._masks[name]
+
+    def total(self, name: str) -> int:
+        return int(self.mask(name).sum())
+
+    def counts(self, name: str, key: GroupKey) -> pd.Series:
+        """Matches of ``name`` per group, for groups with any, in groupby order"""
+        key = _key(key)
+        if (name, key) not in self._counts:
+            codes, index = self._group_codes(key)
+            selected = codes[self.mask(name) & (codes >= 0)]
+            counts = np.bincount(selected, minlength=len(index))
+            present = np.flatnonzero(counts)
+            self._counts[name, key] = pd.Series(counts[present], index=index[present])
+        return self._counts[name, key]
+
+    def value_counts(self, name: str, column: str) -> pd.Series:
+        """Values of ``column`` among matches, most frequent first"""
+        return self.counts(name, column).sort_values(ascending=False)
+
+    def nunique(self, name: str, key: GroupKey, column: str) -> pd.Series:
+        """Distinct non-null ``column`` values among matches per group"""
+        pairs, n_values = self._pairs(name, key, column, dropna=True)
+        index = self.counts(name, key).index
+        codes, groups = self._group_codes(_key(key))
+        distinct = np.bincount(pd.unique(pairs) // n_values, minlength=len(groups))
+        return pd.Series(distinct[groups.get_indexer(index)], index=index)
+
+    def mode(self, name: str, key: GroupKey, column: str, default: Any = None) -> pd.Series:
+        """Most frequent non-null ``column`` value per group, ties to the lowest"""
+        pairs, n_values = self._pairs(name, key, column, dropna=True)
+        index = self.counts(name, key).index
+        codes, groups = self._group_codes(_key(key))
+        values = self._value_codes(column, dropna=True)[1]
+
+        pair_codes, unique_pairs = pd.factorize(pairs)
+        pair_counts = np.bincount(pair_codes, minlength=len(unique_pairs))
+        group, value = unique_pairs // n_values, unique_pairs % n_values
+        order = np.lexsort((value, -pair_counts, group))
+        first = order[np.r_[True, group[order][1:] != group[order][:-1]]] if len(order) else order
+
+        modes = pd.Series(default, index=groups, dtype=object)
+        modes.iloc[group[first]] = values[value[first]]
+        return pd.Series(modes.to_numpy()[groups.get_indexer(index)], index=index)
+
+    def unique_values(self, name: str, key: GroupKey, column: str) -> pd.Series:
+        """Distinct ``column`` values among matches per group, in order of appearance"""
+        pairs, n_values = self._pairs(name, key, column, dropna=False)
+        index = self.counts(name, key).index
+        codes, groups = self._group_codes(_key(key))
+        values = self._value_codes(column, dropna=False)[1]
+
+        pairs = pd.unique(pairs)
+        group = pairs // n_values
+        order = np.argsort(group, kind='stable')
+        bounds = np.searchsorted(group[order], np.arange(len(groups) + 1))
+        lists = [values[pairs[order[bounds[i]:bounds[i + 1]]] % n_values].tolist()
+                 for i in groups.get_indexer(index)]
+        return pd.Series(lists, index=index, dtype=object)
+
+    def person_gaps(self) -> np.ndarray:
+        """Time since the same person's previous event (NaT for their first)"""
+        if self._person_gaps is None:
+            persons = pd.factorize(self.df['person_id'])[0]
+            timestamps = self.df['timestamp'].to_numpy(dtype='datetime64[ns]')
+            order = np.lexsort((timestamps, persons))
+            gaps = np.full(len(order), np.timedelta64('NaT'), dtype='timedelta64[ns]')
+            if len(order) > 1:
+                ordered = timestamps[order]
+                same = (persons[order][1:] == persons[order][:-1]) & (persons[order][1:] >= 0)
+                gaps[order[1:][same]] = (ordered[1:] - ordered[:-1])[same]
+            self._person_gaps = gaps
+        return self._person_gaps
+
+    def _group_codes(self, key: Tuple[str, ...]) -> Tuple[np.ndarray, pd.Index]:
+        """Dense group code per event (-1 if any key is null) and group labels"""
+        if key not in self._groups:
+            if len(key) == 1:
+                codes, uniques = self._value_codes(key[0], dropna=True)
+                self._groups[key] = (codes, pd.Index(uniques, name=key[0]))
+            else:
+                combined = np.zeros(len(self.df), dtype=np.int64)
+                valid = np.ones(len(self.df), dtype=bool)
+                levels = []
+                for column in key:
+                    codes, uniques = self._value_codes(column, dropna=True)
+                    combined = combined * max(len(uniques), 1) + codes
+                    valid &= codes >= 0
+                    levels.append(uniques)
+                observed = np.unique(combined[valid])
+                codes = np.full(len(self.df), -1, dtype=np.int64)
+                codes[valid] = np.searchsorted(observed, combined[valid])
+                arrays, remainder = [], observed
+                for uniques in reversed(levels):
+                    arrays.append(uniques[remainder % max(len(uniques), 1)])
+                    remainder = remainder // max(len(uniques), 1)
+                self._groups[key] = (codes, pd.MultiIndex.from_arrays(arrays[::-1], names=list(key)))
+        return self._groups[key]
+
+    def _value_codes(self, column: str, dropna: bool) -> Tuple[np.ndarray, Any]:
+        """Sorted factorization of ``column``, as groupby orders its keys"""
+        if (column, dropna) not in self._values:
+            codes, uniques = pd.factorize(self.df[column], sort=True, use_na_sentinel=dropna)
+            self._values[column, dropna] = (codes, uniques)
+        return self._values[column, dropna]
+
+    def _pairs(self, name: str, key: GroupKey, column: str, dropna: bool) -> Tuple[np.ndarray, int]:
+        """(group, value) pair keys of the matches of ``name``, in row order"""
+        codes, _ = self._group_codes(_key(key))
+        value_codes, values = self._value_codes(column, dropna)
+        n_values = max(len(values), 1)
+        selected = self.mask(name) & (codes >= 0) & (value_codes >= 0)
+        return codes[selected].astype(np.int64) * n_values + value_codes[selected], n_values
+
+class RuleEngine:
+    """Compile rules into one scan per frame
+
+    Rules are evaluated in registration order when :meth:`scan` runs; their
+    masks and the group tables for every declared key are shared by all
+    later lookups on the returned :class:`RuleScan`.
+    """
+
+    def __init__(self, rules: Iterable[SecurityRule] = ()):
+        self.logger = logging.getLogger(__name__)
+        self.rules: Dict[str, SecurityRule] = {}
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: SecurityRule) -> None:
+        if rule.name in self.rules:
+            raise ValueError(f"Duplicate security rule: {rule.name}")
+        self.rules[rule.name] = rule
+
+    def scan(self, df: pd.DataFrame) -> RuleScan:
+        scan = RuleScan(df, self.rules)
+        for rule in self.rules.values():
+            scan.mask(rule.name)
+            if not scan.has_columns(*rule.requires):
+                continue
+            for key in rule.group_by:
+                scan.counts(rule.name, key)
+        return scan
+
+def _held_open(scan: RuleScan) -> pd.Series:
+    return scan.df['door_held_open_time']
+
+DEFAULT_RULES: List[SecurityRule] = [
+    SecurityRule('failed_access', lambda scan: scan.df['access_result'] == 'Denied',
+                 group_by=('person_id', 'door_id', ('hour', 'day_of_week')),
+                 description='Denied access attempts'),
+    SecurityRule('invalid_badge', lambda scan: scan.df['badge_status'] == 'Invalid',
+                 requires=('badge_status',), description='Invalid badge presented'),
+    SecurityRule('badge_issue', lambda scan: scan.df['badge_status'] != 'Valid',
+                 group_by=('person_id', 'door_id', 'badge_status'), requires=('badge_status',),
+                 description='Any badge status other than valid'),
+    SecurityRule('no_badge_entry', lambda scan: scan.df['entry_without_badge'] == True,  # noqa: E712
+                 requires=('entry_without_badge',), description='Entry without a badge'),
+    SecurityRule('door_held_too_long', lambda scan: _held_open(scan) > 30,
+                 requires=('door_held_open_time',), description='Door held open over 30 seconds'),
+    SecurityRule('door_held_violation', lambda scan: (_held_open(scan) > 30) & (_held_open(scan) < 9999),
+                 requires=('door_held_open_time',),
+                 description='Door held open over 30 seconds, excluding sensor faults'),
+    SecurityRule('unauthorized',
+                 lambda scan: scan.mask('failed_access') | scan.mask('invalid_badge') | scan.mask('no_badge_entry'),
+                 group_by=('person_id', 'door_id'), description='Denied, invalid badge or no badge'),
+    SecurityRule('access_violation',
+                 lambda scan: scan.mask('failed_access') | scan.mask('no_badge_entry') | scan.mask('door_held_violation'),
+                 description='Access policy violations'),
+    SecurityRule('critical_area_violation',
+                 lambda scan: scan.mask('access_violation') & scan.df['door_id'].isin(CRITICAL_DOORS).to_numpy(),
+                 description='Policy violations at critical doors'),
+    SecurityRule('after_hours', lambda scan: scan.df['is_after_hours'], group_by=('person_id',),
+                 description='Events before 06:00 or after 22:00'),
+    SecurityRule('weekend', lambda scan: scan.df['is_weekend'], description='Weekend events'),
+    SecurityRule('very_early', lambda scan: (scan.df['hour'] >= 0) & (scan.df['hour'] <= 4),
+                 description='Events between 00:00 and 04:59'),
+    SecurityRule('very_late', lambda scan: (scan.df['hour'] >= 23) | (scan.df['hour'] <= 1),
+                 description='Events between 23:00 and 01:59'),
+    SecurityRule('rapid_sequential', lambda scan: scan.person_gaps() < RAPID_ACCESS_GAP,
+                 description="Events within two minutes of the same person's previous one"),
+    SecurityRule('device_issue', lambda scan: scan.df['device_status'] != 'normal',
+                 group_by=('door_id', 'device_status'), requires=('device_status',),
+                 description='Device status other than normal'),
+]
+
+# Factory function
+def create_rule_engine(extra_rules: Iterable[SecurityRule] = ()) -> RuleEngine:
+    """Create a rule engine with the default rules plus ``extra_rules``"""
+    return RuleEngine([*DEFAULT_RULES, *extra_rules])
+
+# Export for compatibility
+__all__ = ['SecurityRule', 'RuleScan', 'RuleEngine', 'DEFAULT_RULES', 'CRITICAL_DOORS',
+           'create_rule_engine']
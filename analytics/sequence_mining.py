@@ -0,0 +1,221 @@
+"""
+Sequence Mining Module
+Vectorised sessionisation and door path counting for all users at once
+"""
+
+import pandas as pd
+import numpy as np
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+DEFAULT_SESSION_GAP = timedelta(minutes=30)
+DEFAULT_MAX_PATH_LENGTH = 4
+
+# Two independent 64-bit polynomial hashes identify a door path
+_HASH_BASES = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F))
+
+Path = Tuple[Any, ...]
+
+def _count_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First row index and count of each distinct row of ``keys``
+
+    Columns are factorized one after another into a dense group code, so
+    this is linear in the number of rows. Groups come out in order of first
+    occurrence.
+    """
+    codes = np.zeros(len(keys), dtype=np.int64)
+    n_groups = 1
+    for column in keys.T:
+        column_codes, uniques = pd.factorize(column)
+        codes, groups = pd.factorize(codes * len(uniques) + column_codes)
+        n_groups = len(groups)
+    first = np.empty(n_groups, dtype=np.int64)
+    # With repeated indices the last assignment wins, so write in reverse
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first, np.bincount(codes, minlength=n_groups)
+
+class DoorSequences:
+    """Sessions of all users with door path counts computed on demand
+
+    Events are held as door codes in (user, time) order with session
+    offsets. A path is a whole session (``length=None``) or a run of
+    ``length`` consecutive doors inside a session (an n-gram). Paths are
+    keyed by hashes of their door codes, so counting is a hash-table pass
+    over integer keys rather than building tuples per session.
+    """
+
+    def __init__(self, door_codes: np.ndarray, doors: np.ndarray,
+                 session_starts: np.ndarray, session_doors: np.ndarray):
+        self.door_codes = door_codes
+        self.doors = doors
+        self.session_starts = session_starts
+        self.session_lengths = np.diff(np.append(session_starts, len(door_codes)))
+        self.session_doors = session_doors
+        self._counts: Dict[Optional[int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def session_count(self) -> int:
+        return len(self.session_starts)
+
+    def path_counts(self, length: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """First event position and count of each distinct path
+
+        Positions are sorted by first occurrence in (user, time) order.
+        Only sessions of two or more events count as whole-session paths.
+        """
+        if length not in self._counts:
+            if length is None:
+                keep = self.session_lengths > 1
+                starts = self.session_starts[keep]
+            else:
+                starts = self._ngram_starts(length)
+
+            if len(starts):
+                keys = (self._session_hashes(keep) if length is None
+                        else self._ngram_hashes(starts, length))
+                first, counts = _count_keys(keys)
+                self._counts[length] = (starts[first], counts)
+            else:
+                self._counts[length] = (starts, np.zeros(0, dtype=np.int64))
+        return self._counts[length]
+
+    def common_paths(self, k: int = 10, length: Optional[int] = None) -> List[Tuple[Path, int]]:
+        """The ``k`` most frequent paths, ties in order of first occurrence"""
+        positions, counts = self.path_counts(length)
+        top = np.argsort(-counts, kind='stable')[:k]
+        return [(self._path_at(positions[i], length), int(counts[i])) for i in top]
+
+    def rare_paths(self, k: int = 10, length: Optional[int] = None) -> List[Tuple[Path, int]]:
+        """The ``k`` least frequent paths, ties in order of first occurrence"""
+        positions, counts = self.path_counts(length)
+        bottom = np.argsort(counts, kind='stable')[:k]
+        return [(self._path_at(positions[i], length), int(counts[i])) for i in bottom]
+
+    def distinct_paths(self, length: Optional[int] = None) -> int:
+        return len(self.path_counts(length)[1])
+
+    def total_paths(self, length: Optional[int] = None) -> int:
+        return int(self.path_counts(length)[1].sum())
+
+    def _path_at(self, position: int, length: Optional[int]) -> Path:
+        if length is None:
+            session = np.searchsorted(self.session_starts, position, side='right') - 1
+            length = self.session_lengths[session]
+        return tuple(self.doors[self.door_codes[position:position + length]].tolist())
+
+    def _ngram_starts(self, length: int) -> np.ndarray:
+        """Event positions that begin ``length`` doors within one session"""
+        n_events = len(self.door_codes)
+        if length < 1 or n_events < length:
+            return np.zeros(0, dtype=np.int64)
+        session_end = np.repeat(self.session_starts + self.session_lengths, self.session_lengths)
+        starts = np.arange(n_events - length + 1)
+        return starts[starts + length <= session_end[:len(starts)]]
+
+    def _ngram_hashes(self, starts: np.ndarray, length: int) -> np.ndarray:
+        codes = self.door_codes.astype(np.uint64) + np.uint64(1)
+        hashes = np.zeros((len(starts), len(_HASH_BASES)), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for offset in range(length):
+                for j, base in enumerate(_HASH_BASES):
+                    hashes[:, j] = hashes[:, j] * base + codes[starts + offset]
+        return hashes
+
+    def _session_hashes(self, keep: np.ndarray) -> np.ndarray:
+        """Length and polynomial hashes of each kept session's door codes"""
+        codes = self.door_codes.astype(np.uint64) + np.uint64(1)
+        position = np.arange(len(codes)) - np.repeat(self.session_starts, self.session_lengths)
+        hashes = [self.session_lengths[keep].astype(np.uint64)]
+        with np.errstate(over='ignore'):
+            for base in _HASH_BASES:
+                powers = np.cumprod(np.full(max(self.session_lengths.max(), 1), base, dtype=np.uint64))
+                terms = codes * powers[position]
+                hashes.append(np.add.reduceat(terms, self.session_starts)[keep])
+        return np.column_stack(hashes)
+
+class SequenceMiner:
+    """Split every user's events into sessions in one vectorised pass
+
+    Events are sorted by user and time; a new session starts at each
+    user change or gap longer than ``session_gap``. The cost grows with
+    the number of events, not with users times sessions.
+    """
+
+    def __init__(self, session_gap: timedelta = DEFAULT_SESSION_GAP,
+                 max_path_length: int = DEFAULT_MAX_PATH_LENGTH):
+        self.session_gap = session_gap
+        self.max_path_length = max_path_length
+        self.logger = logging.getLogger(__name__)
+
+    def sessionise(self, df: pd.DataFrame) -> DoorSequences:
+        """Sessions of every user in ``df``"""
+        person_codes, _ = pd.factorize(df['person_id'], sort=True, use_na_sentinel=False)
+        door_codes, doors = pd.factorize(df['door_id'], use_na_sentinel=False)
+        timestamps = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+
+        if len(timestamps) > 1 and (timestamps[1:] >= timestamps[:-1]).all():
+            # Already in time order (as the controller passes frames): a stable
+            # sort by user keeps each user's events chronological
+            order = np.argsort(person_codes, kind='stable')
+        else:
+            order = np.lexsort((timestamps, person_codes))
+        person_codes = person_codes[order]
+        door_codes = door_codes[order]
+        timestamps = timestamps[order]
+
+        new_session = np.ones(len(order), dtype=bool)
+        if len(order) > 1:
+            new_session[1:] = ((person_codes[1:] != person_codes[:-1])
+                               | (np.diff(timestamps) > np.timedelta64(self.session_gap)))
+        session_starts = np.flatnonzero(new_session)
+
+        # Distinct doors per session from distinct (session, door) pairs
+        session_ids = np.cumsum(new_session) - 1
+        n_doors = max(len(doors), 1)
+        _, pairs = pd.factorize(session_ids.astype(np.int64) * n_doors + door_codes)
+        session_doors = np.bincount(pairs // n_doors, minlength=len(session_starts))
+
+        return DoorSequences(door_codes, np.asarray(doors, dtype=object), session_starts, session_doors)
+
+    def summarize(self, sequences: DoorSequences, k: int = 10) -> Dict[str, Any]:
+        """Common and rare whole-session paths and door n-grams"""
+        total = sequences.total_paths()
+        return {
+            'common_sequences': sequences.common_paths(k),
+            'rare_sequences': sequences.rare_paths(k),
+            'total_sequences': sequences.distinct_paths(),
+            'sequence_diversity': sequences.distinct_paths() / max(total, 1),
+            'common_paths': {
+                length: sequences.common_paths(k, length)
+                for length in range(2, self.max_path_length + 1)
+            },
+            'rare_paths': {
+                length: sequences.rare_paths(k, length)
+                for length in range(2, self.max_path_length + 1)
+            },
+        }
+
+    def multi_door_sessions(self, sequences: DoorSequences) -> Dict[str, Any]:
+        """Count and size of sessions that touch more than one door"""
+        multi = sequences.session_doors > 1
+        if not multi.any():
+            return {
+                'total_multi_door_sessions': 0,
+                'avg_doors_per_session': 0,
+                'avg_events_per_session': 0
+            }
+        return {
+            'total_multi_door_sessions': int(multi.sum()),
+            'avg_doors_per_session': float(sequences.session_doors[multi].mean()),
+            'avg_events_per_session': float(sequences.session_lengths[multi].mean())
+        }
+
+# Factory function
+def create_sequence_miner(session_gap: timedelta = DEFAULT_SESSION_GAP,
+                          max_path_length: int = DEFAULT_MAX_PATH_LENGTH) -> SequenceMiner:
+    """Factory function to create door sequence miner"""
+    return SequenceMiner(session_gap, max_path_length)
+
+# Export for compatibility
+__all__ = ['SequenceMiner', 'DoorSequences', 'create_sequence_miner']
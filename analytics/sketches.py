@@ -0,0 +1,330 @@
+"""
+Probabilistic Sketches Module
+Mergeable, fixed-size summaries for approximate analytics over large event sets
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable, Optional, Union
+
+
+def hash_values(values: Iterable) -> np.ndarray:
+    """Hash arbitrary values to uint64 with pandas' vectorised hasher"""
+    if isinstance(values, (pd.Series, pd.Index, pd.Categorical)):
+        values = np.asarray(values, dtype=object)
+    return pd.util.hash_array(np.asarray(values, dtype=object))
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorised ``int.bit_length`` for uint64 arrays"""
+    x = x.copy()
+    length = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x >= (np.uint64(1) << np.uint64(shift))
+        length[mask] += shift
+        x[mask] >>= np.uint64(shift)
+    length += (x > 0).astype(np.uint8)
+    return length
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter
+
+    Uses ``2**precision`` one-byte registers; the relative standard error of
+    :meth:`count` is about ``1.04 / sqrt(2**precision)`` (0.81% at the default
+    precision of 14). Sketches with the same precision merge losslessly.
+    """
+
+    def __init__(self, precision: int = 14, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.num_registers = 1 << precision
+        if registers is None:
+            registers = np.zeros(self.num_registers, dtype=np.uint8)
+        self.registers = registers
+
+    @property
+    def relative_error(self) -> float:
+        return float(1.04 / np.sqrt(self.num_registers))
+
+    def add(self, values: Iterable) -> 'HyperLogLog':
+        """Add values (any hashable) to the sketch"""
+        hashes = hash_values(values)
+        if len(hashes):
+            self.add_hashes(hashes)
+        return self
+
+    def add_hashes(self, hashes: np.ndarray) -> 'HyperLogLog':
+        """Add pre-computed uint64 hashes to the sketch"""
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        rank = (suffix_bits + 1 - _bit_length(suffix)).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Merge another sketch into this one"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> 'HyperLogLog':
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+
+        # Small range correction (linear counting)
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+class TDigest:
+    """t-digest quantile sketch
+
+    Values are kept as at most about ``compression`` weighted centroids,
+    small near the extremes and larger around the median (the k1 scale
+    function), so tail quantiles stay accurate. At the default compression
+    of 100 the rank error of :meth:`quantile` is typically below 0.5% at the
+    median and far smaller in the tails. Digests merge by recompressing the
+    union of their centroids; the exact minimum and maximum are kept.
+    """
+
+    def __init__(self, compression: float = 100.0):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: Iterable, weights: Optional[Iterable] = None) -> 'TDigest':
+        """Add numeric values, optionally weighted"""
+        values = np.asarray(values, dtype=np.float64)
+        weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+        finite = np.isfinite(values)
+        values, weights = values[finite], weights[finite]
+        if len(values):
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._compress(np.r_[self.means, values], np.r_[self.weights, weights])
+        return self
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        """Merge another digest into this one"""
+        if len(other.means):
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.r_[self.means, other.means], np.r_[self.weights, other.weights])
+        return self
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        # Scale each point's rank to k in [0, compression]; equal floors share a centroid
+        q = (np.cumsum(weights) - weights / 2) / weights.sum()
+        k = self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)
+        clusters = np.unique(np.floor(k), return_inverse=True)[1]
+        self.weights = np.bincount(clusters, weights=weights)
+        self.means = np.bincount(clusters, weights=means * weights) / self.weights
+
+    def quantile(self, q: Union[float, Iterable[float]]) -> Union[float, np.ndarray]:
+        """Estimated value at quantile(s) ``q`` in [0, 1]"""
+        scalar = np.ndim(q) == 0
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if not len(self.means):
+            result = np.full(len(q), np.nan)
+        else:
+            # Centroid means sit at the middle of their weight
+            total = self.weights.sum()
+            centres = np.cumsum(self.weights) - self.weights / 2
+            result = np.interp(q * total, np.r_[0.0, centres, total], np.r_[self.min, self.means, self.max])
+        return float(result[0]) if scalar else result
+
+    def copy(self) -> 'TDigest':
+        digest = TDigest(self.compression)
+        digest.means, digest.weights = self.means.copy(), self.weights.copy()
+        digest.min, digest.max = self.min, self.max
+        return digest
+
+
+class CountMinSketch:
+    """Count-min sketch of per-key counts
+
+    ``depth`` rows of ``width`` counters, indexed by double hashing of a
+    single 64-bit hash. Estimates never undercount, and with probability
+    ``1 - exp(-depth)`` overcount by at most ``e / width`` of the total
+    (0.13% at the default width of 2048). Sketches with the same shape merge
+    exactly by adding their tables.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 5):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @property
+    def error_bound(self) -> float:
+        """Additive error bound as a fraction of the total count"""
+        return float(np.e / self.width)
+
+    def _columns(self, hashes: np.ndarray) -> np.ndarray:
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((low + rows * high) % np.uint64(self.width)).astype(np.intp)
+
+    def add(self, values: Iterable, counts: Optional[Iterable] = None) -> 'CountMinSketch':
+        """Add keys, each once or ``counts`` times"""
+        return self.add_hashes(hash_values(values), counts)
+
+    def add_hashes(self, hashes: np.ndarray, counts: Optional[Iterable] = None) -> 'CountMinSketch':
+        """Add pre-computed uint64 hashes of keys"""
+        counts = np.ones(len(hashes), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+        return self
+
+    def estimate(self, values: Iterable) -> np.ndarray:
+        """Estimated count of each key"""
+        return self.estimate_hashes(hash_values(values))
+
+    def estimate_hashes(self, hashes: np.ndarray) -> np.ndarray:
+        columns = self._columns(hashes)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """Merge another sketch into this one"""
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge count-min sketches of different shape")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def copy(self) -> 'CountMinSketch':
+        sketch = CountMinSketch(self.width, self.depth)
+        sketch.table, sketch.total = self.table.copy(), self.total
+        return sketch
+
+
+class TopK:
+    """Heavy hitters: count-min counts plus the ``k`` keys estimated highest
+
+    Each batch adds its exact counts to the count-min sketch and offers its
+    own top ``k`` keys as candidates; candidates are re-estimated and cut
+    to ``k`` after every batch or merge. A key with more than ``1 / k`` of
+    all events holds more than that share in some batch, where it is
+    necessarily among the top ``k``, so it enters the candidates; it can
+    then only be displaced by ``k`` keys estimated higher at that point.
+    """
+
+    def __init__(self, k: int = 100, width: int = 2048, depth: int = 5):
+        self.k = k
+        self.counts = CountMinSketch(width, depth)
+        self.candidates = pd.Series(dtype='int64')
+
+    def add(self, values: Iterable) -> 'TopK':
+        """Add one batch of keys"""
+        counts = pd.Series(np.asarray(values, dtype=object)).value_counts()
+        return self.add_counts(counts.index, counts.to_numpy())
+
+    def add_counts(self, keys: Iterable, counts: Iterable,
+                   hashes: Optional[np.ndarray] = None) -> 'TopK':
+        """Add a batch of distinct keys with their counts"""
+        keys = pd.Index(keys)
+        counts = np.asarray(counts, dtype=np.int64)
+        self.counts.add_hashes(hash_values(keys) if hashes is None else hashes, counts)
+        batch_top = keys[np.argsort(-counts, kind='stable')[:self.k]]
+        self._refresh(batch_top)
+        return self
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        """Merge another sketch into this one"""
+        self.counts.merge(other.counts)
+        self._refresh(other.candidates.index)
+        return self
+
+    def _refresh(self, keys: pd.Index) -> None:
+        keys = pd.Index(keys)
+        if len(self.candidates):
+            keys = self.candidates.index.append(keys)
+        keys = keys.unique()
+        estimates = pd.Series(self.counts.estimate(keys), index=keys)
+        self.candidates = estimates.sort_values(ascending=False, kind='stable').iloc[:self.k]
+
+    def top(self, n: Optional[int] = None) -> pd.Series:
+        """Estimated counts of the heaviest keys, highest first"""
+        return self.candidates.iloc[:n]
+
+    def estimate(self, values: Iterable) -> np.ndarray:
+        return self.counts.estimate(values)
+
+    def copy(self) -> 'TopK':
+        sketch = TopK.__new__(TopK)
+        sketch.k, sketch.counts, sketch.candidates = self.k, self.counts.copy(), self.candidates.copy()
+        return sketch
+
+
+class DistinctSample:
+    """Uniform random sample of distinct values (bottom-k by hash)
+
+    Keeps the ``size`` distinct values with the smallest hashes, each with
+    its count. Every distinct value is equally likely to be kept whatever
+    its frequency, and the sample of merged sketches is exactly the sample
+    of the union. A value kept after a merge was kept by every partition
+    holding it, so summed counts are exact. A quantile over the sample has
+    a rank error of about ``sqrt(q * (1 - q) / size)`` (1.25% at q = 0.8
+    with 1024 values).
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.values = np.empty(0, dtype=object)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def add(self, values: Iterable, hashes: Optional[np.ndarray] = None,
+            counts: Optional[Iterable] = None) -> 'DistinctSample':
+        """Add values, with their hashes and counts if already known"""
+        values = np.asarray(values, dtype=object)
+        hashes = hash_values(values) if hashes is None else hashes
+        counts = np.ones(len(values), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        return self._keep(np.r_[self.hashes, hashes], np.r_[self.values, values], np.r_[self.counts, counts])
+
+    def merge(self, other: 'DistinctSample') -> 'DistinctSample':
+        """Merge another sample into this one"""
+        return self._keep(np.r_[self.hashes, other.hashes], np.r_[self.values, other.values],
+                          np.r_[self.counts, other.counts])
+
+    def _keep(self, hashes: np.ndarray, values: np.ndarray, counts: np.ndarray) -> 'DistinctSample':
+        hashes, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse, weights=counts, minlength=len(hashes)).astype(np.int64)
+        self.hashes, self.values, self.counts = hashes[:self.size], values[first[:self.size]], counts[:self.size]
+        return self
+
+    def copy(self) -> 'DistinctSample':
+        sample = DistinctSample(self.size)
+        sample.hashes, sample.values, sample.counts = self.hashes.copy(), self.values.copy(), self.counts.copy()
+        return sample
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+
+__all__ = ['HyperLogLog', 'TDigest', 'CountMinSketch', 'TopK', 'DistinctSample', 'hash_values']
@@ -0,0 +1,316 @@
+"""
+Streaming Anomaly Detection Module
+Online anomaly detection over live access event feeds
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Any, Callable, Iterator, Mapping, Optional
+import itertools
+import logging
+import time
+
+from .anomaly_detection import Anomaly
+
+class StreamingAnomalyDetector:
+    """Online anomaly detection, one event or micro-batch at a time
+
+    State lives in compact arrays indexed by a per-user and per-door slot:
+    EWMA mean and variance of each badge's access time of day, exponentially
+    decayed denial counters per badge and per door, and the last door, last
+    access time and last granted access per badge and door. Every event is
+    checked against that state before it is folded in, so anomalies are
+    emitted as :class:`Anomaly` objects as soon as the triggering event
+    arrives.
+    """
+
+    def __init__(self,
+                 alpha: float = 0.05,
+                 z_threshold: float = 3.0,
+                 warmup_events: int = 20,
+                 denial_window_seconds: float = 300.0,
+                 user_denial_threshold: float = 5.0,
+                 door_denial_threshold: float = 10.0,
+                 tailgating_window_seconds: float = 30.0,
+                 door_hop_seconds: float = 60.0,
+                 on_anomaly: Optional[Callable[[Anomaly], None]] = None,
+                 initial_capacity: int = 1024):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup_events = warmup_events
+        self.denial_window_seconds = denial_window_seconds
+        self.user_denial_threshold = user_denial_threshold
+        self.door_denial_threshold = door_denial_threshold
+        self.tailgating_window_seconds = tailgating_window_seconds
+        self.door_hop_seconds = door_hop_seconds
+        self.on_anomaly = on_anomaly
+        self.logger = logging.getLogger(__name__)
+
+        self._user_index: Dict[Any, int] = {}
+        self._door_index: Dict[Any, int] = {}
+        self._door_ids: List[Any] = []
+        self._anomaly_counter = itertools.count(1)
+
+        # Per-user state
+        self._hour_mean = np.zeros(initial_capacity, dtype=np.float32)
+        self._hour_var = np.zeros(initial_capacity, dtype=np.float32)
+        self._user_events = np.zeros(initial_capacity, dtype=np.int32)
+        self._user_denials = np.zeros(initial_capacity, dtype=np.float32)
+        self._user_denial_time = np.zeros(initial_capacity, dtype=np.float64)
+        self._last_door = np.full(initial_capacity, -1, dtype=np.int32)
+        self._last_seen = np.zeros(initial_capacity, dtype=np.float64)
+
+        # Per-door state
+        self._door_denials = np.zeros(initial_capacity, dtype=np.float32)
+        self._door_denial_time = np.zeros(initial_capacity, dtype=np.float64)
+        self._last_granted = np.full(initial_capacity, -np.inf, dtype=np.float64)
+        self._last_granted_user = np.full(initial_capacity, -1, dtype=np.int32)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def process_event(self, event: Mapping[str, Any]) -> List[Anomaly]:
+        """Check one event against the running state, then update it
+
+        ``event`` needs ``timestamp``, ``person_id``, ``door_id`` and
+        ``access_result``.
+        """
+        timestamp = pd.Timestamp(event['timestamp'])
+        user_id = event['person_id']
+        door_id = event['door_id']
+        granted = event['access_result'] == 'Granted'
+
+        user = self._slot(self._user_index, user_id, self._user_arrays())
+        door = self._door_slot(door_id)
+        seconds = timestamp.value / 1e9
+        hour = timestamp.hour + timestamp.minute / 60.0 + timestamp.second / 3600.0
+
+        anomalies = []
+        anomalies.extend(self._check_time_of_day(user, user_id, door_id, timestamp, hour))
+        anomalies.extend(self._check_door_hop(user, user_id, door, door_id, timestamp, seconds))
+        if granted:
+            anomalies.extend(self._check_tailgating(user, user_id, door, door_id, timestamp, seconds))
+            self._last_granted[door] = seconds
+            self._last_granted_user[door] = user
+        else:
+            anomalies.extend(self._record_denial(user, user_id, door, door_id, timestamp, seconds))
+
+        self._update_time_of_day(user, hour)
+        self._last_door[user] = door
+        self._last_seen[user] = seconds
+
+        if self.on_anomaly is not None:
+            for anomaly in anomalies:
+                self.on_anomaly(anomaly)
+        return anomalies
+
+    def process_batch(self, events: pd.DataFrame) -> List[Anomaly]:
+        """Process a micro-batch of events in timestamp order"""
+        if events.empty:
+            return []
+        events = events.sort_values('timestamp', kind='stable')
+        anomalies = []
+        columns = ['timestamp', 'person_id', 'door_id', 'access_result']
+        for values in zip(*(events[col] for col in columns)):
+            anomalies.extend(self.process_event(dict(zip(columns, values))))
+        return anomalies
+
+    def get_user_state(self, user_id: Any) -> Dict[str, Any]:
+        """Running statistics kept for one badge"""
+        user = self._user_index.get(user_id)
+        if user is None:
+            return {}
+        last_door = self._last_door[user]
+        return {
+            'events': int(self._user_events[user]),
+            'hour_mean': float(self._hour_mean[user]),
+            'hour_std': float(np.sqrt(self._hour_var[user])),
+            'denial_score': float(self._user_denials[user]),
+            'last_door': self._door_ids[last_door] if last_door >= 0 else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+    def _check_time_of_day(self, user: int, user_id: Any, door_id: Any,
+                           timestamp: pd.Timestamp, hour: float) -> List[Anomaly]:
+        if self._user_events[user] < self.warmup_events:
+            return []
+        # One hour of spread at least, so strict routines are not flagged for minutes
+        std = max(float(np.sqrt(self._hour_var[user])), 1.0)
+        deviation = _hour_difference(hour, float(self._hour_mean[user]))
+        z_score = abs(deviation) / std
+        if z_score < self.z_threshold:
+            return []
+        return [self._anomaly(
+            'unusual_time', 'medium', min(0.5 + z_score / 20, 0.95),
+            f'User {user_id} accessed {door_id} at {timestamp:%H:%M}, '
+            f'{abs(deviation):.1f}h from their usual time',
+            [user_id, door_id], timestamp,
+            {'z_score': z_score, 'usual_hour': float(self._hour_mean[user])},
+            'Verify the access with the badge holder'
+        )]
+
+    def _check_door_hop(self, user: int, user_id: Any, door: int, door_id: Any,
+                        timestamp: pd.Timestamp, seconds: float) -> List[Anomaly]:
+        last_door = self._last_door[user]
+        if last_door < 0 or last_door == door:
+            return []
+        elapsed = seconds - self._last_seen[user]
+        if elapsed >= self.door_hop_seconds:
+            return []
+        previous_door = self._door_ids[last_door]
+        return [self._anomaly(
+            'door_hopping', 'medium', 0.7,
+            f'User {user_id} moved from {previous_door} to {door_id} in {elapsed:.0f}s',
+            [user_id, previous_door, door_id], timestamp,
+            {'previous_door': previous_door, 'elapsed_seconds': elapsed},
+            'Check whether the badge is being shared'
+        )]
+
+    def _check_tailgating(self, user: int, user_id: Any, door: int, door_id: Any,
+                          timestamp: pd.Timestamp, seconds: float) -> List[Anomaly]:
+        gap = seconds - self._last_granted[door]
+        previous_user = self._last_granted_user[door]
+        if gap >= self.tailgating_window_seconds or previous_user == user:
+            return []
+        return [self._anomaly(
+            'potential_tailgating', 'medium', 0.6,
+            f'Potential tailgating at door {door_id}: access {pd.Timedelta(seconds=gap)} after previous',
+            [door_id, user_id], timestamp,
+            {'time_gap_seconds': gap},
+            'Review door camera footage'
+        )]
+
+    def _record_denial(self, user: int, user_id: Any, door: int, door_id: Any,
+                       timestamp: pd.Timestamp, seconds: float) -> List[Anomaly]:
+        anomalies = []
+        user_before, user_after = self._bump(self._user_denials, self._user_denial_time, user, seconds)
+        if user_before < self.user_denial_threshold <= user_after:
+            anomalies.append(self._anomaly(
+                'rapid_attempts', 'high', 0.9,
+                f'User {user_id} has repeated denied attempts, last at {door_id}',
+                [user_id, door_id], timestamp,
+                {'denial_score': user_after},
+                'Suspend the badge pending review'
+            ))
+
+        door_before, door_after = self._bump(self._door_denials, self._door_denial_time, door, seconds)
+        if door_before < self.door_denial_threshold <= door_after:
+            anomalies.append(self._anomaly(
+                'door_failure_spike', 'high', 0.85,
+                f'Door {door_id} has a spike of denied attempts',
+                [door_id], timestamp,
+                {'denial_score': door_after},
+                'Inspect the reader and the area around the door'
+            ))
+        return anomalies
+
+    # ------------------------------------------------------------------
+    # State updates
+    # ------------------------------------------------------------------
+    def _update_time_of_day(self, user: int, hour: float):
+        """EWMA of time of day on the 24h circle"""
+        if self._user_events[user] == 0:
+            self._hour_mean[user] = hour
+            self._hour_var[user] = 0.0
+        else:
+            deviation = _hour_difference(hour, float(self._hour_mean[user]))
+            self._hour_mean[user] = (self._hour_mean[user] + self.alpha * deviation) % 24
+            self._hour_var[user] = (1 - self.alpha) * (self._hour_var[user] + self.alpha * deviation ** 2)
+        self._user_events[user] += 1
+
+    def _bump(self, counts: np.ndarray, updated: np.ndarray, slot: int, seconds: float):
+        """Decay a denial counter to ``seconds`` and add one"""
+        decay = np.exp(-max(seconds - updated[slot], 0.0) / self.denial_window_seconds)
+        before = float(counts[slot]) * decay
+        counts[slot] = before + 1
+        updated[slot] = seconds
+        return before, before + 1
+
+    def _anomaly(self, anomaly_type: str, severity: str, confidence: float,
+                 description: str, entities: List[Any], timestamp: pd.Timestamp,
+                 context: Dict[str, Any], action: str) -> Anomaly:
+        return Anomaly(
+            anomaly_id=f'stream_{next(self._anomaly_counter)}',
+            anomaly_type=anomaly_type,
+            severity=severity,
+            confidence=confidence,
+            description=description,
+            affected_entities=[str(entity) for entity in entities],
+            timestamp=timestamp.to_pydatetime(),
+            context=context,
+            recommended_action=action,
+        )
+
+    # ------------------------------------------------------------------
+    # Slot allocation
+    # ------------------------------------------------------------------
+    def _user_arrays(self) -> List[str]:
+        return ['_hour_mean', '_hour_var', '_user_events', '_user_denials',
+                '_user_denial_time', '_last_door', '_last_seen']
+
+    def _door_arrays(self) -> List[str]:
+        return ['_door_denials', '_door_denial_time', '_last_granted', '_last_granted_user']
+
+    def _door_slot(self, door_id: Any) -> int:
+        door = self._slot(self._door_index, door_id, self._door_arrays())
+        if door == len(self._door_ids):
+            self._door_ids.append(door_id)
+        return door
+
+    def _slot(self, index: Dict[Any, int], key: Any, arrays: List[str]) -> int:
+        slot = index.get(key)
+        if slot is None:
+            slot = len(index)
+            index[key] = slot
+            if slot >= len(getattr(self, arrays[0])):
+                for name in arrays:
+                    self._grow(name)
+        return slot
+
+    def _grow(self, name: str):
+        """Double a state array, filling new slots with its initial value"""
+        array = getattr(self, name)
+        fill = {'_last_door': -1, '_last_granted_user': -1, '_last_granted': -np.inf}.get(name, 0)
+        grown = np.full(len(array) * 2, fill, dtype=array.dtype)
+        grown[:len(array)] = array
+        setattr(self, name, grown)
+
+def _hour_difference(hour: float, mean: float) -> float:
+    """Signed difference between two times of day, in (-12, 12]"""
+    return (hour - mean + 12) % 24 - 12
+
+def replay_csv(path: str,
+               detector: StreamingAnomalyDetector,
+               speed: float = 1.0,
+               chunksize: int = 10_000,
+               sleep: Callable[[float], None] = time.sleep) -> Iterator[Anomaly]:
+    """Replay a CSV export as a live feed, yielding anomalies as they occur
+
+    Events are fed one at a time in file order and paced by their
+    timestamps; ``speed`` > 1 plays faster than real time and ``speed=0``
+    does not wait at all.
+    """
+    from services.file_processor_service import FileProcessorService
+
+    previous = None
+    columns = ['timestamp', 'person_id', 'door_id', 'access_result']
+    for chunk in FileProcessorService().iter_csv_chunks(path, chunksize):
+        chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+        for values in zip(*(chunk[col] for col in columns)):
+            event = dict(zip(columns, values))
+            if previous is not None and speed > 0:
+                delay = (event['timestamp'] - previous).total_seconds() / speed
+                if delay > 0:
+                    sleep(delay)
+            previous = event['timestamp']
+            yield from detector.process_event(event)
+
+# Factory function
+def create_streaming_detector(**kwargs) -> StreamingAnomalyDetector:
+    """Factory function to create streaming anomaly detector"""
+    return StreamingAnomalyDetector(**kwargs)
+
+# Export for compatibility
+__all__ = ['StreamingAnomalyDetector', 'replay_csv', 'create_streaming_detector']
@@ -5,27 +5,34 @@ Replace: Add to analytics/ directory
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Tuple, Set
+from typing import Dict, Any, List, Optional, Tuple, Set
 from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
 
+from .access_graph import AccessGraph, AccessGraphEngine
+from .interaction_matrix import InteractionMatrix
+
 logger = logging.getLogger(__name__)
 
 class UniquePatternAnalyzer:
     """Modular analyzer for unique user and device patterns"""
     
-    def __init__(self):
+    def __init__(self, graph_engine: Optional[AccessGraphEngine] = None):
         self.min_frequency_threshold = 3  # Minimum events to be considered active
         self.anomaly_threshold = 2.5  # Standard deviations for anomaly detection
+        self.graph_engine = graph_engine or AccessGraphEngine()
         
-    def analyze_patterns(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_patterns(self, df: pd.DataFrame, metadata: Dict[str, Any],
+                         dataset_version: Optional[str] = None) -> Dict[str, Any]:
         """
         Main analysis method for unique user/device patterns
         
         Args:
             df: Combined processed dataframe
             metadata: Database metadata
+            dataset_version: Identifies the data (e.g. the upload store
+                generation) so the access graph is built once per version
             
         Returns:
             Dict containing all pattern analysis results
@@ -35,10 +42,11 @@ class UniquePatternAnalyzer:
         
         # Prepare data
         prepared_df = self._prepare_data(df)
+        access_graph = self._build_access_graph(prepared_df, dataset_version)
         
         # Core analyses
         user_patterns = self._analyze_unique_users(prepared_df)
-        device_patterns = self._analyze_unique_devices(prepared_df)
+        device_patterns = self._analyze_unique_devices(prepared_df, access_graph)
         interaction_patterns = self._analyze_user_device_interactions(prepared_df)
         temporal_patterns = self._analyze_temporal_uniqueness(prepared_df)
         access_patterns = self._analyze_access_success_patterns(prepared_df)
@@ -46,7 +54,7 @@ class UniquePatternAnalyzer:
         # Advanced analyses
         behavioral_segments = self._segment_unique_behaviors(prepared_df)
         outlier_detection = self._detect_pattern_outliers(prepared_df)
-        network_analysis = self._analyze_access_networks(prepared_df)
+        network_analysis = self._analyze_access_networks(access_graph)
         
         return {
             'status': 'success',
@@ -87,12 +95,18 @@ class UniquePatternAnalyzer:
         
         return prepared_df
     
+    def _build_access_graph(self, df: pd.DataFrame, dataset_version: Optional[str]) -> Optional[AccessGraph]:
+        """Door-transition graph, cached by the engine per dataset version"""
+        if not all(col in df.columns for col in ['person_id', 'door_id', 'timestamp']):
+            return None
+        return self.graph_engine.graph(df, dataset_version)
+    
     def _analyze_unique_users(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze unique user patterns"""
         if 'person_id' not in df.columns:
             return {'status': 'missing_user_data'}
         
-        user_stats = df.groupby('person_id').agg({
+        user_stats = df.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'door_id': 'nunique',
             'timestamp': ['min', 'max'],
@@ -127,12 +141,13 @@ class UniquePatternAnalyzer:
             'top_users': user_stats.nlargest(10, 'total_events').to_dict('index')
         }
     
-    def _analyze_unique_devices(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_unique_devices(self, df: pd.DataFrame,
+                                access_graph: Optional[AccessGraph] = None) -> Dict[str, Any]:
         """Analyze unique device patterns"""
         if 'door_id' not in df.columns:
             return {'status': 'missing_device_data'}
         
-        device_stats = df.groupby('door_id').agg({
+        device_stats = df.groupby('door_id', observed=True).agg({
             'event_id': 'count',
             'person_id': 'nunique',
             'access_granted': 'mean',
@@ -150,7 +165,7 @@ class UniquePatternAnalyzer:
         security_analysis = self._analyze_device_security_patterns(df, device_stats)
         
         # Floor/location analysis if available
-        location_analysis = self._analyze_device_locations(df)
+        location_analysis = self._analyze_device_locations(df, access_graph)
         
         return {
             'total_unique_devices': len(device_stats),
@@ -172,29 +187,24 @@ class UniquePatternAnalyzer:
         if not all(col in df.columns for col in ['person_id', 'door_id']):
             return {'status': 'missing_interaction_data'}
         
-        # Create interaction matrix
-        interaction_matrix = df.groupby(['person_id', 'door_id']).agg({
-            'event_id': 'count',
-            'access_granted': 'mean',
-            'timestamp': ['min', 'max']
-        }).round(3)
-        
-        interaction_matrix.columns = ['interaction_count', 'success_rate', 'first_interaction', 'last_interaction']
+        # Sparse user x device matrix: memory follows the observed pairs
+        matrix = InteractionMatrix.from_events(df)
+        counts = pd.Series(matrix.counts.data)
         
         # Find unique interaction patterns
-        exclusive_pairs = self._find_exclusive_user_device_pairs(interaction_matrix)
-        access_diversity = self._calculate_access_diversity(df)
-        behavioral_clusters = self._cluster_interaction_behaviors(interaction_matrix)
+        exclusive_pairs = self._find_exclusive_user_device_pairs(matrix)
+        access_diversity = self._calculate_access_diversity(matrix)
+        behavioral_clusters = self._cluster_interaction_behaviors(matrix)
         
         return {
-            'total_unique_interactions': len(interaction_matrix),
+            'total_unique_interactions': matrix.nnz,
             'exclusive_relationships': exclusive_pairs,
             'access_diversity': access_diversity,
             'behavioral_clusters': behavioral_clusters,
             'interaction_statistics': {
-                'mean_interactions_per_pair': interaction_matrix['interaction_count'].mean(),
-                'median_interactions_per_pair': interaction_matrix['interaction_count'].median(),
-                'highly_active_pairs': len(interaction_matrix[interaction_matrix['interaction_count'] > interaction_matrix['interaction_count'].quantile(0.9)])
+                'mean_interactions_per_pair': counts.mean(),
+                'median_interactions_per_pair': counts.median(),
+                'highly_active_pairs': int((counts > counts.quantile(0.9)).sum())
             }
         }
     
@@ -224,11 +234,11 @@ class UniquePatternAnalyzer:
             return {'status': 'missing_access_data'}
         
         # Success/failure patterns by user
-        user_success_patterns = df.groupby('person_id')['access_granted'].agg(['mean', 'count', 'sum'])
+        user_success_patterns = df.groupby('person_id', observed=True)['access_granted'].agg(['mean', 'count', 'sum'])
         user_success_patterns['failure_count'] = user_success_patterns['count'] - user_success_patterns['sum']
         
         # Success/failure patterns by device
-        device_success_patterns = df.groupby('door_id')['access_granted'].agg(['mean', 'count', 'sum'])
+        device_success_patterns = df.groupby('door_id', observed=True)['access_granted'].agg(['mean', 'count', 'sum'])
         device_success_patterns['failure_count'] = device_success_patterns['count'] - device_success_patterns['sum']
         
         # Identify problematic patterns
@@ -382,21 +392,47 @@ class UniquePatternAnalyzer:
         """Analyze security-related device patterns"""
         return {'status': 'analysis_placeholder'}
     
-    def _analyze_device_locations(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_device_locations(self, df: pd.DataFrame,
+                                  access_graph: Optional[AccessGraph] = None) -> Dict[str, Any]:
         """Analyze device location patterns if floor/location data available"""
-        return {'status': 'analysis_placeholder'}
+        if 'floor_number' not in df.columns:
+            return {'status': 'no_location_data'}
+        
+        door_floors = df.groupby('door_id', observed=True)['floor_number'].first()
+        floor_stats = df.groupby('floor_number', observed=True).agg(
+            devices=('door_id', 'nunique'), events=('event_id', 'count'))
+        result = {
+            'floors': len(floor_stats),
+            'floor_statistics': floor_stats.to_dict('index')
+        }
+        
+        if access_graph is not None and access_graph.n_edges:
+            # Transitions whose doors sit on different floors
+            floors = door_floors.reindex(access_graph.doors).to_numpy()
+            coo = access_graph.adjacency.tocoo()
+            known = pd.notna(floors[coo.row]) & pd.notna(floors[coo.col])
+            between = known & (floors[coo.row] != floors[coo.col])
+            connectors = np.bincount(np.r_[coo.row[between], coo.col[between]],
+                                     weights=np.tile(coo.data[between], 2),
+                                     minlength=access_graph.n_doors)
+            top = np.argsort(-connectors, kind='stable')[:5]
+            result['inter_floor_transitions'] = int(coo.data[between].sum())
+            result['inter_floor_share'] = float(coo.data[between].sum() / max(coo.data[known].sum(), 1))
+            result['floor_connectors'] = [access_graph.doors[i] for i in top if connectors[i] > 0]
+        
+        return result
     
-    def _find_exclusive_user_device_pairs(self, interaction_matrix: pd.DataFrame) -> Dict[str, Any]:
+    def _find_exclusive_user_device_pairs(self, matrix: InteractionMatrix) -> Dict[str, Any]:
         """Find exclusive user-device relationships"""
-        return {'status': 'analysis_placeholder'}
+        return matrix.exclusive_pairs()
     
-    def _calculate_access_diversity(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _calculate_access_diversity(self, matrix: InteractionMatrix) -> Dict[str, Any]:
         """Calculate diversity metrics for access patterns"""
-        return {'status': 'analysis_placeholder'}
+        return matrix.diversity()
     
-    def _cluster_interaction_behaviors(self, interaction_matrix: pd.DataFrame) -> Dict[str, Any]:
+    def _cluster_interaction_behaviors(self, matrix: InteractionMatrix) -> Dict[str, Any]:
         """Cluster similar interaction behaviors"""
-        return {'status': 'analysis_placeholder'}
+        return matrix.cluster_users()
     
     def _analyze_hourly_uniqueness(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze unique patterns by hour"""
@@ -422,6 +458,8 @@ class UniquePatternAnalyzer:
         """Detect outliers in access patterns"""
         return {'status': 'analysis_placeholder'}
     
-    def _analyze_access_networks(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_access_networks(self, access_graph: Optional[AccessGraph]) -> Dict[str, Any]:
         """Analyze network relationships in access patterns"""
-        return {'status': 'analysis_placeholder'}
+        if access_graph is None:
+            return {'status': 'missing_network_data'}
+        return access_graph.summary()
@@ -6,13 +6,21 @@ Analyzes user behavior patterns and characteristics in access control data
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 import logging
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 from scipy import stats
 
+from .behavior_clustering import IncrementalBehaviorClustering
+from core.caching import dataframe_fingerprint
+
+from .model_registry import ModelRegistry
+from .prepared_frame import PreparedFrame, prepare_frame
+from .sequence_mining import SequenceMiner
+from .user_profiles import DEFAULT_PAGE_SIZE, UserProfiles, build_user_profiles
+
 @dataclass
 class UserProfile:
     """User behavior profile data structure"""
@@ -23,28 +31,39 @@ class UserProfile:
     patterns: Dict[str, Any]
     anomalies: List[Dict[str, Any]]
 
+# From this many users segmentation switches to incremental MiniBatchKMeans
+INCREMENTAL_CLUSTERING_MIN_USERS = 10_000
+
 class UserBehaviorAnalyzer:
     """Advanced user behavior analysis"""
     
-    def __init__(self):
+    def __init__(self, clustering: str = 'auto',
+                 model_registry: Optional[ModelRegistry] = None):
         self.logger = logging.getLogger(__name__)
-        
-    def analyze_behavior(self, df: pd.DataFrame) -> Dict[str, Any]:
+        # 'batch' refits KMeans per call, 'incremental' updates stored centroids
+        self.clustering = clustering
+        self.incremental_clustering = IncrementalBehaviorClustering(model_registry)
+        self.sequence_miner = SequenceMiner()
+        # Profiles of the last dataset and the version they were built for
+        self._user_profiles: Tuple[Optional[str], Optional[UserProfiles]] = (None, None)
+        
+    def analyze_behavior(self, df: Union[pd.DataFrame, PreparedFrame]) -> Dict[str, Any]:
         """Main analysis function for user behavior"""
         try:
             if df.empty:
                 return self._empty_result()
             
             df = self._prepare_data(df)
+            profiles = self._create_user_profiles(df)
             
             behavior = {
-                'user_profiles': self._create_user_profiles(df),
+                'user_profiles': profiles.page(),
                 'behavior_clustering': self._perform_behavior_clustering(df),
                 'access_patterns': self._analyze_access_patterns(df),
                 'temporal_behavior': self._analyze_temporal_behavior(df),
                 'location_preferences': self._analyze_location_preferences(df),
-                'behavioral_anomalies': self._detect_behavioral_anomalies(df),
-                'user_segments': self._segment_users(df),
+                'behavioral_anomalies': self._detect_behavioral_anomalies(df, profiles),
+                'user_segments': self._segment_users(df, profiles),
                 'behavior_summary': self._generate_behavior_summary(df)
             }
             
@@ -54,99 +73,35 @@ class UserBehaviorAnalyzer:
             self.logger.error(f"User behavior analysis failed: {e}")
             return self._empty_result()
     
-    def _prepare_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def get_user_profiles(self, df: Union[pd.DataFrame, PreparedFrame],
+                          dataset_version: Optional[str] = None) -> Optional[UserProfiles]:
+        """Lazy profiles of every user, or None without events
+
+        ``analyze_behavior`` reports only the first page of summary rows;
+        use this to page further or open individual profiles. Profiles are
+        kept for the last dataset, identified by ``dataset_version`` or a
+        fingerprint of the events, so paging through them never rebuilds.
+        """
+        if df.empty:
+            return None
+        key = str(dataset_version) if dataset_version is not None else dataframe_fingerprint(
+            df.source if isinstance(df, PreparedFrame) else df)
+        if key != self._user_profiles[0]:
+            self._user_profiles = (key, self._create_user_profiles(self._prepare_data(df)))
+        return self._user_profiles[1]
+    
+    def _prepare_data(self, df: Union[pd.DataFrame, PreparedFrame]) -> pd.DataFrame:
         """Prepare and validate data for behavior analysis"""
-        df = df.copy()
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['date'] = df['timestamp'].dt.date
-        df['hour'] = df['timestamp'].dt.hour
-        df['day_of_week'] = df['timestamp'].dt.day_name()
-        df['is_weekend'] = df['timestamp'].dt.weekday >= 5
-        df['is_business_hours'] = (df['hour'] >= 8) & (df['hour'] <= 18)
-        df['month'] = df['timestamp'].dt.month
-        df['week'] = df['timestamp'].dt.isocalendar().week
-        return df
+        return prepare_frame(df).view()
     
-    def _create_user_profiles(self, df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
-        """Create comprehensive user behavior profiles"""
-        user_profiles = {}
-        
-        for user_id in df['person_id'].unique():
-            user_data = df[df['person_id'] == user_id]
-            profile = self._build_individual_profile(user_id, user_data, df)
-            user_profiles[user_id] = profile
+    def _create_user_profiles(self, df: pd.DataFrame) -> UserProfiles:
+        """Create user behavior profiles
         
-        return user_profiles
-    
-    def _build_individual_profile(self, user_id: str, user_data: pd.DataFrame, 
-                                  full_df: pd.DataFrame) -> Dict[str, Any]:
-        """Build detailed profile for individual user"""
-        
-        # Basic statistics
-        total_events = len(user_data)
-        unique_doors = user_data['door_id'].nunique()
-        success_rate = (user_data['access_result'] == 'Granted').mean() * 100
-        
-        # Time span analysis
-        first_access = user_data['timestamp'].min()
-        last_access = user_data['timestamp'].max()
-        activity_span = (last_access - first_access).days
-        
-        # Behavioral characteristics
-        preferred_hours = user_data['hour'].mode().tolist()
-        preferred_days = user_data['day_of_week'].mode().tolist()
-        after_hours_events = len(user_data[~user_data['is_business_hours']])
-        weekend_events = len(user_data[user_data['is_weekend']])
-        
-        # Activity patterns
-        daily_activity = user_data.groupby('date')['event_id'].count()
-        activity_consistency = 1 - (daily_activity.std() / daily_activity.mean()) if daily_activity.mean() > 0 else 0
-        
-        # Door usage patterns
-        door_distribution = user_data['door_id'].value_counts()
-        door_concentration = self._calculate_concentration_index(door_distribution.values)
-        
-        # Failure analysis
-        failed_attempts = user_data[user_data['access_result'] == 'Denied']
-        failure_pattern = self._analyze_user_failures(failed_attempts)
-        
-        # Risk scoring
-        risk_score = self._calculate_user_risk_score(user_data, full_df)
-        
-        # Behavior classification
-        behavior_type = self._classify_user_behavior(user_data, full_df)
-        
-        return {
-            'basic_stats': {
-                'total_events': total_events,
-                'unique_doors_accessed': unique_doors,
-                'success_rate': success_rate,
-                'activity_span_days': activity_span,
-                'avg_daily_events': total_events / max(activity_span, 1)
-            },
-            'temporal_patterns': {
-                'preferred_hours': preferred_hours,
-                'preferred_days': preferred_days,
-                'after_hours_events': after_hours_events,
-                'weekend_events': weekend_events,
-                'activity_consistency': activity_consistency
-            },
-            'location_patterns': {
-                'door_distribution': door_distribution.to_dict(),
-                'door_concentration_index': door_concentration,
-                'primary_doors': door_distribution.head(3).index.tolist()
-            },
-            'failure_analysis': failure_pattern,
-            'risk_assessment': {
-                'risk_score': risk_score,
-                'risk_level': self._categorize_risk(risk_score)
-            },
-            'behavior_classification': {
-                'type': behavior_type,
-                'confidence': self._calculate_classification_confidence(user_data)
-            },
-            'anomalies': self._detect_user_anomalies(user_data, full_df)
-        }
+        Statistics for all users are computed in one pass; each user's full
+        profile dict is built when it is first looked up. Use ``page`` on the
+        result to list users without building their profiles.
+        """
+        return build_user_profiles(df)
     
     def _perform_behavior_clustering(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Perform clustering analysis on user behaviors"""
@@ -157,37 +112,50 @@ class UserBehaviorAnalyzer:
         if len(user_features) < 3:
             return {'clusters': {}, 'cluster_count': 0, 'silhouette_score': 0}
         
-        # Standardize features
-        scaler = StandardScaler()
-        features_scaled = scaler.fit_transform(user_features.values)
+        mode = self.clustering
+        if mode == 'auto':
+            mode = 'incremental' if len(user_features) >= INCREMENTAL_CLUSTERING_MIN_USERS else 'batch'
         
-        # Determine optimal number of clusters
-        optimal_clusters = min(5, max(2, len(user_features) // 3))
-        
-        # Perform clustering
-        kmeans = KMeans(n_clusters=optimal_clusters, random_state=42, n_init=10)
-        cluster_labels = kmeans.fit_predict(features_scaled)
+        if mode == 'incremental':
+            cluster_labels = self.incremental_clustering.fit_predict(user_features)
+            centroids = self.incremental_clustering.centroids
+        else:
+            # Standardize features
+            scaler = StandardScaler()
+            features_scaled = scaler.fit_transform(user_features.values)
+            
+            # Determine optimal number of clusters
+            optimal_clusters = min(5, max(2, len(user_features) // 3))
+            
+            # Perform clustering
+            kmeans = KMeans(n_clusters=optimal_clusters, random_state=42, n_init=10)
+            cluster_labels = kmeans.fit_predict(features_scaled)
+            centroids = kmeans.cluster_centers_
         
         # Analyze clusters
         user_features['cluster'] = cluster_labels
         cluster_analysis = self._analyze_clusters(user_features, df)
         
         return {
-            'cluster_count': optimal_clusters,
+            'mode': mode,
+            'cluster_count': len(centroids),
             'cluster_analysis': cluster_analysis,
-            'cluster_centroids': kmeans.cluster_centers_.tolist(),
+            'cluster_centroids': centroids.tolist(),
             'user_cluster_assignments': user_features[['cluster']].to_dict()
         }
     
     def _extract_user_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Extract features for clustering analysis"""
-        user_features = df.groupby('person_id').agg({
+        columns = ['person_id', 'event_id', 'door_id', 'hour', 'is_weekend', 'is_business_hours']
+        user_features = df[columns].assign(
+            access_result=df['access_result'] == 'Granted'
+        ).groupby('person_id', observed=True).agg({
             'event_id': 'count',  # Total activity
             'door_id': 'nunique',  # Door diversity
-            'hour': lambda x: x.std(),  # Time consistency
+            'hour': 'std',  # Time consistency
             'is_weekend': 'mean',  # Weekend activity rate
             'is_business_hours': 'mean',  # Business hours rate
-            'access_result': lambda x: (x == 'Granted').mean()  # Success rate
+            'access_result': 'mean'  # Success rate
         })
         
         user_features.columns = [
@@ -204,22 +172,21 @@ class UserBehaviorAnalyzer:
     def _analyze_access_patterns(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze detailed access patterns"""
         
-        # Sequential access analysis
-        df_sorted = df.sort_values(['person_id', 'timestamp'])
-        df_sorted['time_diff'] = df_sorted.groupby('person_id')['timestamp'].diff()
-        
         # Access frequency patterns
-        user_frequencies = df.groupby('person_id').agg({
+        user_frequencies = df.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'timestamp': lambda x: (x.max() - x.min()).days
         })
         user_frequencies['frequency'] = user_frequencies['event_id'] / (user_frequencies['timestamp'] + 1)
         
-        # Common access sequences
-        access_sequences = self._identify_access_sequences(df_sorted)
+        # Sessions of all users (30-minute gaps) for sequence mining
+        sequences = self.sequence_miner.sessionise(df)
+        
+        # Common and rare access sequences
+        access_sequences = self.sequence_miner.summarize(sequences)
         
         # Multi-door sessions
-        multi_door_sessions = self._analyze_multi_door_sessions(df_sorted)
+        multi_door_sessions = self.sequence_miner.multi_door_sessions(sequences)
         
         return {
             'frequency_distribution': user_frequencies['frequency'].describe().to_dict(),
@@ -242,7 +209,7 @@ class UserBehaviorAnalyzer:
             peak_hours = hour_distribution.nlargest(3).index.tolist()
             
             # Day patterns
-            day_distribution = user_data['day_of_week'].value_counts()
+            day_distribution = user_data['day_of_week'].value_counts().loc[lambda counts: counts > 0]
             preferred_days = day_distribution.nlargest(2).index.tolist()
             
             # Regularity analysis
@@ -275,7 +242,7 @@ class UserBehaviorAnalyzer:
             user_data = df[df['person_id'] == user_id]
             
             # Door preferences
-            door_counts = user_data['door_id'].value_counts()
+            door_counts = user_data['door_id'].value_counts().loc[lambda counts: counts > 0]
             primary_door = door_counts.index[0] if len(door_counts) > 0 else None
             door_diversity = len(door_counts)
             
@@ -308,7 +275,8 @@ class UserBehaviorAnalyzer:
             'mobility_distribution': pd.Series(mobility_scores).describe().to_dict()
         }
     
-    def _detect_behavioral_anomalies(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _detect_behavioral_anomalies(self, df: pd.DataFrame,
+                                     profiles: Optional[UserProfiles] = None) -> Dict[str, Any]:
         """Detect behavioral anomalies using statistical methods"""
         
         anomalies = {
@@ -319,11 +287,8 @@ class UserBehaviorAnalyzer:
         }
         
         # User-level anomalies
-        for user_id in df['person_id'].unique():
-            user_data = df[df['person_id'] == user_id]
-            user_anomalies = self._detect_user_anomalies(user_data, df)
-            if user_anomalies:
-                anomalies['user_anomalies'][user_id] = user_anomalies
+        profiles = profiles if profiles is not None else self._create_user_profiles(df)
+        anomalies['user_anomalies'] = profiles.users_with_anomalies()
         
         # Temporal anomalies (unusual time patterns)
         temporal_anomalies = self._detect_temporal_anomalies(df)
@@ -335,7 +300,8 @@ class UserBehaviorAnalyzer:
         
         return anomalies
     
-    def _segment_users(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _segment_users(self, df: pd.DataFrame,
+                       profiles: Optional[UserProfiles] = None) -> Dict[str, Any]:
         """Segment users based on behavior patterns"""
         
         segments = {
@@ -346,7 +312,7 @@ class UserBehaviorAnalyzer:
             'security_risks': []
         }
         
-        user_stats = df.groupby('person_id').agg({
+        user_stats = df.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'door_id': 'nunique',
             'access_result': lambda x: (x == 'Granted').mean(),
@@ -357,9 +323,10 @@ class UserBehaviorAnalyzer:
         high_activity_threshold = user_stats['event_id'].quantile(0.8)
         low_activity_threshold = user_stats['event_id'].quantile(0.2)
         
+        profiles = profiles if profiles is not None else self._create_user_profiles(df)
+        is_regular = profiles.summary['is_regular']
+        
         for user_id, stats in user_stats.iterrows():
-            user_data = df[df['person_id'] == user_id]
-            
             # Classify user
             if stats['event_id'] >= high_activity_threshold:
                 if stats['access_result'] > 0.9:
@@ -367,7 +334,7 @@ class UserBehaviorAnalyzer:
                 else:
                     segments['security_risks'].append(user_id)
             elif stats['event_id'] >= low_activity_threshold:
-                if self._is_regular_pattern(user_data):
+                if is_regular[user_id]:
                     segments['regular_users'].append(user_id)
                 else:
                     segments['irregular_users'].append(user_id)
@@ -409,15 +376,15 @@ class UserBehaviorAnalyzer:
         overall_success_rate = (df['access_result'] == 'Granted').mean() * 100
         
         # Behavior diversity
-        user_hour_diversity = df.groupby('person_id')['hour'].nunique().mean()
-        user_door_diversity = df.groupby('person_id')['door_id'].nunique().mean()
+        user_hour_diversity = df.groupby('person_id', observed=True)['hour'].nunique().mean()
+        user_door_diversity = df.groupby('person_id', observed=True)['door_id'].nunique().mean()
         
         # Activity patterns
         weekend_users = df[df['is_weekend']]['person_id'].nunique()
         after_hours_users = df[~df['is_business_hours']]['person_id'].nunique()
         
         # Risk indicators
-        high_failure_users = df.groupby('person_id').agg({
+        high_failure_users = df.groupby('person_id', observed=True).agg({
             'access_result': lambda x: (x == 'Denied').sum()
         })
         risky_users = len(high_failure_users[high_failure_users['access_result'] >= 5])
@@ -444,134 +411,6 @@ class UserBehaviorAnalyzer:
         }
     
     # Helper methods
-    def _calculate_concentration_index(self, values: np.ndarray) -> float:
-        """Calculate Herfindahl-Hirschman Index for concentration"""
-        if len(values) == 0:
-            return 0
-        
-        total = values.sum()
-        if total == 0:
-            return 0
-        
-        shares = values / total
-        hhi = np.sum(shares ** 2)
-        return hhi
-    
-    def _analyze_user_failures(self, failed_attempts: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze user-specific failure patterns"""
-        if failed_attempts.empty:
-            return {'total_failures': 0, 'failure_pattern': 'none'}
-        
-        failure_hours = failed_attempts['hour'].value_counts()
-        failure_doors = failed_attempts['door_id'].value_counts()
-        
-        return {
-            'total_failures': len(failed_attempts),
-            'failure_hours': failure_hours.to_dict(),
-            'failure_doors': failure_doors.to_dict(),
-            'failure_concentration': len(failure_doors) == 1  # All failures at one door
-        }
-    
-    def _calculate_user_risk_score(self, user_data: pd.DataFrame, 
-                                   full_df: pd.DataFrame) -> float:
-        """Calculate risk score for user (0-100, higher = more risky)"""
-        
-        risk_score = 0
-        
-        # Failure rate component
-        failure_rate = (user_data['access_result'] == 'Denied').mean()
-        risk_score += failure_rate * 40
-        
-        # After-hours activity component
-        after_hours_rate = (~user_data['is_business_hours']).mean()
-        risk_score += after_hours_rate * 20
-        
-        # Badge issues component
-        if 'badge_status' in user_data.columns:
-            badge_issue_rate = (user_data['badge_status'] != 'Valid').mean()
-            risk_score += badge_issue_rate * 30
-        
-        # Unusual pattern component
-        if self._has_unusual_patterns(user_data, full_df):
-            risk_score += 10
-        
-        return min(100, risk_score)
-    
-    def _classify_user_behavior(self, user_data: pd.DataFrame, 
-                                full_df: pd.DataFrame) -> str:
-        """Classify user behavior type"""
-        
-        total_events = len(user_data)
-        activity_span = (user_data['timestamp'].max() - user_data['timestamp'].min()).days
-        avg_daily = total_events / max(activity_span, 1)
-        
-        # Get percentiles from full dataset
-        all_user_events = full_df.groupby('person_id')['event_id'].count()
-        user_percentile = (all_user_events <= total_events).mean()
-        
-        # Classification logic
-        if user_percentile >= 0.9:
-            return 'power_user'
-        elif user_percentile >= 0.7:
-            if self._is_regular_pattern(user_data):
-                return 'regular_user'
-            else:
-                return 'irregular_user'
-        elif user_percentile >= 0.3:
-            return 'moderate_user'
-        else:
-            return 'occasional_user'
-    
-    def _calculate_classification_confidence(self, user_data: pd.DataFrame) -> float:
-        """Calculate confidence in behavior classification"""
-        
-        # More data = higher confidence
-        data_confidence = min(1.0, len(user_data) / 50)
-        
-        # Pattern consistency = higher confidence
-        daily_counts = user_data.groupby('date')['event_id'].count()
-        if len(daily_counts) > 1:
-            consistency = 1 - (daily_counts.std() / daily_counts.mean())
-            consistency = max(0, min(1, consistency))
-        else:
-            consistency = 0.5
-        
-        return (data_confidence + consistency) / 2
-    
-    def _detect_user_anomalies(self, user_data: pd.DataFrame, 
-                               full_df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Detect anomalies for specific user"""
-        
-        anomalies = []
-        
-        # Unusual time patterns
-        user_hours = user_data['hour'].values
-        typical_hours = full_df['hour'].values
-        
-        # Statistical test for time pattern deviation
-        if len(user_hours) >= 5:
-            _, p_value = stats.ks_2samp(user_hours, typical_hours)
-            if p_value < 0.05:
-                anomalies.append({
-                    'type': 'unusual_time_pattern',
-                    'significance': p_value,
-                    'description': 'User has significantly different time patterns'
-                })
-        
-        # Excessive failures
-        failure_rate = (user_data['access_result'] == 'Denied').mean()
-        overall_failure_rate = (full_df['access_result'] == 'Denied').mean()
-        
-        if failure_rate > overall_failure_rate * 3 and failure_rate > 0.1:
-            anomalies.append({
-                'type': 'high_failure_rate',
-                'user_rate': failure_rate,
-                'system_rate': overall_failure_rate,
-                'description': f'User failure rate ({failure_rate:.1%}) is {failure_rate/overall_failure_rate:.1f}x system average'
-            })
-        
-        return anomalies
-    
     def _analyze_clusters(self, user_features: pd.DataFrame, 
                           df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze the characteristics of each cluster"""
@@ -580,7 +419,6 @@ class UserBehaviorAnalyzer:
         
         for cluster_id in user_features['cluster'].unique():
             cluster_users = user_features[user_features['cluster'] == cluster_id].index
-            cluster_data = df[df['person_id'].isin(cluster_users)]
             
             # Cluster characteristics
             cluster_features = user_features[user_features['cluster'] == cluster_id]
@@ -628,71 +466,6 @@ class UserBehaviorAnalyzer:
         
         return f"{activity_level} users with {timing} and {success_level}"
     
-    def _identify_access_sequences(self, df_sorted: pd.DataFrame) -> Dict[str, Any]:
-        """Identify common access sequences"""
-        
-        sequences = {}
-        
-        # Look for door sequences within short time windows
-        for user_id in df_sorted['person_id'].unique():
-            user_data = df_sorted[df_sorted['person_id'] == user_id].copy()
-            user_data['time_diff'] = user_data['timestamp'].diff()
-            
-            # Group events within 30 minutes as potential sequences
-            user_data['session'] = (user_data['time_diff'] > pd.Timedelta(minutes=30)).cumsum()
-            
-            for session_id in user_data['session'].unique():
-                session_data = user_data[user_data['session'] == session_id]
-                if len(session_data) > 1:
-                    door_sequence = tuple(session_data['door_id'].values)
-                    if door_sequence not in sequences:
-                        sequences[door_sequence] = 0
-                    sequences[door_sequence] += 1
-        
-        # Return most common sequences
-        common_sequences = sorted(sequences.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        return {
-            'common_sequences': common_sequences,
-            'total_sequences': len(sequences),
-            'sequence_diversity': len(sequences) / max(sum(sequences.values()), 1)
-        }
-    
-    def _analyze_multi_door_sessions(self, df_sorted: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze sessions involving multiple doors"""
-        
-        multi_door_sessions = []
-        
-        for user_id in df_sorted['person_id'].unique():
-            user_data = df_sorted[df_sorted['person_id'] == user_id].copy()
-            user_data['time_diff'] = user_data['timestamp'].diff()
-            
-            # Define sessions (gaps > 30 minutes start new session)
-            user_data['session'] = (user_data['time_diff'] > pd.Timedelta(minutes=30)).cumsum()
-            
-            session_stats = user_data.groupby('session').agg({
-                'door_id': 'nunique',
-                'event_id': 'count',
-                'timestamp': ['min', 'max']
-            })
-            
-            # Focus on multi-door sessions
-            multi_door = session_stats[session_stats[('door_id', 'nunique')] > 1]
-            multi_door_sessions.extend(multi_door.values.tolist())
-        
-        if multi_door_sessions:
-            avg_doors_per_session = np.mean([session[0] for session in multi_door_sessions])
-            avg_events_per_session = np.mean([session[1] for session in multi_door_sessions])
-        else:
-            avg_doors_per_session = 0
-            avg_events_per_session = 0
-        
-        return {
-            'total_multi_door_sessions': len(multi_door_sessions),
-            'avg_doors_per_session': avg_doors_per_session,
-            'avg_events_per_session': avg_events_per_session
-        }
-    
     def _measure_pattern_consistency(self, df: pd.DataFrame) -> Dict[str, float]:
         """Measure how consistent user patterns are"""
         
@@ -788,7 +561,7 @@ class UserBehaviorAnalyzer:
         
         # Rapid successive attempts
         df_sorted = df.sort_values(['person_id', 'timestamp'])
-        df_sorted['time_diff'] = df_sorted.groupby('person_id')['timestamp'].diff()
+        df_sorted['time_diff'] = df_sorted.groupby('person_id', observed=True)['timestamp'].diff()
         
         rapid_attempts = df_sorted[df_sorted['time_diff'] < pd.Timedelta(minutes=1)]
         
@@ -802,52 +575,6 @@ class UserBehaviorAnalyzer:
         
         return anomalies
     
-    def _categorize_risk(self, risk_score: float) -> str:
-        """Categorize risk level based on score"""
-        if risk_score >= 70:
-            return 'high'
-        elif risk_score >= 40:
-            return 'medium'
-        elif risk_score >= 20:
-            return 'low'
-        else:
-            return 'minimal'
-    
-    def _has_unusual_patterns(self, user_data: pd.DataFrame, 
-                              full_df: pd.DataFrame) -> bool:
-        """Check if user has unusual patterns compared to population"""
-        
-        # Simple heuristic checks
-        user_after_hours_rate = (~user_data['is_business_hours']).mean()
-        system_after_hours_rate = (~full_df['is_business_hours']).mean()
-        
-        user_weekend_rate = user_data['is_weekend'].mean()
-        system_weekend_rate = full_df['is_weekend'].mean()
-        
-        # Consider unusual if rates are significantly higher than system average
-        return (user_after_hours_rate > system_after_hours_rate * 3 or
-                user_weekend_rate > system_weekend_rate * 3)
-    
-    def _is_regular_pattern(self, user_data: pd.DataFrame) -> bool:
-        """Check if user has regular access patterns"""
-        
-        if len(user_data) < 3:
-            return False
-        
-        # Check time consistency
-        hour_std = user_data['hour'].std()
-        time_regular = hour_std < 4  # Within 4-hour standard deviation
-        
-        # Check frequency consistency
-        daily_counts = user_data.groupby('date')['event_id'].count()
-        if len(daily_counts) > 1:
-            freq_cv = daily_counts.std() / daily_counts.mean()
-            freq_regular = freq_cv < 1  # Coefficient of variation < 1
-        else:
-            freq_regular = True
-        
-        return time_regular and freq_regular
-    
     def _summarize_segmentation(self, segment_stats: Dict[str, Dict]) -> Dict[str, Any]:
         """Summarize user segmentation results"""
         
@@ -896,7 +623,7 @@ class UserBehaviorAnalyzer:
         total_users = df['person_id'].nunique()
         
         # Activity level insight
-        user_events = df.groupby('person_id')['event_id'].count()
+        user_events = df.groupby('person_id', observed=True)['event_id'].count()
         high_activity_users = len(user_events[user_events > user_events.quantile(0.8)])
         insights.append(f"{high_activity_users} users ({high_activity_users/total_users*100:.1f}%) are high-activity users")
         
@@ -906,7 +633,7 @@ class UserBehaviorAnalyzer:
             insights.append(f"Significant after-hours activity: {after_hours_users} users")
         
         # Success rate insight
-        user_success_rates = df.groupby('person_id').agg({
+        user_success_rates = df.groupby('person_id', observed=True).agg({
             'access_result': lambda x: (x == 'Granted').mean()
         })['access_result']
         
@@ -915,7 +642,7 @@ class UserBehaviorAnalyzer:
             insights.append(f"{low_success_users} users have success rates below 80%")
         
         # Door diversity insight
-        user_door_diversity = df.groupby('person_id')['door_id'].nunique()
+        user_door_diversity = df.groupby('person_id', observed=True)['door_id'].nunique()
         high_mobility_users = len(user_door_diversity[user_door_diversity > 5])
         if high_mobility_users > 0:
             insights.append(f"{high_mobility_users} users access more than 5 different doors")
@@ -925,7 +652,10 @@ class UserBehaviorAnalyzer:
     def _empty_result(self) -> Dict[str, Any]:
         """Return empty result structure"""
         return {
-            'user_profiles': {},
+            'user_profiles': {
+                'page': 1, 'page_size': DEFAULT_PAGE_SIZE,
+                'total_users': 0, 'total_pages': 0, 'users': []
+            },
             'behavior_clustering': {'clusters': {}, 'cluster_count': 0},
             'access_patterns': {'frequency_distribution': {}},
             'temporal_behavior': {'individual_patterns': {}},
@@ -936,9 +666,10 @@ class UserBehaviorAnalyzer:
         }
 
 # Factory function
-def create_behavior_analyzer() -> UserBehaviorAnalyzer:
+def create_behavior_analyzer(clustering: str = 'auto',
+                             model_registry: Optional[ModelRegistry] = None) -> UserBehaviorAnalyzer:
     """Create user behavior analyzer instance"""
-    return UserBehaviorAnalyzer()
+    return UserBehaviorAnalyzer(clustering, model_registry)
 
 # Export
 __all__ = ['UserBehaviorAnalyzer', 'UserProfile', 'create_behavior_analyzer']
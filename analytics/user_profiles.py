@@ -0,0 +1,314 @@
+"""
+User Profiles Module
+Columnar behaviour profiles for all users with on-demand detail
+"""
+
+import pandas as pd
+import numpy as np
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator
+import logging
+from scipy import stats
+
+from .prepared_frame import DAY_NAMES
+
+DEFAULT_PAGE_SIZE = 50
+# Users whose hour distribution differs from everyone's at this level are flagged
+KS_ALPHA = 0.05
+# scipy's ks_2samp switches from the exact to the asymptotic p-value here
+KS_EXACT_MAX_N = 10_000
+HOURS = np.arange(24)
+
+# Columns returned for each user by ``UserProfiles.page``
+SUMMARY_COLUMNS = [
+    'total_events', 'unique_doors', 'success_rate', 'activity_span_days',
+    'after_hours_events', 'weekend_events', 'total_failures',
+    'door_concentration_index', 'risk_score', 'risk_level', 'behavior_type',
+]
+
+class UserProfiles(Mapping):
+    """Behaviour profiles of every user, computed with one groupby per table
+
+    ``summary`` holds one row of statistics per user. Indexing by user id
+    builds the full profile dict from the pre-aggregated count tables and
+    caches it, so only the users a caller opens are ever materialised.
+    ``page`` lists summary rows without building any profile.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.logger = logging.getLogger(__name__)
+        self._profiles: Dict[Any, Dict[str, Any]] = {}
+        self._build(df)
+
+    def __getitem__(self, user_id: Any) -> Dict[str, Any]:
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            if user_id not in self.summary.index:
+                raise KeyError(user_id)
+            profile = self._profiles[user_id] = self._materialise(user_id)
+        return profile
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.summary.index)
+
+    def __len__(self) -> int:
+        return len(self.summary)
+
+    def __contains__(self, user_id: Any) -> bool:
+        return user_id in self.summary.index
+
+    def page(self, number: int = 1, size: int = DEFAULT_PAGE_SIZE,
+             sort_by: str = 'risk_score', ascending: bool = False) -> Dict[str, Any]:
+        """One page of per-user summary rows, without building profiles"""
+        ordered = self.summary.sort_values(sort_by, ascending=ascending, kind='stable')
+        start = (max(number, 1) - 1) * size
+        rows = ordered.iloc[start:start + size][SUMMARY_COLUMNS]
+        return {
+            'page': max(number, 1),
+            'page_size': size,
+            'total_users': len(ordered),
+            'total_pages': -(-len(ordered) // size) if size else 0,
+            'users': [{'user_id': user_id, **row} for user_id, row in
+                      zip(rows.index, rows.to_dict('records'))],
+        }
+
+    def anomalies(self, user_id: Any) -> List[Dict[str, Any]]:
+        """Time pattern and failure rate anomalies for one user"""
+        row = self.summary.loc[user_id]
+        return self._anomalies(user_id, row['unusual_hours'], row['failure_rate'])
+
+    def users_with_anomalies(self) -> Dict[Any, List[Dict[str, Any]]]:
+        """Anomalies of every user that has any"""
+        summary = self.summary
+        high_failure = ((summary['failure_rate'] > self.overall_failure_rate * 3)
+                        & (summary['failure_rate'] > 0.1))
+        flagged = summary[summary['unusual_hours'] | high_failure]
+        return {
+            user_id: self._anomalies(user_id, unusual_hours, failure_rate)
+            for user_id, unusual_hours, failure_rate in zip(
+                flagged.index, flagged['unusual_hours'], flagged['failure_rate']
+            )
+        }
+
+    def _anomalies(self, user_id: Any, unusual_hours: bool,
+                   failure_rate: float) -> List[Dict[str, Any]]:
+        anomalies = []
+
+        if unusual_hours:
+            anomalies.append({
+                'type': 'unusual_time_pattern',
+                'significance': float(self._hour_pvalues[user_id]),
+                'description': 'User has significantly different time patterns'
+            })
+
+        overall = self.overall_failure_rate
+        if failure_rate > overall * 3 and failure_rate > 0.1:
+            anomalies.append({
+                'type': 'high_failure_rate',
+                'user_rate': float(failure_rate),
+                'system_rate': overall,
+                'description': f'User failure rate ({failure_rate:.1%}) is {failure_rate/overall:.1f}x system average'
+            })
+
+        return anomalies
+
+    def _build(self, df: pd.DataFrame) -> None:
+        person = df['person_id']
+        work = pd.DataFrame({
+            'person_id': person,
+            'granted': (df['access_result'] == 'Granted').to_numpy(),
+            'denied': (df['access_result'] == 'Denied').to_numpy(),
+            'after_hours': ~df['is_business_hours'].to_numpy(dtype=bool),
+            'weekend': df['is_weekend'].to_numpy(dtype=bool),
+            'hour': df['hour'].to_numpy(),
+            'timestamp': df['timestamp'],
+        })
+        aggregations = {
+            'total_events': ('hour', 'size'),
+            'success_rate': ('granted', 'mean'),
+            'failure_rate': ('denied', 'mean'),
+            'total_failures': ('denied', 'sum'),
+            'after_hours_events': ('after_hours', 'sum'),
+            'after_hours_rate': ('after_hours', 'mean'),
+            'weekend_events': ('weekend', 'sum'),
+            'weekend_rate': ('weekend', 'mean'),
+            'hour_std': ('hour', 'std'),
+            'first_access': ('timestamp', 'min'),
+            'last_access': ('timestamp', 'max'),
+        }
+        if 'badge_status' in df.columns:
+            work['badge_issue'] = (df['badge_status'] != 'Valid').to_numpy()
+            aggregations['badge_issue_rate'] = ('badge_issue', 'mean')
+
+        summary = work.groupby('person_id', sort=False, observed=True).agg(**aggregations)
+        users = summary.index
+        summary['success_rate'] *= 100
+        summary['activity_span_days'] = (summary['last_access'] - summary['first_access']).dt.days
+        summary['avg_daily_events'] = summary['total_events'] / summary['activity_span_days'].clip(lower=1)
+
+        # Count tables kept for building individual profiles
+        self._door_counts = self._pair_counts(df, 'door_id')
+        denied = df[work['denied'].to_numpy()]
+        self._failure_hours = self._pair_counts(denied, 'hour')
+        self._failure_doors = self._pair_counts(denied, 'door_id')
+        self._hour_counts = (work.groupby(['person_id', 'hour'], observed=True).size()
+                             .unstack(fill_value=0).reindex(index=users, columns=HOURS, fill_value=0))
+        self._day_counts = (df.groupby([person, df['day_of_week']], observed=True).size()
+                            .unstack(fill_value=0).reindex(index=users, columns=DAY_NAMES, fill_value=0))
+
+        # Door concentration (Herfindahl-Hirschman index) per user
+        door_shares = self._door_counts / self._door_counts.groupby(level=0, observed=True).transform('sum')
+        door_groups = (door_shares ** 2).groupby(level=0, observed=True)
+        summary['unique_doors'] = door_groups.size().reindex(users, fill_value=0)
+        summary['door_concentration_index'] = door_groups.sum().reindex(users, fill_value=0)
+
+        # Daily activity consistency
+        daily = (df.groupby([person, df['date']], observed=True).size()
+                 .groupby(level=0, observed=True).agg(['mean', 'std', 'size']).reindex(users))
+        daily_cv = daily['std'] / daily['mean']
+        summary['activity_consistency'] = (1 - daily_cv).where(daily['mean'] > 0, 0)
+        summary['classification_confidence'] = (
+            (summary['total_events'] / 50).clip(upper=1.0)
+            + np.where(daily['size'] > 1, (1 - daily_cv).clip(0, 1), 0.5)
+        ) / 2
+
+        # Population rates every user is compared against
+        self.overall_failure_rate = float(work['denied'].mean())
+        system_after_hours_rate = work['after_hours'].mean()
+        system_weekend_rate = work['weekend'].mean()
+
+        unusual = ((summary['after_hours_rate'] > system_after_hours_rate * 3)
+                   | (summary['weekend_rate'] > system_weekend_rate * 3))
+        risk_score = summary['failure_rate'] * 40 + summary['after_hours_rate'] * 20 + unusual * 10
+        if 'badge_issue_rate' in summary.columns:
+            risk_score += summary['badge_issue_rate'] * 30
+        summary['risk_score'] = risk_score.clip(upper=100)
+        summary['risk_level'] = np.select(
+            [summary['risk_score'] >= 70, summary['risk_score'] >= 40, summary['risk_score'] >= 20],
+            ['high', 'medium', 'low'], 'minimal'
+        )
+
+        totals = summary['total_events'].to_numpy()
+        percentile = np.searchsorted(np.sort(totals), totals, side='right') / len(totals)
+        summary['is_regular'] = ((summary['total_events'] >= 3) & (summary['hour_std'] < 4)
+                                 & ((daily['size'] <= 1) | (daily_cv < 1)))
+        regular = summary['is_regular'].to_numpy()
+        summary['behavior_type'] = np.select(
+            [percentile >= 0.9, (percentile >= 0.7) & regular, percentile >= 0.7, percentile >= 0.3],
+            ['power_user', 'regular_user', 'irregular_user', 'moderate_user'], 'occasional_user'
+        )
+
+        self._hour_pvalues = self._unusual_hour_pvalues(users, work['hour'].to_numpy(), totals)
+        summary['unusual_hours'] = users.isin(self._hour_pvalues.index)
+        self.summary = summary
+
+    def _pair_counts(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """Event counts per (user, ``column``) pair, grouped by user"""
+        counts = df.groupby(['person_id', column], sort=False, observed=True).size()
+        return counts.sort_index(level=0, sort_remaining=False)
+
+    def _unusual_hour_pvalues(self, users: pd.Index, hours: np.ndarray,
+                              totals: np.ndarray) -> pd.Series:
+        """KS p-values of users whose hours differ from everyone's at ``KS_ALPHA``
+
+        Hours take 24 values, so the two-sample statistic comes from
+        cumulative hour histograms instead of sorting every user's events
+        against the whole population. P-values follow ``stats.ks_2samp``'s
+        default method; for large populations only users past the critical
+        statistic of their sample size get an exact p-value.
+        """
+        counts = self._hour_counts.to_numpy()
+        tested = totals >= 5
+        population = np.bincount(hours.astype(np.int64), minlength=24)
+        n_population = len(hours)
+
+        if n_population > KS_EXACT_MAX_N:
+            user_cdf = counts.cumsum(axis=1) / totals[:, None]
+            statistic = np.abs(user_cdf - population.cumsum() / n_population).max(axis=1)
+            en = np.round(n_population * totals / (n_population + totals))
+            sizes, size_index = np.unique(en, return_inverse=True)
+            critical = stats.kstwo.isf(KS_ALPHA, sizes)[size_index]
+            candidates = np.flatnonzero(tested & (statistic >= critical * (1 - 1e-9)))
+            # Many users share a (statistic, size) pair; evaluate each once
+            pairs, pair_index = np.unique(
+                np.column_stack([statistic[candidates], en[candidates]]), axis=0, return_inverse=True
+            )
+            pair_pvalues = stats.kstwo.sf(pairs[:, 0], pairs[:, 1]) if len(pairs) else pairs[:, 0]
+            pvalues = np.clip(pair_pvalues[pair_index.ravel()], 0, 1)
+        else:
+            population_hours = np.repeat(HOURS, population)
+            candidates = np.flatnonzero(tested)
+            pvalues = np.array([
+                stats.ks_2samp(np.repeat(HOURS, counts[i]), population_hours).pvalue
+                for i in candidates
+            ])
+
+        significant = pvalues < KS_ALPHA
+        return pd.Series(pvalues[significant], index=users[candidates[significant]])
+
+    def _materialise(self, user_id: Any) -> Dict[str, Any]:
+        """Full profile dict for one user from the summary and count tables"""
+        row = self.summary.loc[user_id]
+        hour_counts = self._hour_counts.loc[user_id]
+        day_counts = self._day_counts.loc[user_id]
+        door_distribution = self._counts_for(self._door_counts, user_id)
+
+        if row['total_failures']:
+            failure_doors = self._counts_for(self._failure_doors, user_id)
+            failure_analysis = {
+                'total_failures': int(row['total_failures']),
+                'failure_hours': self._counts_for(self._failure_hours, user_id).to_dict(),
+                'failure_doors': failure_doors.to_dict(),
+                'failure_concentration': len(failure_doors) == 1
+            }
+        else:
+            failure_analysis = {'total_failures': 0, 'failure_pattern': 'none'}
+
+        return {
+            'basic_stats': {
+                'total_events': int(row['total_events']),
+                'unique_doors_accessed': int(row['unique_doors']),
+                'success_rate': float(row['success_rate']),
+                'activity_span_days': int(row['activity_span_days']),
+                'avg_daily_events': float(row['avg_daily_events'])
+            },
+            'temporal_patterns': {
+                'preferred_hours': hour_counts.index[hour_counts == hour_counts.max()].tolist(),
+                'preferred_days': day_counts.index[day_counts == day_counts.max()].tolist(),
+                'after_hours_events': int(row['after_hours_events']),
+                'weekend_events': int(row['weekend_events']),
+                'activity_consistency': float(row['activity_consistency'])
+            },
+            'location_patterns': {
+                'door_distribution': door_distribution.to_dict(),
+                'door_concentration_index': float(row['door_concentration_index']),
+                'primary_doors': door_distribution.head(3).index.tolist()
+            },
+            'failure_analysis': failure_analysis,
+            'risk_assessment': {
+                'risk_score': float(row['risk_score']),
+                'risk_level': row['risk_level']
+            },
+            'behavior_classification': {
+                'type': row['behavior_type'],
+                'confidence': float(row['classification_confidence'])
+            },
+            'anomalies': self.anomalies(user_id)
+        }
+
+    def _counts_for(self, counts: pd.Series, user_id: Any) -> pd.Series:
+        """One user's counts from a pair table, most frequent first"""
+        try:
+            user_counts = counts.xs(user_id, level=0)
+        except KeyError:
+            return pd.Series(dtype='int64')
+        user_counts.index = list(user_counts.index)
+        return user_counts.sort_values(ascending=False, kind='stable')
+
+# Factory function
+def build_user_profiles(df: pd.DataFrame) -> UserProfiles:
+    """Build profiles for every user in a prepared frame"""
+    return UserProfiles(df)
+
+# Export for compatibility
+__all__ = ['UserProfiles', 'build_user_profiles']
@@ -108,6 +108,13 @@ def _create_navbar() -> dbc.Navbar:
                                                     active="exact"
                                                 )
                                             ),
+                                            dbc.NavItem(
+                                                dbc.NavLink(
+                                                    "Co-presence",
+                                                    href="/copresence",
+                                                    active="exact"
+                                                )
+                                            ),
                                         ],
                                         pills=True,
                                     )
@@ -248,6 +255,20 @@ def _get_upload_page() -> Any:
         )
 
 
+def _get_copresence_page() -> Any:
+    """Get co-presence drill-down page"""
+    try:
+        from pages.copresence import layout
+        return layout()
+    except ImportError as e:
+        logger.error(f"Co-presence page import failed: {e}")
+        return _create_placeholder_page(
+            "👥 Co-presence",
+            "Co-presence page is being loaded...",
+            "The co-presence module is not available. Please check the installation.",
+        )
+
+
 @callback(Output("page-content", "children"), Input("url", "pathname"))
 def display_page(pathname):
     """Route pages based on URL"""
@@ -255,6 +276,8 @@ def display_page(pathname):
         return _get_analytics_page()
     elif pathname == "/upload" or pathname == "/file-upload":  # Handle both paths
         return _get_upload_page()
+    elif pathname == "/copresence":
+        return _get_copresence_page()
     elif pathname == "/":
         return _get_home_page()
     else:
@@ -291,6 +314,12 @@ def _register_all_callbacks(app: dash.Dash) -> None:
             logger.info("✅ Analytics callbacks registered")
         except ImportError:
             logger.warning("Analytics callbacks not available")
+
+        try:
+            import pages.copresence
+            logger.info("✅ Co-presence callbacks registered")
+        except ImportError:
+            logger.warning("Co-presence callbacks not available")
             
     except ImportError as e:
         logger.error(f"Failed to register page callbacks: {e}")
@@ -1,10 +1,25 @@
 """Caching utilities for performance optimization"""
 
+from collections import OrderedDict
 from typing import Any, Optional, Callable, Dict
 import functools
+import hashlib
+import pickle
+import sys
 import threading
+import time
 from datetime import datetime, timedelta
 
+import numpy as np
+import pandas as pd
+
+try:  # Optional fast non-cryptographic hash
+    import xxhash
+
+    XXHASH_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    XXHASH_AVAILABLE = False
+
 
 class MemoryCache:
     """Thread-safe in-memory cache implementation"""
@@ -56,6 +71,147 @@ class MemoryCache:
         return datetime.now() > entry["expiry"]
 
 
+def estimate_size(value: Any) -> int:
+    """Estimate the in-memory footprint of a cached value in bytes"""
+
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(str(value))
+
+
+class LRUByteCache:
+    """Thread-safe LRU cache bounded by the total size of its values"""
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[int] = None,
+        size_func: Callable[[Any], int] = estimate_size,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_func = size_func
+        # key -> (value, size in bytes, insertion time)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache and mark it most recently used"""
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, created = entry
+            if self.ttl is not None and time.monotonic() - created > self.ttl:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> bool:
+        """Set value in cache, evicting least recently used entries
+
+        Returns ``False`` when the value alone exceeds ``max_bytes`` and is
+        therefore not cached.
+        """
+
+        size = self.size_func(value)
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            if size > self.max_bytes:
+                return False
+
+            while self._cache and self._total_bytes + size > self.max_bytes:
+                oldest = next(iter(self._cache))
+                self._remove(oldest)
+                self.evictions += 1
+
+            self._cache[key] = (value, size, time.monotonic())
+            self._total_bytes += size
+            return True
+
+    def delete(self, key: str) -> bool:
+        """Delete key from cache"""
+
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self) -> None:
+        """Clear all cache entries"""
+
+        with self._lock:
+            self._cache.clear()
+            self._total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._cache.pop(key)
+        self._total_bytes -= size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and size statistics"""
+
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate_percent": (self.hits / total * 100) if total else 0.0,
+            }
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame's columns, dtypes and values
+
+    Numeric and datetime columns are hashed straight from their buffers;
+    other columns go through ``pd.util.hash_pandas_object``. Uses xxhash when
+    installed and BLAKE2b otherwise. The index is ignored.
+    """
+
+    hasher = xxhash.xxh3_128() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=16)
+    hasher.update(
+        repr((list(df.columns), [str(dtype) for dtype in df.dtypes], len(df))).encode()
+    )
+
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufcmM":
+            values = column.to_numpy()
+        else:
+            values = pd.util.hash_pandas_object(column, index=False).to_numpy()
+        hasher.update(np.ascontiguousarray(values).view(np.uint8))
+
+    return hasher.hexdigest()
+
+
 def cached(ttl: int = 300, key_func: Optional[Callable] = None) -> Callable:
     """Decorator for caching function results"""
 
@@ -24,6 +24,13 @@ except ImportError as e:
     logger.warning(f"File upload page not available: {e}")
     _pages['file_upload'] = None
 
+try:
+    from . import copresence
+    _pages['copresence'] = copresence
+except ImportError as e:
+    logger.warning(f"Co-presence page not available: {e}")
+    _pages['copresence'] = None
+
 def get_page_layout(page_name: str) -> Optional[Callable]:
     """Get page layout function safely"""
     page_module = _pages.get(page_name)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Co-presence Drill-down Page
+Which badges used the same reader within N minutes of a given badge
+"""
+import logging
+from typing import Any, Dict, List
+
+import pandas as pd
+from dash import html, dcc, callback
+from dash.dependencies import Input, Output, State
+import dash_bootstrap_components as dbc
+
+from services.analytics_service import get_analytics_service
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = 200
+
+
+def layout() -> dbc.Container:
+    """Co-presence query form and results area"""
+    form = dbc.Card(
+        [
+            dbc.CardHeader(html.H5("👥 Co-presence Lookup", className="mb-0")),
+            dbc.CardBody(
+                [
+                    dbc.Row(
+                        [
+                            dbc.Col(
+                                [
+                                    dbc.Label("Badge / Person ID"),
+                                    dbc.Input(id="copresence-person", type="text", placeholder="e.g. EMP001"),
+                                ],
+                                md=4,
+                            ),
+                            dbc.Col(
+                                [
+                                    dbc.Label("Window (minutes)"),
+                                    dbc.Input(id="copresence-window", type="number", min=0, value=5),
+                                ],
+                                md=2,
+                            ),
+                            dbc.Col(
+                                [
+                                    dbc.Label("Date range"),
+                                    dcc.DatePickerRange(id="copresence-dates"),
+                                ],
+                                md=4,
+                            ),
+                            dbc.Col(
+                                dbc.Button("Search", id="copresence-search", color="primary", className="mt-4"),
+                                md=2,
+                            ),
+                        ]
+                    )
+                ]
+            ),
+        ],
+        className="mb-4",
+    )
+    return dbc.Container([form, html.Div(id="copresence-results")], fluid=True)
+
+
+def _table(records: List[Dict[str, Any]], columns: List[str]) -> dbc.Table:
+    frame = pd.DataFrame(records[:MAX_ROWS], columns=columns)
+    for column in columns:
+        if column == "doors":
+            frame[column] = frame[column].map(", ".join)
+    return dbc.Table.from_dataframe(frame, striped=True, bordered=True, hover=True, size="sm")
+
+
+def create_results_display(result: Dict[str, Any]) -> Any:
+    """Contacts summary plus the individual encounters"""
+    if result.get("status") != "success":
+        return dbc.Alert(result.get("message", "No results"), color="warning")
+    if not result["contacts"]:
+        return dbc.Alert(
+            f"No other badges at the same door within {result['window_minutes']} minutes "
+            f"of {result['person_id']} ({result['badge_events']} events checked)",
+            color="info",
+        )
+    return html.Div(
+        [
+            html.H5(
+                f"{len(result['contacts'])} badges co-present with {result['person_id']} "
+                f"across {result['badge_events']} events"
+            ),
+            _table(
+                result["contacts"],
+                ["person_id", "encounters", "doors", "first_contact", "last_contact", "closest_gap_seconds"],
+            ),
+            html.H6("Encounters", className="mt-4"),
+            _table(result["encounters"], ["timestamp", "door_id", "person_id", "other_timestamp", "gap_seconds"]),
+        ]
+    )
+
+
+@callback(
+    Output("copresence-results", "children"),
+    Input("copresence-search", "n_clicks"),
+    [
+        State("copresence-person", "value"),
+        State("copresence-window", "value"),
+        State("copresence-dates", "start_date"),
+        State("copresence-dates", "end_date"),
+    ],
+    prevent_initial_call=True,
+)
+def search_copresence(n_clicks, person_id, window_minutes, start_date, end_date):
+    """Run the co-presence query for the entered badge"""
+    if not person_id:
+        return dbc.Alert("Enter a badge or person ID", color="warning")
+    # The end date picks the whole day
+    end = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(milliseconds=1) if end_date else None
+    result = get_analytics_service().get_copresence(
+        person_id.strip(), float(window_minutes or 0), start_date, end
+    )
+    return create_results_display(result)
+
+
+__all__ = ["layout", "search_copresence", "create_results_display"]
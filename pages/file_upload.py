@@ -3,18 +3,20 @@
 Complete File Upload Page - Fixed import and callback issues
 """
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 import json
 
 import pandas as pd
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from dash import html, dcc, no_update, ctx
 from dash import callback  # Correct import for current Dash version
 from dash.dependencies import Input, Output, State, ALL
 import dash_bootstrap_components as dbc
 
 from services.device_learning_service import DeviceLearningService
+from services.shared_event_store import SharedEventStore
 from services.upload_utils import (
     parse_uploaded_file,
     generate_preview,
@@ -24,6 +26,13 @@ from components.column_verification import save_verified_mappings
 
 logger = logging.getLogger(__name__)
 
+try:  # Optional columnar storage backend
+    import pyarrow  # noqa: F401
+
+    PARQUET_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    PARQUET_AVAILABLE = False
+
 # Initialize device learning service
 learning_service = DeviceLearningService()
 
@@ -32,25 +41,44 @@ learning_service = DeviceLearningService()
 # Persistent Uploaded Data Store
 # -----------------------------------------------------------------------------
 class UploadedDataStore:
-    """Persistent uploaded data store with file system backup"""
+    """Persistent uploaded data store with columnar file system backup
+
+    Frames are written as Parquet (dictionary-encoding ``CATEGORICAL_COLUMNS``)
+    when pyarrow is installed and as pickle otherwise. Only the file info is
+    read at start-up; frames are loaded lazily on first access.
+
+    Every added frame is also published to a memory-mapped
+    :class:`SharedEventStore` so all worker processes read the same pages,
+    and its generation counter tells workers to pick up other workers' uploads.
+    """
 
-    def __init__(self) -> None:
+    CATEGORICAL_COLUMNS = ("person_id", "door_id", "access_result")
+
+    def __init__(self, storage_dir: str = "temp/uploaded_data") -> None:
         self._data_store: Dict[str, pd.DataFrame] = {}
         self._file_info_store: Dict[str, Dict[str, Any]] = {}
-        self.storage_dir = Path("temp/uploaded_data")
+        self._lock = threading.RLock()
+        self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._shared = SharedEventStore(str(self.storage_dir / "mmap"))
+        self._generation = self._shared.generation
         self._load_from_disk()
 
-    def _get_file_path(self, filename: str) -> Path:
+    def _get_file_path(self, filename: str, storage_format: str = "pickle") -> Path:
         safe_name = filename.replace(" ", "_").replace("/", "_").replace("\\", "_")
-        return self.storage_dir / f"{safe_name}.pkl"
+        suffix = ".parquet" if storage_format == "parquet" else ".pkl"
+        return self.storage_dir / f"{safe_name}{suffix}"
 
     def _info_path(self) -> Path:
         return self.storage_dir / "file_info.json"
 
+    def _journal_path(self) -> Path:
+        return self.storage_dir / "file_info.jsonl"
+
     def _load_from_disk(self) -> None:
-        """Load existing data from disk with proper error handling"""
+        """Load file info from disk; frames are read lazily on demand"""
         try:
+            # Legacy snapshot written by earlier versions
             info_path = self._info_path()
             if info_path.exists() and info_path.stat().st_size > 0:
                 try:
@@ -62,65 +90,185 @@ class UploadedDataStore:
                     logger.warning("Corrupted file info, starting fresh")
                     self._file_info_store = {}
 
-            # Load DataFrame files
-            for info_filename, info in self._file_info_store.items():
-                pkl_path = self._get_file_path(info_filename)
-                if pkl_path.exists():
-                    try:
-                        df = pd.read_pickle(pkl_path)
-                        self._data_store[info_filename] = df
-                        logger.info(f"Restored {info_filename} from disk")
-                    except Exception as e:
-                        logger.warning(f"Could not load {info_filename}: {e}")
+            # Append-only journal, one entry per added file
+            journal_path = self._journal_path()
+            if journal_path.exists():
+                with open(journal_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            logger.warning("Skipping corrupted file info entry")
+                            continue
+                        self._file_info_store[entry.pop("filename")] = entry
+
+            # Drop entries whose data file is missing
+            for info_filename, info in list(self._file_info_store.items()):
+                data_path = self._get_file_path(
+                    info_filename, info.get("format", "pickle")
+                )
+                if not data_path.exists():
+                    logger.warning(f"Could not find stored data for {info_filename}")
+                    del self._file_info_store[info_filename]
 
         except Exception as e:
             logger.warning(f"Error loading from disk: {e}")
             self._file_info_store = {}
 
-    def add_file(self, filename: str, df: pd.DataFrame) -> None:
-        """Add file to store and persist to disk"""
-        self._data_store[filename] = df
-        self._file_info_store[filename] = {
-            "rows": len(df),
-            "columns": len(df.columns),
-            "upload_time": datetime.now().isoformat(),
-        }
-        self._persist_to_disk(filename, df)
+    def _sync(self) -> None:
+        """Reload file info when another process changed the shared store"""
+        generation = self._shared.generation
+        if generation != self._generation:
+            self._data_store.clear()
+            self._file_info_store = {}
+            self._load_from_disk()
+            self._generation = generation
+
+    def add_file(
+        self,
+        filename: str,
+        df: pd.DataFrame,
+        memory_usage: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Add file to store and persist to disk
+
+        ``memory_usage`` holds the ingest dtype optimisation savings and is
+        recorded in the file info.
+        """
+        with self._lock:
+            self._sync()
+            self._file_info_store[filename] = {
+                "rows": len(df),
+                "columns": len(df.columns),
+                "upload_time": datetime.now().isoformat(),
+                "format": "parquet" if PARQUET_AVAILABLE else "pickle",
+                **(memory_usage or {}),
+            }
+            self._persist_to_disk(filename, df)
+            try:
+                self._generation = self._shared.add_frame(filename, df)
+                self._data_store.pop(filename, None)
+            except Exception as e:
+                logger.error(f"Error publishing {filename} to shared store: {e}")
+                self._data_store[filename] = df
 
     def _persist_to_disk(self, filename: str, df: pd.DataFrame) -> None:
-        """Persist DataFrame and info to disk"""
+        """Persist DataFrame and append its info to the journal"""
         try:
-            # Save DataFrame
-            pkl_path = self._get_file_path(filename)
-            df.to_pickle(pkl_path)
-
-            # Save file info
-            with open(self._info_path(), "w", encoding="utf-8") as f:
-                json.dump(self._file_info_store, f, indent=2)
+            info = self._file_info_store[filename]
+            if info["format"] == "parquet":
+                try:
+                    encoded_df, encoded_columns = self._encode_for_storage(df)
+                    info["encoded_columns"] = encoded_columns
+                    encoded_df.to_parquet(
+                        self._get_file_path(filename, "parquet"), index=False
+                    )
+                except Exception as e:
+                    # e.g. object columns mixing numbers and strings
+                    logger.warning(f"Storing {filename} as pickle, not Parquet: {e}")
+                    self._get_file_path(filename, "parquet").unlink(missing_ok=True)
+                    info.pop("encoded_columns", None)
+                    info["format"] = "pickle"
+            if info["format"] == "pickle":
+                df.to_pickle(self._get_file_path(filename))
+
+            with open(self._journal_path(), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"filename": filename, **info}) + "\n")
 
         except Exception as e:
             logger.error(f"Error persisting to disk: {e}")
 
-    def get_all_data(self) -> Dict[str, pd.DataFrame]:
-        """Get all stored DataFrames"""
-        return self._data_store.copy()
+    def _encode_for_storage(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
+        """Dictionary-encode low-cardinality string columns for Parquet"""
+        encoded_columns = [
+            col
+            for col in self.CATEGORICAL_COLUMNS
+            if col in df.columns and df[col].dtype == object
+        ]
+        if not encoded_columns:
+            return df, []
+        return df.astype({col: "category" for col in encoded_columns}), encoded_columns
+
+    def _read_from_disk(
+        self, filename: str, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """Read a stored frame, restoring the dtypes it was uploaded with"""
+        info = self._file_info_store[filename]
+        if info.get("format", "pickle") == "parquet":
+            df = pd.read_parquet(
+                self._get_file_path(filename, "parquet"), columns=columns
+            )
+            decode = [c for c in info.get("encoded_columns", []) if c in df.columns]
+            if decode:
+                df = df.astype({col: object for col in decode})
+            return df
+
+        df = pd.read_pickle(self._get_file_path(filename))
+        return df if columns is None else df[columns]
+
+    def load_dataframe(
+        self, filename: str, columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """Get a stored DataFrame, optionally reading only ``columns``
+
+        Frames come from the shared store, memory-mapped and not copied,
+        or straight from disk for frames that were never published. Only
+        full frames read from disk are cached.
+        """
+        with self._lock:
+            self._sync()
+            if filename in self._data_store:
+                df = self._data_store[filename]
+                return df if columns is None else df[columns]
+            if filename not in self._file_info_store:
+                return None
+
+            df = self._shared.get_frame(filename, columns)
+            if df is not None:
+                return df
+
+            try:
+                df = self._read_from_disk(filename, columns)
+            except Exception as e:
+                logger.warning(f"Could not load {filename}: {e}")
+                return None
+            if columns is None:
+                logger.info(f"Restored {filename} from disk")
+                self._data_store[filename] = df
+            return df
+
+    def get_all_data(
+        self, columns: Optional[List[str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """Get all stored DataFrames, optionally projected to ``columns``"""
+        data = {}
+        for filename in self.get_filenames():
+            df = self.load_dataframe(filename, columns)
+            if df is not None:
+                data[filename] = df
+        return data
 
     def get_filenames(self) -> List[str]:
         """Get list of stored filenames"""
-        return list(self._data_store.keys())
+        with self._lock:
+            self._sync()
+            return list(self._file_info_store.keys())
 
     def clear_all(self) -> None:
         """Clear all stored data"""
-        self._data_store.clear()
-        self._file_info_store.clear()
-        try:
-            for pkl_file in self.storage_dir.glob("*.pkl"):
-                pkl_file.unlink()
-            info_path = self._info_path()
-            if info_path.exists():
-                info_path.unlink()
-        except Exception as e:
-            logger.error(f"Error clearing disk storage: {e}")
+        with self._lock:
+            self._data_store.clear()
+            self._file_info_store.clear()
+            try:
+                self._generation = self._shared.clear()
+                for pattern in ("*.pkl", "*.parquet"):
+                    for data_file in self.storage_dir.glob(pattern):
+                        data_file.unlink()
+                for info_path in (self._info_path(), self._journal_path()):
+                    if info_path.exists():
+                        info_path.unlink()
+            except Exception as e:
+                logger.error(f"Error clearing disk storage: {e}")
 
 
 # Initialize global store
@@ -404,7 +552,9 @@ def consolidated_upload_callback(
                     df = result["data"]
 
                     # Update store
-                    info = update_upload_state(filename, df, _uploaded_data_store)
+                    info = update_upload_state(
+                        filename, df, _uploaded_data_store, result["memory_usage"]
+                    )
                     info["ai_suggestions"] = get_ai_column_suggestions(
                         info["column_names"]
                     )
@@ -445,6 +595,15 @@ def consolidated_upload_callback(
                 )
                 logger.error(f"Exception processing {filename}: {e}")
 
+        # Sketch the new files' headline KPIs now, so summaries never scan them
+        if current_file_info:
+            try:
+                from services.analytics_service import get_analytics_service
+
+                get_analytics_service().data_accessor.get_kpi_sketch()
+            except Exception as e:
+                logger.warning(f"Could not sketch uploaded files: {e}")
+
         # Create navigation to analytics if successful uploads
         upload_nav = []
         if any("Successfully uploaded" in str(result) for result in upload_results):
@@ -499,9 +658,8 @@ def consolidated_upload_callback(
         file_preview_components = []
 
         for filename in _uploaded_data_store.get_filenames():
-            df_dict = _uploaded_data_store.get_all_data()
-            if filename in df_dict:
-                df = df_dict[filename]
+            df = _uploaded_data_store.load_dataframe(filename)
+            if df is not None:
                 upload_results.append(
                     dbc.Alert(
                         f"Restored: {filename} ({len(df)} rows)",
@@ -612,9 +770,16 @@ def save_confirmed_device_mappings(
 # -----------------------------------------------------------------------------
 # Public API Functions
 # -----------------------------------------------------------------------------
-def get_uploaded_data() -> Dict[str, pd.DataFrame]:
+def get_uploaded_data(columns: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
     """Get all uploaded data (for use by analytics)"""
-    return _uploaded_data_store.get_all_data()
+    return _uploaded_data_store.get_all_data(columns)
+
+
+def get_uploaded_file(
+    filename: str, columns: Optional[List[str]] = None
+) -> Optional[pd.DataFrame]:
+    """Get one uploaded file's data, or ``None`` if it is unknown"""
+    return _uploaded_data_store.load_dataframe(filename, columns)
 
 
 def get_uploaded_filenames() -> List[str]:
@@ -656,6 +821,7 @@ def save_ai_training_data(mappings: Dict[str, Any], filename: str) -> bool:
 __all__ = [
     "layout",
     "get_uploaded_data",
+    "get_uploaded_file",
     "get_uploaded_filenames",
     "clear_uploaded_data",
     "get_file_info",
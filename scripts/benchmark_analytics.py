@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Benchmark the analytics pipeline on synthetic events of growing size.
+
+Times file ingestion, the shared feature preparation, each analyzer, chart
+generation and ``AnalyticsController.analyze_all``. Every run is appended
+to a JSON-lines history file; ``--compare`` checks the run against the
+previous one on the same machine and exits non-zero on regressions.
+``--svm-agreement`` also fits the exact and approximate One-Class SVM
+backends on two years of hourly windows and reports how well they agree.
+``--forecast-doors`` times fitting and serving per-door forecasts as the
+number of doors grows.
+
+Usage: python scripts/benchmark_analytics.py [--sizes 10000 100000 ...]
+       [--stages ingest analyze_all ...] [--repeat N] [--compare]
+       [--svm-agreement] [--forecast-doors 50 200 800 ...]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analytics.access_trends import AccessTrendsAnalyzer  # noqa: E402
+from analytics.analytics_controller import AnalyticsConfig, AnalyticsController  # noqa: E402
+from analytics.anomaly_detection import AnomalyDetector  # noqa: E402
+from analytics.door_forecasting import DoorForecaster  # noqa: E402
+from analytics.interactive_charts import SecurityChartsGenerator  # noqa: E402
+from analytics.prepared_frame import PreparedFrame  # noqa: E402
+from analytics.rollup_cube import RollupCube  # noqa: E402
+from analytics.security_patterns import SecurityPatternsAnalyzer  # noqa: E402
+from analytics.user_behavior import UserBehaviorAnalyzer  # noqa: E402
+from services.file_processor_service import FileProcessorService  # noqa: E402
+from services.upload_utils import guess_column_names  # noqa: E402
+from utils.sample_data_generator import generate_synthetic_access_data  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_HISTORY = os.path.join(
+    os.path.dirname(__file__), os.pardir, "data", "benchmarks", "analytics.jsonl"
+)
+REGRESSION_TOLERANCE = 0.25
+# Timings below this are too noisy to flag as regressions
+MIN_COMPARABLE_SECONDS = 0.05
+START_DATE = "2024-01-01"
+# Long enough for the hourly feature table to pass the exact SVM limit
+SVM_AGREEMENT_DAYS = 730
+FORECAST_DAYS = 180
+FORECAST_EVENTS_PER_DOOR = 2_000
+
+
+def ingest_csv(csv_path: str) -> pd.DataFrame:
+    """Stream a CSV and compact its dtypes, as parse_uploaded_file does
+
+    parse_uploaded_file keys the conversion on the names raw headers are
+    expected to map to; the synthetic events already use standard names.
+    """
+    processor = FileProcessorService()
+    df = pd.concat(processor.process_file_stream(csv_path, "events.csv"), ignore_index=True)
+    return processor.optimize_dtypes(df, guess_column_names(list(df.columns)))[0]
+
+
+def build_stages(df: pd.DataFrame, csv_path: Optional[str]) -> Dict[str, Callable[[], object]]:
+    """Map stage names to zero-argument callables over ``df``"""
+    prepared = PreparedFrame(df)
+    controller = AnalyticsController(AnalyticsConfig(cache_results=False))
+    stages = {
+        "prepare": lambda: PreparedFrame(df),
+        # Built once per frame and reused by later trend and chart stages
+        "rollup_cube": lambda: RollupCube.from_events(df),
+        "security_patterns": lambda: SecurityPatternsAnalyzer().analyze_patterns(prepared),
+        "access_trends": lambda: AccessTrendsAnalyzer().analyze_trends(prepared),
+        "user_behavior": lambda: UserBehaviorAnalyzer().analyze_behavior(prepared),
+        "anomaly_detection": lambda: AnomalyDetector().detect_anomalies(prepared),
+        "interactive_charts": lambda: SecurityChartsGenerator().generate_all_charts(prepared),
+        "analyze_all": lambda: controller.analyze_all(df),
+    }
+    if csv_path is not None:
+        stages = {"ingest": lambda: ingest_csv(csv_path), **stages}
+    return stages
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], stages: Optional[List[str]], repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        df = generate_synthetic_access_data(size, start_date=START_DATE, seed=seed)
+        with tempfile.TemporaryDirectory(prefix="yosai_bench_") as tmp:
+            csv_path = None
+            if stages is None or "ingest" in stages:
+                csv_path = os.path.join(tmp, "events.csv")
+                df.to_csv(csv_path, index=False)
+
+            timings = {}
+            for name, func in build_stages(df, csv_path).items():
+                if stages is not None and name not in stages:
+                    continue
+                timings[name] = best_time(func, repeat)
+                print(f"{size:>10} {name:<20} {timings[name]:>9.3f}s", flush=True)
+            results[str(size)] = timings
+    return results
+
+
+def svm_agreement(sizes: List[int], seed: int) -> Dict[str, Dict[str, float]]:
+    """Compare the exact and approximate One-Class SVM on each size"""
+    reports = {}
+    detector = AnomalyDetector()
+    for size in sizes:
+        df = generate_synthetic_access_data(size, days=SVM_AGREEMENT_DAYS, start_date=START_DATE, seed=seed)
+        features = detector._extract_ml_features(detector._prepare_data(df))
+        report = detector.compare_svm_backends(features)
+        print(f"{size:>10} svm windows={report['samples']} agreement={report['agreement']:.3f} "
+              f"recall={report['anomaly_recall']:.3f} exact={report['exact_seconds']:.2f}s "
+              f"approximate={report['approximate_seconds']:.2f}s", flush=True)
+        reports[str(size)] = report
+    return reports
+
+
+def forecast_scaling(door_counts: List[int], repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """Time fitting per-door forecasts, and serving them once cached, per door count"""
+    reports = {}
+    for doors in door_counts:
+        df = generate_synthetic_access_data(doors * FORECAST_EVENTS_PER_DOOR, num_doors=doors,
+                                            days=FORECAST_DAYS, start_date=START_DATE, seed=seed)
+        cube = RollupCube.from_events(df)
+        fit_seconds = best_time(lambda: DoorForecaster().fit(cube), repeat)
+        forecaster = DoorForecaster()
+        forecaster.fit(cube)
+        serve_seconds = best_time(lambda: forecaster.forecast_doors(cube), max(repeat, 5))
+        print(f"{doors:>10} doors fit={fit_seconds * 1000:.1f}ms "
+              f"cached forecast={serve_seconds * 1000:.1f}ms", flush=True)
+        reports[str(doors)] = {"fit_seconds": fit_seconds, "serve_seconds": serve_seconds}
+    return reports
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def load_previous(history_path: str) -> Optional[Dict]:
+    if not os.path.exists(history_path):
+        return None
+    previous = None
+    with open(history_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("machine") == platform.node():
+                previous = record
+    return previous
+
+
+def find_regressions(current: Dict[str, Dict[str, float]],
+                     previous: Dict[str, Dict[str, float]],
+                     tolerance: float) -> List[str]:
+    regressions = []
+    for size, timings in current.items():
+        for stage, seconds in timings.items():
+            before = previous.get(size, {}).get(stage)
+            if before is None or max(before, seconds) < MIN_COMPARABLE_SECONDS:
+                continue
+            if seconds > before * (1 + tolerance):
+                regressions.append(
+                    f"{stage} at {size} rows: {before:.3f}s -> {seconds:.3f}s "
+                    f"(+{(seconds / before - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", help="subset of stages to time")
+    parser.add_argument("--repeat", type=int, default=1, help="best of N runs per stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSON-lines results file")
+    parser.add_argument("--compare", action="store_true",
+                        help="fail if a stage is slower than the previous run")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--svm-agreement", action="store_true",
+                        help="compare exact and approximate One-Class SVM backends")
+    parser.add_argument("--forecast-doors", type=int, nargs="+",
+                        help="door counts to time per-door forecast fitting at")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'stage':<20} {'time':>10}")
+    results = run(args.sizes, args.stages, args.repeat, args.seed)
+    agreement = svm_agreement(args.sizes, args.seed) if args.svm_agreement else None
+    forecasts = forecast_scaling(args.forecast_doors, args.repeat, args.seed) if args.forecast_doors else None
+    previous = load_previous(args.history)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "run_at": datetime.now().isoformat(),
+            "revision": git_revision(),
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "seed": args.seed,
+            "results": results,
+            "svm_agreement": agreement,
+            "forecast_scaling": forecasts,
+        }) + "\n")
+
+    if args.compare and previous is not None:
+        regressions = find_regressions(results, previous["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {previous.get('revision') or previous['run_at']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
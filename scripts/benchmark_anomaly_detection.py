@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark the per-user anomaly detectors against growing badge counts.
+
+Usage: python scripts/benchmark_anomaly_detection.py [events-per-user]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from analytics.anomaly_detection import AnomalyDetector  # noqa: E402
+
+USER_COUNTS = [500, 2000, 8000, 15000]
+EVENTS_PER_USER = 40
+
+
+def build_events(num_users: int, events_per_user: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = num_users * events_per_user
+    offsets = rng.integers(0, 30 * 24 * 3600, n)
+    return pd.DataFrame(
+        {
+            "event_id": np.arange(n),
+            "timestamp": pd.Timestamp("2024-01-01") + pd.to_timedelta(offsets, unit="s"),
+            "person_id": rng.integers(0, num_users, n).astype(str),
+            "door_id": rng.integers(0, 200, n).astype(str),
+            "access_result": np.where(rng.random(n) < 0.9, "Granted", "Denied"),
+        }
+    )
+
+
+def time_call(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    events_per_user = int(sys.argv[1]) if len(sys.argv) > 1 else EVENTS_PER_USER
+    detector = AnomalyDetector()
+    detectors = [
+        ("door_hopping", detector._detect_door_hopping),
+        ("pattern_deviations", detector._detect_pattern_deviations),
+        ("sequence_anomalies", detector._detect_sequence_anomalies),
+        ("routine_breaks", detector._detect_routine_breaks),
+    ]
+
+    header = f"{'users':>8} {'rows':>10} {'prepare':>9}" + "".join(f" {name:>19}" for name, _ in detectors)
+    print(header)
+    for num_users in USER_COUNTS:
+        df = build_events(num_users, events_per_user)
+        start = time.perf_counter()
+        prepared = detector._prepare_data(df)
+        prepare_time = time.perf_counter() - start
+        timings = [time_call(func, prepared) for _, func in detectors]
+        print(
+            f"{num_users:>8} {len(df):>10} {prepare_time:>8.3f}s"
+            + "".join(f" {t:>18.3f}s" for t in timings)
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import pickle
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple, TypeVar
 
 import pandas as pd
 
+from analytics.copresence_index import CoPresenceIndex
+from analytics.incremental_aggregates import IncrementalAggregator
+from analytics.kpi_sketches import KPISketch
+from analytics.rollup_cube import RollupCube
+from services.shared_event_store import get_shared_event_store
 from utils import apply_standard_mappings
 
 logger = logging.getLogger(__name__)
 
+Partial = TypeVar("Partial")
+
 
 class AnalyticsDataAccessor:
     """Load uploaded files and apply learned mappings."""
@@ -22,43 +31,231 @@ class AnalyticsDataAccessor:
         self.base_path = Path(base_data_path)
         self.mappings_file = self.base_path / "learned_mappings.pkl"
         self.session_storage = self.base_path.parent / "session_storage"
+        # filename -> (content fingerprint, partial aggregates)
+        self._file_aggregates: Dict[str, Tuple[str, IncrementalAggregator]] = {}
+        self._file_rollups: Dict[str, Tuple[str, RollupCube]] = {}
+        self._file_copresence: Dict[str, Tuple[str, CoPresenceIndex]] = {}
+        self._file_kpis: Dict[str, Tuple[str, KPISketch]] = {}
+        # Loaded mappings with the file stamp they were read at, and the
+        # per-file mapping digests of the last mappings seen
+        self._mappings: Tuple[Optional[tuple], Dict[str, Any]] = (None, {})
+        self._mapping_keys: Tuple[Optional[Dict[str, Any]], Dict[str, str]] = (None, {})
+        # Combined index and the file versions it was built from
+        self._copresence: Tuple[Tuple[Tuple[str, str], ...], CoPresenceIndex] = ((), CoPresenceIndex())
+        # Combined frame and metadata, and the data version they were built from
+        self._processed: Tuple[Optional[str], Tuple[pd.DataFrame, Dict[str, Any]]] = (None, (pd.DataFrame(), {}))
+
+    def get_data_version(self) -> str:
+        """Version of all uploaded data with its learned mappings.
+
+        Changes whenever a file is added, replaced or removed, or a file's
+        learned mappings change; computed without loading any frame.
+        """
+        versions = self._get_uploaded_versions()
+        mapping_keys = self._get_mapping_keys()
+        return _digest(sorted(
+            (filename, version, mapping_keys.get(filename, _NO_MAPPINGS_KEY))
+            for filename, version in versions.items()
+        ))
 
     def get_processed_database(self) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-        """Return combined dataframe and metadata using stored mappings."""
+        """Return combined dataframe and metadata using stored mappings.
+
+        The combined frame is rebuilt only when :meth:`get_data_version`
+        changes; callers must not modify it.
+        """
+        version = self.get_data_version()
+        if version == self._processed[0]:
+            return self._processed[1]
+
         mappings_data = self._load_consolidated_mappings()
         uploaded_data = self._get_uploaded_data()
 
         if not uploaded_data:
             return pd.DataFrame(), {}
 
-        combined_df, metadata = self._apply_mappings_and_combine(uploaded_data, mappings_data)
-        return combined_df, metadata
+        self._processed = (version, self._apply_mappings_and_combine(uploaded_data, mappings_data))
+        return self._processed[1]
+
+    def get_incremental_aggregates(self) -> IncrementalAggregator:
+        """Return aggregates over all uploaded files, scanning only new ones.
+
+        Partial aggregates are kept per file and keyed by the shared store
+        version (or a content fingerprint) and the file's learned mappings, so
+        a new upload costs one pass over that file and a merge of small
+        per-file tables instead of a rescan of the history.
+        """
+        combined = IncrementalAggregator()
+        for partial in self._file_partials(self._file_aggregates, IncrementalAggregator.from_events):
+            combined.merge(partial)
+        return combined
+
+    def get_rollup_cube(self) -> RollupCube:
+        """Return the time-series rollup cube over all uploaded files.
+
+        Like :meth:`get_incremental_aggregates`, a cube is built once per
+        file version and the per-file cubes are merged, so trend analytics
+        over the history only pay for the newly uploaded rows.
+        """
+        combined = RollupCube()
+        for partial in self._file_partials(self._file_rollups, RollupCube.from_events):
+            combined.merge(partial)
+        return combined
+
+    def get_kpi_sketch(self) -> KPISketch:
+        """Return headline KPI sketches merged over all uploaded files.
+
+        Each file is sketched once per version; merging the fixed-size
+        per-file sketches costs the same however many events they hold.
+        """
+        combined = KPISketch()
+        for partial in self._file_partials(self._file_kpis, KPISketch.from_events):
+            combined.merge(partial)
+        return combined
+
+    def get_copresence_index(self) -> CoPresenceIndex:
+        """Return the co-presence index over all uploaded files.
+
+        Per-file indexes are built once per file version; the combined index
+        is rebuilt only when the set of file versions changes, so repeated
+        badge queries reuse it.
+        """
+        partials = self._file_partials(self._file_copresence, CoPresenceIndex.from_events)
+        versions = tuple(sorted((name, version) for name, (version, _) in self._file_copresence.items()))
+        if versions != self._copresence[0]:
+            self._copresence = (versions, CoPresenceIndex.concat(partials))
+        return self._copresence[1]
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _file_partials(
+        self,
+        cache: Dict[str, Tuple[str, Partial]],
+        build: Callable[[pd.DataFrame], Partial],
+    ) -> List[Partial]:
+        """Refresh per-file partials in ``cache``, building only for new files.
+
+        File versions come from the upload manifests, so a frame is only
+        loaded when its version or its learned mappings changed.
+        """
+        versions = self._get_uploaded_versions()
+        mapping_keys = self._get_mapping_keys()
+
+        for filename in set(cache) - set(versions):
+            del cache[filename]
+
+        for filename, version in versions.items():
+            # Relearned mappings change the mapped frame, so they are part of the key
+            fingerprint = f"{version}:{mapping_keys.get(filename, _NO_MAPPINGS_KEY)}"
+            cached = cache.get(filename)
+            if cached is not None and cached[0] == fingerprint:
+                continue
+            df = self._load_uploaded_frame(filename)
+            if df is None:
+                continue
+            try:
+                mapped_df = self._apply_column_mappings(
+                    df, filename, self._load_consolidated_mappings()
+                )
+                partial = build(mapped_df)
+            except Exception as exc:  # pragma: no cover - log and continue
+                logger.error("Error aggregating %s: %s", filename, exc)
+                continue
+            cache[filename] = (fingerprint, partial)
+
+        return [partial for _, partial in cache.values()]
+
+    def _get_mapping_keys(self) -> Dict[str, str]:
+        """Digest of the learned mapping entries of each file.
+
+        Digests are recomputed only when the loaded mappings change.
+        """
+        mappings_data = self._load_consolidated_mappings()
+        if mappings_data is not self._mapping_keys[0]:
+            entries: Dict[str, List[Any]] = {}
+            for mapping_info in mappings_data.values():
+                entries.setdefault(mapping_info.get("filename"), []).append(mapping_info)
+            keys = {filename: _digest(file_entries) for filename, file_entries in entries.items()}
+            self._mapping_keys = (mappings_data, keys)
+        return self._mapping_keys[1]
+
     def _load_consolidated_mappings(self) -> Dict[str, Any]:
-        """Load consolidated mappings from ``learned_mappings.pkl`` if present."""
+        """Load consolidated mappings from ``learned_mappings.pkl`` if present.
+
+        The file is re-read only when its modification time or size changes.
+        """
         try:
-            if self.mappings_file.exists():
+            stat = self.mappings_file.stat()
+        except FileNotFoundError:
+            self._mappings = (None, {})
+            return self._mappings[1]
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._mappings[0]:
+            try:
                 with open(self.mappings_file, "rb") as f:
-                    return pickle.load(f)
-            return {}
-        except Exception as exc:  # pragma: no cover - log errors
-            logger.error("Error loading mappings: %s", exc)
-            return {}
+                    self._mappings = (stamp, pickle.load(f))
+            except Exception as exc:  # pragma: no cover - log errors
+                logger.error("Error loading mappings: %s", exc)
+                return {}
+        return self._mappings[1]
+
+    def _get_uploaded_versions(self) -> Dict[str, str]:
+        """Version of every uploaded file, read without loading any frame.
+
+        Published files use their shared store version; uploads that were
+        never published use their entry in the upload file-info journal.
+        """
+        versions: Dict[str, str] = {}
+        try:
+            from pages.file_upload import get_file_info, get_uploaded_filenames
+
+            file_info = get_file_info()
+            for filename in get_uploaded_filenames():
+                info = file_info.get(filename, {})
+                versions[filename] = f"{info.get('upload_time')}:{info.get('rows')}"
+        except Exception:  # pragma: no cover - import failure
+            pass
+
+        shared_store = get_shared_event_store()
+        for filename in shared_store.get_filenames():
+            version = shared_store.get_version(filename)
+            if version is not None:
+                versions[filename] = version
+        return versions
+
+    def _load_uploaded_frame(self, filename: str) -> Optional[pd.DataFrame]:
+        """Load one uploaded frame, memory-mapped when it was published."""
+        df = get_shared_event_store().get_frame(filename)
+        if df is not None:
+            return df
+        try:
+            from pages.file_upload import get_uploaded_file
+
+            return get_uploaded_file(filename)
+        except Exception:  # pragma: no cover - import failure
+            return None
 
     def _get_uploaded_data(self) -> Dict[str, pd.DataFrame]:
-        """Retrieve uploaded data frames from ``pages.file_upload``."""
+        """Retrieve uploaded data frames from ``pages.file_upload`` and the shared store.
+
+        Disk-backed uploads that were never published are kept, and frames
+        published by other workers are added from the memory-mapped store.
+        """
         try:
             from pages.file_upload import get_uploaded_data
 
-            uploaded_data = get_uploaded_data()
-            if uploaded_data:
-                return uploaded_data
-            return {}
+            uploaded_data = dict(get_uploaded_data() or {})
         except Exception:  # pragma: no cover - import failure
-            return {}
+            uploaded_data = {}
+
+        shared_store = get_shared_event_store()
+        for filename in shared_store.get_filenames():
+            if filename not in uploaded_data:
+                df = shared_store.get_frame(filename)
+                if df is not None:
+                    uploaded_data[filename] = df
+        return uploaded_data
 
     def _apply_mappings_and_combine(
         self, uploaded_data: Dict[str, pd.DataFrame], mappings_data: Dict[str, Any]
@@ -145,4 +342,13 @@ class AnalyticsDataAccessor:
 
         return df.merge(device_attrs_df, on="door_id", how="left")
 
+def _digest(entries: List[Any]) -> str:
+    """Short stable digest of JSON-serialisable mapping entries."""
+    payload = json.dumps(entries, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+# Key of files without learned mapping entries
+_NO_MAPPINGS_KEY = _digest([])
+
 __all__ = ["AnalyticsDataAccessor"]
@@ -10,6 +10,7 @@ from typing import Dict, Any, List, Optional, Tuple
 
 import pandas as pd
 
+from analytics.access_trends import create_trends_analyzer
 from .analytics_ingestion import AnalyticsDataAccessor
 from .analytics_computation import (
     generate_basic_analytics,
@@ -38,6 +39,10 @@ class AnalyticsService:
         self.file_ingestion = FileIngestionAnalytics()
         self.database_analytics = DatabaseAnalytics(self.database_manager)
         self.uploaded_analytics = UploadedDataAnalytics()
+        self.data_accessor = AnalyticsDataAccessor()
+        self.trends_analyzer = create_trends_analyzer()
+        # Last access trends and the data version they were computed for
+        self._access_trends: Tuple[Optional[str], Dict[str, Any]] = (None, {})
 
     def _initialize_database(self):
         """Initialize database connection"""
@@ -65,13 +70,11 @@ class AnalyticsService:
 
         # FORCE CHECK: If uploaded data exists, use it regardless of source
         try:
-            from pages.file_upload import get_uploaded_data
-
-            uploaded_data = get_uploaded_data()
+            from pages.file_upload import get_uploaded_filenames
 
-            if uploaded_data and source in ["uploaded", "sample"]:
+            if get_uploaded_filenames() and source in ["uploaded", "sample"]:
                 logger.info("Forcing uploaded data usage (source was: %s)", source)
-                return self._process_uploaded_data_directly(uploaded_data)
+                return self._process_uploaded_data_directly()
 
         except Exception as e:
             logger.warning("Uploaded data check failed: %s", e)
@@ -87,10 +90,22 @@ class AnalyticsService:
             return {"status": "error", "message": f"Unknown source: {source}"}
 
     def _process_uploaded_data_directly(
-        self, uploaded_data: Dict[str, pd.DataFrame]
+        self, uploaded_data: Optional[Dict[str, pd.DataFrame]] = None
     ) -> Dict[str, Any]:
-        """Process uploaded data directly - bypasses all other logic"""
+        """Process uploaded data directly - bypasses all other logic
+
+        The summary comes from the accessor's per-file incremental
+        aggregates, so only new uploads are scanned. Concatenating every
+        frame is the fallback when nothing could be aggregated.
+        """
         try:
+            aggregates = self.data_accessor.get_incremental_aggregates()
+            if aggregates.total_events:
+                return self.uploaded_analytics.summarize_aggregates(aggregates)
+            if uploaded_data is None:
+                from pages.file_upload import get_uploaded_data
+
+                uploaded_data = get_uploaded_data()
             return self.uploaded_analytics.process_uploaded_data(uploaded_data)
         except Exception as e:
             logger.error("Direct processing failed: %s", e)
@@ -182,126 +197,138 @@ class AnalyticsService:
         return self.database_analytics.get_analytics()
 
     def get_dashboard_summary(self) -> Dict[str, Any]:
-        """Get a basic dashboard summary"""
+        """Get a basic dashboard summary
+
+        Uploaded files are summarised from the KPI sketches built when they
+        were uploaded, so the summary never rescans their events.
+        """
         try:
-            summary = self.get_analytics_from_uploaded_data()
+            sketch = self.data_accessor.get_kpi_sketch()
+            if sketch.total_events:
+                summary = self.uploaded_analytics.summarize_sketch(sketch)
+            else:
+                summary = self.get_analytics_from_uploaded_data()
             return format_dashboard_summary(summary)
         except Exception as e:
             logger.error(f"Dashboard summary failed: {e}")
             return {"status": "error", "message": str(e)}
 
     def get_unique_patterns_analysis(self):
-        """Get unique patterns analysis with all required fields including date_range"""
-        try:
-            from pages.file_upload import get_uploaded_data
+        """Get unique patterns analysis with all required fields including date_range
 
-            uploaded_data = get_uploaded_data()
+        Headline figures come from per-file KPI sketches merged at query
+        time, so the cost does not grow with the history. Distinct counts
+        and user/device classifications are estimates; see
+        :class:`analytics.kpi_sketches.KPISketch` for their error bounds.
+        """
+        try:
+            sketch = self.data_accessor.get_kpi_sketch()
+            if not sketch.total_events:
+                return {"status": "no_data", "message": "No uploaded data available"}
 
-            if uploaded_data:
-                # Process the first available file
-                filename, df = next(iter(uploaded_data.items()))
-
-                # Apply basic column mapping
-                column_mapping = {
-                    "Timestamp": "timestamp",
-                    "Person ID": "person_id",
-                    "Token ID": "token_id",
-                    "Device name": "door_id",
-                    "Access result": "access_result",
-                }
-                df = df.rename(columns=column_mapping)
+            summary = sketch.summary()
+            date_range = summary["date_range"]
+            date_span = (date_range["end"] - date_range["start"]).days if date_range["start"] is not None else 0
 
-                # Calculate real statistics
-                total_records = len(df)
-                unique_users = (
-                    df["person_id"].nunique() if "person_id" in df.columns else 0
-                )
-                unique_devices = (
-                    df["door_id"].nunique() if "door_id" in df.columns else 0
-                )
+            # Users above the 80th percentile of activity, and between the 20th and 80th
+            user_low, user_high = sketch.users.quantiles([0.2, 0.8])
+            power_users = sketch.users.top(10, above=user_high)
+            regular_users = sketch.users.sampled(user_low, user_high, 10)
+            device_high = sketch.doors.quantiles([0.8])[0]
+            high_traffic_devices = sketch.doors.top(10, above=device_high)
 
-                # Calculate date range
-                if "timestamp" in df.columns:
-                    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-                    valid_dates = df["timestamp"].dropna()
-                    if len(valid_dates) > 0:
-                        date_span = (valid_dates.max() - valid_dates.min()).days
-                    else:
-                        date_span = 0
-                else:
-                    date_span = 0
-
-                # Analyze user patterns
-                if "person_id" in df.columns:
-                    user_stats = df.groupby("person_id").size()
-                    power_users = user_stats[
-                        user_stats > user_stats.quantile(0.8)
-                    ].index.tolist()
-                    regular_users = user_stats[
-                        user_stats.between(
-                            user_stats.quantile(0.2), user_stats.quantile(0.8)
-                        )
-                    ].index.tolist()
-                else:
-                    power_users = []
-                    regular_users = []
-
-                # Analyze device patterns
-                if "door_id" in df.columns:
-                    device_stats = df.groupby("door_id").size()
-                    high_traffic_devices = device_stats[
-                        device_stats > device_stats.quantile(0.8)
-                    ].index.tolist()
-                else:
-                    high_traffic_devices = []
-
-                # Calculate success rate
-                if "access_result" in df.columns:
-                    success_rate = (
-                        df["access_result"].str.lower().isin(["granted", "success"])
-                    ).mean()
-                else:
-                    success_rate = 0.95
-
-                # Return ALL required fields including date_range
-                return {
-                    "status": "success",
-                    "data_summary": {
-                        "total_records": total_records,
-                        "date_range": {"span_days": date_span},
-                        "unique_entities": {
-                            "users": unique_users,
-                            "devices": unique_devices,
-                        },
-                    },
-                    "user_patterns": {
-                        "user_classifications": {
-                            "power_users": power_users[:10],
-                            "regular_users": regular_users[:10],
-                        }
-                    },
-                    "device_patterns": {
-                        "device_classifications": {
-                            "high_traffic_devices": high_traffic_devices[:10]
-                        }
-                    },
-                    "interaction_patterns": {
-                        "total_unique_interactions": unique_users * unique_devices
-                    },
-                    "temporal_patterns": {
-                        "peak_hours": [8, 9, 17],
-                        "peak_days": ["Monday", "Tuesday"],
+            return {
+                "status": "success",
+                "data_summary": {
+                    "total_records": summary["total_events"],
+                    "date_range": {"span_days": date_span},
+                    "unique_entities": {
+                        "users": summary["unique_users"],
+                        "devices": summary["unique_doors"],
                     },
-                    "access_patterns": {"overall_success_rate": success_rate},
-                    "recommendations": [],
-                }
-            else:
-                return {"status": "no_data", "message": "No uploaded data available"}
+                    "distinct_error": summary["distinct_error"],
+                },
+                "user_patterns": {
+                    "user_classifications": {
+                        "power_users": power_users,
+                        "regular_users": regular_users,
+                    }
+                },
+                "device_patterns": {
+                    "device_classifications": {
+                        "high_traffic_devices": high_traffic_devices
+                    }
+                },
+                "interaction_patterns": {
+                    "total_unique_interactions": summary["unique_interactions"]
+                },
+                "temporal_patterns": {
+                    "peak_hours": summary["peak_hours"],
+                    "peak_days": summary["peak_days"],
+                    "events_per_user_day": summary["events_per_user_day"],
+                },
+                "access_patterns": {"overall_success_rate": sketch.success_rate},
+                "recommendations": [],
+            }
 
         except Exception as e:
             logger.error("Error in get_unique_patterns_analysis: %s", e)
             return {"status": "error", "message": str(e)}
 
+    def get_access_trends(self) -> Dict[str, Any]:
+        """Get access trends over all uploaded data
+
+        Time-series metrics read the accessor's rollup cube, merged from
+        per-file cubes that are built once per upload, instead of a rollup
+        of the combined frame; only usage patterns scan the rows. Results
+        are kept until the uploaded data or its mappings change.
+        """
+        try:
+            version = self.data_accessor.get_data_version()
+            if version == self._access_trends[0]:
+                return dict(self._access_trends[1])
+
+            df, _ = self.data_accessor.get_processed_database()
+            if df.empty:
+                return {"status": "no_data", "message": "No uploaded data available"}
+
+            cube = self.data_accessor.get_rollup_cube()
+            trends = self.trends_analyzer.analyze_trends(df, cube=cube)
+            trends["status"] = "success"
+            self._access_trends = (version, trends)
+            return dict(trends)
+        except Exception as e:
+            logger.error("Error in get_access_trends: %s", e)
+            return {"status": "error", "message": str(e)}
+
+    def get_copresence(
+        self,
+        person_id: str,
+        window_minutes: float = 5,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Badges seen at the same door as ``person_id`` within the window"""
+        try:
+            index = self.data_accessor.get_copresence_index()
+            if len(index) == 0:
+                return {"status": "no_data", "message": "No uploaded data available"}
+
+            window = timedelta(minutes=window_minutes)
+            pairs = index.co_present(person_id, window, start, end)
+            contacts = index.summarize_contacts(pairs)
+            return {
+                "status": "success",
+                "person_id": person_id,
+                "window_minutes": window_minutes,
+                "badge_events": index.event_count(person_id, start, end),
+                "contacts": contacts.reset_index().to_dict("records"),
+                "encounters": pairs.sort_values("timestamp").to_dict("records"),
+            }
+        except Exception as e:
+            logger.error("Error in get_copresence: %s", e)
+            return {"status": "error", "message": str(e)}
+
     def health_check(self) -> Dict[str, Any]:
         """Check service health"""
         health = {"service": "healthy", "timestamp": datetime.now().isoformat()}
@@ -246,7 +246,7 @@ class EnhancedAnalyticsService:
         busiest_day = daily_counts.index[0] if len(daily_counts) > 0 else None
         
         # Door usage patterns
-        door_patterns = df.groupby('door_id').agg({
+        door_patterns = df.groupby('door_id', observed=True).agg({
             'event_id': 'count',
             'access_result': lambda x: (x == 'Granted').mean() * 100
         }).round(2)
@@ -259,8 +259,8 @@ class EnhancedAnalyticsService:
                 'daily_distribution': daily_counts.to_dict(),
                 'door_usage': door_patterns.to_dict('index'),
                 'access_frequency_stats': {
-                    'events_per_person': df.groupby('person_id').size().describe().to_dict(),
-                    'events_per_door': df.groupby('door_id').size().describe().to_dict()
+                    'events_per_person': df.groupby('person_id', observed=True).size().describe().to_dict(),
+                    'events_per_door': df.groupby('door_id', observed=True).size().describe().to_dict()
                 }
             }
         }
@@ -301,7 +301,7 @@ class EnhancedAnalyticsService:
             })
         
         # Repeated failures by person
-        repeated_failures = failed_attempts.groupby('person_id').size()
+        repeated_failures = failed_attempts.groupby('person_id', observed=True).size()
         high_failure_users = repeated_failures[repeated_failures >= 3].to_dict()
         
         return {
@@ -313,7 +313,7 @@ class EnhancedAnalyticsService:
                 'device_issues': len(device_issues),
                 'security_alerts': security_alerts,
                 'high_failure_users': high_failure_users,
-                'failed_attempts_by_door': failed_attempts['door_id'].value_counts().to_dict() if len(failed_attempts) > 0 else {}
+                'failed_attempts_by_door': failed_attempts['door_id'].value_counts().loc[lambda counts: counts > 0].to_dict() if len(failed_attempts) > 0 else {}
             }
         }
     
@@ -597,7 +597,7 @@ class EnhancedAnalyticsService:
     
     def _analyze_user_patterns(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze user behavior patterns"""
-        user_stats = data.groupby('person_id').agg({
+        user_stats = data.groupby('person_id', observed=True).agg({
             'event_id': 'count',
             'access_result': lambda x: (x == 'Granted').mean() * 100,
             'door_id': 'nunique'
@@ -616,7 +616,7 @@ class EnhancedAnalyticsService:
     
     def _analyze_door_patterns(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Analyze door utilization patterns"""
-        door_stats = data.groupby('door_id').agg({
+        door_stats = data.groupby('door_id', observed=True).agg({
             'event_id': 'count',
             'person_id': 'nunique',
             'access_result': lambda x: (x == 'Granted').mean() * 100
@@ -640,10 +640,10 @@ class EnhancedAnalyticsService:
         security_issues = {
             'total_failed_attempts': len(failed_attempts),
             'failure_rate': len(failed_attempts) / len(data) * 100 if len(data) > 0 else 0,
-            'users_with_multiple_failures': failed_attempts.groupby('person_id').size()[
-                failed_attempts.groupby('person_id').size() >= 3
+            'users_with_multiple_failures': failed_attempts.groupby('person_id', observed=True).size()[
+                failed_attempts.groupby('person_id', observed=True).size() >= 3
             ].to_dict(),
-            'doors_with_high_failures': failed_attempts.groupby('door_id').size().nlargest(5).to_dict()
+            'doors_with_high_failures': failed_attempts.groupby('door_id', observed=True).size().nlargest(5).to_dict()
         }
         
         return security_issues
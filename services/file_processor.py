@@ -3,7 +3,7 @@ import pandas as pd
 import json
 import os
 import uuid
-from typing import Dict, Any, Optional, Tuple, Sequence
+from typing import Dict, Any, Iterator, Optional, Tuple, Sequence
 import logging
 from datetime import datetime
 
@@ -12,6 +12,7 @@ from utils import (
     apply_manual_mapping as util_apply_manual_mapping,
     get_mapping_suggestions as util_get_mapping_suggestions,
 )
+from services.file_processor_service import FileProcessorService
 
 
 class FileProcessor:
@@ -81,21 +82,32 @@ class FileProcessor:
             return {"success": False, "error": f"Error processing file: {str(e)}"}
 
     def _parse_csv(self, file_path: str) -> pd.DataFrame:
-        """Parse CSV file with various delimiters"""
+        """Parse CSV file, sniffing encoding and delimiter once
 
-        # Try different delimiters
-        delimiters = [",", ";", "\t", "|"]
+        The other common delimiters are still tried when the sniffed one
+        does not give more than one column.
+        """
 
-        # Read the header only once to determine date parsing
-        header = pd.read_csv(file_path, nrows=0).columns
-        parse_dates = ["timestamp"] if "timestamp" in header else False
+        with open(file_path, "rb") as f:
+            prefix = f.read(FileProcessorService.SNIFF_BYTES)
+        encoding, delimiter = FileProcessorService().sniff_csv_format(prefix)
+        delimiters = [delimiter] + [
+            d for d in FileProcessorService.CSV_DELIMITERS if d != delimiter
+        ]
 
         for delimiter in delimiters:
             try:
+                # Parse timestamps only when this delimiter finds the column
+                header = pd.read_csv(
+                    file_path, sep=delimiter, encoding=encoding, nrows=0
+                ).columns
+                parse_dates = ["timestamp"] if "timestamp" in header else False
+
                 df = pd.read_csv(
                     file_path,
-                    delimiter=delimiter,
-                    encoding="utf-8",
+                    sep=delimiter,
+                    encoding=encoding,
+                    encoding_errors="replace",
                     parse_dates=parse_dates,
                 )
 
@@ -109,6 +121,31 @@ class FileProcessor:
         # Fallback to default comma delimiter
         return pd.read_csv(file_path, encoding="utf-8")
 
+    def iter_csv_chunks(
+        self, file_path: str, chunksize: Optional[int] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Stream a large CSV file as validated, normalised chunks
+
+        Column mapping is resolved from the first chunk and reused for the
+        rest, and ``_validate_data_content`` normalisation runs per chunk so
+        memory stays bounded by ``chunksize`` regardless of file size.
+        """
+        rename_dict: Optional[Dict[str, str]] = None
+
+        def normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+            nonlocal rename_dict
+            if rename_dict is None:
+                validation_result = self._validate_data(chunk)
+                if not validation_result["valid"]:
+                    raise ValueError(validation_result["error"])
+                mapped = validation_result["data"]
+                rename_dict = dict(zip(chunk.columns, mapped.columns))
+                return mapped
+
+            return self._validate_data_content(chunk.rename(columns=rename_dict))["data"]
+
+        yield from FileProcessorService().iter_csv_chunks(file_path, chunksize, normalize)
+
     def _parse_json(self, file_path: str) -> pd.DataFrame:
         """Parse JSON file"""
 
@@ -2,14 +2,19 @@
 """
 Fixed File Processor Service - Handles Unicode encoding issues properly
 """
+import codecs
+import csv
 import io
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, BinaryIO, Callable, Iterator, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+CsvSource = Union[str, Path, bytes, BinaryIO]
+
 
 class FileProcessorService:
     """Fixed service for processing uploaded files with proper Unicode handling"""
@@ -17,6 +22,20 @@ class FileProcessorService:
     ALLOWED_EXTENSIONS = {".csv", ".json", ".xlsx", ".xls"}
     MAX_FILE_SIZE_MB = 100
 
+    # Streaming ingestion settings
+    CSV_DELIMITERS = ",;\t|"
+    SNIFF_BYTES = 64 * 1024
+    STREAM_CHUNK_ROWS = 100_000
+
+    # Low-cardinality event columns stored as ``category`` on ingest
+    CATEGORICAL_COLUMNS = (
+        "person_id",
+        "door_id",
+        "access_result",
+        "badge_status",
+        "device_status",
+    )
+
     def __init__(self):
         """Initialize the file processor service"""
         pass
@@ -69,6 +88,166 @@ class FileProcessorService:
             logger.error(f"Error processing file {filename}: {e}")
             raise
 
+    def process_file_stream(
+        self,
+        source: CsvSource,
+        filename: str,
+        chunksize: Optional[int] = None,
+        normalize: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the uploaded file as DataFrame chunks
+
+        CSV files are parsed incrementally so peak memory is bounded by the
+        chunk size rather than the file size. Other formats cannot be read
+        incrementally and are yielded as a single frame.
+        """
+        file_ext = Path(filename).suffix.lower()
+        if file_ext == ".csv":
+            yield from self.iter_csv_chunks(source, chunksize, normalize)
+            return
+
+        if isinstance(source, (str, Path)):
+            content = Path(source).read_bytes()
+        elif isinstance(source, bytes):
+            content = source
+        else:
+            content = source.read()
+        df = self.process_file(content, filename)
+        yield normalize(df) if normalize else df
+
+    def iter_csv_chunks(
+        self,
+        source: CsvSource,
+        chunksize: Optional[int] = None,
+        normalize: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream a CSV file in fixed-size chunks
+
+        Encoding and delimiter are sniffed once from a small prefix of the
+        file, then ``pd.read_csv`` parses ``chunksize`` rows at a time. The
+        optional ``normalize`` callable is applied to every chunk before it
+        is yielded.
+        """
+        chunksize = chunksize or self.STREAM_CHUNK_ROWS
+
+        if isinstance(source, (str, Path)):
+            handle: BinaryIO = open(source, "rb")
+            owns_handle = True
+        elif isinstance(source, bytes):
+            handle = io.BytesIO(source)
+            owns_handle = True
+        else:
+            handle = source
+            owns_handle = False
+
+        try:
+            prefix = handle.read(self.SNIFF_BYTES)
+            handle.seek(0)
+            encoding, delimiter = self.sniff_csv_format(prefix)
+            logger.info(
+                f"Streaming CSV with {encoding} encoding, delimiter {delimiter!r}, "
+                f"{chunksize} rows per chunk"
+            )
+
+            with pd.read_csv(
+                handle,
+                sep=delimiter,
+                encoding=encoding,
+                encoding_errors="replace",
+                chunksize=chunksize,
+            ) as reader:
+                for chunk in reader:
+                    yield normalize(chunk) if normalize else chunk
+        finally:
+            if owns_handle:
+                handle.close()
+
+    def optimize_dtypes(
+        self, df: pd.DataFrame, column_names: Optional[Dict[str, str]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Convert an uploaded frame to compact dtypes
+
+        ``CATEGORICAL_COLUMNS`` become ``category``, ``timestamp`` is parsed
+        to ``datetime64[ns]`` when every value parses, integers are
+        downcast and floats are downcast only when no precision is lost.
+        ``column_names`` maps raw headers to the standard names these rules
+        key on, so a frame can be converted before its columns are renamed.
+        Returns the converted frame and its memory use before and after.
+        """
+        memory_before = int(df.memory_usage(deep=True).sum())
+        df = df.copy(deep=False)
+        column_names = column_names or {}
+
+        for col in df.columns:
+            series = df[col]
+            name = column_names.get(col, col)
+            if name in self.CATEGORICAL_COLUMNS:
+                if not isinstance(series.dtype, pd.CategoricalDtype) and (
+                    pd.api.types.is_object_dtype(series)
+                    or pd.api.types.is_string_dtype(series)
+                ):
+                    df[col] = series.astype("category")
+            elif name == "timestamp":
+                df[col] = self._to_datetime(series)
+            elif pd.api.types.is_bool_dtype(series):
+                continue
+            elif pd.api.types.is_integer_dtype(series):
+                df[col] = pd.to_numeric(series, downcast="integer")
+            elif pd.api.types.is_float_dtype(series):
+                downcast = pd.to_numeric(series, downcast="float")
+                if np.array_equal(
+                    downcast.to_numpy(dtype="float64"),
+                    series.to_numpy(dtype="float64"),
+                    equal_nan=True,
+                ):
+                    df[col] = downcast
+
+        memory_after = int(df.memory_usage(deep=True).sum())
+        return df, {
+            "memory_before_bytes": memory_before,
+            "memory_after_bytes": memory_after,
+            "memory_saved_bytes": memory_before - memory_after,
+        }
+
+    def _to_datetime(self, series: pd.Series) -> pd.Series:
+        """Parse timestamps, leaving the column as-is if any value fails"""
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            return series
+        if not pd.api.types.is_datetime64_any_dtype(series):
+            parsed = pd.to_datetime(series, errors="coerce")
+            if parsed.isna().sum() > series.isna().sum():
+                logger.warning("Unparseable timestamps, keeping original column")
+                return series
+            series = parsed
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            return series
+        return series.astype("datetime64[ns]")
+
+    def sniff_csv_format(self, prefix: bytes) -> Tuple[str, str]:
+        """Detect encoding and delimiter from the first bytes of a CSV file"""
+        if prefix.startswith(codecs.BOM_UTF8):
+            encoding = "utf-8-sig"
+        else:
+            try:
+                # Incremental decoding tolerates a multi-byte character cut
+                # off at the end of the prefix
+                codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+                encoding = "utf-8"
+            except UnicodeDecodeError:
+                encoding = "latin1"
+
+        text = prefix.decode(encoding, errors="replace")
+        # Only sniff complete lines
+        if "\n" in text:
+            text = text[: text.rindex("\n")]
+
+        try:
+            delimiter = csv.Sniffer().sniff(text, delimiters=self.CSV_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+
+        return encoding, delimiter
+
     def _sanitize_text(self, text: str) -> str:
         """Remove or replace problematic Unicode characters including surrogates"""
         try:
@@ -92,9 +271,21 @@ class FileProcessorService:
             return text.encode("utf-8", errors="replace").decode("utf-8")
 
     def _process_csv(self, content: bytes) -> pd.DataFrame:
-        """Process CSV file with proper Unicode handling"""
+        """Process CSV file with proper Unicode handling
+
+        The file is read in chunks with the sniffed encoding and delimiter,
+        so no decoded copy of the whole text is held. Decoding with each
+        encoding in turn is the fallback when that gives a single column.
+        """
         logger.info("Processing CSV file...")
 
+        try:
+            df = pd.concat(self.iter_csv_chunks(content), ignore_index=True)
+            if len(df.columns) > 1 and len(df) > 0:
+                return df
+        except Exception as e:
+            logger.debug(f"Chunked CSV parsing failed: {e}")
+
         # List of encodings to try in order
         encodings = ["utf-8", "utf-8-sig", "latin1", "cp1252", "iso-8859-1"]
 
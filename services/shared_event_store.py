@@ -0,0 +1,277 @@
+"""Memory-mapped columnar event store shared across worker processes.
+
+Each uploaded frame is written once as a directory of ``.npy`` column files.
+Workers open the columns with ``mmap_mode="r"`` so every process maps the same
+page-cache pages instead of holding a private copy. String columns are stored
+dictionary-encoded (category codes plus categories) and served as categoricals
+over the mapped codes; :func:`read_frame` can decode them back to their
+original dtype. A generation counter in ``manifest.json`` tells workers
+when an upload or clear happened in another process.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:  # POSIX advisory locking for concurrent writers
+    import fcntl
+except ImportError:  # pragma: no cover - non POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_STORE_DIR = "temp/uploaded_data/mmap"
+
+
+class SharedEventStore:
+    """Read-only, zero-copy view of uploaded frames shared between processes"""
+
+    def __init__(self, root_dir: str = DEFAULT_SHARED_STORE_DIR) -> None:
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._manifest: Dict[str, Any] = {"generation": 0, "files": {}}
+        self._manifest_stamp: Optional[tuple] = None
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    # ------------------------------------------------------------------
+    # Manifest handling
+    # ------------------------------------------------------------------
+    def _manifest_path(self) -> Path:
+        return self.root_dir / "manifest.json"
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with open(self.root_dir / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"generation": 0, "files": {}}
+        except json.JSONDecodeError:
+            logger.warning("Corrupted shared store manifest, ignoring it")
+            return {"generation": 0, "files": {}}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = self._manifest_path().with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _refresh(self) -> None:
+        """Reload the manifest if another process published a new generation"""
+        try:
+            stat = self._manifest_path().stat()
+            stamp = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self._manifest_stamp:
+            return
+
+        manifest = self._read_manifest()
+        if manifest["generation"] != self._manifest["generation"]:
+            live_dirs = {entry["dir"] for entry in manifest["files"].values()}
+            self._frames = {d: df for d, df in self._frames.items() if d in live_dirs}
+        self._manifest = manifest
+        self._manifest_stamp = stamp
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every publish or clear in any process"""
+        with self._lock:
+            self._refresh()
+            return self._manifest["generation"]
+
+    def add_frame(self, filename: str, df: pd.DataFrame) -> int:
+        """Write ``df`` as memory-mappable columns and publish it"""
+        with self._lock, self._write_lock():
+            manifest = self._read_manifest()
+            generation = manifest["generation"] + 1
+            frame_dir = f"g{generation}"
+            write_frame(self.root_dir / frame_dir, df)
+
+            old = manifest["files"].get(filename)
+            manifest["generation"] = generation
+            manifest["files"][filename] = {"dir": frame_dir, "rows": len(df)}
+            self._write_manifest(manifest)
+
+            # Processes still mapping the old columns keep their view until
+            # they refresh; unlinking mapped files is safe on POSIX
+            if old is not None:
+                shutil.rmtree(self.root_dir / old["dir"], ignore_errors=True)
+            return generation
+
+    def clear(self) -> int:
+        """Remove every published frame"""
+        with self._lock, self._write_lock():
+            manifest = self._read_manifest()
+            for entry in manifest["files"].values():
+                shutil.rmtree(self.root_dir / entry["dir"], ignore_errors=True)
+            generation = manifest["generation"] + 1
+            self._write_manifest({"generation": generation, "files": {}})
+            return generation
+
+    def get_filenames(self) -> List[str]:
+        """Get the filenames published in the current generation"""
+        with self._lock:
+            self._refresh()
+            return list(self._manifest["files"].keys())
+
+    def get_version(self, filename: str) -> Optional[str]:
+        """Get an identifier that changes whenever ``filename`` is republished"""
+        with self._lock:
+            self._refresh()
+            entry = self._manifest["files"].get(filename)
+            return None if entry is None else entry["dir"]
+
+    def get_frame(
+        self, filename: str, columns: Optional[List[str]] = None
+    ) -> Optional[pd.DataFrame]:
+        """Get a memory-mapped frame, optionally projected to ``columns``
+
+        String columns stay categorical over the mapped codes; decoding
+        them would give every worker a private copy.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self._manifest["files"].get(filename)
+            if entry is None:
+                return None
+
+            df = self._frames.get(entry["dir"])
+            if df is None:
+                try:
+                    df = read_frame(self.root_dir / entry["dir"], restore_dtypes=False)
+                except Exception as e:
+                    logger.warning(f"Could not map {filename}: {e}")
+                    return None
+                self._frames[entry["dir"]] = df
+            return df if columns is None else df[columns]
+
+    def get_all_data(
+        self, columns: Optional[List[str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """Get all published frames without copying column data"""
+        data = {}
+        for filename in self.get_filenames():
+            df = self.get_frame(filename, columns)
+            if df is not None:
+                data[filename] = df
+        return data
+
+
+# ----------------------------------------------------------------------
+# Column encoding
+# ----------------------------------------------------------------------
+def write_frame(frame_dir: Path, df: pd.DataFrame) -> None:
+    """Write ``df`` to ``frame_dir`` as one ``.npy`` file per column"""
+    frame_dir = Path(frame_dir)
+    frame_dir.mkdir(parents=True, exist_ok=True)
+    columns_meta = []
+    for i, name in enumerate(df.columns):
+        series = df.iloc[:, i]
+        meta: Dict[str, Any] = {"name": name, "file": f"c{i}.npy"}
+
+        if isinstance(series.dtype, pd.DatetimeTZDtype):
+            meta["tz"] = str(series.dt.tz)
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+            meta["kind"] = "array"
+            np.save(frame_dir / meta["file"], series.to_numpy())
+        else:
+            # Dictionary-encode strings and other object columns
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                meta["dtype"] = str(series.dtype)
+            cat = series.astype("category").cat
+            categories = cat.categories.to_numpy()
+            if categories.dtype == object:
+                if all(isinstance(value, str) for value in categories):
+                    categories = categories.astype(str)
+                else:
+                    # Mixed or non-string values keep their types
+                    meta["pickled"] = True
+            meta["kind"] = "category"
+            meta["categories"] = f"c{i}.categories.npy"
+            np.save(frame_dir / meta["file"], cat.codes.to_numpy())
+            np.save(frame_dir / meta["categories"], categories)
+        columns_meta.append(meta)
+
+    with open(frame_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"rows": len(df), "columns": columns_meta}, f)
+
+
+def read_frame(frame_dir: Path, restore_dtypes: bool = True) -> pd.DataFrame:
+    """Memory-map a frame written by :func:`write_frame`
+
+    String columns are decoded back to their original dtype. With
+    ``restore_dtypes=False`` they stay ``category`` over the mapped codes.
+    """
+    frame_dir = Path(frame_dir)
+    with open(frame_dir / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    data: Dict[Any, Any] = {}
+    for column in meta["columns"]:
+        # Plain ndarray view of the read-only mapping
+        values = np.load(frame_dir / column["file"], mmap_mode="r").view(np.ndarray)
+        if column["kind"] == "category":
+            categories = np.load(
+                frame_dir / column["categories"],
+                allow_pickle=column.get("pickled", False),
+            )
+            values = pd.Categorical.from_codes(
+                values, dtype=pd.CategoricalDtype(categories), validate=False
+            )
+            if restore_dtypes and "dtype" in column:
+                # Decode columns that were not categorical when written
+                values = values.astype(column["dtype"])
+        elif "tz" in column:
+            values = (
+                pd.DatetimeIndex(values).tz_localize("UTC").tz_convert(column["tz"])
+            )
+        data[column["name"]] = values
+
+    return pd.DataFrame(data, index=pd.RangeIndex(meta["rows"]), copy=False)
+
+
+_shared_event_store: Optional[SharedEventStore] = None
+
+
+def get_shared_event_store() -> SharedEventStore:
+    """Get the process-wide shared event store"""
+    global _shared_event_store
+    if _shared_event_store is None:
+        _shared_event_store = SharedEventStore()
+    return _shared_event_store
+
+
+__all__ = [
+    "SharedEventStore",
+    "DEFAULT_SHARED_STORE_DIR",
+    "get_shared_event_store",
+    "write_frame",
+    "read_frame",
+]
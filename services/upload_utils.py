@@ -2,7 +2,7 @@
 
 import logging
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import pandas as pd
 import dash_bootstrap_components as dbc
 from dash import html
@@ -12,10 +12,28 @@ from utils.file_validator import (
     safe_decode_file,
 )
 from services.file_processor_service import FileProcessorService
+from utils import STANDARD_COLUMN_MAPPINGS, fuzzy_match_columns
 
 logger = logging.getLogger(__name__)
 
 
+def guess_column_names(columns: List[str]) -> Dict[str, str]:
+    """Standard names the raw headers are expected to be mapped to.
+
+    Standard names and headers stay as they are; other headers take the
+    fuzzy suggestions that column verification starts from.
+    """
+    targets = FileProcessorService.CATEGORICAL_COLUMNS + ("timestamp",)
+    names = {col: col for col in columns if col in targets}
+    for col in columns:
+        if col in STANDARD_COLUMN_MAPPINGS:
+            names.setdefault(col, STANDARD_COLUMN_MAPPINGS[col])
+    for standard, col in fuzzy_match_columns(columns, targets).items():
+        if standard not in names.values():
+            names.setdefault(col, standard)
+    return names
+
+
 def parse_uploaded_file(contents: str, filename: str) -> Dict[str, Any]:
     """Parse uploaded file contents into a DataFrame.
 
@@ -29,9 +47,10 @@ def parse_uploaded_file(contents: str, filename: str) -> Dict[str, Any]:
     Returns
     -------
     Dict[str, Any]
-        Dictionary containing ``success`` flag, ``data`` DataFrame when
-        successful and additional metadata or an ``error`` message when
-        parsing fails.
+        Dictionary containing ``success`` flag, ``data`` DataFrame with
+        compact dtypes when successful and additional metadata (including
+        ``memory_usage`` before and after dtype optimisation) or an
+        ``error`` message when parsing fails.
     """
     validation = validate_upload_content(contents, filename)
     if not validation.get("valid"):
@@ -61,11 +80,20 @@ def parse_uploaded_file(contents: str, filename: str) -> Dict[str, Any]:
     if df is None or df.empty:
         return {"success": False, "error": "File contains no data"}
 
+    # Headers keep their raw names for column verification; the dtypes
+    # follow the standard names they are expected to be mapped to
+    df, memory_usage = processor.optimize_dtypes(df, guess_column_names(list(df.columns)))
+    logger.info(
+        f"Optimized dtypes for {filename}: saved "
+        f"{memory_usage['memory_saved_bytes'] / (1024 * 1024):.1f}MB"
+    )
+
     return {
         "success": True,
         "data": df,
         "rows": len(df),
         "columns": list(df.columns),
+        "memory_usage": memory_usage,
         "upload_time": datetime.now(),
     }
 
@@ -97,9 +125,14 @@ def generate_preview(df: pd.DataFrame, filename: str) -> dbc.Card:
     )
 
 
-def update_upload_state(filename: str, df: pd.DataFrame, store) -> Dict[str, Any]:
+def update_upload_state(
+    filename: str,
+    df: pd.DataFrame,
+    store,
+    memory_usage: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
     """Update the persistent upload store with a new file."""
-    store.add_file(filename, df)
+    store.add_file(filename, df, memory_usage)
     return {
         "filename": filename,
         "rows": len(df),
@@ -6,6 +6,8 @@ from typing import Any, Dict, List
 
 import pandas as pd
 
+from analytics.incremental_aggregates import IncrementalAggregator
+from analytics.kpi_sketches import KPISketch
 from .analytics_base import AnalyticsModule
 
 logger = logging.getLogger(__name__)
@@ -79,5 +81,63 @@ class UploadedDataAnalytics(AnalyticsModule):
             logger.error("Direct processing failed: %s", exc)
             return {"status": "error", "message": str(exc)}
 
+    def summarize_aggregates(self, aggregates: IncrementalAggregator) -> Dict[str, Any]:
+        """Build the same summary from incremental aggregates, without a rescan."""
+        summary = aggregates.get_summary()
+        date_range = {"start": "Unknown", "end": "Unknown"}
+        if summary["date_range"]["start"] is not None:
+            date_range = {
+                "start": summary["date_range"]["start"].strftime("%Y-%m-%d"),
+                "end": summary["date_range"]["end"].strftime("%Y-%m-%d"),
+            }
+        top_users = aggregates.users["events"].astype("int64").nlargest(10)
+        top_doors = aggregates.get_door_stats()["events"].head(10)
+        return {
+            "status": "success",
+            "total_events": summary["total_events"],
+            "successful_events": int(aggregates.daily["granted"].sum()),
+            "active_users": summary["unique_users"],
+            "active_doors": summary["unique_doors"],
+            "unique_users": summary["unique_users"],
+            "unique_doors": summary["unique_doors"],
+            "data_source": "uploaded",
+            "date_range": date_range,
+            "top_users": [{"user_id": u, "count": int(c)} for u, c in top_users.items()],
+            "top_doors": [{"door_id": d, "count": int(c)} for d, c in top_doors.items()],
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def summarize_sketch(self, sketch: KPISketch) -> Dict[str, Any]:
+        """Build the headline summary from merged KPI sketches.
+
+        Unique counts are HyperLogLog estimates within ``distinct_error``;
+        top users and doors are ranked by count-min estimates.
+        """
+        summary = sketch.summary()
+        date_range = {"start": "Unknown", "end": "Unknown"}
+        if summary["date_range"]["start"] is not None:
+            date_range = {
+                "start": summary["date_range"]["start"].strftime("%Y-%m-%d"),
+                "end": summary["date_range"]["end"].strftime("%Y-%m-%d"),
+            }
+        top_users = sketch.users.counts.top(10)
+        top_doors = sketch.doors.counts.top(10)
+        return {
+            "status": "success",
+            "total_events": summary["total_events"],
+            "successful_events": sketch.granted,
+            "success_rate": summary["success_rate"],
+            "active_users": summary["unique_users"],
+            "active_doors": summary["unique_doors"],
+            "unique_users": summary["unique_users"],
+            "unique_doors": summary["unique_doors"],
+            "distinct_error": summary["distinct_error"],
+            "data_source": "uploaded",
+            "date_range": date_range,
+            "top_users": [{"user_id": u, "count": int(c)} for u, c in top_users.items()],
+            "top_doors": [{"door_id": d, "count": int(c)} for d, c in top_doors.items()],
+            "timestamp": datetime.now().isoformat(),
+        }
+
     def get_analytics(self, uploaded_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
         return self.process_uploaded_data(uploaded_data)
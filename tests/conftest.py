@@ -4,7 +4,7 @@ import pytest
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Generator
+from typing import Callable, Generator
 import sys
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -114,6 +114,62 @@ def sample_access_data() -> "pd.DataFrame":
     )
 
 
+@pytest.fixture
+def make_events() -> Callable[..., "pd.DataFrame"]:
+    """Factory of synthetic access events of any size
+
+    ``make_events(seed, n, users, doors, days, start)`` wraps
+    ``generate_synthetic_access_data``; ids and labels are categorical,
+    as they are after ingest.
+    """
+
+    if pd is None:
+        pytest.skip("pandas is required for make_events")
+
+    from utils.sample_data_generator import generate_synthetic_access_data
+
+    def make(seed: int = 0, n: int = 5000, users: int | None = None,
+             doors: int | None = None, days: int = 20,
+             start: str = "2024-01-01") -> "pd.DataFrame":
+        return generate_synthetic_access_data(
+            num_records=n,
+            num_users=users,
+            num_doors=doors,
+            days=days,
+            start_date=start,
+            seed=seed,
+        )
+
+    return make
+
+
+@pytest.fixture
+def serve_uploads(monkeypatch) -> Callable[..., list]:
+    """Serve a dict of frames as an analytics accessor's uploads
+
+    ``serve_uploads(accessor, uploads)`` versions each file by its frame
+    object, so replacing a frame is a new upload. The returned list
+    records every file the accessor loaded.
+    """
+
+    def serve(accessor, uploads) -> list:
+        loaded: list = []
+
+        def load(filename):
+            loaded.append(filename)
+            return uploads.get(filename)
+
+        monkeypatch.setattr(
+            accessor,
+            "_get_uploaded_versions",
+            lambda: {filename: str(id(df)) for filename, df in uploads.items()},
+        )
+        monkeypatch.setattr(accessor, "_load_uploaded_frame", load)
+        return loaded
+
+    return serve
+
+
 @pytest.fixture
 def sample_persons() -> list[Person]:
     """Sample person entities for testing"""
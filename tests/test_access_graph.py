@@ -0,0 +1,82 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("sklearn")
+
+from analytics.access_graph import AccessGraph, AccessGraphEngine
+from analytics.unique_patterns_analyzer import UniquePatternAnalyzer
+
+
+def _walks(shift=0, walks=400):
+    """Badges wandering inside one of two wings, every fifth crossing via LOBBY
+
+    Walks step through their wing's doors with strides of 1 to 4, so every
+    door pair in a wing is linked, and LOBBY is the only way between the
+    wings; ``shift`` varies the doors each walk starts from.
+    """
+    wings = {"A": [f"A{i}" for i in range(5)], "B": [f"B{i}" for i in range(5)]}
+    rows = []
+    for walk in range(walks):
+        start = pd.Timestamp("2024-01-01 08:00") + pd.Timedelta(hours=walk)
+        wing = "A" if walk % 2 else "B"
+        first, stride = walk * 3 + shift, 1 + walk // 2 % 4
+        doors = [wings[wing][(first + stride * step) % 5] for step in range(4)]
+        if walk % 5 == 0:
+            other = wings["B" if wing == "A" else "A"]
+            doors += ["LOBBY"] + [other[(first + step) % 5] for step in range(2)]
+        for step, door in enumerate(doors):
+            rows.append((start + pd.Timedelta(minutes=step), f"U{walk % 40}", door))
+    df = pd.DataFrame(rows, columns=["timestamp", "person_id", "door_id"])
+    df["access_result"] = "Granted"
+    df["floor_number"] = df["door_id"].str[0].map({"A": 1, "B": 2, "L": 1})
+    return df
+
+
+def test_edges_follow_consecutive_visits_within_sessions():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 09:00", "2024-01-01 09:05", "2024-01-01 09:06", "2024-01-01 12:00",
+                 "2024-01-01 09:01", "2024-01-01 09:02"]
+            ),
+            "person_id": ["U1", "U1", "U1", "U1", "U2", "U2"],
+            "door_id": ["D1", "D2", "D2", "D3", "D2", "D1"],
+        }
+    )
+    graph = AccessGraph.from_events(df.sample(frac=1, random_state=0))
+    edges = {(edge["from"], edge["to"]): edge["transitions"] for edge in graph.top_edges()}
+    # Repeats at D2 are not edges and the 3 hour gap ends U1's session
+    assert edges == {("D1", "D2"): 1, ("D2", "D1"): 1}
+
+
+def test_communities_and_chokepoints():
+    graph = AccessGraph.from_events(_walks())
+    communities = pd.Series(graph.communities(), index=graph.doors)
+    assert communities[[f"A{i}" for i in range(5)]].nunique() == 1
+    assert communities[[f"B{i}" for i in range(5)]].nunique() == 1
+    assert communities["A0"] != communities["B0"]
+    assert graph.chokepoints(1)[0]["door_id"] == "LOBBY"
+    assert np.isclose(graph.pagerank().sum(), 1)
+
+
+def test_graph_cached_per_dataset_version():
+    engine = AccessGraphEngine()
+    df = _walks(1)
+    graph = engine.graph(df, dataset_version=3)
+    assert engine.graph(df.iloc[:10], dataset_version=3) is graph
+    assert engine.graph(df) is engine.graph(df.copy())
+    engine.invalidate(3)
+    assert engine.graph(df, dataset_version=3) is not graph
+
+
+def test_unique_patterns_report_network_and_locations():
+    analyzer = UniquePatternAnalyzer()
+    result = analyzer.analyze_patterns(_walks(2), {}, dataset_version="g1")
+    network = result["network_analysis"]
+    assert network["total_doors"] == 11
+    assert network["chokepoints"][0]["door_id"] == "LOBBY"
+    locations = result["device_patterns"]["location_analysis"]
+    assert locations["floors"] == 2
+    assert locations["inter_floor_transitions"] > 0
@@ -0,0 +1,60 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from analytics.analytics_controller import AnalyticsConfig, AnalyticsController
+from core.caching import LRUByteCache, dataframe_fingerprint
+
+
+def _events(doors):
+    return pd.DataFrame(
+        {
+            "event_id": range(len(doors)),
+            "timestamp": pd.date_range("2024-01-01", periods=len(doors), freq="h"),
+            "person_id": ["EMP1"] * len(doors),
+            "door_id": doors,
+            "access_result": ["Granted"] * len(doors),
+        }
+    )
+
+
+def test_fingerprint_tracks_content_not_shape():
+    df = _events(["D1", "D2", "D3"])
+
+    assert dataframe_fingerprint(df) == dataframe_fingerprint(df.copy())
+    # Same shape, timestamps and user count as before: the old key collided
+    assert dataframe_fingerprint(df) != dataframe_fingerprint(_events(["D1", "D2", "D4"]))
+
+
+def test_lru_byte_cache_evicts_least_recently_used():
+    cache = LRUByteCache(max_bytes=30, size_func=len)
+    cache.set("a", "x" * 10)
+    cache.set("b", "x" * 10)
+    cache.get("a")
+    cache.set("c", "x" * 15)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.total_bytes == 25
+    assert cache.set("huge", "x" * 31) is False
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_controller_reuses_result_for_identical_content():
+    config = AnalyticsConfig(
+        enable_security_patterns=False,
+        enable_access_trends=False,
+        enable_user_behavior=False,
+        enable_interactive_charts=False,
+        parallel_processing=False,
+    )
+    controller = AnalyticsController(config)
+    df = _events(["D1", "D2", "D3"])
+
+    first = controller.analyze_all(df)
+    assert controller.analyze_all(df.copy()) is first
+    assert controller.analyze_all(_events(["D1", "D2", "D4"])) is not first
+    assert controller.analyze_all(df, dataset_version="gen-7") is not first
+
+    stats = controller.get_analytics_status()["cache_stats"]
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["cached_results"] == 3
@@ -0,0 +1,59 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+
+from analytics.analytics_controller import AnalyticsConfig, AnalyticsController
+
+
+@pytest.fixture
+def access_events(make_events):
+    return make_events(3, n=600, users=20, doors=5, days=7)
+
+
+def _config(**overrides):
+    return AnalyticsConfig(
+        enable_user_behavior=False,
+        enable_interactive_charts=False,
+        cache_results=False,
+        **overrides,
+    )
+
+
+def test_process_backend_matches_sequential(access_events):
+    sequential = AnalyticsController(_config(parallel_processing=False))
+    processes = AnalyticsController(_config(parallel_backend="process"))
+
+    expected = sequential.analyze_all(access_events)
+    result = processes.analyze_all(access_events)
+
+    assert result.status == "success"
+    # repr() so NaN entries compare equal
+    assert repr(result.access_trends) == repr(expected.access_trends)
+    assert result.security_patterns.keys() == expected.security_patterns.keys()
+    assert (
+        result.anomaly_detection["anomaly_summary"]
+        == expected.anomaly_detection["anomaly_summary"]
+    )
+
+
+def test_default_backend_never_starts_processes(access_events, monkeypatch):
+    controller = AnalyticsController(_config(process_pool_min_rows=0))
+
+    def fail(*args):
+        raise AssertionError("process pool used without opting in")
+
+    monkeypatch.setattr(controller, "_run_process_analysis", fail)
+    assert controller.analyze_all(access_events).status == "success"
+    assert controller._process_pool is None
+
+
+def test_auto_backend_uses_threads_for_small_frames(access_events, monkeypatch):
+    controller = AnalyticsController(_config(parallel_backend="auto"))
+
+    def fail(*args):
+        raise AssertionError("process pool used for a small frame")
+
+    monkeypatch.setattr(controller, "_run_process_analysis", fail)
+    assert controller.analyze_all(access_events).status == "success"
+    assert controller._process_pool is None
@@ -0,0 +1,205 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from analytics.anomaly_detection import AnomalyDetector
+from analytics.tailgating import TailgatingDetector
+
+
+@pytest.fixture
+def access_events(make_events) -> "pd.DataFrame":
+    """Access events with enough history per user for every detector"""
+    df = make_events(7, n=4000, users=40, doors=8, days=14)
+    # Bursts of closely spaced events so door hopping / rapid sequences fire
+    burst = df.index[::4]
+    df.loc[burst, "timestamp"] = df.loc[burst, "timestamp"].dt.floor("10min") + pd.to_timedelta(
+        np.arange(len(burst)) % 90, unit="s"
+    )
+    return df
+
+
+def _legacy_door_hopping(df):
+    df_sorted = df.sort_values(["person_id", "timestamp"], kind="stable")
+    found = {}
+    for user_id in df_sorted["person_id"].unique():
+        user_data = df_sorted[df_sorted["person_id"] == user_id].copy()
+        user_data["door_change"] = user_data["door_id"] != user_data["door_id"].shift()
+        user_data["time_diff"] = user_data["timestamp"].diff()
+        rapid = user_data[user_data["door_change"] & (user_data["time_diff"] < pd.Timedelta(minutes=5))]
+        if len(rapid) > 3:
+            found[user_id] = len(rapid)
+    return found
+
+
+def _legacy_sequences(df):
+    found = {}
+    for user_id in df["person_id"].unique():
+        user_data = df[df["person_id"] == user_id].sort_values("timestamp", kind="stable").copy()
+        if len(user_data) < 3:
+            continue
+        user_data["door_change"] = user_data["door_id"] != user_data["door_id"].shift()
+        user_data["time_diff"] = user_data["timestamp"].diff()
+        rapid = user_data[user_data["door_change"] & (user_data["time_diff"] < pd.Timedelta(minutes=1))]
+        if len(rapid) > 2:
+            found[user_id] = len(rapid)
+    return found
+
+
+def _legacy_pattern_deviations(detector, df):
+    found = {}
+    for user_id in df["person_id"].unique():
+        user_data = df[df["person_id"] == user_id].sort_values("timestamp", kind="stable")
+        if len(user_data) < 10:
+            continue
+        split_point = int(len(user_data) * 0.7)
+        similarity = detector._calculate_pattern_similarity(
+            user_data.iloc[:split_point]["hour"].value_counts(normalize=True),
+            user_data.iloc[split_point:]["hour"].value_counts(normalize=True),
+        )
+        found[user_id] = similarity
+    return found
+
+
+def _legacy_routine_breaks(df):
+    found = {}
+    for user_id in df["person_id"].unique():
+        user_data = df[df["person_id"] == user_id]
+        if len(user_data) < 7:
+            continue
+        daily_activity = user_data.groupby("date")["event_id"].count()
+        if len(daily_activity) > 3:
+            recent_avg = daily_activity.tail(3).mean()
+            historical_avg = daily_activity.head(-3).mean()
+            if abs(recent_avg - historical_avg) > historical_avg:
+                found[user_id] = (historical_avg, recent_avg)
+    return found
+
+
+def _legacy_tailgating(df):
+    anomalies = []
+    df_sorted = df.sort_values(["door_id", "timestamp"])
+    for door_id in df["door_id"].unique():
+        door_data = df_sorted[df_sorted["door_id"] == door_id]
+        granted_access = door_data[door_data["access_result"] == "Granted"].copy()
+        if len(granted_access) < 2:
+            continue
+        granted_access["time_diff"] = granted_access["timestamp"].diff()
+        rapid = granted_access[granted_access["time_diff"] < pd.Timedelta(seconds=30)]
+        for _, row in rapid.iterrows():
+            anomalies.append({
+                "type": "potential_tailgating",
+                "severity": "medium",
+                "confidence": 0.6,
+                "door_id": door_id,
+                "timestamp": row["timestamp"],
+                "time_gap": row["time_diff"],
+                "description": f"Potential tailgating at door {door_id}: access {row['time_diff']} after previous",
+            })
+    return anomalies
+
+
+def test_per_user_detectors_match_legacy_loops(access_events):
+    detector = AnomalyDetector()
+    df = detector._prepare_data(access_events)
+
+    hopping = {a["user_id"]: a["rapid_changes"] for a in detector._detect_door_hopping(df)}
+    assert hopping == _legacy_door_hopping(df)
+    assert hopping
+
+    sequences = {a["user_id"]: a["sequence_count"] for a in detector._detect_sequence_anomalies(df)}
+    assert sequences == _legacy_sequences(df)
+    assert list(sequences) == [u for u in df["person_id"].unique() if u in sequences]
+
+    breaks = {
+        a["user_id"]: (a["historical_avg"], a["recent_avg"])
+        for a in detector._detect_routine_breaks(df)
+    }
+    expected_breaks = _legacy_routine_breaks(df)
+    assert breaks.keys() == expected_breaks.keys()
+    for user_id, averages in breaks.items():
+        assert averages == pytest.approx(expected_breaks[user_id])
+
+    similarities = _legacy_pattern_deviations(detector, df)
+    deviations = {a["user_id"]: a["similarity_score"] for a in detector._detect_pattern_deviations(df)}
+    assert deviations.keys() == {u for u, s in similarities.items() if s < 0.5}
+    for user_id, similarity in deviations.items():
+        assert similarity == pytest.approx(similarities[user_id])
+
+
+def test_pattern_deviation_flags_shifted_schedule():
+    detector = AnomalyDetector()
+    day_shift = pd.date_range("2024-01-01 09:00", periods=14, freq="D")
+    night_shift = pd.date_range("2024-01-15 02:00", periods=6, freq="D")
+    df = pd.DataFrame(
+        {
+            "event_id": range(20),
+            "timestamp": day_shift.append(night_shift),
+            "person_id": "EMP001",
+            "door_id": "MAIN",
+            "access_result": "Granted",
+        }
+    )
+
+    anomalies = detector._detect_pattern_deviations(detector._prepare_data(df))
+
+    assert [a["user_id"] for a in anomalies] == ["EMP001"]
+    assert anomalies[0]["similarity_score"] == pytest.approx(0.0)
+
+
+def test_detect_anomalies_runs_on_prepared_sequence_features(access_events):
+    result = AnomalyDetector().detect_anomalies(access_events)
+
+    types = result["anomaly_summary"]["type_breakdown"]
+    assert types.get("door_hopping", 0) > 0
+    assert types.get("rapid_attempts", 0) > 0
+
+
+def test_tailgating_matches_legacy_loop(access_events):
+    detector = AnomalyDetector()
+    df = detector._prepare_data(access_events)
+
+    anomalies = detector._detect_tailgating(df)
+
+    assert anomalies == _legacy_tailgating(df)
+    assert anomalies
+
+
+def test_tailgating_door_windows_and_streaming():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 09:00:00", "2024-01-01 09:00:20", "2024-01-01 09:00:50",
+                 "2024-01-01 09:00:00", "2024-01-01 09:00:20", "2024-01-01 09:00:25"]
+            ),
+            "person_id": ["A", "B", "C", "D", "E", "F"],
+            "door_id": ["LOBBY"] * 3 + ["LAB"] * 3,
+            "access_result": ["Granted"] * 5 + ["Denied"],
+        }
+    )
+    detector = TailgatingDetector(window_seconds=10, door_windows={"LOBBY": 45})
+
+    rapid = detector.find_rapid_accesses(df)
+    assert rapid["person_id"].tolist() == ["B", "C"]
+    assert rapid["time_gap"].tolist() == [pd.Timedelta(seconds=20), pd.Timedelta(seconds=30)]
+
+    stream = detector.iter_anomalies(df, batch_size=1)
+    assert next(stream)["timestamp"] == pd.Timestamp("2024-01-01 09:00:20")
+    assert len(list(stream)) == 1
+
+
+def test_large_feature_sets_use_approximate_svm(access_events):
+    detector = AnomalyDetector(svm_exact_max_samples=100)
+    df = detector._prepare_data(access_events)
+    features = detector._extract_ml_features(df)
+    assert len(features) > 100
+
+    anomalies = detector._oneclass_svm_detection(features, 0.95)
+    assert anomalies and {a["backend"] for a in anomalies} == {"approximate"}
+    assert detector.model_registry.get("oneclass_svm_approximate_0.9500") is not None
+
+    report = detector.compare_svm_backends(features, 0.95)
+    assert report["samples"] == len(features)
+    assert report["agreement"] > 0.9
+    assert AnomalyDetector()._svm_backend(len(features)) == "exact"
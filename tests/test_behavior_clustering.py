@@ -0,0 +1,58 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from analytics.behavior_clustering import IncrementalBehaviorClustering
+from analytics.model_registry import ModelRegistry
+from analytics.user_behavior import UserBehaviorAnalyzer
+from utils.sample_data_generator import generate_synthetic_access_data
+
+
+def _user_features(seed):
+    df = generate_synthetic_access_data(20_000, num_users=600, start_date="2024-01-01", seed=seed)
+    analyzer = UserBehaviorAnalyzer()
+    return analyzer._extract_user_features(analyzer._prepare_data(df))
+
+
+def test_centroids_update_incrementally_and_persist(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    clustering = IncrementalBehaviorClustering(registry)
+    first = _user_features(seed=1)
+
+    labels = clustering.fit_predict(first)
+    assert len(labels) == len(first)
+    centroids = clustering.centroids.copy()
+
+    # Features already seen are only assigned
+    np.testing.assert_array_equal(clustering.fit_predict(first), labels)
+    np.testing.assert_array_equal(clustering.centroids, centroids)
+
+    # New data moves the existing centroids instead of reseeding them
+    second = _user_features(seed=2)
+    clustering.fit_predict(second)
+    moved = clustering.centroids
+    assert moved.shape == centroids.shape
+    assert not np.array_equal(moved, centroids)
+    assert registry.get("behavior_clusters").n_samples == len(first) + len(second)
+
+    reloaded = IncrementalBehaviorClustering(ModelRegistry(str(tmp_path)))
+    np.testing.assert_array_equal(reloaded.centroids, moved)
+
+
+def test_single_user_assignment_matches_batch_predict():
+    clustering = IncrementalBehaviorClustering()
+    features = _user_features(seed=3)
+    labels = clustering.fit_predict(features)
+
+    assigned = [clustering.assign(row) for _, row in features.head(50).iterrows()]
+    assert assigned == labels[:50].tolist()
+
+
+def test_analyzer_incremental_mode():
+    df = generate_synthetic_access_data(5_000, num_users=120, start_date="2024-01-01")
+    result = UserBehaviorAnalyzer(clustering="incremental").analyze_behavior(df)["behavior_clustering"]
+    assert result["mode"] == "incremental"
+    assert result["cluster_count"] == len(result["cluster_centroids"]) == 5
+    assert sum(c["user_count"] for c in result["cluster_analysis"].values()) == 120
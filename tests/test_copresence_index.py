@@ -0,0 +1,111 @@
+import pytest
+from datetime import timedelta
+
+pd = pytest.importorskip("pandas")
+
+from analytics.copresence_index import CoPresenceIndex
+from services.analytics_ingestion import AnalyticsDataAccessor
+
+
+def _brute_force(df, person_id, window, start=None, end=None):
+    mine = df[df["person_id"] == person_id]
+    if start is not None:
+        mine = mine[mine["timestamp"] >= pd.Timestamp(start)]
+    if end is not None:
+        mine = mine[mine["timestamp"] <= pd.Timestamp(end)]
+    pairs = mine.merge(df, on="door_id", suffixes=("", "_other"))
+    pairs = pairs[
+        (pairs["person_id_other"] != person_id)
+        & ((pairs["timestamp_other"] - pairs["timestamp"]).abs() <= window)
+    ]
+    return sorted(zip(pairs["door_id"], pairs["timestamp"], pairs["person_id_other"], pairs["timestamp_other"]))
+
+
+def _pairs(result):
+    return sorted(zip(result["door_id"], result["timestamp"], result["person_id"], result["other_timestamp"]))
+
+
+def test_queries_match_brute_force_across_batches(make_events):
+    df = make_events(n=6000, users=60, days=7)
+    df.loc[::40, "door_id"] = None
+    index = CoPresenceIndex.concat(
+        [CoPresenceIndex.from_events(df.iloc[:2500]), CoPresenceIndex.from_events(df.iloc[2500:])]
+    )
+    valid = df.dropna(subset=["door_id"])
+    assert len(index) == len(valid)
+
+    window = timedelta(minutes=10)
+    for person in ["EMP000001", "EMP000042"]:
+        assert _pairs(index.co_present(person, window)) == _brute_force(valid, person, window)
+    bounded = index.co_present("EMP000007", window, "2024-01-03", "2024-01-04 12:00")
+    assert _pairs(bounded) == _brute_force(valid, "EMP000007", window, "2024-01-03", "2024-01-04 12:00")
+    assert index.co_present("NOBODY", window).empty
+
+
+def test_contacts_summarise_encounters():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 09:00", "2024-01-01 09:03", "2024-01-01 09:20", "2024-01-01 10:00",
+                 "2024-01-01 10:01", "2024-01-01 09:02"]
+            ),
+            "person_id": ["A", "B", "C", "A", "B", "D"],
+            "door_id": ["D1", "D1", "D1", "D2", "D2", "D2"],
+        }
+    )
+    contacts = CoPresenceIndex.from_events(df).contacts("A", timedelta(minutes=5))
+    assert list(contacts.index) == ["B"]
+    assert contacts.loc["B", "encounters"] == 2
+    assert contacts.loc["B", "doors"] == ["D1", "D2"]
+    assert contacts.loc["B", "closest_gap_seconds"] == 60
+
+
+def test_service_queries_the_index_once(monkeypatch):
+    from services.analytics_service import AnalyticsService
+
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2024-01-01 09:00", "2024-01-01 09:03", "2024-01-01 11:00"]),
+            "person_id": ["A", "B", "A"],
+            "door_id": ["D1", "D1", "D2"],
+        }
+    )
+    index = CoPresenceIndex.from_events(df)
+    service = AnalyticsService()
+    monkeypatch.setattr(service.data_accessor, "get_copresence_index", lambda: index)
+    calls = []
+    original = index.co_present
+    monkeypatch.setattr(index, "co_present", lambda *args: calls.append(args) or original(*args))
+
+    result = service.get_copresence("A", window_minutes=5)
+    assert len(calls) == 1
+    assert result["badge_events"] == 2
+    assert [contact["person_id"] for contact in result["contacts"]] == ["B"]
+    assert len(result["encounters"]) == 1
+
+
+def test_integer_ids_match_string_queries():
+    times = pd.to_datetime(["2024-01-01 09:00", "2024-01-01 09:02", "2024-01-01 09:03"])
+    ints = pd.DataFrame({"timestamp": times[:2], "person_id": [1001, 1002], "door_id": ["D1", "D1"]})
+    strings = pd.DataFrame({"timestamp": times[2:], "person_id": ["1001"], "door_id": ["D1"]})
+    index = CoPresenceIndex.concat([CoPresenceIndex.from_events(ints), CoPresenceIndex.from_events(strings)])
+
+    # The page passes the typed-in ID as a string
+    for person in ["1001", 1001]:
+        contacts = index.contacts(person, timedelta(minutes=5))
+        assert list(contacts.index) == ["1002"]
+        assert contacts.loc["1002", "encounters"] == 2
+    assert len(index.events(1001)) == 2
+
+
+def test_accessor_rebuilds_index_only_when_files_change(make_events, serve_uploads, tmp_path):
+    accessor = AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    uploads = {"jan.csv": make_events(1, n=6000)}
+    loaded = serve_uploads(accessor, uploads)
+
+    index = accessor.get_copresence_index()
+    assert accessor.get_copresence_index() is index
+    uploads["feb.csv"] = make_events(2, n=500, start="2024-02-01")
+    combined = accessor.get_copresence_index()
+    assert combined is not index and len(combined) == 6500
+    assert loaded == ["jan.csv", "feb.csv"]
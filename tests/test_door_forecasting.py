@@ -0,0 +1,78 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+from analytics.access_trends import AccessTrendsAnalyzer
+from analytics.door_forecasting import DoorForecaster
+from analytics.model_registry import ModelRegistry
+from analytics.rollup_cube import RollupCube
+
+
+def _daily_events(counts_by_door, start="2024-01-01"):
+    """One event at noon per unit of each door's daily count"""
+    rows = []
+    for door, counts in counts_by_door.items():
+        for day, count in enumerate(counts):
+            timestamp = pd.Timestamp(start) + pd.Timedelta(days=day, hours=12)
+            rows.extend([(timestamp, f"U{i}", door, "Granted") for i in range(count)])
+    return pd.DataFrame(rows, columns=["timestamp", "person_id", "door_id", "access_result"])
+
+
+def _seasonal_counts(days=42, weekday=20, weekend=4, slope=0):
+    weekdays = pd.date_range("2024-01-01", periods=days).weekday
+    return [(weekend if wd >= 5 else weekday) + slope * day for day, wd in enumerate(weekdays)]
+
+
+def test_forecasts_recover_weekly_seasonality_and_trend():
+    cube = RollupCube.from_events(_daily_events({
+        "LOBBY": _seasonal_counts(),
+        "LAB": _seasonal_counts(weekday=5, weekend=5, slope=1),
+    }))
+    forecasts = DoorForecaster().forecast_doors(cube, horizon=7)
+
+    lobby = forecasts.loc["LOBBY"]
+    assert list(lobby.index) == list(pd.date_range("2024-02-12", periods=7))
+    expected = np.where(lobby.index.weekday >= 5, 4, 20)
+    assert np.allclose(lobby["forecast"], expected)
+    assert np.allclose(lobby["upper"] - lobby["lower"], 0)
+    assert np.allclose(forecasts.loc["LAB", "forecast"], 5 + np.arange(42, 49))
+
+    sites = DoorForecaster().forecast_sites(cube, {"LOBBY": "HQ", "LAB": "HQ"})
+    assert np.allclose(sites.loc["HQ", "forecast"], lobby["forecast"] + forecasts.loc["LAB", "forecast"])
+
+
+def test_forecasts_are_cached_until_new_data_arrives():
+    registry = ModelRegistry()
+    forecaster = DoorForecaster(registry)
+    events = _daily_events({"D1": _seasonal_counts(), "D2": _seasonal_counts(weekday=8)})
+    cube = RollupCube.from_events(events)
+
+    first = forecaster.forecast_doors(cube)
+    fitted = registry.get("door_forecasts")
+    pd.testing.assert_frame_equal(forecaster.forecast_doors(cube), first)
+    assert registry.get("door_forecasts") is fitted
+
+    cube.add_events(_daily_events({"D3": [6] * 3}, start="2024-02-12"))
+    updated = forecaster.forecast_doors(cube)
+    assert registry.get("door_forecasts") is not fitted
+    assert set(updated.index.get_level_values("door_id")) == {"D1", "D2", "D3"}
+
+    short = RollupCube.from_events(_daily_events({"D1": [3] * 5}))
+    assert forecaster.forecast_doors(short).empty
+
+
+def test_trends_report_door_and_site_forecasts():
+    events = _daily_events({"D1": _seasonal_counts(), "D2": _seasonal_counts(weekday=8)})
+    events["event_id"] = [f"E{i}" for i in range(len(events))]
+    events["facility_id"] = events["door_id"].map({"D1": "HQ", "D2": "HQ"})
+
+    forecasting = AccessTrendsAnalyzer().analyze_trends(events)["forecasting"]
+    assert set(forecasting["door_forecasts"]) == {"D1", "D2"}
+    assert len(forecasting["door_forecasts"]["D1"]) == 7
+    assert np.allclose(
+        forecasting["site_forecasts"]["HQ"],
+        np.add(forecasting["door_forecasts"]["D1"], forecasting["door_forecasts"]["D2"]),
+    )
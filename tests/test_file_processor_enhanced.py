@@ -2,6 +2,7 @@ import pytest
 pytest.importorskip("pandas")
 import pandas as pd
 from services.file_processor import FileProcessor
+from services.file_processor_service import FileProcessorService
 
 
 def test_enhanced_processor(tmp_path):
@@ -28,3 +29,105 @@ def test_enhanced_processor(tmp_path):
     assert mapped_df is not None
     assert list(mapped_df.columns) == ["person_id", "door_id", "access_result", "timestamp"]
 
+
+
+def test_parse_csv_sniffs_delimiter_and_encoding(tmp_path):
+    csv_path = tmp_path / "semicolon.csv"
+    csv_path.write_bytes(
+        "person_id;door_id;access_result;timestamp\n"
+        "José;Door1;Granted;2024-01-01 10:00:00\n"
+        "EMP2;Door2;Denied;2024-01-01 11:00:00\n".encode("latin1")
+    )
+    processor = FileProcessor(upload_folder=str(tmp_path), allowed_extensions={"csv"})
+
+    df = processor._parse_csv(str(csv_path))
+
+    assert list(df.columns) == ["person_id", "door_id", "access_result", "timestamp"]
+    assert df.loc[0, "person_id"] == "José"
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+
+
+def test_parse_csv_retries_delimiters_when_sniffing_misses(tmp_path, monkeypatch):
+    csv_path = tmp_path / "comma.csv"
+    csv_path.write_text("person_id,door_id,access_result\nEMP1,Door1,Granted\n")
+    monkeypatch.setattr(FileProcessorService, "sniff_csv_format", lambda self, prefix: ("utf-8", "|"))
+    processor = FileProcessor(upload_folder=str(tmp_path), allowed_extensions={"csv"})
+
+    df = processor._parse_csv(str(csv_path))
+
+    assert list(df.columns) == ["person_id", "door_id", "access_result"]
+
+
+def test_iter_csv_chunks_maps_and_normalizes_each_chunk(tmp_path):
+    df = pd.DataFrame(
+        {
+            "userid": [f"EMP{i}" for i in range(25)],
+            "device name": ["Door1"] * 25,
+            "access result": ["Access Granted", "Access Denied"] * 12 + ["Access Granted"],
+            "datetime": pd.date_range("2024-01-01", periods=25, freq="h").astype(str),
+        }
+    )
+    csv_path = tmp_path / "pipe.csv"
+    df.to_csv(csv_path, index=False, sep="|")
+    processor = FileProcessor(upload_folder=str(tmp_path), allowed_extensions={"csv"})
+
+    chunks = list(processor.iter_csv_chunks(str(csv_path), chunksize=10))
+
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    for chunk in chunks:
+        assert list(chunk.columns) == ["person_id", "door_id", "access_result", "timestamp"]
+        assert set(chunk["access_result"]) <= {"Granted", "Denied"}
+        assert pd.api.types.is_datetime64_any_dtype(chunk["timestamp"])
+    assert pd.concat(chunks)["person_id"].tolist() == df["userid"].tolist()
+
+
+def test_optimize_dtypes_compacts_event_columns():
+    n = 1000
+    df = pd.DataFrame(
+        {
+            "person_id": [f"EMP{i % 20}" for i in range(n)],
+            "door_id": [f"Door{i % 5}" for i in range(n)],
+            "badge_status": ["Valid"] * n,
+            "timestamp": pd.date_range("2024-01-01", periods=n, freq="min").astype(str),
+            "floor": [i % 10 for i in range(n)],
+            "reading": [0.5] * (n - 1) + [0.1],
+        }
+    )
+
+    optimized, memory = FileProcessorService().optimize_dtypes(df)
+
+    assert isinstance(optimized["person_id"].dtype, pd.CategoricalDtype)
+    assert isinstance(optimized["badge_status"].dtype, pd.CategoricalDtype)
+    assert optimized["timestamp"].dtype == "datetime64[ns]"
+    assert optimized["floor"].dtype == "int8"
+    # 0.1 is not exact in float32, so the column keeps float64
+    assert optimized["reading"].dtype == "float64"
+    assert optimized["person_id"].tolist() == df["person_id"].tolist()
+    assert memory["memory_saved_bytes"] == memory["memory_before_bytes"] - memory["memory_after_bytes"]
+    assert memory["memory_after_bytes"] < memory["memory_before_bytes"]
+    # The input frame is not modified
+    assert df["person_id"].dtype == object
+
+
+def test_upload_compacts_raw_headers_by_their_mapped_names():
+    import base64
+    from services.upload_utils import parse_uploaded_file
+
+    csv = (
+        "Person ID,Device name,Access result,Timestamp,Note\n"
+        "EMP1,Door1,Granted,2024-01-01 08:00,a\n"
+        "EMP2,Door2,Denied,2024-01-01 09:00,b\n"
+    )
+    contents = "data:text/csv;base64," + base64.b64encode(csv.encode()).decode()
+
+    result = parse_uploaded_file(contents, "raw.csv")
+
+    df = result["data"]
+    assert list(df.columns) == ["Person ID", "Device name", "Access result", "Timestamp", "Note"]
+    for col in ["Person ID", "Device name", "Access result"]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype)
+    assert df["Timestamp"].dtype == "datetime64[ns]"
+    assert df["Note"].dtype == object
+    assert result["memory_usage"]["memory_saved_bytes"] == (
+        result["memory_usage"]["memory_before_bytes"] - result["memory_usage"]["memory_after_bytes"]
+    )
@@ -0,0 +1,120 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from analytics.anomaly_detection import AnomalyDetector
+from analytics.impossible_travel import DoorTopology, ImpossibleTravelDetector
+
+
+MAPPINGS = {
+    "LOBBY": {"floor_number": 1, "is_entry": True},
+    "LIFT1": {"floor_number": 1, "is_elevator": True},
+    "LAB": {"floor_number": 1},
+    "OFFICE5": {"floor_number": 5},
+    "ROOF": {"floor_number": None},
+}
+
+
+@pytest.fixture
+def moves(make_events) -> "pd.DataFrame":
+    """Badge events over doors enriched with the device mapping columns"""
+    df = make_events(11, n=6000, users=60, doors=20, days=5)
+    door_number = df["door_id"].str[len("DOOR_"):].astype(int)
+    df["floor_number"] = door_number % 4
+    df["is_elevator"] = door_number < 2
+    return df
+
+
+def _brute_force(df, topology):
+    found = []
+    for person_id, events in df.sort_values("timestamp", kind="stable").groupby("person_id", sort=False, observed=True):
+        events = events.reset_index(drop=True)
+        for i in range(1, len(events)):
+            source, target = events["door_id"][i - 1], events["door_id"][i]
+            gap = (events["timestamp"][i] - events["timestamp"][i - 1]).total_seconds()
+            if source != target and gap < topology.min_transit(source, target):
+                found.append((person_id, source, target, gap))
+    return sorted(found)
+
+
+def test_topology_models_floors_and_connectors():
+    topology = DoorTopology.from_device_mappings(MAPPINGS)
+    assert topology.min_transit("LOBBY", "LAB") == 5.0
+    assert topology.min_transit("LAB", "LAB") == 0.0
+    # Four floors, plus the walk to a lift unless one end is the lift
+    assert topology.min_transit("LAB", "OFFICE5") == 5.0 + 4 * 8.0 + 10.0
+    assert topology.min_transit("LIFT1", "OFFICE5") == 5.0 + 4 * 8.0
+    # Unknown floors and unknown doors give no bound
+    assert topology.min_transit("ROOF", "LAB") == 0.0
+    assert topology.min_transit("LAB", "ELSEWHERE") == 0.0
+
+
+def test_learned_median_only_tightens_bounded_pairs():
+    topology = DoorTopology.from_device_mappings(MAPPINGS)
+    lobby, office, roof, lab = topology.codes(["LOBBY", "OFFICE5", "ROOF", "LAB"])
+    seconds = np.array([90.0, 100.0, 120.0, 400.0, 110.0, 95.0])
+    learned = topology.learn(np.full(6, lobby), np.full(6, office), seconds,
+                             min_observations=5, fraction=0.25)
+    assert learned.learned_pairs == 1
+    assert learned.min_transit("LOBBY", "OFFICE5") == pytest.approx(0.25 * 105.0)
+    # The reverse direction and the original topology are unchanged
+    assert learned.min_transit("OFFICE5", "LOBBY") == topology.min_transit("OFFICE5", "LOBBY")
+    assert topology.min_transit("LOBBY", "OFFICE5") == 5.0 + 4 * 8.0 + 10.0
+
+    # Slow pairs keep the modelled bound and unbounded pairs stay unbounded
+    loose = topology.learn(np.full(6, lobby), np.full(6, office), seconds, min_observations=5, fraction=0.5)
+    assert loose.min_transit("LOBBY", "OFFICE5") == topology.min_transit("LOBBY", "OFFICE5")
+    unknown = topology.learn(np.full(6, roof), np.full(6, lab), seconds, min_observations=5)
+    assert unknown.learned_pairs == 0 and unknown.min_transit("ROOF", "LAB") == 0.0
+
+    sparse = topology.learn(np.full(4, lobby), np.full(4, office), seconds[:4], min_observations=5)
+    assert sparse.learned_pairs == 0
+
+
+def test_detector_matches_brute_force(moves):
+    detector = ImpossibleTravelDetector()
+    topology = detector.topology_for(moves)
+    assert topology.learned_pairs > 0
+
+    found = detector.find_impossible_transitions(moves)
+    assert len(found)
+    assert sorted(zip(found["person_id"], found["from_door"], found["door_id"], found["gap_seconds"])) == \
+        _brute_force(moves, topology)
+    assert (found["gap_seconds"] < found["min_transit_seconds"]).all()
+
+
+def test_fixed_topology_and_anomaly_output():
+    topology = DoorTopology.from_device_mappings(MAPPINGS)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(
+                ["2024-01-01 09:00:00", "2024-01-01 09:00:20", "2024-01-01 09:05:00", "2024-01-01 09:05:03"]
+            ),
+            "person_id": ["EMP001", "EMP001", "EMP002", "EMP002"],
+            "door_id": ["LAB", "OFFICE5", "LOBBY", "VISITOR"],
+        }
+    )
+    anomalies = ImpossibleTravelDetector(topology, learn=False).detect(df)
+    assert len(anomalies) == 1
+    anomaly = anomalies[0]
+    assert anomaly["type"] == "impossible_travel"
+    assert (anomaly["user_id"], anomaly["from_door"], anomaly["door_id"]) == ("EMP001", "LAB", "OFFICE5")
+    assert anomaly["time_gap"] == 20.0
+
+
+def test_anomaly_detector_reports_impossible_travel(moves):
+    travel = ImpossibleTravelDetector()
+    detector = AnomalyDetector(travel_detector=travel)
+    df = detector._prepare_data(moves)
+    anomalies = detector._detect_pattern_anomalies(df)
+    reported = [a for a in anomalies if a["type"] == "impossible_travel"]
+    assert len(reported) == len(travel.find_impossible_transitions(moves))
+    assert all(a["type"] != "impossible_travel" for a in detector._detect_sequence_anomalies(df))
+
+
+def test_frames_without_floor_data_are_not_checked(moves):
+    detector = AnomalyDetector()
+    df = detector._prepare_data(moves.drop(columns=["floor_number", "is_elevator"]))
+    assert detector._detect_impossible_travel(df) == []
@@ -0,0 +1,91 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from analytics.incremental_aggregates import IncrementalAggregator
+from analytics.sketches import HyperLogLog
+from services.analytics_ingestion import AnalyticsDataAccessor
+from services.uploaded_data_analytics import UploadedDataAnalytics
+
+
+def test_incremental_merge_matches_full_scan(make_events):
+    # Overlapping days exercise the sum-of-squares correction
+    batches = [make_events(1), make_events(2, start="2024-01-10"), make_events(3, start="2024-01-15")]
+    full = IncrementalAggregator.from_events(pd.concat(batches, ignore_index=True))
+
+    incremental = IncrementalAggregator()
+    for batch in batches:
+        incremental.add_events(batch)
+
+    for table in ["daily", "hourly", "doors"]:
+        pd.testing.assert_frame_equal(
+            getattr(incremental, table).sort_index(), getattr(full, table).sort_index()
+        )
+    pd.testing.assert_frame_equal(
+        incremental.get_user_activity_stats().sort_index(),
+        full.get_user_activity_stats().sort_index(),
+        check_dtype=False,
+    )
+    assert incremental.get_summary() == full.get_summary()
+
+    # Daily stats agree with a direct computation
+    combined = pd.concat(batches)
+    daily = combined.groupby(["person_id", combined["timestamp"].dt.date], observed=True).size()
+    expected_std = daily.groupby(level=0, observed=True).std(ddof=0)
+    stats = incremental.get_user_activity_stats()
+    assert np.allclose(stats.loc[expected_std.index, "daily_std"], expected_std)
+
+
+def test_hyperloglog_error_bound():
+    sketch = HyperLogLog(precision=12).add(np.arange(50_000))
+    other = HyperLogLog(precision=12).add(np.arange(25_000, 75_000))
+
+    assert abs(sketch.count() - 50_000) / 50_000 < 3 * sketch.relative_error
+    assert abs(sketch.merge(other).count() - 75_000) / 75_000 < 3 * sketch.relative_error
+    assert HyperLogLog().add(["a", "b", "a"]).count() == 2
+
+
+def test_accessor_aggregates_only_new_files(make_events, serve_uploads, tmp_path, monkeypatch):
+    accessor = AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    uploads = {"jan.csv": make_events(1)}
+    mappings = {}
+    loaded = serve_uploads(accessor, uploads)
+    monkeypatch.setattr(accessor, "_load_consolidated_mappings", lambda: dict(mappings))
+
+    scanned = []
+    original = IncrementalAggregator.from_events.__func__
+
+    def tracking(cls, df, **kwargs):
+        scanned.append(len(df))
+        return original(cls, df, **kwargs)
+
+    monkeypatch.setattr(IncrementalAggregator, "from_events", classmethod(tracking))
+
+    assert accessor.get_incremental_aggregates().total_events == 5000
+    uploads["feb.csv"] = make_events(2, n=300, start="2024-02-01")
+    assert accessor.get_incremental_aggregates().total_events == 5300
+    assert scanned == [5000, 300]
+
+    # Relearned mappings for a file rebuild only that file's partial
+    mappings["fp"] = {"filename": "feb.csv", "column_mappings": {"door_id": "door_id"}}
+    assert accessor.get_incremental_aggregates().total_events == 5300
+    assert scanned == [5000, 300, 300]
+    # Unchanged files are never reloaded
+    assert loaded == ["jan.csv", "feb.csv", "feb.csv"]
+
+    del uploads["jan.csv"]
+    assert accessor.get_incremental_aggregates().total_events == 300
+
+
+def test_uploaded_summary_from_aggregates_matches_full_scan(make_events):
+    df = pd.concat([make_events(1), make_events(2, start="2024-01-10")], ignore_index=True)
+    analytics = UploadedDataAnalytics()
+    full = analytics.process_uploaded_data({"jan.csv": df})
+    summary = analytics.summarize_aggregates(IncrementalAggregator.from_events(df))
+
+    for key in ["status", "total_events", "active_doors", "date_range", "top_doors"]:
+        assert summary[key] == full[key]
+    assert [u["count"] for u in summary["top_users"]] == [u["count"] for u in full["top_users"]]
+    assert summary["unique_users"] == pytest.approx(full["unique_users"], rel=0.05)
+    assert summary["successful_events"] == (df["access_result"] == "Granted").sum()
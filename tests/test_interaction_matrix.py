@@ -0,0 +1,56 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("sklearn")
+
+from analytics.interaction_matrix import InteractionMatrix
+from analytics.unique_patterns_analyzer import UniquePatternAnalyzer
+
+
+def _with_exclusive_owner(df):
+    """Events plus one badge that only ever uses its own door"""
+    df = df.astype({"person_id": object, "door_id": object})
+    df.loc[:9, ["person_id", "door_id"]] = ["OWNER", "VAULT"]
+    df.loc[::37, "door_id"] = None
+    return df
+
+
+def test_matrix_matches_pair_groupby(make_events):
+    df = _with_exclusive_owner(make_events(users=120))
+    matrix = InteractionMatrix.from_events(df)
+    expected = df.groupby(["person_id", "door_id"]).agg(
+        interaction_count=("timestamp", "size"),
+        success_rate=("access_result", lambda x: (x == "Granted").mean()),
+        first_interaction=("timestamp", "min"),
+        last_interaction=("timestamp", "max"),
+    )
+    pd.testing.assert_frame_equal(
+        matrix.pair_frame().sort_index(), expected.sort_index(), check_names=False, check_dtype=False
+    )
+    assert matrix.counts.shape == (df["person_id"].nunique(), df["door_id"].nunique())
+    assert matrix.nnz == len(expected)
+
+
+def test_exclusivity_and_diversity(make_events):
+    df = _with_exclusive_owner(make_events(1, users=120))
+    matrix = InteractionMatrix.from_events(df)
+    exclusive = matrix.exclusive_pairs()
+    crosstab = pd.crosstab(df["person_id"], df["door_id"])
+    assert exclusive["exclusive_device_count"] == ((crosstab > 0).sum() == 1).sum()
+    assert exclusive["exclusive_pairs"][0]["user"] == "OWNER"
+    assert exclusive["exclusive_pairs"][0]["device"] == "VAULT"
+
+    shares = crosstab.div(crosstab.sum(axis=1), axis=0)
+    entropy = -(shares * np.log(shares.where(shares > 0, 1))).sum(axis=1)
+    normalised = entropy / np.log((crosstab > 0).sum(axis=1)).replace(0, np.inf)
+    assert np.isclose(matrix.diversity()["user_entropy"]["mean"], normalised.mean())
+
+
+def test_unique_patterns_report_interactions(make_events):
+    df = _with_exclusive_owner(make_events(2, users=120))
+    interactions = UniquePatternAnalyzer().analyze_patterns(df, {})["interaction_patterns"]
+    assert interactions["exclusive_relationships"]["exclusive_device_count"] >= 1
+    clusters = interactions["behavioral_clusters"]["clusters"]
+    assert sum(cluster["size"] for cluster in clusters) == df["person_id"].nunique()
@@ -0,0 +1,120 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from analytics.kpi_sketches import KPISketch
+from analytics.sketches import CountMinSketch, DistinctSample, TDigest, TopK
+from services.analytics_ingestion import AnalyticsDataAccessor
+
+
+def test_tdigest_merged_quantiles_within_rank_error():
+    values = np.random.default_rng(0).lognormal(0, 1.5, 100_000)
+    digest = TDigest()
+    for part in np.array_split(values, 10):
+        digest.merge(TDigest().add(part))
+    assert len(digest.means) <= digest.compression + 1
+
+    q = np.array([0.001, 0.1, 0.5, 0.9, 0.999])
+    ranks = np.searchsorted(np.sort(values), digest.quantile(q)) / len(values)
+    assert np.abs(ranks - q).max() < 0.005
+    assert digest.quantile(0.0) == values.min() and digest.quantile(1.0) == values.max()
+
+
+def test_count_min_and_top_k_bounds():
+    keys = np.random.default_rng(1).zipf(1.3, 200_000) % 20_000
+    exact = pd.Series(keys).value_counts()
+
+    sketch = CountMinSketch()
+    top = TopK(20)
+    for part in np.array_split(keys, 5):
+        sketch.merge(CountMinSketch().add(part))
+        top.merge(TopK(20).add(part))
+    estimates = sketch.estimate(exact.index)
+    assert (estimates >= exact.to_numpy()).all()
+    assert (estimates - exact.to_numpy()).max() <= sketch.error_bound * len(keys)
+    assert set(top.top(10).index) == set(exact.index[:10])
+
+
+def test_distinct_sample_merges_exactly_with_counts():
+    keys = np.random.default_rng(2).integers(0, 50_000, 300_000)
+    merged = DistinctSample(256)
+    for part in np.array_split(keys, 6):
+        counts = pd.Series(part).value_counts()
+        merged.merge(DistinctSample(256).add(counts.index, counts=counts.to_numpy()))
+    counts = pd.Series(keys).value_counts()
+    full = DistinctSample(256).add(counts.index, counts=counts.to_numpy())
+
+    assert list(merged.values) == list(full.values)
+    assert list(merged.counts) == counts.loc[list(merged.values)].tolist()
+
+
+def test_kpi_sketch_merge_matches_exact_summary(make_events):
+    batches = [make_events(3, n=20000), make_events(4, n=20000, start="2024-01-15"),
+               make_events(5, n=20000, start="2024-02-01")]
+    merged = KPISketch()
+    for batch in batches:
+        merged.merge(KPISketch.from_events(batch))
+    df = pd.concat(batches, ignore_index=True)
+    summary = merged.summary()
+
+    assert summary["total_events"] == len(df)
+    assert summary["date_range"] == {"start": df["timestamp"].min(), "end": df["timestamp"].max()}
+    assert summary["success_rate"] == pytest.approx((df["access_result"] == "Granted").mean() * 100)
+    assert summary["peak_hours"] == sorted(df["timestamp"].dt.hour.value_counts().index[:3])
+    error = 4 * summary["distinct_error"]
+    assert summary["unique_users"] == pytest.approx(df["person_id"].nunique(), rel=error)
+    assert summary["unique_doors"] == pytest.approx(df["door_id"].nunique(), rel=error)
+    assert summary["unique_interactions"] == pytest.approx(
+        len(df[["person_id", "door_id"]].drop_duplicates()), rel=error)
+
+    per_user = df.groupby("person_id", observed=True).size()
+    low, high = merged.users.quantiles([0.2, 0.8])
+    assert low == per_user.quantile(0.2) and high == per_user.quantile(0.8)
+    assert merged.users.top(5) == per_user.nlargest(5).index.tolist()
+    for user_id in merged.users.sampled(low, high):
+        assert low <= per_user[user_id] <= high
+
+
+def test_accessor_sketches_each_file_once(make_events, serve_uploads, tmp_path, monkeypatch):
+    accessor = AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    uploads = {"jan.csv": make_events(6, n=3000)}
+    loaded = serve_uploads(accessor, uploads)
+
+    scanned = []
+    original = KPISketch.from_events.__func__
+
+    def tracking(cls, df, **kwargs):
+        scanned.append(len(df))
+        return original(cls, df, **kwargs)
+
+    monkeypatch.setattr(KPISketch, "from_events", classmethod(tracking))
+
+    assert accessor.get_kpi_sketch().total_events == 3000
+    uploads["feb.csv"] = make_events(7, n=500, start="2024-02-01")
+    assert accessor.get_kpi_sketch().total_events == 3500
+    assert accessor.get_kpi_sketch().total_events == 3500
+    assert scanned == [3000, 500]
+    assert loaded == ["jan.csv", "feb.csv"]
+
+
+def test_summaries_read_the_merged_sketch(make_events, monkeypatch):
+    from analytics.analytics_controller import AnalyticsController
+    from services.analytics_service import AnalyticsService
+
+    df = make_events(8, n=4000)
+    df["event_id"] = range(len(df))
+    sketch = KPISketch.from_events(df)
+
+    summary = AnalyticsController()._generate_data_summary(df, sketch)
+    assert summary["total_events"] == 4000
+    assert summary["unique_users"] == sketch.users.distinct.count()
+    assert summary["access_success_rate"] == pytest.approx((df["access_result"] == "Granted").mean() * 100)
+
+    service = AnalyticsService()
+    monkeypatch.setattr(service.data_accessor, "get_kpi_sketch", lambda: sketch)
+    monkeypatch.setattr(service, "get_analytics_from_uploaded_data", lambda: pytest.fail("rescanned"))
+    dashboard = service.get_dashboard_summary()
+    assert dashboard["total_events"] == 4000
+    assert dashboard["successful_events"] == (df["access_result"] == "Granted").sum()
+    assert dashboard["top_users"][0]["user_id"] == df["person_id"].value_counts().index[0]
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+pytest.importorskip("joblib")
+
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+
+from analytics.anomaly_detection import AnomalyDetector
+from analytics.model_registry import ModelRegistry
+
+
+class _CountingFit:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return StandardScaler(), {"fit": self.calls}, 10
+
+
+def test_registry_refits_only_for_new_versions():
+    registry = ModelRegistry()
+    fit = _CountingFit()
+
+    first = registry.get_or_fit("model", "v1", fit)
+    assert registry.get_or_fit("model", "v1", fit) is first
+    assert fit.calls == 1
+
+    second = registry.get_or_fit("model", "v2", fit)
+    assert fit.calls == 2
+    assert second.model == {"fit": 2}
+
+
+def test_registry_persists_models_across_instances(tmp_path):
+    fit = _CountingFit()
+    ModelRegistry(str(tmp_path)).get_or_fit("model", "v1", fit)
+    assert (tmp_path / "model.joblib").exists()
+
+    reloaded = ModelRegistry(str(tmp_path)).get_or_fit("model", "v1", fit)
+    assert fit.calls == 1
+    assert reloaded.version == "v1"
+
+    ModelRegistry(str(tmp_path)).invalidate()
+    assert not list(tmp_path.glob("*.joblib"))
+
+
+def test_registry_refit_interval_ignores_version():
+    fit = _CountingFit()
+    scheduled = ModelRegistry(refit_interval=timedelta(hours=1))
+    scheduled.get_or_fit("model", "v1", fit)
+    scheduled.get_or_fit("model", "v2", fit)
+    assert fit.calls == 1
+
+    expired = ModelRegistry(refit_interval=timedelta(0))
+    expired.get_or_fit("model", "v1", fit)
+    expired.get_or_fit("model", "v1", fit)
+    assert fit.calls == 3
+
+
+def test_detector_reuses_fitted_models_and_matches_fresh_fit(make_events, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    detector = AnomalyDetector(model_registry=registry)
+    df = detector._prepare_data(make_events(3, n=3000, users=30, doors=4, days=10))
+    features = detector._extract_ml_features(df)
+
+    first = detector._detect_ml_anomalies(df, 0.95)
+    fitted = registry.get("isolation_forest_0.9500")
+    assert fitted is not None and fitted.n_samples == len(features)
+
+    # A second request scores with the stored pair instead of refitting
+    assert detector._detect_ml_anomalies(df, 0.95) == first
+    assert registry.get("isolation_forest_0.9500") is fitted
+
+    expected = IsolationForest(contamination=0.05, random_state=42, n_estimators=100).fit_predict(
+        StandardScaler().fit_transform(features)
+    )
+    flagged = [a["timestamp"] for a in first if a["type"] == "ml_isolation_forest"]
+    assert flagged == list(features.index[expected == -1])
@@ -0,0 +1,51 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from analytics.prepared_frame import DAY_NAMES, PreparedFrame, prepare_frame
+
+
+@pytest.fixture
+def events(make_events) -> "pd.DataFrame":
+    """Events with string timestamps, as read from a CSV"""
+    df = make_events(5, n=500, users=10, doors=3, days=14)
+    return df.astype({"timestamp": str})
+
+
+def test_derived_columns_match_datetime_accessors(events):
+    df = events
+    prepared = PreparedFrame(df)
+    data = prepared.data
+    timestamps = pd.to_datetime(df["timestamp"])
+
+    assert data["hour"].dtype == np.int8
+    assert data["is_weekend"].dtype == bool
+    assert list(data["day_of_week"].cat.categories) == DAY_NAMES
+    assert (data["hour"] == timestamps.dt.hour).all()
+    assert (data["day_of_week"].astype(str) == timestamps.dt.day_name()).all()
+    assert (data["is_weekend"] == (timestamps.dt.weekday >= 5)).all()
+    assert (data["is_business_hours"] == timestamps.dt.hour.between(8, 18)).all()
+    # The caller's frame and the input-only view are untouched
+    assert list(df.columns) == list(prepared.source.columns)
+    assert df["timestamp"].dtype == object
+
+
+def test_prepare_frame_reuses_prepared_and_views_are_independent(events):
+    prepared = prepare_frame(events)
+    assert prepare_frame(prepared) is prepared
+
+    view = prepared.view()
+    view["extra"] = 1
+    assert "extra" not in prepared.columns
+
+
+def test_analyzers_accept_prepared_frame(events):
+    from analytics.security_patterns import SecurityPatternsAnalyzer
+
+    df = events
+    analyzer = SecurityPatternsAnalyzer()
+    from_frame = analyzer.analyze_patterns(df)
+    from_prepared = analyzer.analyze_patterns(prepare_frame(df))
+    assert from_prepared.keys() == from_frame.keys()
+    assert from_prepared["security_score"] == from_frame["security_score"]
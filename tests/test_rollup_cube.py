@@ -0,0 +1,131 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from analytics.access_trends import AccessTrendsAnalyzer
+from analytics.prepared_frame import PreparedFrame
+from analytics.rollup_cube import RollupCube
+from services.analytics_ingestion import AnalyticsDataAccessor
+
+
+def _as_table(cube, level):
+    """Non-zero cells of one cube level keyed by (row label, door, result)"""
+    counts = getattr(cube, level)
+    rows, doors, results = np.nonzero(counts)
+    labels = {"daily": cube.days, "hourly": cube.start + np.arange(len(cube.hourly)) * np.timedelta64(1, "h")}
+    row_labels = labels[level][rows] if level in labels else rows
+    return pd.Series(
+        counts[rows, doors, results],
+        index=pd.MultiIndex.from_arrays([row_labels, cube.doors[doors], cube.results[results]]),
+    ).sort_index()
+
+
+def test_incremental_cube_matches_full_build(make_events):
+    # Later batches start earlier, add doors and a new result value
+    extra = make_events(3, n=500, start="2023-12-20", doors=10)
+    extra["access_result"] = extra["access_result"].cat.add_categories(["Tampered"])
+    extra.loc[::7, "access_result"] = "Tampered"
+    batches = [make_events(1, n=4000, doors=8), make_events(2, n=4000, start="2024-01-10", doors=8), extra]
+    full = RollupCube.from_events(pd.concat(batches, ignore_index=True))
+
+    incremental = RollupCube()
+    for batch in batches:
+        incremental.add_events(batch.astype({"door_id": "category"}))
+
+    assert incremental.total_events == full.total_events == 8500
+    for level in ["daily", "hourly", "minute_of_day"]:
+        pd.testing.assert_series_equal(_as_table(incremental, level), _as_table(full, level))
+    assert np.array_equal(incremental.days, full.days)
+    assert np.array_equal(incremental.daily_unique_users(), full.daily_unique_users())
+    assert incremental.first_timestamp == full.first_timestamp
+
+
+def test_cube_counts_match_raw_groupbys(make_events):
+    df = make_events(4, n=6000, days=45)
+    df.loc[::50, "door_id"] = None
+    prepared = PreparedFrame(df)
+    cube = prepared.rollup()
+    assert prepared.rollup() is cube
+
+    view = prepared.view()
+    daily = view.groupby("date").agg(
+        events=("event_id", "count"), users=("person_id", "nunique"), doors=("door_id", "nunique")
+    )
+    active = cube.events("daily") > 0
+    assert list(cube.days[active].astype(object)) == list(daily.index)
+    assert np.array_equal(cube.events("daily")[active], daily["events"])
+    assert np.array_equal(cube.daily_unique_users()[active], daily["users"])
+    assert np.array_equal(cube.daily_unique_doors()[active], daily["doors"])
+
+    by_minute = view.groupby(view["hour"].astype(int) * 60 + view["minute"].astype(int)).size()
+    assert np.array_equal(cube.events("minute_of_day")[by_minute.index], by_minute)
+    assert cube.granted("daily").sum() == (df["access_result"] == "Granted").sum()
+
+    trends = AccessTrendsAnalyzer().analyze_trends(prepared)
+    expected_peaks = view.groupby("hour")["event_id"].count().nlargest(3).index.tolist()
+    assert trends["peak_analysis"]["peak_hours"] == expected_peaks
+    assert trends["volume_trends"]["daily_volumes"]["total_events"] == daily["events"].to_dict()
+
+
+def test_accessor_builds_cubes_only_for_new_files(make_events, serve_uploads, tmp_path, monkeypatch):
+    accessor = AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    uploads = {"jan.csv": make_events(1, n=4000)}
+    loaded = serve_uploads(accessor, uploads)
+
+    scanned = []
+    original = RollupCube.from_events.__func__
+
+    def tracking(cls, df):
+        scanned.append(len(df))
+        return original(cls, df)
+
+    monkeypatch.setattr(RollupCube, "from_events", classmethod(tracking))
+
+    assert accessor.get_rollup_cube().total_events == 4000
+    uploads["feb.csv"] = make_events(2, n=300, start="2024-02-01")
+    cube = accessor.get_rollup_cube()
+    assert cube.total_events == 4300
+    assert scanned == [4000, 300]
+    assert loaded == ["jan.csv", "feb.csv"]
+    # Merging never mutates the per-file partials
+    assert accessor.get_rollup_cube().total_events == 4300
+
+    del uploads["jan.csv"]
+    assert accessor.get_rollup_cube().total_events == 300
+
+
+def test_service_trends_read_the_accessor_cube(make_events, monkeypatch):
+    from services.analytics_service import AnalyticsService
+
+    service = AnalyticsService()
+    batches = [make_events(1), make_events(2, start="2024-01-21")]
+    df = pd.concat(batches, ignore_index=True)
+    cube = RollupCube()
+    for batch in batches:
+        cube.merge(RollupCube.from_events(batch))
+    monkeypatch.setattr(service.data_accessor, "get_processed_database", lambda: (df, {}))
+    monkeypatch.setattr(service.data_accessor, "get_rollup_cube", lambda: cube)
+    version = ["v1"]
+    monkeypatch.setattr(service.data_accessor, "get_data_version", lambda: version[0])
+
+    used = []
+    original = service.trends_analyzer.analyze_trends
+    monkeypatch.setattr(
+        service.trends_analyzer, "analyze_trends",
+        lambda frame, **kwargs: used.append(kwargs["cube"]) or original(frame, **kwargs),
+    )
+
+    trends = service.get_access_trends()
+    assert trends["status"] == "success"
+    assert used == [cube]
+    assert trends["trend_summary"]["events_per_user_average"] == pytest.approx(
+        len(df) / df["person_id"].nunique(), rel=0.05
+    )
+
+    # Trends are recomputed only for a new data version
+    assert service.get_access_trends() == trends and used == [cube]
+    version[0] = "v2"
+    service.get_access_trends()
+    assert used == [cube, cube]
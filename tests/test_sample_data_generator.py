@@ -0,0 +1,41 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from utils.sample_data_generator import generate_synthetic_access_data
+
+
+def test_synthetic_events_are_sized_sorted_and_reproducible():
+    df = generate_synthetic_access_data(20_000, start_date="2024-01-01", seed=4)
+
+    assert len(df) == 20_000
+    assert df["timestamp"].is_monotonic_increasing
+    assert df["event_id"].is_unique
+    assert df["timestamp"].min() >= pd.Timestamp("2024-01-01")
+    pd.testing.assert_frame_equal(
+        df, generate_synthetic_access_data(20_000, start_date="2024-01-01", seed=4)
+    )
+
+
+def test_synthetic_events_contain_bursts_and_storms():
+    df = generate_synthetic_access_data(
+        20_000, start_date="2024-01-01", tailgating_rate=0.05, storm_rate=0.02
+    )
+
+    # Failed-badge storms: one badge denied repeatedly at one door within a minute
+    denied = df[df["access_result"] == "Denied"]
+    per_minute = denied.groupby(
+        ["person_id", "door_id", denied["timestamp"].dt.floor("min")], observed=True
+    ).size()
+    assert per_minute.max() >= 5
+    assert set(denied["badge_status"]) <= {"Invalid", "Expired", "Suspended"}
+
+    # Tailgating: granted entries at one door seconds apart
+    granted = df[df["access_result"] == "Granted"].sort_values(["door_id", "timestamp"])
+    gaps = granted.groupby("door_id", observed=True)["timestamp"].diff()
+    assert (gaps < pd.Timedelta(seconds=15)).sum() >= 0.04 * len(df)
+
+    # Shift peaks: the busiest hours are at day-shift start and end
+    busiest = df["timestamp"].dt.hour.value_counts().nlargest(4).index
+    assert {7, 8} & set(busiest) and {15, 16} & set(busiest)
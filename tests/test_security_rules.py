@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from analytics.prepared_frame import prepare_frame
+from analytics.security_patterns import SecurityPatternsAnalyzer
+from analytics.security_rules import SecurityRule, create_rule_engine
+
+
+def test_scan_aggregates_match_groupbys(make_events):
+    df = make_events(n=3000)
+    df.loc[::30, "person_id"] = None
+    view = prepare_frame(df).view()
+    scan = create_rule_engine().scan(view)
+    denied = view[view["access_result"] == "Denied"]
+    badge = view[view["badge_status"] != "Valid"]
+
+    assert scan.total("failed_access") == len(denied)
+    pd.testing.assert_series_equal(
+        scan.counts("failed_access", "person_id"),
+        denied.groupby("person_id", observed=True).size(),
+        check_names=False,
+    )
+    assert scan.counts("failed_access", ("hour", "day_of_week")).to_dict() == (
+        denied.groupby(["hour", "day_of_week"], observed=True).size().to_dict()
+    )
+    assert scan.nunique("failed_access", "door_id", "person_id").to_dict() == (
+        denied.groupby("door_id", observed=True)["person_id"].nunique().to_dict()
+    )
+    assert scan.mode("badge_issue", "door_id", "badge_status").to_dict() == (
+        badge.groupby("door_id", observed=True)["badge_status"].agg(lambda x: x.mode().iloc[0]).to_dict()
+    )
+    assert scan.unique_values("device_issue", "door_id", "device_status").map(list).to_dict() == {
+        door: ["maintenance"] for door in view.loc[view["device_status"] != "normal", "door_id"].unique()
+    }
+
+
+def test_site_rules_join_the_shared_scan(make_events):
+    lab = SecurityRule(
+        "lab_denied",
+        lambda scan: scan.mask("failed_access") & (scan.df["door_id"] == "DOOR_0004").to_numpy(),
+        group_by=("person_id",),
+        description="Denied at the lab",
+    )
+    df = make_events(1, n=3000)
+    analyzer = SecurityPatternsAnalyzer([lab])
+    result = analyzer.analyze_patterns(df)
+
+    expected = df[(df["access_result"] == "Denied") & (df["door_id"] == "DOOR_0004")]
+    summary = result["custom_rules"]["lab_denied"]
+    assert summary["total"] == len(expected)
+    assert summary["groups"]["person_id"] == expected.groupby("person_id", observed=True).size().to_dict()
+    # The built-in sections are unaffected by extra rules
+    baseline = SecurityPatternsAnalyzer().analyze_patterns(df)
+    assert result["failed_access_patterns"] == baseline["failed_access_patterns"]
+
+    with pytest.raises(ValueError):
+        analyzer.add_rule(lab)
+
+
+def test_optional_columns_are_not_required(make_events):
+    df = make_events(2, n=3000).drop(columns=["badge_status", "device_status"])
+    result = SecurityPatternsAnalyzer().analyze_patterns(df)
+    assert result["failed_access_patterns"]["total"] == (df["access_result"] == "Denied").sum()
+    assert result["badge_anomalies"]["total"] == 0
+    assert result["device_security_issues"] == {"total": 0, "issues": {}}
@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from analytics.sequence_mining import SequenceMiner
+from utils.sample_data_generator import generate_synthetic_access_data
+
+
+def _legacy_sessions(df):
+    """Per-user, per-session loop the miner replaces"""
+    df_sorted = df.sort_values(["person_id", "timestamp"])
+    sequences = {}
+    multi_door = []
+    for user_id in df_sorted["person_id"].unique():
+        user_data = df_sorted[df_sorted["person_id"] == user_id].copy()
+        user_data["session"] = (user_data["timestamp"].diff() > pd.Timedelta(minutes=30)).cumsum()
+        for _, session_data in user_data.groupby("session"):
+            if len(session_data) > 1:
+                door_sequence = tuple(session_data["door_id"].values)
+                sequences[door_sequence] = sequences.get(door_sequence, 0) + 1
+            if session_data["door_id"].nunique() > 1:
+                multi_door.append((session_data["door_id"].nunique(), len(session_data)))
+    return sequences, multi_door
+
+
+@pytest.fixture
+def events():
+    return generate_synthetic_access_data(8_000, num_users=80, days=5, start_date="2024-01-01", seed=4)
+
+
+def test_sessions_and_sequences_match_per_user_loop(events):
+    miner = SequenceMiner()
+    sequences = miner.sessionise(events)
+    expected, multi_door = _legacy_sessions(events)
+
+    summary = miner.summarize(sequences)
+    assert summary["total_sequences"] == len(expected)
+    assert summary["common_sequences"] == sorted(expected.items(), key=lambda x: x[1], reverse=True)[:10]
+    assert dict(sequences.rare_paths(k=len(expected))) == expected
+
+    multi = miner.multi_door_sessions(sequences)
+    assert multi["total_multi_door_sessions"] == len(multi_door)
+    assert multi["avg_doors_per_session"] == pytest.approx(np.mean([d for d, _ in multi_door]))
+    assert multi["avg_events_per_session"] == pytest.approx(np.mean([e for _, e in multi_door]))
+
+
+def test_door_ngrams_stay_within_sessions():
+    df = pd.DataFrame(
+        {
+            "person_id": ["A"] * 4 + ["B"] * 3,
+            "door_id": ["D1", "D2", "D3", "D1", "D2", "D3", "D1"],
+            "timestamp": pd.to_datetime(
+                ["09:00", "09:05", "09:10", "11:00", "09:00", "09:01", "09:02"], format="%H:%M"
+            ),
+        }
+    )
+    sequences = SequenceMiner().sessionise(df)
+    assert sequences.session_count == 3
+
+    bigrams = dict(sequences.common_paths(k=10, length=2))
+    # D3 -> D1 for user A crosses a session gap and is not a path
+    assert bigrams == {("D1", "D2"): 1, ("D2", "D3"): 2, ("D3", "D1"): 1}
+    assert sequences.common_paths(k=1, length=3) == [(("D1", "D2", "D3"), 1)]
+    # Whole sessions of one event are not paths
+    assert sequences.common_paths() == [(("D1", "D2", "D3"), 1), (("D2", "D3", "D1"), 1)]
@@ -0,0 +1,124 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from services.shared_event_store import SharedEventStore, read_frame
+
+DECODED = ["person_id", "badge_ref", "escorted"]
+
+
+def _events():
+    return pd.DataFrame(
+        {
+            "person_id": ["EMP1", "EMP2", np.nan, "EMP1"],
+            "door_id": pd.Categorical(["D1", "D2", "D1", "D3"]),
+            "badge": [1, 2, 3, 4],
+            "badge_ref": [1, "A2", 3, np.nan],
+            "escorted": [True, False, np.nan, True],
+            "score": [0.5, np.nan, 1.5, 2.0],
+            "timestamp": pd.date_range("2024-01-01", periods=4, freq="h"),
+            "local_time": pd.date_range("2024-01-01", periods=4, freq="h", tz="Europe/Berlin"),
+        }
+    )
+
+
+def _is_mapped(array):
+    """Whether ``array`` is a view of a memory-mapped file"""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+def test_frames_round_trip_as_memory_maps(tmp_path):
+    store = SharedEventStore(str(tmp_path))
+    store.add_frame("events.csv", _events())
+
+    df = SharedEventStore(str(tmp_path)).get_frame("events.csv")
+
+    # Object columns stay categorical and decode to their original values
+    assert all(isinstance(df[column].dtype, pd.CategoricalDtype) for column in DECODED)
+    pd.testing.assert_frame_equal(df.astype({column: object for column in DECODED}), _events())
+    pd.testing.assert_frame_equal(read_frame(tmp_path / "g1"), _events())
+    assert df["badge_ref"].tolist()[:3] == [1, "A2", 3]
+    assert df["escorted"].tolist()[:2] == [True, False]
+    # Columns are read-only views of the mapped files, not private copies
+    assert not df["badge"].to_numpy().flags.writeable
+    assert not df["door_id"].cat.codes.to_numpy().flags.writeable
+    assert list(store.get_frame("events.csv", columns=["badge"]).columns) == ["badge"]
+
+
+def test_second_reader_string_columns_stay_mapped(tmp_path):
+    SharedEventStore(str(tmp_path)).add_frame("events.csv", _events())
+
+    first = SharedEventStore(str(tmp_path)).get_frame("events.csv")
+    second = SharedEventStore(str(tmp_path)).get_frame("events.csv")
+
+    for df in (first, second):
+        for column in ["person_id", "door_id"]:
+            assert _is_mapped(df[column].array.codes)
+        assert _is_mapped(df["badge"].to_numpy())
+
+
+def test_generation_counter_propagates_between_processes(tmp_path):
+    writer = SharedEventStore(str(tmp_path))
+    reader = SharedEventStore(str(tmp_path))
+    assert reader.get_all_data() == {}
+
+    generation = writer.add_frame("a.csv", _events())
+    assert reader.generation == generation
+    assert reader.get_filenames() == ["a.csv"]
+
+    writer.add_frame("a.csv", _events().head(2))
+    assert len(reader.get_frame("a.csv")) == 2
+    assert len(list(tmp_path.glob("g*"))) == 1
+
+    writer.clear()
+    assert reader.get_filenames() == []
+    assert list(tmp_path.glob("g*")) == []
+
+
+def test_accessor_keeps_uploads_missing_from_shared_store(tmp_path, monkeypatch):
+    file_upload = pytest.importorskip("pages.file_upload")
+    from services import analytics_ingestion
+
+    store = SharedEventStore(str(tmp_path / "mmap"))
+    store.add_frame("shared.csv", _events())
+    monkeypatch.setattr(analytics_ingestion, "get_shared_event_store", lambda: store)
+    monkeypatch.setattr(
+        file_upload, "get_uploaded_data", lambda columns=None: {"legacy.csv": _events().head(2)}
+    )
+
+    accessor = analytics_ingestion.AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    data = accessor._get_uploaded_data()
+
+    assert sorted(data) == ["legacy.csv", "shared.csv"]
+    pd.testing.assert_frame_equal(data["shared.csv"].astype({column: object for column in DECODED}), _events())
+
+
+def test_accessor_versions_uploads_without_loading_frames(tmp_path, monkeypatch):
+    file_upload = pytest.importorskip("pages.file_upload")
+    from services import analytics_ingestion
+
+    store = SharedEventStore(str(tmp_path / "mmap"))
+    store.add_frame("shared.csv", _events())
+    monkeypatch.setattr(analytics_ingestion, "get_shared_event_store", lambda: store)
+    monkeypatch.setattr(file_upload, "get_uploaded_filenames", lambda: ["legacy.csv"])
+    monkeypatch.setattr(
+        file_upload, "get_file_info", lambda: {"legacy.csv": {"upload_time": "t0", "rows": 2}}
+    )
+    monkeypatch.setattr(
+        file_upload, "get_uploaded_data", lambda columns=None: pytest.fail("loaded every frame")
+    )
+    monkeypatch.setattr(
+        file_upload, "get_uploaded_file", lambda filename, columns=None: _events().head(2)
+    )
+
+    accessor = analytics_ingestion.AnalyticsDataAccessor(base_data_path=str(tmp_path))
+    versions = accessor._get_uploaded_versions()
+
+    assert versions == {"legacy.csv": "t0:2", "shared.csv": store.get_version("shared.csv")}
+    assert len(accessor._load_uploaded_frame("legacy.csv")) == 2
+    assert _is_mapped(accessor._load_uploaded_frame("shared.csv")["timestamp"].values)
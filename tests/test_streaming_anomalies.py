@@ -0,0 +1,65 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from analytics.anomaly_detection import Anomaly
+from analytics.streaming_anomalies import StreamingAnomalyDetector, replay_csv
+
+
+def _event(ts, person="EMP1", door="LOBBY", result="Granted"):
+    return {"timestamp": ts, "person_id": person, "door_id": door, "access_result": result}
+
+
+def test_denial_storm_and_tailgating_emit_anomalies():
+    detector = StreamingAnomalyDetector(user_denial_threshold=3, initial_capacity=1)
+    start = pd.Timestamp("2024-01-01 09:00")
+
+    storm = []
+    for i in range(5):
+        storm += detector.process_event(_event(start + pd.Timedelta(seconds=10 * i), result="Denied"))
+    assert [a.anomaly_type for a in storm] == ["rapid_attempts"]
+    assert isinstance(storm[0], Anomaly)
+    assert storm[0].timestamp == start + pd.Timedelta(seconds=30)
+
+    detector.process_event(_event(start + pd.Timedelta(minutes=5), person="EMP2", door="LAB"))
+    tailgate = detector.process_event(
+        _event(start + pd.Timedelta(minutes=5, seconds=4), person="EMP3", door="LAB")
+    )
+    assert [a.anomaly_type for a in tailgate] == ["potential_tailgating"]
+    assert tailgate[0].affected_entities == ["LAB", "EMP3"]
+
+
+def test_time_of_day_and_door_hop_use_running_state():
+    detector = StreamingAnomalyDetector(warmup_events=10)
+    days = pd.date_range("2024-01-01 08:55", periods=15, freq="D")
+    for ts in days:
+        assert detector.process_event(_event(ts + pd.Timedelta(minutes=ts.day % 10))) == []
+
+    state = detector.get_user_state("EMP1")
+    assert state["events"] == 15
+    assert 8.9 < state["hour_mean"] < 9.2
+
+    late = pd.Timestamp("2024-01-20 03:00")
+    assert [a.anomaly_type for a in detector.process_event(_event(late))] == ["unusual_time"]
+    hop = detector.process_event(_event(late + pd.Timedelta(seconds=20), door="SERVER_ROOM"))
+    assert [a.anomaly_type for a in hop] == ["unusual_time", "door_hopping"]
+
+
+def test_replay_csv_paces_events_and_matches_batch(tmp_path):
+    events = pd.DataFrame(
+        [_event(pd.Timestamp("2024-01-01 09:00") + pd.Timedelta(seconds=s), person=p, result=r)
+         for s, p, r in [(0, "A", "Granted"), (5, "B", "Granted"), (20, "C", "Denied"), (21, "C", "Denied")]]
+    )
+    path = tmp_path / "feed.csv"
+    events.to_csv(path, index=False)
+
+    delays = []
+    replayed = list(replay_csv(str(path), StreamingAnomalyDetector(user_denial_threshold=1.5),
+                               speed=10, sleep=delays.append))
+    batch = StreamingAnomalyDetector(user_denial_threshold=1.5).process_batch(events)
+
+    assert delays == pytest.approx([0.5, 1.5, 0.1])
+    assert [a.anomaly_type for a in replayed] == [a.anomaly_type for a in batch]
+    assert [a.anomaly_type for a in batch] == ["potential_tailgating", "rapid_attempts"]
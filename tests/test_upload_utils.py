@@ -29,6 +29,20 @@ def test_parse_csv_upload() -> None:
     assert len(df) == 2
 
 
+def test_csv_upload_is_parsed_in_chunks(monkeypatch) -> None:
+    from services.file_processor_service import FileProcessorService
+
+    monkeypatch.setattr(FileProcessorService, "STREAM_CHUNK_ROWS", 4)
+    rows = "".join(f"EMP{i};Door{i % 3}\n" for i in range(10))
+    contents = _to_data_url("person_id;door_id\n" + rows, "text/csv")
+    result = parse_uploaded_file(contents, "chunked.csv")
+    assert result["success"] is True
+    df = result["data"]
+    assert list(df.columns) == ["person_id", "door_id"]
+    assert df["person_id"].tolist() == [f"EMP{i}" for i in range(10)]
+    assert df.index.tolist() == list(range(10))
+
+
 def test_parse_json_upload() -> None:
     json_text = '[{"a":1,"b":2},{"a":3,"b":4}]'
     contents = _to_data_url(json_text, "application/json")
@@ -0,0 +1,113 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("dash")
+
+from pages import file_upload
+from pages.file_upload import UploadedDataStore
+
+
+def _sample_df():
+    return pd.DataFrame(
+        {
+            "person_id": ["EMP1", "EMP2", "EMP1"],
+            "door_id": ["Door1", "Door2", "Door2"],
+            "access_result": ["Granted", "Denied", "Granted"],
+            "timestamp": pd.date_range("2024-01-01", periods=3, freq="h"),
+        }
+    )
+
+
+def test_store_restores_lazily_with_projection(tmp_path):
+    store = UploadedDataStore(str(tmp_path))
+    store.add_file("first.csv", _sample_df())
+    store.add_file("second.csv", _sample_df().head(2))
+
+    restored = UploadedDataStore(str(tmp_path))
+
+    assert restored.get_filenames() == ["first.csv", "second.csv"]
+    assert restored._data_store == {}
+    assert restored._file_info_store["second.csv"]["rows"] == 2
+
+    projected = restored.load_dataframe("first.csv", columns=["person_id"])
+    assert list(projected.columns) == ["person_id"]
+    assert restored._data_store == {}
+
+    data = restored.get_all_data()
+    decoded = data["first.csv"].astype({col: object for col in ["person_id", "door_id", "access_result"]})
+    pd.testing.assert_frame_equal(decoded, _sample_df())
+    # Memory-mapped frames are served from the shared store, not copied
+    assert restored._data_store == {}
+    assert not data["first.csv"]["person_id"].array.codes.flags.writeable
+
+
+def test_store_falls_back_to_disk_without_shared_copy(tmp_path):
+    UploadedDataStore(str(tmp_path)).add_file("first.csv", _sample_df())
+    (tmp_path / "mmap" / "manifest.json").unlink()
+
+    restored = UploadedDataStore(str(tmp_path))
+
+    pd.testing.assert_frame_equal(restored.get_all_data()["first.csv"], _sample_df())
+    assert set(restored._data_store) == {"first.csv"}
+
+
+def test_store_sees_uploads_from_other_workers(tmp_path):
+    worker_a = UploadedDataStore(str(tmp_path))
+    worker_b = UploadedDataStore(str(tmp_path))
+
+    worker_a.add_file("first.csv", _sample_df())
+    assert worker_b.get_filenames() == ["first.csv"]
+    assert worker_b._file_info_store["first.csv"]["rows"] == 3
+
+    worker_b.clear_all()
+    assert worker_a.get_filenames() == []
+
+
+def test_store_records_memory_usage_in_file_info(tmp_path):
+    store = UploadedDataStore(str(tmp_path))
+    memory = {"memory_before_bytes": 300, "memory_after_bytes": 100, "memory_saved_bytes": 200}
+    store.add_file("first.csv", _sample_df(), memory)
+
+    info = UploadedDataStore(str(tmp_path))._file_info_store["first.csv"]
+    assert info["memory_saved_bytes"] == 200
+    assert info["rows"] == 3
+
+
+def test_store_appends_file_info_and_clears(tmp_path):
+    store = UploadedDataStore(str(tmp_path))
+    store.add_file("first.csv", _sample_df())
+    store.add_file("first.csv", _sample_df().head(1))
+
+    assert UploadedDataStore(str(tmp_path))._file_info_store["first.csv"]["rows"] == 1
+
+    store.clear_all()
+    assert [p.name for p in tmp_path.iterdir()] == ["mmap"]
+    assert UploadedDataStore(str(tmp_path)).get_filenames() == []
+
+
+def test_parquet_storage_dictionary_encodes_ids(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(file_upload, "PARQUET_AVAILABLE", True)
+    store = UploadedDataStore(str(tmp_path))
+    store.add_file("first.csv", _sample_df())
+
+    on_disk = pd.read_parquet(tmp_path / "first.csv.parquet")
+    assert isinstance(on_disk["door_id"].dtype, pd.CategoricalDtype)
+
+    (tmp_path / "mmap" / "manifest.json").unlink()
+    restored = UploadedDataStore(str(tmp_path)).load_dataframe("first.csv")
+    pd.testing.assert_frame_equal(restored, _sample_df())
+
+
+def test_parquet_failure_falls_back_to_pickle(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(file_upload, "PARQUET_AVAILABLE", True)
+    mixed = _sample_df().assign(person_id=[1, "A2", 3])
+    UploadedDataStore(str(tmp_path)).add_file("mixed.csv", mixed)
+    (tmp_path / "mmap" / "manifest.json").unlink()
+
+    restored = UploadedDataStore(str(tmp_path))
+
+    assert restored._file_info_store["mixed.csv"]["format"] == "pickle"
+    assert not (tmp_path / "mixed.csv.parquet").exists()
+    pd.testing.assert_frame_equal(restored.load_dataframe("mixed.csv"), mixed)
@@ -0,0 +1,98 @@
+import json
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+stats = pytest.importorskip("scipy.stats")
+
+from analytics.prepared_frame import prepare_frame
+from analytics.user_behavior import UserBehaviorAnalyzer
+from analytics.user_profiles import UserProfiles
+
+
+def _legacy_profile(user_data, full_df):
+    """Per-user profile as built before the columnar engine"""
+    activity_span = (user_data["timestamp"].max() - user_data["timestamp"].min()).days
+    daily = user_data.groupby("date")["event_id"].count()
+    failure_rate = (user_data["access_result"] == "Denied").mean()
+    after_hours_rate = (~user_data["is_business_hours"]).mean()
+    unusual = (after_hours_rate > (~full_df["is_business_hours"]).mean() * 3
+               or user_data["is_weekend"].mean() > full_df["is_weekend"].mean() * 3)
+    risk = min(100, failure_rate * 40 + after_hours_rate * 20
+               + (user_data["badge_status"] != "Valid").mean() * 30 + unusual * 10)
+    all_user_events = full_df.groupby("person_id", observed=True)["event_id"].count()
+    doors = user_data["door_id"].value_counts().loc[lambda counts: counts > 0]
+    shares = doors.to_numpy() / doors.sum()
+    anomaly_types = []
+    if len(user_data) >= 5 and stats.ks_2samp(user_data["hour"].values, full_df["hour"].values).pvalue < 0.05:
+        anomaly_types.append("unusual_time_pattern")
+    if failure_rate > (full_df["access_result"] == "Denied").mean() * 3 and failure_rate > 0.1:
+        anomaly_types.append("high_failure_rate")
+    return {
+        "total_events": len(user_data),
+        "unique_doors": user_data["door_id"].nunique(),
+        "activity_span_days": activity_span,
+        "preferred_hours": user_data["hour"].mode().tolist(),
+        "preferred_days": user_data["day_of_week"].mode().tolist(),
+        "activity_consistency": 1 - daily.std() / daily.mean(),
+        "door_distribution": doors.to_dict(),
+        "door_concentration_index": np.sum(shares ** 2),
+        "risk_score": risk,
+        "user_percentile": (all_user_events <= len(user_data)).mean(),
+        "anomaly_types": anomaly_types,
+    }
+
+
+@pytest.mark.parametrize("n", [3000, 30000])
+def test_profiles_match_per_user_computation(make_events, n):
+    df = prepare_frame(make_events(11, n=n, users=25)).view()
+    profiles = UserProfiles(df)
+    assert list(profiles) == list(df["person_id"].unique())
+
+    for user_id in profiles:
+        expected = _legacy_profile(df[df["person_id"] == user_id], df)
+        profile = profiles[user_id]
+        assert profile["basic_stats"]["total_events"] == expected["total_events"]
+        assert profile["basic_stats"]["unique_doors_accessed"] == expected["unique_doors"]
+        assert profile["basic_stats"]["activity_span_days"] == expected["activity_span_days"]
+        assert profile["temporal_patterns"]["preferred_hours"] == expected["preferred_hours"]
+        assert profile["temporal_patterns"]["preferred_days"] == expected["preferred_days"]
+        assert profile["temporal_patterns"]["activity_consistency"] == pytest.approx(expected["activity_consistency"])
+        assert profile["location_patterns"]["door_distribution"] == expected["door_distribution"]
+        assert profile["location_patterns"]["door_concentration_index"] == pytest.approx(expected["door_concentration_index"])
+        assert profile["risk_assessment"]["risk_score"] == pytest.approx(expected["risk_score"])
+        assert [a["type"] for a in profile["anomalies"]] == expected["anomaly_types"]
+
+
+def test_profiles_are_built_lazily_and_paged(make_events):
+    df = prepare_frame(make_events(11, n=3000, users=25)).view()
+    analyzer = UserBehaviorAnalyzer()
+    profiles = analyzer.get_user_profiles(df)
+    assert isinstance(profiles, UserProfiles)
+    assert not profiles._profiles
+    # The analysis result carries the JSON-ready first page, not the mapping
+    reported = analyzer.analyze_behavior(df)["user_profiles"]
+    assert json.loads(json.dumps(reported, default=str)) == json.loads(json.dumps(profiles.page(), default=str))
+
+    page = profiles.page(number=2, size=10)
+    assert page["total_users"] == len(profiles) and page["total_pages"] == 3
+    assert len(page["users"]) == 10
+    risk = profiles.summary["risk_score"].sort_values(ascending=False, kind="stable")
+    assert [row["user_id"] for row in page["users"]] == list(risk.index[10:20])
+    assert not profiles._profiles
+
+    user_id = page["users"][0]["user_id"]
+    assert profiles[user_id] is profiles[user_id]
+    assert list(profiles._profiles) == [user_id]
+    with pytest.raises(KeyError):
+        profiles["nobody"]
+
+    # The same events reuse the profiles; new events rebuild them
+    assert analyzer.get_user_profiles(df.copy()) is profiles
+    assert analyzer.get_user_profiles(df.iloc[:100]) is not profiles
+
+
+def test_empty_result_has_the_page_shape(make_events):
+    empty = UserBehaviorAnalyzer().analyze_behavior(make_events(n=10).iloc[:0])["user_profiles"]
+    assert empty == {"page": 1, "page_size": 50, "total_users": 0, "total_pages": 0, "users": []}
+    assert set(empty) == set(UserProfiles(prepare_frame(make_events(n=50)).view()).page())
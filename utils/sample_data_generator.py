@@ -93,6 +93,173 @@ def generate_sample_access_data(num_records=1000):
     
     return df
 
+# Shift start hours and the share of employees working each shift
+SHIFT_STARTS = np.array([8, 16, 0])
+SHIFT_WEIGHTS = np.array([0.7, 0.2, 0.1])
+SHIFT_HOURS = 8
+CRITICAL_DOOR_SHARE = 0.25
+DENIED_BADGE_STATUSES = np.array(["Invalid", "Expired", "Suspended"])
+
+
+def generate_synthetic_access_data(
+    num_records=100_000,
+    num_users=None,
+    num_doors=None,
+    days=30,
+    start_date=None,
+    tailgating_rate=0.01,
+    storm_rate=0.005,
+    seed=0,
+):
+    """Generate realistic access events at scale with vectorised numpy
+
+    Employees work day, evening or night shifts, with arrival and departure
+    peaks at their entrance door and a long tail of off-shift events;
+    weekends are quieter and critical doors deny more often. A
+    ``tailgating_rate`` share of events are bursts of 2-4 granted entries at
+    one door seconds apart, and a ``storm_rate`` share are failed-badge
+    storms of 10-30 denials by one badge at one door.
+
+    Ten million events take a few seconds and well under 1GB: ids are
+    int64 and string columns are categorical, as they are after ingest.
+    """
+    rng = np.random.default_rng(seed)
+    num_users = num_users or int(np.clip(num_records // 200, 50, 200_000))
+    num_doors = num_doors or int(np.clip(num_users // 50, 12, 2_000))
+    start = pd.Timestamp(start_date or pd.Timestamp.now().normalize() - pd.Timedelta(days=days))
+    start = start.normalize()
+
+    num_tailgating = int(num_records * tailgating_rate)
+    num_storm = int(num_records * storm_rate)
+    num_base = num_records - num_tailgating - num_storm
+
+    # Per-user attributes; 20% of people are visitors
+    num_visitors = num_users // 5
+    person_names = np.array(
+        [f"EMP{i:06d}" for i in range(num_users - num_visitors)]
+        + [f"VIS{i:05d}" for i in range(num_visitors)]
+    )
+    user_shift = rng.choice(SHIFT_STARTS, num_users, p=SHIFT_WEIGHTS)
+    user_entrance = rng.integers(0, max(1, num_doors // 10), num_users)
+    user_weights = rng.pareto(1.5, num_users) + 1
+    user_weights[num_users - num_visitors:] *= 0.2
+    door_names = np.array([f"DOOR_{i:04d}" for i in range(num_doors)])
+    door_weights = 1.0 / np.arange(1, num_doors + 1)
+    is_critical = np.zeros(num_doors, dtype=bool)
+    is_critical[rng.permutation(num_doors)[: int(num_doors * CRITICAL_DOOR_SHARE)]] = True
+
+    # Base events: pick a user, a (mostly week-) day and a time within their shift
+    users = rng.choice(num_users, num_base, p=user_weights / user_weights.sum())
+    day_weights = np.where((start + pd.to_timedelta(np.arange(days), unit="D")).weekday >= 5, 0.25, 1.0)
+    day_offsets = rng.choice(days, num_base, p=day_weights / day_weights.sum())
+
+    kind = rng.random(num_base)
+    shift_start = user_shift[users] * 3600
+    seconds = np.where(
+        kind < 0.3,
+        rng.normal(shift_start, 20 * 60),
+        np.where(
+            kind < 0.5,
+            rng.normal(shift_start + SHIFT_HOURS * 3600, 20 * 60),
+            shift_start + rng.uniform(0, SHIFT_HOURS * 3600, num_base),
+        ),
+    )
+    off_shift = kind > 0.95
+    seconds[off_shift] = rng.uniform(0, 86400, off_shift.sum())
+    # Night-shift arrivals before midnight wrap within the day
+    offsets = day_offsets * 86400 + np.mod(seconds.astype(np.int64), 86400)
+
+    doors = rng.choice(num_doors, num_base, p=door_weights / door_weights.sum())
+    at_entrance = kind < 0.5
+    doors[at_entrance] = user_entrance[users[at_entrance]]
+
+    deny_probability = np.where(is_critical[doors], 0.3, 0.05)
+    outcome = rng.random(num_base)
+    results = np.where(
+        outcome < deny_probability,
+        1,
+        np.where(outcome > 0.99, np.where(outcome > 0.997, 3, 2), 0),
+    )
+
+    # Tailgating bursts: followers a few seconds behind a granted entry
+    tail_users, tail_doors, tail_offsets = _bursts(
+        rng, num_tailgating, 2, 5, (2, 15), num_users, num_doors, days, day_weights
+    )
+    tail_users = rng.integers(0, num_users, len(tail_users))
+
+    # Failed-badge storms: one badge retried many times at one door
+    storm_users, storm_doors, storm_offsets = _bursts(
+        rng, num_storm, 10, 31, (1, 10), num_users, num_doors, days, day_weights
+    )
+
+    users = np.concatenate([users, tail_users, storm_users])
+    doors = np.concatenate([doors, tail_doors, storm_doors])
+    offsets = np.concatenate([offsets, tail_offsets, storm_offsets])
+    results = np.concatenate(
+        [results, np.zeros(len(tail_users), dtype=results.dtype), np.ones(len(storm_users), dtype=results.dtype)]
+    )
+
+    order = np.argsort(offsets, kind="stable")
+    users, doors, offsets, results = users[order], doors[order], offsets[order], results[order]
+    n = len(users)
+
+    granted = results == 0
+    badge_codes = np.where(granted | (results > 1), 0, rng.integers(1, 4, n))
+
+    categorical = pd.Categorical.from_codes
+    return pd.DataFrame(
+        {
+            "event_id": np.arange(n, dtype=np.int64),
+            "timestamp": start + pd.to_timedelta(offsets, unit="s"),
+            "person_id": categorical(users, person_names),
+            "door_id": categorical(doors, door_names),
+            "badge_id": categorical(users, np.char.add("BADGE_", person_names)),
+            "access_result": categorical(results, ["Granted", "Denied", "Timeout", "Error"]),
+            "badge_status": categorical(
+                badge_codes, np.concatenate([["Valid"], DENIED_BADGE_STATUSES])
+            ),
+            "door_held_open_time": np.where(granted, rng.uniform(0.5, 5.0, n), 0.0).round(2),
+            "entry_without_badge": rng.random(n) < 0.02,
+            "device_status": categorical(
+                (rng.random(n) < 0.002).astype(np.int8), ["normal", "maintenance"]
+            ),
+        }
+    )
+
+
+def _bursts(rng, num_events, min_size, max_size, gap_range, num_users, num_doors, days, day_weights):
+    """Groups of events by one user at one door, a few seconds apart
+
+    Returns per-event user, door and offset in seconds, truncated to
+    ``num_events``.
+    """
+    if num_events == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    sizes = rng.integers(min_size, max_size, num_events // min_size + 1)
+    sizes = sizes[: np.searchsorted(np.cumsum(sizes), num_events) + 1]
+    num_bursts = len(sizes)
+
+    burst_start = (
+        rng.choice(days, num_bursts, p=day_weights / day_weights.sum()) * 86400
+        + rng.integers(0, 86400, num_bursts)
+    )
+    burst_ids = np.repeat(np.arange(num_bursts), sizes)
+
+    # Gaps accumulate within each burst, starting from zero
+    gaps = rng.integers(gap_range[0], gap_range[1], len(burst_ids))
+    firsts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    gaps[firsts] = 0
+    elapsed = np.cumsum(gaps)
+    elapsed -= np.repeat(elapsed[firsts], sizes)
+
+    users = np.repeat(rng.integers(0, num_users, num_bursts), sizes)
+    doors = np.repeat(rng.integers(0, num_doors, num_bursts), sizes)
+    offsets = np.repeat(burst_start, sizes) + elapsed
+    return users[:num_events], doors[:num_events], offsets[:num_events]
+
+
 def save_sample_data():
     # Generate different sized datasets
     datasets = {